@@ -1,14 +1,31 @@
 """Compatibility analysis engine. Frontends should use src.api instead."""
 
-from .main import CrossGuardAnalyzer
-from .compatibility import CompatibilityAnalyzer
-from .scorer import CompatibilityScorer
-from .database import get_database, reload_database
+import importlib
+
+# Exported lazily so importing a submodule (e.g. src.analyzer.database) does
+# not pull in every parser through src.analyzer.main.
+_EXPORTS = {
+    'CrossGuardAnalyzer': '.main',
+    'AnalysisCancelledError': '.main',
+    'CompatibilityAnalyzer': '.compatibility',
+    'CompatibilityScorer': '.scorer',
+    'get_database': '.database',
+    'reload_database': '.database',
+}
 
 __all__ = [
     'CrossGuardAnalyzer',
+    'AnalysisCancelledError',
     'CompatibilityAnalyzer',
     'CompatibilityScorer',
     'get_database',
     'reload_database',
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -5,6 +5,7 @@ from pathlib import Path
 from typing import Dict, Optional
 
 from ..utils.config import CANIUSE_DB_PATH, CANIUSE_FEATURES_PATH, get_logger
+from ..utils.metrics import DB_LOOKUPS
 
 logger = get_logger('analyzer.database')
 
@@ -134,19 +135,23 @@ class CanIUseDatabase:
         feature = self.get_feature(feature_id)
         
         if not feature or 'stats' not in feature:
+            DB_LOOKUPS.inc('unknown')
             return 'u'
         
         stats = feature['stats']
         
         if browser not in stats:
+            DB_LOOKUPS.inc('unknown')
             return 'u'
         
         browser_stats = stats[browser]
         
         if version in browser_stats:
+            DB_LOOKUPS.inc('exact')
             return self._parse_support_status(browser_stats[version])
 
         # exact version not in DB — fall back to nearest
+        DB_LOOKUPS.inc('nearest')
         return self._find_closest_version_support(browser_stats, version)
     
     def _parse_support_status(self, status: str) -> str:
@@ -1,24 +1,126 @@
-"""Updates the local Can I Use database via npm registry (with git fallback)."""
-
+"""Updates the local Can I Use database via npm registry (with git fallback).
+
+npm downloads are streamed to a .part file next to the database directory.
+The registry metadata is fetched conditionally (ETag / Last-Modified). An
+interrupted tarball download is resumed with a Range request. The finished
+tarball is checked against the registry's dist.integrity (or dist.shasum)
+before use. Only data.json, package.json and features-json/*.json are
+extracted, into a staging directory.
+
+The database directory is a symlink to the installed version's directory
+(a hidden sibling). An update points a new symlink at the staging directory
+and moves it over the old one with os.replace, so the database path always
+names a complete database, old or new, and never a mix of half-copied files.
+Entries the package does not provide (a .git dir, notes, ...) are hard-linked
+or copied into the new version, never moved, so a failed update leaves the
+old version as it was. A database directory that is still a real directory
+(a git clone, or an install from before the symlink) is first renamed to a
+version directory with the symlink put in its place; that one-time switch
+is the only moment the path is missing. Where symlinks are not available
+(e.g. Windows without the privilege) the directories are swapped with two
+renames, and a failed second rename is rolled back.
+"""
+
+import base64
+import hashlib
 import subprocess
 import os
 import shutil
 import tarfile
 import tempfile
 from pathlib import Path
-from typing import Callable, Optional
+from typing import Callable, Dict, Optional
 from urllib.request import urlopen, Request
-from urllib.error import URLError
+from urllib.error import HTTPError, URLError
 import json
 
+from ..utils.config import get_logger
+
+logger = get_logger('analyzer.database_updater')
+
+# Bytes read from the network / hashed per iteration
+_CHUNK_SIZE = 64 * 1024
+
+_TARBALL_NAME = 'caniuse-db.tgz'
+
+
+class IntegrityError(Exception):
+    """The downloaded tarball does not match the registry's checksum."""
+
+
+def _wanted_member(name: str) -> Optional[str]:
+    """Path inside the database dir for a tarball member we install, else None."""
+    parts = name.split('/')
+    if len(parts) == 2 and parts[0] == 'package' and parts[1] in ('data.json', 'package.json'):
+        return parts[1]
+    if (len(parts) == 3 and parts[0] == 'package' and parts[1] == 'features-json'
+            and parts[2].endswith('.json') and not parts[2].startswith('.')):
+        return f"features-json/{parts[2]}"
+    return None
+
+
+def verify_integrity(path: Path, integrity: Optional[str] = None, shasum: Optional[str] = None):
+    """Check path against an SRI string ('sha512-<base64>', possibly several) or a sha1 hex digest.
+
+    Raises IntegrityError on mismatch, or when there is nothing to check against.
+    """
+    expected = []
+    for token in (integrity or '').split():
+        algorithm, _, digest = token.partition('-')
+        if algorithm in ('sha512', 'sha384', 'sha256') and digest:
+            expected.append((algorithm, digest, 'base64'))
+    if not expected and shasum:
+        expected.append(('sha1', shasum.lower(), 'hex'))
+    if not expected:
+        raise IntegrityError("registry gave no dist.integrity or dist.shasum to verify against")
+
+    hashers = {algorithm: hashlib.new(algorithm) for algorithm, _, _ in expected}
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_CHUNK_SIZE), b''):
+            for hasher in hashers.values():
+                hasher.update(chunk)
+
+    for algorithm, digest, encoding in expected:
+        actual = hashers[algorithm].digest()
+        actual = base64.b64encode(actual).decode() if encoding == 'base64' else actual.hex()
+        if actual == digest:
+            return
+    raise IntegrityError(f"{path.name} does not match the registry checksum ({expected[0][0]})")
+
+
+def _link_or_copy(source: str, dest: str):
+    try:
+        os.link(source, dest)
+    except OSError:
+        shutil.copy2(source, dest)
+
+
+def _carry_over(source: Path, staging: Path):
+    """Hard-link (or copy) into staging the entries of source that staging lacks."""
+    for entry in source.iterdir():
+        dest = staging / entry.name
+        if dest.exists() or dest.is_symlink():
+            continue
+        if entry.is_symlink():
+            os.symlink(os.readlink(entry), dest)
+        elif entry.is_dir():
+            shutil.copytree(entry, dest, symlinks=True, copy_function=_link_or_copy)
+        else:
+            _link_or_copy(entry, dest)
+
 
 class DatabaseUpdater:
     """Downloads a fresh copy of the Can I Use data. Tries npm first, falls back to git."""
 
-    def __init__(self, caniuse_dir: Path):
+    def __init__(self, caniuse_dir: Path, registry_url: Optional[str] = None):
         self.caniuse_dir = Path(caniuse_dir)
         self.data_json_path = self.caniuse_dir / "data.json"
         self.package_json_path = self.caniuse_dir / "package.json"
+        self._registry_url = registry_url
+        # Download state lives beside the database so it survives the directory swap
+        self.download_dir = self.caniuse_dir.parent / f".{self.caniuse_dir.name}-download"
+        self._state_path = self.download_dir / "state.json"
+        self._part_path = self.download_dir / f"{_TARBALL_NAME}.part"
 
     # --- npm methods ---
 
@@ -31,26 +133,218 @@ class DatabaseUpdater:
             pass
         return None
 
+    def _load_state(self) -> Dict:
+        try:
+            with open(self._state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+            return state if isinstance(state, dict) else {}
+        except (OSError, json.JSONDecodeError):
+            return {}
+
+    def _save_state(self, state: Dict):
+        try:
+            self.download_dir.mkdir(parents=True, exist_ok=True)
+            tmp = self._state_path.with_suffix('.tmp')
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump(state, f)
+            os.replace(tmp, self._state_path)
+        except OSError as e:
+            logger.debug(f"Could not save download state: {e}")
+
     def check_npm_update(self) -> dict:
         from src.utils.config import NPM_REGISTRY_URL
+        state = self._load_state()
+        local = self.get_local_npm_version()
+
+        headers = {'Accept': 'application/json'}
+        # Only revalidate when the metadata we cached describes what is installed
+        if local and state.get('version') == local and self.data_json_path.exists():
+            if state.get('registry_etag'):
+                headers['If-None-Match'] = state['registry_etag']
+            if state.get('registry_last_modified'):
+                headers['If-Modified-Since'] = state['registry_last_modified']
+
         try:
-            req = Request(NPM_REGISTRY_URL, headers={'Accept': 'application/json'})
-            with urlopen(req, timeout=10) as resp:
-                data = json.loads(resp.read().decode())
+            req = Request(self._registry_url or NPM_REGISTRY_URL, headers=headers)
+            try:
+                with urlopen(req, timeout=10) as resp:
+                    data = json.loads(resp.read().decode())
+                    etag = resp.headers.get('ETag')
+                    last_modified = resp.headers.get('Last-Modified')
+            except HTTPError as e:
+                if e.code != 304:
+                    raise
+                return {
+                    'success': True,
+                    'local_version': local,
+                    'latest_version': local,
+                    'update_available': False,
+                    'not_modified': True,
+                }
 
             latest = data.get('version')
-            local = self.get_local_npm_version()
+            dist = data.get('dist', {})
+            state.update({
+                'latest_version': latest,
+                'latest_registry_etag': etag,
+                'latest_registry_last_modified': last_modified,
+            })
+            self._save_state(state)
 
             return {
                 'success': True,
                 'local_version': local,
                 'latest_version': latest,
                 'update_available': latest != local if (latest and local) else latest is not None,
-                'tarball_url': data.get('dist', {}).get('tarball'),
+                'tarball_url': dist.get('tarball'),
+                'integrity': dist.get('integrity'),
+                'shasum': dist.get('shasum'),
             }
         except (URLError, OSError, json.JSONDecodeError) as e:
             return {'success': False, 'error': str(e)}
 
+    def _download_tarball(self, url: str, progress_callback: Optional[Callable[[str, int], None]] = None) -> Path:
+        """Stream url to the .part file, resuming a previous partial download of the same URL."""
+        self.download_dir.mkdir(parents=True, exist_ok=True)
+        state = self._load_state()
+
+        headers = {}
+        offset = 0
+        if state.get('tarball_url') == url and self._part_path.exists():
+            offset = self._part_path.stat().st_size
+            validator = state.get('tarball_etag') or state.get('tarball_last_modified')
+            if offset and validator:
+                headers['Range'] = f"bytes={offset}-"
+                headers['If-Range'] = validator
+            else:
+                offset = 0
+
+        try:
+            resp = urlopen(Request(url, headers=headers), timeout=60)
+        except HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            # The part file is already complete (or longer than the tarball); start over
+            self._part_path.unlink()
+            return self._download_tarball(url, progress_callback)
+
+        with resp:
+            resumed = offset and resp.status == 206
+            if not resumed:
+                offset = 0
+            state.update({
+                'tarball_url': url,
+                'tarball_etag': resp.headers.get('ETag'),
+                'tarball_last_modified': resp.headers.get('Last-Modified'),
+            })
+            self._save_state(state)
+
+            length = resp.headers.get('Content-Length')
+            total = offset + int(length) if length and length.isdigit() else None
+            done = offset
+            if resumed:
+                logger.info(f"Resuming database download at {offset} bytes")
+            with open(self._part_path, 'ab' if resumed else 'wb') as f:
+                for chunk in iter(lambda: resp.read(_CHUNK_SIZE), b''):
+                    f.write(chunk)
+                    done += len(chunk)
+                    if progress_callback and total:
+                        progress_callback(f"Downloading from npm... {done // 1024} / {total // 1024} KB",
+                                          20 + int(40 * done / total))
+        return self._part_path
+
+    def _extract(self, tarball: Path, staging: Path) -> int:
+        """Write the members we need into staging; returns how many feature files were written."""
+        features = 0
+        (staging / 'features-json').mkdir(parents=True)
+        with tarfile.open(tarball, 'r:gz') as tar:
+            for member in tar:
+                target = _wanted_member(member.name)
+                if target is None or not member.isfile():
+                    continue
+                source = tar.extractfile(member)
+                if source is None:
+                    continue
+                with source, open(staging / target, 'wb') as out:
+                    shutil.copyfileobj(source, out, _CHUNK_SIZE)
+                if target.startswith('features-json/'):
+                    features += 1
+        if not (staging / 'data.json').exists():
+            raise ValueError("Unexpected tarball structure: no package/data.json")
+        return features
+
+    def _is_version_dir(self, path: Path) -> bool:
+        """Whether path is a version directory we created (and may delete)."""
+        return path.parent == self.caniuse_dir.parent and path.name.startswith(f".{self.caniuse_dir.name}.")
+
+    def _migrate_to_link(self) -> bool:
+        """Turn a real caniuse_dir into a version directory plus the symlink to it.
+
+        Returns False, changing nothing, when symlinks cannot be created here.
+        """
+        link = self.caniuse_dir
+        version = Path(tempfile.mkdtemp(prefix=f".{link.name}.", dir=link.parent))
+        version.rmdir()  # only the free name is needed
+        new_link = link.with_name(f".{link.name}-link-{os.getpid()}")
+        try:
+            os.symlink(version.name, new_link, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            return False
+        try:
+            os.rename(link, version)
+        except OSError:
+            new_link.unlink()
+            raise
+        try:
+            os.replace(new_link, link)
+        except OSError:
+            os.rename(version, link)
+            new_link.unlink()
+            raise
+        logger.info(f"Moved the Can I Use database to {version.name} behind a symlink")
+        return True
+
+    def _rename_swap(self, staging: Path):
+        """Swap a real caniuse_dir for staging with two renames (no symlinks available)."""
+        _carry_over(self.caniuse_dir, staging)
+        retired = self.caniuse_dir.with_name(f".{self.caniuse_dir.name}-old-{os.getpid()}")
+        os.rename(self.caniuse_dir, retired)
+        try:
+            os.rename(staging, self.caniuse_dir)
+        except OSError:
+            os.rename(retired, self.caniuse_dir)
+            raise
+        shutil.rmtree(retired, ignore_errors=True)
+
+    def _swap_in(self, staging: Path):
+        """Make staging the database; entries the package does not provide are kept."""
+        link = self.caniuse_dir
+        if link.is_dir() and not link.is_symlink() and not self._migrate_to_link():
+            self._rename_swap(staging)
+            return
+
+        previous = link.parent / os.readlink(link) if link.is_symlink() else None
+        if previous is not None and previous.is_dir():
+            _carry_over(previous, staging)
+
+        new_link = link.with_name(f".{link.name}-link-{os.getpid()}")
+        try:
+            os.symlink(staging.name, new_link, target_is_directory=True)
+        except (OSError, NotImplementedError):
+            if previous is not None:
+                raise
+            # No symlinks here (e.g. Windows without the privilege); nothing to replace yet
+            os.rename(staging, link)
+            return
+        try:
+            os.replace(new_link, link)
+        except OSError:
+            new_link.unlink()
+            raise
+
+        if previous is not None and self._is_version_dir(previous):
+            shutil.rmtree(previous, ignore_errors=True)
+
     def download_npm_update(self, progress_callback: Optional[Callable[[str, int], None]] = None) -> dict:
         if progress_callback:
             progress_callback("Checking npm registry...", 5)
@@ -69,47 +363,40 @@ class DatabaseUpdater:
         if progress_callback:
             progress_callback("Downloading from npm...", 20)
 
+        staging = None
         try:
-            tmp_dir = tempfile.mkdtemp(prefix='crossguard_')
-            tmp_tar = os.path.join(tmp_dir, 'caniuse-db.tgz')
-
-            req = Request(tarball_url)
-            with urlopen(req, timeout=60) as resp:
-                with open(tmp_tar, 'wb') as f:
-                    f.write(resp.read())
+            tarball = self._download_tarball(tarball_url, progress_callback)
 
             if progress_callback:
-                progress_callback("Extracting...", 60)
-
-            with tarfile.open(tmp_tar, 'r:gz') as tar:
-                tar.extractall(path=tmp_dir)
-
-            package_dir = os.path.join(tmp_dir, 'package')
-            if not os.path.isdir(package_dir):
-                return {'success': False, 'message': 'Unexpected tarball structure', 'error': 'No package/ directory'}
+                progress_callback("Verifying...", 60)
+            try:
+                verify_integrity(tarball, check.get('integrity'), check.get('shasum'))
+            except IntegrityError:
+                tarball.unlink()  # don't resume from a corrupt file
+                raise
 
             if progress_callback:
-                progress_callback("Installing...", 80)
+                progress_callback("Extracting...", 70)
 
-            self.caniuse_dir.mkdir(parents=True, exist_ok=True)
+            self.caniuse_dir.parent.mkdir(parents=True, exist_ok=True)
+            # Staging becomes the new version's directory (see _swap_in)
+            staging = Path(tempfile.mkdtemp(prefix=f".{self.caniuse_dir.name}.", dir=self.caniuse_dir.parent))
+            self._extract(tarball, staging)
 
-            src_data = os.path.join(package_dir, 'data.json')
-            if os.path.exists(src_data):
-                shutil.copy2(src_data, str(self.data_json_path))
-
-            src_features = os.path.join(package_dir, 'features-json')
-            dst_features = self.caniuse_dir / 'features-json'
-            if os.path.isdir(src_features):
-                if dst_features.exists():
-                    shutil.rmtree(str(dst_features))
-                shutil.copytree(src_features, str(dst_features))
+            if progress_callback:
+                progress_callback("Installing...", 85)
 
-            # keep package.json so we can compare versions next time
-            src_pkg = os.path.join(package_dir, 'package.json')
-            if os.path.exists(src_pkg):
-                shutil.copy2(src_pkg, str(self.package_json_path))
+            self._swap_in(staging)
+            staging = None
+            tarball.unlink()
 
-            shutil.rmtree(tmp_dir, ignore_errors=True)
+            state = self._load_state()
+            state.update({
+                'version': check['latest_version'],
+                'registry_etag': state.get('latest_registry_etag'),
+                'registry_last_modified': state.get('latest_registry_last_modified'),
+            })
+            self._save_state(state)
 
             if progress_callback:
                 progress_callback("Update complete!", 100)
@@ -123,10 +410,13 @@ class DatabaseUpdater:
                 'npm_version': check['latest_version'],
             }
 
+        except IntegrityError as e:
+            return {'success': False, 'message': 'Downloaded database failed the integrity check', 'error': str(e)}
         except Exception as e:
-            if 'tmp_dir' in locals():
-                shutil.rmtree(tmp_dir, ignore_errors=True)
             return {'success': False, 'message': 'npm download failed', 'error': str(e)}
+        finally:
+            if staging is not None:
+                shutil.rmtree(staging, ignore_errors=True)
 
     # --- git methods (fallback) ---
 
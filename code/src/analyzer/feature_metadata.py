@@ -0,0 +1,138 @@
+"""Per-feature metadata (display name, category, Baseline, polyfill, fix) in one table.
+
+Report generation, history saving, exporters and the GUI used to ask
+feature_names, WebFeaturesManager and the polyfill loader about every
+feature separately, each with its own lookups and fallbacks. The table
+resolves all of it once for every feature the rules know about, and is
+rebuilt only when one of its sources changes: the rule set version, the
+web-features data, or the polyfill map. Features outside the rules (e.g.
+from an old history entry) are resolved on first lookup and kept.
+"""
+
+import threading
+import weakref
+from typing import Dict, NamedTuple, Optional
+
+from .web_features import BaselineInfo, WebFeaturesManager, get_web_features_manager
+from ..utils.feature_names import FIX_SUGGESTIONS, get_feature_name
+
+# Short labels shown next to each feature in reports
+BASELINE_LABELS = {'high': 'Widely', 'low': 'Newly', 'limited': 'Limited'}
+UNKNOWN_BASELINE = 'Unknown'
+
+# Polyfill map sections -> report categories
+_POLYFILL_CATEGORIES = {'javascript': 'js', 'css': 'css', 'html': 'html'}
+
+
+class FeatureMetadata(NamedTuple):
+    feature_id: str
+    name: str
+    category: Optional[str]            # 'css' / 'js' / 'html' (CSS, then JS, wins on overlap); None if no rule
+    baseline: Optional[BaselineInfo]
+    baseline_label: str                # 'Widely' / 'Newly' / 'Limited' / 'Unknown'
+    polyfill: Optional[Dict]           # polyfill_map.json entry
+    fix_suggestion: Optional[str]
+
+    @property
+    def has_polyfill(self) -> bool:
+        return bool(self.polyfill and self.polyfill.get('polyfillable'))
+
+    def to_dict(self) -> Dict:
+        return {
+            'feature_id': self.feature_id,
+            'name': self.name,
+            'category': self.category,
+            'baseline': self.baseline.to_dict() if self.baseline else None,
+            'baseline_label': self.baseline_label,
+            'has_polyfill': self.has_polyfill,
+            'fix_suggestion': self.fix_suggestion,
+        }
+
+
+class FeatureMetadataTable:
+    """Read-mostly feature_id -> FeatureMetadata map for one version of its sources."""
+
+    def __init__(self, key: tuple, categories: Dict[str, str],
+                 baseline: Dict[str, BaselineInfo], polyfills: Dict[str, Dict]):
+        self.key = key
+        self._categories = categories
+        self._baseline = baseline
+        self._polyfills = polyfills
+        self._entries: Dict[str, FeatureMetadata] = {}
+        for feature_id in set(categories) | set(polyfills) | set(FIX_SUGGESTIONS):
+            self._entries[feature_id] = self._resolve(feature_id)
+
+    def _resolve(self, feature_id: str) -> FeatureMetadata:
+        info = self._baseline.get(feature_id)
+        return FeatureMetadata(
+            feature_id=feature_id,
+            name=get_feature_name(feature_id),
+            category=self._categories.get(feature_id),
+            baseline=info,
+            baseline_label=BASELINE_LABELS.get(info.status, UNKNOWN_BASELINE) if info else UNKNOWN_BASELINE,
+            polyfill=self._polyfills.get(feature_id),
+            fix_suggestion=FIX_SUGGESTIONS.get(feature_id),
+        )
+
+    def get(self, feature_id: str) -> FeatureMetadata:
+        entry = self._entries.get(feature_id)
+        if entry is None:
+            entry = self._entries[feature_id] = self._resolve(feature_id)
+        return entry
+
+    def __contains__(self, feature_id: str) -> bool:
+        return feature_id in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _rule_categories(snapshot) -> Dict[str, str]:
+    categories: Dict[str, str] = {}
+    html = snapshot.html
+    for table in (html.elements, html.input_types, html.attributes, html.attribute_values):
+        for feature_id in table.values():
+            categories.setdefault(feature_id, 'html')
+    for feature_id in snapshot.js:
+        categories[feature_id] = 'js'
+    for feature_id in snapshot.css:
+        categories[feature_id] = 'css'
+    return categories
+
+
+_lock = threading.Lock()
+# One table per WebFeaturesManager, dropped with the manager
+_tables: 'weakref.WeakKeyDictionary[WebFeaturesManager, FeatureMetadataTable]' = weakref.WeakKeyDictionary()
+
+
+def _source_key(web_features: WebFeaturesManager, snapshot, polyfill_loader) -> tuple:
+    return (snapshot.version, web_features.generation, web_features.has_data(), polyfill_loader.version)
+
+
+def get_feature_metadata(web_features: Optional[WebFeaturesManager] = None) -> FeatureMetadataTable:
+    """The metadata table for web_features' Baseline data, rebuilt if any source changed."""
+    from ..parsers.rule_registry import get_rule_snapshot
+    from ..polyfill.polyfill_loader import get_polyfill_loader
+
+    if web_features is None:
+        web_features = get_web_features_manager()
+
+    snapshot = get_rule_snapshot()
+    loader = get_polyfill_loader()
+    key = _source_key(web_features, snapshot, loader)
+    table = _tables.get(web_features)
+    if table is not None and table.key == key:
+        return table
+
+    with _lock:
+        table = _tables.get(web_features)
+        if table is None or table.key != key:
+            baseline = web_features.get_baseline_map() if key[2] else {}
+            polyfills = {}
+            categories = _rule_categories(snapshot)
+            for section, feature_id, entry in loader.iter_polyfills():
+                polyfills.setdefault(feature_id, entry)
+                categories.setdefault(feature_id, _POLYFILL_CATEGORIES[section])
+            table = FeatureMetadataTable(key, categories, baseline, polyfills)
+            _tables[web_features] = table
+        return table
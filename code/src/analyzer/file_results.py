@@ -0,0 +1,121 @@
+"""Per-file parse results, so unchanged files need not be parsed again.
+
+Everything one file contributes to a report (features, unrecognized
+patterns and feature details per language, including inline CSS/JS of an
+HTML file, plus library matches, warnings and errors) is collected into a
+FileResult before it is merged into the report. A FileResultCache keeps
+them keyed by path and reuses one as long as the file's mtime and size are
+unchanged and the analysis options and rules are the same.
+"""
+
+import os
+from typing import Dict, Iterable, List, Optional, Tuple
+
+LANGUAGES = ('html', 'css', 'js')
+
+
+def file_stamp(path: str) -> Optional[Tuple[int, int]]:
+    """(mtime_ns, size) of path, or None if it cannot be read."""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class FileResult:
+    """What analyzing one file contributed, per language."""
+
+    __slots__ = ('path', 'stamp', 'parts', 'libraries', 'warnings', 'errors')
+
+    def __init__(self, path: str, stamp: Optional[Tuple[int, int]] = None):
+        self.path = path
+        self.stamp = stamp
+        # language -> {'features': set, 'unrecognized': set, 'details': list}
+        self.parts: Dict[str, Dict] = {}
+        self.libraries: List[Dict] = []
+        self.warnings: List[str] = []
+        self.errors: List[str] = []
+
+    def part(self, language: str) -> Dict:
+        part = self.parts.get(language)
+        if part is None:
+            part = self.parts[language] = {'features': set(), 'unrecognized': set(), 'details': []}
+        return part
+
+    def add(self, language: str, features: Iterable[str], unrecognized: Iterable[str] = (),
+            details: Iterable[Dict] = ()):
+        part = self.part(language)
+        part['features'].update(features)
+        part['unrecognized'].update(unrecognized)
+        part['details'].extend(details)
+
+    def to_dict(self) -> Dict:
+        """JSON-safe form, e.g. for a partial report of one CI shard (stamp is not kept)."""
+        return {
+            'path': self.path,
+            'parts': {
+                language: {
+                    'features': sorted(part['features']),
+                    'unrecognized': sorted(part['unrecognized']),
+                    'details': part['details'],
+                }
+                for language, part in self.parts.items()
+            },
+            'libraries': self.libraries,
+            'warnings': self.warnings,
+            'errors': self.errors,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'FileResult':
+        result = cls(data['path'])
+        for language, part in data.get('parts', {}).items():
+            if language not in LANGUAGES:
+                raise ValueError(f"Unknown language in file result: {language!r}")
+            result.add(language, part.get('features', ()), part.get('unrecognized', ()),
+                       part.get('details', ()))
+        result.libraries = list(data.get('libraries', []))
+        result.warnings = list(data.get('warnings', []))
+        result.errors = list(data.get('errors', []))
+        return result
+
+
+class FileResultCache:
+    """path -> FileResult for files whose stamp has not changed since."""
+
+    def __init__(self):
+        self._results: Dict[str, FileResult] = {}
+        self._options = None
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def use_options(self, options: Tuple):
+        """Drop every result if they were computed with different options."""
+        if options != self._options:
+            self._results.clear()
+            self._options = options
+
+    def get(self, path: str) -> Optional[FileResult]:
+        result = self._results.get(path)
+        if result is None:
+            return None
+        if result.stamp is None or file_stamp(path) != result.stamp:
+            del self._results[path]
+            return None
+        return result
+
+    def put(self, result: FileResult):
+        if result.stamp is not None:
+            self._results[result.path] = result
+
+    def retain(self, paths: Iterable[str]):
+        """Forget files that are no longer analyzed."""
+        keep = set(paths)
+        for path in [p for p in self._results if p not in keep]:
+            del self._results[path]
+
+    def clear(self):
+        self._results.clear()
+        self._options = None
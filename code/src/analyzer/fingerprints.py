@@ -0,0 +1,322 @@
+"""Known-library fingerprints: vendored files resolved by content hash.
+
+Projects carry many identical copies of the same third-party files
+(jQuery, Bootstrap, normalize.css, polyfill bundles). Their features only
+need to be computed once: the store maps the SHA-256 of a file's content
+to the features, details and unrecognized patterns it produced, and the
+analyzer consults it before parsing a CSS or JS file.
+
+Entries come from two files, merged with local entries winning:
+
+- known_libraries.json next to this module, shipped with Cross Guard;
+- ~/.crossguard/fingerprints.json, extended with `crossguard fingerprint add`.
+
+The shipped entries are generated from the release files kept in the
+known_libraries/ directory beside it. `crossguard fingerprint add --builtin`
+adds a file there, and `crossguard fingerprint rebuild` recomputes every
+shipped entry from those files. Run the rebuild after a version bump or a
+rule change.
+
+Every entry is stamped with the rules it was computed with (Cross Guard
+version plus the language's effective rule patterns, custom rules
+included). An entry whose stamp differs from the current one is ignored,
+so a rule change can never serve stale results; the file is parsed as
+usual instead.
+
+Entries also record the size and line count of the content they hash, so
+the analyzer only reads files whose size one of them could have (see
+LibraryFingerprints.may_match).
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from ..utils.config import LIBRARY_FINGERPRINTS_PATH, get_logger
+
+logger = get_logger('analyzer.fingerprints')
+
+KNOWN_LIBRARIES_PATH = Path(__file__).parent / "known_libraries.json"
+
+_FORMAT = 1
+
+# Languages whose files are fingerprinted; HTML pages are project code
+LANGUAGES = ('css', 'js')
+
+# 'jquery-3.7.1.min.js' -> ('jquery', '3.7.1')
+_NAME_VERSION_RE = re.compile(r'^(?P<name>.+?)(?:[-_.@]v?(?P<version>\d+(?:\.\d+)*))?$')
+
+
+class LibraryMatch(NamedTuple):
+    sha256: str
+    library: str
+    version: str
+    language: str
+    features: List[str]
+    feature_details: List[Dict]
+    unrecognized: List[str]
+
+
+def _normalized(data: bytes) -> bytes:
+    if data.startswith(b'\xef\xbb\xbf'):
+        data = data[3:]
+    if b'\r\n' in data:
+        data = data.replace(b'\r\n', b'\n')
+    return data
+
+
+def content_hash(data: bytes) -> str:
+    """SHA-256 of file content, ignoring a UTF-8 BOM and CRLF line endings."""
+    return hashlib.sha256(_normalized(data)).hexdigest()
+
+
+def _size_range(entry: Dict) -> Optional[Tuple[int, int]]:
+    """(smallest, largest) size of a file with the entry's content: with or
+    without a BOM, with LF or CRLF line endings. None for entries without a size."""
+    size, lines = entry.get('size'), entry.get('lines')
+    if not isinstance(size, int) or not isinstance(lines, int):
+        return None
+    return size, size + lines + 3
+
+
+def guess_library_name(filename: str) -> Tuple[str, str]:
+    """(name, version) from a vendored file name, e.g. 'bootstrap-5.3.2.min.css'."""
+    stem = Path(filename).name
+    for suffix in ('.css', '.js', '.mjs', '.cjs'):
+        if stem.lower().endswith(suffix):
+            stem = stem[:-len(suffix)]
+            break
+    if stem.lower().endswith('.min'):
+        stem = stem[:-4]
+    m = _NAME_VERSION_RE.match(stem)
+    return m.group('name'), m.group('version') or ''
+
+
+_digest_lock = threading.Lock()
+_digests: Dict[Tuple[int, str], str] = {}
+
+
+def rules_stamp(language: str) -> str:
+    """Identifies the detection rules a result for this language depends on."""
+    from .. import __version__
+    from ..parsers.rule_registry import get_rule_snapshot
+
+    snapshot = get_rule_snapshot()
+    key = (snapshot.version, language)
+    stamp = _digests.get(key)
+    if stamp is None:
+        rules = snapshot.css if language == 'css' else snapshot.js
+        patterns = {feature_id: info.get('patterns', []) for feature_id, info in rules.items()}
+        payload = json.dumps([__version__, language, patterns], sort_keys=True, default=str)
+        stamp = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+        with _digest_lock:
+            _digests[key] = stamp
+    return stamp
+
+
+def _make_entry(data: bytes, language: str, library: str, version: str, file: str,
+                features, feature_details: List[Dict], unrecognized) -> Tuple[str, Dict]:
+    if language not in LANGUAGES:
+        raise ValueError(f"Only CSS and JS files can be fingerprinted, not '{language}'")
+    data = _normalized(data)
+    entry = {
+        'library': library,
+        'version': version,
+        'file': file,
+        'language': language,
+        'size': len(data),
+        'lines': data.count(b'\n'),
+        'rules': rules_stamp(language),
+        'features': sorted(features),
+        'feature_details': feature_details,
+        'unrecognized': sorted(unrecognized),
+    }
+    return hashlib.sha256(data).hexdigest(), entry
+
+
+def _read_entries(path: Path) -> Dict[str, Dict]:
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning(f"Ignoring unreadable fingerprint file {path}: {e}")
+        return {}
+    if not isinstance(data, dict) or data.get('format') != _FORMAT:
+        logger.warning(f"Ignoring fingerprint file {path}: unsupported format")
+        return {}
+    entries = data.get('libraries')
+    return entries if isinstance(entries, dict) else {}
+
+
+def _mtime(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except OSError:
+        return None
+
+
+class LibraryFingerprints:
+    """Shipped plus local fingerprint entries, keyed by content hash."""
+
+    def __init__(self, builtin_path: Path = KNOWN_LIBRARIES_PATH,
+                 local_path: Path = LIBRARY_FINGERPRINTS_PATH):
+        self.builtin_path = Path(builtin_path)
+        self.local_path = Path(local_path)
+        # The exact release files the shipped entries were computed from
+        # (known_libraries.json -> known_libraries/)
+        self.builtin_sources = self.builtin_path.with_suffix('')
+        self._lock = threading.Lock()
+        self._entries: Optional[Dict[str, Dict]] = None
+        self._stamp: Optional[Tuple] = None
+        # language -> size ranges of its entries, or None if one has no size
+        self._sizes: Dict[str, Optional[List[Tuple[int, int]]]] = {}
+
+    def _source_stamp(self) -> Tuple:
+        return (_mtime(self.builtin_path), _mtime(self.local_path))
+
+    def refresh(self):
+        """Reload the entries if either file changed since they were read."""
+        stamp = self._source_stamp()
+        if self._entries is not None and stamp == self._stamp:
+            return
+        with self._lock:
+            entries = _read_entries(self.builtin_path)
+            entries.update(_read_entries(self.local_path))
+            sizes: Dict[str, Optional[List[Tuple[int, int]]]] = {}
+            for entry in entries.values():
+                ranges = sizes.setdefault(entry.get('language'), [])
+                if ranges is None:
+                    continue
+                size_range = _size_range(entry)
+                if size_range is None:
+                    sizes[entry.get('language')] = None
+                else:
+                    ranges.append(size_range)
+            self._sizes = sizes
+            self._entries = entries
+            self._stamp = stamp
+
+    @property
+    def stamp(self) -> Optional[Tuple]:
+        """Identifies the loaded entries; changes when either file is reloaded."""
+        return self._stamp
+
+    def _loaded(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self.refresh()
+        return self._entries
+
+    def __len__(self) -> int:
+        return len(self._loaded())
+
+    def may_match(self, size: int, language: str) -> bool:
+        """False when no entry for language can be a file of size bytes, so
+        the file need not be read for lookup."""
+        self._loaded()
+        ranges = self._sizes.get(language, [])
+        if ranges is None:
+            return True
+        return any(low <= size <= high for low, high in ranges)
+
+    def lookup(self, data: bytes, language: str) -> Optional[LibraryMatch]:
+        """The stored result for this content, if it was computed with the current rules."""
+        entries = self._loaded()
+        if not entries:
+            return None
+        sha = content_hash(data)
+        entry = entries.get(sha)
+        if entry is None or entry.get('language') != language:
+            return None
+        if entry.get('rules') != rules_stamp(language):
+            logger.debug(f"Fingerprint for {entry.get('library')} is stale for the current rules")
+            return None
+        return LibraryMatch(
+            sha256=sha,
+            library=entry.get('library', ''),
+            version=entry.get('version', ''),
+            language=language,
+            features=list(entry.get('features', [])),
+            feature_details=[dict(d) for d in entry.get('feature_details', [])],
+            unrecognized=list(entry.get('unrecognized', [])),
+        )
+
+    def entries(self) -> List[Dict]:
+        """Every entry as a dict with its 'sha256', sorted by library and version."""
+        entries = [{'sha256': sha, **entry} for sha, entry in self._loaded().items()]
+        entries.sort(key=lambda e: (e.get('library', ''), e.get('version', ''), e.get('file', '')))
+        return entries
+
+    def add(self, data: bytes, language: str, library: str, version: str, file: str,
+            features, feature_details: List[Dict], unrecognized, builtin: bool = False) -> Dict:
+        """Record a result (replacing any entry for the same content).
+
+        Entries go to the local file; with builtin=True to the shipped file,
+        and the content is kept in builtin_sources so rebuild_builtin() can
+        recompute the entry.
+        """
+        sha, entry = _make_entry(data, language, library, version, file,
+                                 features, feature_details, unrecognized)
+        path = self.builtin_path if builtin else self.local_path
+        with self._lock:
+            if builtin:
+                self.builtin_sources.mkdir(parents=True, exist_ok=True)
+                source = self.builtin_sources / Path(file).name
+                if not source.exists() or source.read_bytes() != data:
+                    source.write_bytes(data)
+            entries = _read_entries(path)
+            entries[sha] = entry
+            self._write(path, entries)
+            self._entries = None
+        return {'sha256': sha, **entry}
+
+    def builtin_source_files(self) -> List[Path]:
+        """The files the shipped entries are computed from, sorted by name."""
+        if not self.builtin_sources.is_dir():
+            return []
+        return sorted(p for p in self.builtin_sources.iterdir() if p.is_file())
+
+    def rebuild_builtin(self, results: List[Dict]) -> List[Dict]:
+        """Replace every shipped entry with the given results.
+
+        results hold add()'s arguments except builtin. Entries for content
+        no longer in the list are dropped.
+        """
+        entries = {}
+        for result in results:
+            sha, entry = _make_entry(**result)
+            entries[sha] = entry
+        with self._lock:
+            self._write(self.builtin_path, entries)
+            self._entries = None
+        return [{'sha256': sha, **entry} for sha, entry in entries.items()]
+
+    def _write(self, path: Path, entries: Dict[str, Dict]):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'format': _FORMAT, 'libraries': entries}, f, indent=1, sort_keys=True)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+
+_store_lock = threading.Lock()
+_store: Optional[LibraryFingerprints] = None
+
+
+def get_library_fingerprints() -> LibraryFingerprints:
+    """Process-wide store, so the fingerprint files are read at most once per change."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = LibraryFingerprints()
+    return _store
@@ -1,84 +1,222 @@
 """Entry point that combines parsers, compatibility checking, and scoring."""
 
-from typing import Dict, List, Set, Optional
+from typing import Callable, Dict, List, Set, Optional
 from pathlib import Path
 from datetime import datetime
+import os
+import threading
+import time
 
-from ..parsers.html_parser import HTMLParser
-from ..parsers.js_parser import JavaScriptParser
-from ..parsers.css_parser import CSSParser
 from .compatibility import CompatibilityAnalyzer
+from .file_results import FileResult, FileResultCache, file_stamp
 from .scorer import CompatibilityScorer
-from .web_features import WebFeaturesManager
+from .feature_metadata import get_feature_metadata
+from .fingerprints import get_library_fingerprints
+from .web_features import get_web_features_manager
+from ..parsers.minified import (
+    DEFAULT_MINIFIED_MODE, MINIFIED_FULL, MINIFIED_SKIP, check_minified_mode, detect_minified,
+)
+from ..parsers.custom_rules_loader import get_custom_rules_version
+from ..parsers.rule_patterns import describe_disabled, get_pattern_stats
 from ..utils.config import get_logger, LATEST_VERSIONS
+from ..utils.metrics import CACHE_REQUESTS, FILES_PARSED, PARSE_SECONDS
+from ..utils.profiling import get_active_profiler, profile_stage
 
 # Maps web-features baseline status codes to display labels used in reports.
-_BASELINE_LABELS = {'high': 'Widely', 'low': 'Newly', 'limited': 'Limited'}
-
 logger = get_logger('analyzer.main')
 
+# Share of the progress bar spent on parsing; classification/scoring fill the rest.
+_PARSE_PROGRESS_SHARE = 90
+
+# Analyzer attributes (features, unrecognized, details) a language's results go to
+_LANGUAGE_STATE = {
+    'html': ('html_features', 'unrecognized_html', 'html_feature_details'),
+    'css': ('css_features', 'unrecognized_css', 'css_feature_details'),
+    'js': ('js_features', 'unrecognized_js', 'js_feature_details'),
+}
+
+
+class AnalysisCancelledError(Exception):
+    """Raised between files when the caller sets the cancel event."""
+
 
 class CrossGuardAnalyzer:
     """Runs the full pipeline: parse files, check browser support, score, and build a report."""
 
     def __init__(self):
-        self.html_parser = HTMLParser()
-        self.js_parser = JavaScriptParser()
-        self.css_parser = CSSParser()
+        self._html_parser = None
+        self._js_parser = None
+        self._css_parser = None
         self.compatibility_analyzer = CompatibilityAnalyzer()
         self.scorer = CompatibilityScorer()
-        self.web_features = WebFeaturesManager()
+        self.web_features = get_web_features_manager()
+        # Per-file results kept between runs (see run_analysis(cache_file_results=...))
+        self._file_cache = FileResultCache()
         self._reset_state()
 
+    # Each parser (and its tinycss2 / tree-sitter / bs4 dependency) is only
+    # imported once a file of that type is actually analyzed.
+
+    @property
+    def html_parser(self):
+        if self._html_parser is None:
+            from ..parsers.html_parser import HTMLParser
+            self._html_parser = HTMLParser()
+        return self._html_parser
+
+    @property
+    def css_parser(self):
+        if self._css_parser is None:
+            from ..parsers.css_parser import CSSParser
+            self._css_parser = CSSParser()
+        return self._css_parser
+
+    @property
+    def js_parser(self):
+        if self._js_parser is None:
+            from ..parsers.js_parser import JavaScriptParser
+            self._js_parser = JavaScriptParser()
+        return self._js_parser
+
     def _annotate_baseline(self, detail_lists):
         """Attach a 'baseline' label to each feature_details entry. Falls back to 'Unknown'."""
-        has_data = self.web_features.has_data()
+        metadata = get_feature_metadata(self.web_features)
         for entries in detail_lists:
             for entry in entries:
-                if not has_data:
-                    entry['baseline'] = 'Unknown'
-                    continue
-                info = self.web_features.get_baseline_status(entry.get('feature', ''))
-                entry['baseline'] = _BASELINE_LABELS.get(info.status, 'Unknown') if info else 'Unknown'
+                entry['baseline'] = metadata.get(entry.get('feature', '')).baseline_label
 
     def run_analysis(
         self,
         html_files: Optional[List[str]] = None,
         css_files: Optional[List[str]] = None,
         js_files: Optional[List[str]] = None,
-        target_browsers: Optional[Dict[str, str]] = None
+        target_browsers: Optional[Dict[str, str]] = None,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        group_libraries: bool = False,
+        minified: str = DEFAULT_MINIFIED_MODE,
+        max_file_size: Optional[int] = None,
+        incremental: bool = False,
+        cache_file_results: bool = False,
     ) -> Dict:
-        self._reset_state()
-
+        """progress_callback(message, percentage) is called after every parsed file.
+        Setting cancel_event stops the run before the next file (AnalysisCancelledError).
+        CSS/JS files found in the library fingerprint store are not parsed; with
+        group_libraries their features are only listed under report['libraries']
+        instead of counting towards the project's features. minified ('skip',
+        'fast' or 'full', see parsers.minified) decides how minified or
+        generated CSS/JS files are analyzed. Files larger than max_file_size
+        bytes are skipped with a warning. With incremental, JS files analyzed
+        again by this analyzer are re-parsed only where they changed. With
+        cache_file_results, files whose mtime and size are unchanged since this
+        analyzer's last run (with the same options and rules) are not parsed
+        again; their previous results are reused.
+        """
         if target_browsers is None:
             target_browsers = self._get_default_browsers()
 
         validation_result = self._validate_inputs(html_files, css_files, js_files)
         if not validation_result['valid']:
+            self._reset_state()
             return {
                 'success': False,
                 'error': validation_result['error'],
                 'timestamp': datetime.now().isoformat()
             }
 
+        self._parse_all(html_files or [], css_files or [], js_files or [],
+                        progress_callback, cancel_event, group_libraries, minified,
+                        max_file_size, incremental, cache_file_results)
+        return self._build_report(target_browsers)
+
+    def collect_file_results(
+        self,
+        html_files: Optional[List[str]] = None,
+        css_files: Optional[List[str]] = None,
+        js_files: Optional[List[str]] = None,
+        progress_callback: Optional[Callable[[str, int], None]] = None,
+        cancel_event: Optional[threading.Event] = None,
+        group_libraries: bool = False,
+        minified: str = DEFAULT_MINIFIED_MODE,
+        max_file_size: Optional[int] = None,
+    ) -> List[FileResult]:
+        """Parse the files like run_analysis, without checking browser support.
+
+        Returns what each file contributed, in analysis order (HTML, CSS, JS).
+        Results of several runs (e.g. one per CI shard) are turned into one
+        report by report_from_file_results. No files gives no results.
+        """
+        if not any([html_files, css_files, js_files]):
+            return []
+        validation_result = self._validate_inputs(html_files, css_files, js_files)
+        if not validation_result['valid']:
+            raise FileNotFoundError(validation_result['error'])
+        self._parse_all(html_files or [], css_files or [], js_files or [],
+                        progress_callback, cancel_event, group_libraries, minified,
+                        max_file_size, False, False)
+        return list(self.file_results)
+
+    def report_from_file_results(self, file_results: List[FileResult],
+                                 target_browsers: Optional[Dict[str, str]] = None) -> Dict:
+        """The report run_analysis would give for the files behind file_results,
+        which must be in analysis order (HTML, CSS, JS, as run_analysis got them)."""
+        if target_browsers is None:
+            target_browsers = self._get_default_browsers()
+        self._reset_state()
+        for result in file_results:
+            self._apply_file_result(result)
+        return self._build_report(target_browsers)
+
+    def _parse_all(self, html_files: List[str], css_files: List[str], js_files: List[str],
+                   progress_callback, cancel_event, group_libraries: bool, minified: str,
+                   max_file_size: Optional[int], incremental: bool, cache_file_results: bool):
+        self._reset_state()
+        self._progress_callback = progress_callback
+        self._cancel_event = cancel_event
+        self._group_libraries = group_libraries
+        self._minified_mode = check_minified_mode(minified)
+        self._max_file_size = max_file_size
+        self._incremental = incremental
+        self._cache_file_results = cache_file_results
+        self._fingerprints = get_library_fingerprints()
+        self._fingerprints.refresh()
+        if cache_file_results:
+            self._file_cache.use_options((
+                self._minified_mode, group_libraries, max_file_size,
+                get_custom_rules_version(), self._fingerprints.stamp,
+            ))
+            self._file_cache.retain([*html_files, *css_files, *js_files])
+        else:
+            self._file_cache.clear()
+        self._files_total = len(html_files) + len(css_files) + len(js_files)
+        for entry in get_pattern_stats().disabled_patterns():
+            self.warnings.append(f"{describe_disabled(entry)} earlier in this session and is disabled; "
+                                 f"no file was checked against it")
+
         logger.info("Analyzing project files...")
-        self._parse_html_files(html_files or [])
-        self._parse_css_files(css_files or [])
-        self._parse_js_files(js_files or [])
+        self._parse_html_files(html_files)
+        self._parse_css_files(css_files)
+        self._parse_js_files(js_files)
 
+    def _build_report(self, target_browsers: Dict[str, str]) -> Dict:
         self.all_features = self.html_features | self.js_features | self.css_features
 
+        self._check_cancelled()
+        self._report_progress("Checking browser compatibility...", _PARSE_PROGRESS_SHARE)
         logger.info("Checking browser compatibility...")
-        compatibility_results = self._check_compatibility(target_browsers)
+        with profile_stage('classify'):
+            compatibility_results = self._check_compatibility(target_browsers)
 
         logger.info("Calculating compatibility scores...")
-        scores = self._calculate_scores(compatibility_results, target_browsers)
-
-        report = self._generate_report(
-            compatibility_results,
-            scores,
-            target_browsers
-        )
+        with profile_stage('score'):
+            scores = self._calculate_scores(compatibility_results, target_browsers)
+
+        with profile_stage('report'):
+            report = self._generate_report(
+                compatibility_results,
+                scores,
+                target_browsers
+            )
 
         return report
 
@@ -96,6 +234,20 @@ class CrossGuardAnalyzer:
         self.css_feature_details = []
         self.js_feature_details = []
         self.html_feature_details = []
+        # CSS/JS files resolved from the library fingerprint store
+        self.libraries = []
+        # What each file of the last run contributed, in analysis order
+        self.file_results = []
+        self._group_libraries = False
+        self._minified_mode = DEFAULT_MINIFIED_MODE
+        self._max_file_size = None
+        self._incremental = False
+        self._cache_file_results = False
+        self._fingerprints = None
+        self._progress_callback = None
+        self._cancel_event = None
+        self._files_total = 0
+        self._files_done = 0
 
     def _validate_inputs(
         self,
@@ -120,33 +272,226 @@ class CrossGuardAnalyzer:
         return {'valid': True}
 
     def _parse_files(self, label: str, files: List[str], parser,
-                     feature_set: set, unrecognized_set: set, details_list: list):
+                     after_parse: Optional[Callable[[str, FileResult], None]] = None):
+        profiler = get_active_profiler()
+        language = label.lower()
+        stage = f"parse.{language}"
+        if hasattr(parser, 'minified_mode'):
+            parser.minified_mode = self._minified_mode
+        if hasattr(parser, 'incremental'):
+            parser.incremental = self._incremental
+        cache = self._file_cache if self._cache_file_results else None
         for filepath in files:
-            try:
-                features = parser.parse_file(filepath)
-                feature_set.update(features)
-                unrecognized_set.update(parser.unrecognized_patterns)
-                details_list.extend(parser.feature_details)
+            self._check_cancelled()
+            result = cache.get(filepath) if cache is not None else None
+            if result is not None:
+                CACHE_REQUESTS.inc('files', 'hit')
+                self._apply_file_result(result)
+                self._files_done += 1
+                self._report_file_progress(filepath)
+                continue
+            if cache is not None:
+                CACHE_REQUESTS.inc('files', 'miss')
+            # Stamped before parsing, so a write during the parse invalidates it
+            result = FileResult(filepath, file_stamp(filepath))
+            if not self._over_size_limit(filepath, label, result):
+                self._parse_one(filepath, label, parser, result, stage, profiler, after_parse)
+            if cache is not None:
+                cache.put(result)
+            self._apply_file_result(result)
+            self._files_done += 1
+            self._report_file_progress(filepath)
+
+    def _parse_one(self, filepath: str, label: str, parser, result: FileResult,
+                   stage: str, profiler, after_parse):
+        language = label.lower()
+        pattern_stats = get_pattern_stats()
+        disabled_before = len(pattern_stats.disabled_patterns())
+        try:
+            start = time.perf_counter()
+            with profile_stage(stage):
+                match, minified_reason = self._match_library(filepath, language)
+                if match is not None:
+                    # A stored result stands in for parsing, so the minified
+                    # mode applies to it as it would to the parse
+                    if minified_reason is not None:
+                        self._note_minified(filepath, label, minified_reason, result)
+                    if minified_reason is not None and self._minified_mode == MINIFIED_SKIP:
+                        features = set()
+                    else:
+                        features = match.features
+                        self._add_library(filepath, match, result, fast=minified_reason is not None)
+                else:
+                    features = parser.parse_file(filepath)
+                    result.add(language, features, parser.unrecognized_patterns, parser.feature_details)
+                    if getattr(parser, 'minified_reason', None):
+                        self._note_minified(filepath, label, parser.minified_reason, result)
+                    if after_parse is not None:
+                        after_parse(filepath, result)
+            elapsed = time.perf_counter() - start
+            for entry in pattern_stats.disabled_patterns()[disabled_before:]:
+                result.warnings.append(f"{describe_disabled(entry)} on {filepath}; disabled for the rest "
+                                       f"of the session, so later files are not checked against it")
+            if match is None:
+                FILES_PARSED.inc(language)
+                PARSE_SECONDS.observe(elapsed, language)
+            if profiler is not None:
+                profiler.record_file(filepath, label, elapsed, len(features))
+            if match is None:
                 logger.info(f"Parsed {label}: {Path(filepath).name} ({len(features)} features)")
-            except Exception as e:
-                error_msg = f"Error parsing {label} file {filepath}: {str(e)}"
-                self.errors.append(error_msg)
-                logger.error(error_msg)
+        except Exception as e:
+            error_msg = f"Error parsing {label} file {filepath}: {str(e)}"
+            result.errors.append(error_msg)
+            logger.error(error_msg)
+
+    def _apply_file_result(self, result: FileResult):
+        """Merge one file's contributions into the analysis state."""
+        self.file_results.append(result)
+        for language, part in result.parts.items():
+            features, unrecognized, details = (getattr(self, name) for name in _LANGUAGE_STATE[language])
+            features.update(part['features'])
+            unrecognized.update(part['unrecognized'])
+            details.extend(part['details'])
+        self.libraries.extend(result.libraries)
+        self.warnings.extend(result.warnings)
+        self.errors.extend(result.errors)
+
+    def _over_size_limit(self, filepath: str, label: str, result: FileResult) -> bool:
+        if self._max_file_size is None:
+            return False
+        try:
+            size = os.path.getsize(filepath)
+        except OSError:
+            return False  # reported by the parser
+        if size <= self._max_file_size:
+            return False
+        result.warnings.append(
+            f"Skipped {label} file {filepath}: {size} bytes exceeds the {self._max_file_size} byte limit")
+        logger.warning(f"Skipped {label}: {Path(filepath).name} is larger than {self._max_file_size} bytes")
+        return True
+
+    def _note_minified(self, filepath: str, label: str, reason: str, result: FileResult):
+        name = Path(filepath).name
+        if self._minified_mode == MINIFIED_SKIP:
+            result.warnings.append(f"Skipped minified {label} file {filepath} ({reason})")
+            logger.warning(f"Skipped {label}: {name} looks minified or generated ({reason})")
+        else:
+            logger.info(f"{label}: {name} looks minified or generated ({reason}); "
+                        f"skipped unrecognized patterns and details")
+
+    def _match_library(self, filepath: str, language: str):
+        """(the fingerprint store's entry for this file's content or None,
+        why a matched file looks minified when that matters to the minified mode)."""
+        store = self._fingerprints
+        if store is None or language not in ('css', 'js') or not len(store):
+            return None, None
+        try:
+            size = os.path.getsize(filepath)
+        except OSError:
+            return None, None  # reported by the parser
+        if not store.may_match(size, language):
+            CACHE_REQUESTS.inc('fingerprints', 'miss')
+            return None, None
+        with open(filepath, 'rb') as f:
+            content = f.read()
+        match = store.lookup(content, language)
+        CACHE_REQUESTS.inc('fingerprints', 'miss' if match is None else 'hit')
+        reason = None
+        if match is not None and self._minified_mode != MINIFIED_FULL:
+            reason = detect_minified(content)
+        return match, reason
+
+    def _add_library(self, filepath: str, match, result: FileResult, fast: bool = False):
+        """With fast, only the match's features count, as for a minified file parsed in fast mode."""
+        result.libraries.append({
+            'file': filepath,
+            'library': match.library,
+            'version': match.version,
+            'language': match.language,
+            'features': sorted(match.features),
+            'counted': not self._group_libraries,
+        })
+        if not self._group_libraries:
+            if fast:
+                result.add(match.language, match.features)
+            else:
+                result.add(match.language, match.features, match.unrecognized, match.feature_details)
+        version = f" {match.version}" if match.version else ""
+        logger.info(f"Matched {Path(filepath).name} to {match.library}{version} ({len(match.features)} features)")
+
+    def _check_cancelled(self):
+        if self._cancel_event is not None and self._cancel_event.is_set():
+            raise AnalysisCancelledError("Analysis cancelled")
+
+    def _report_progress(self, message: str, percentage: int):
+        if self._progress_callback is None:
+            return
+        try:
+            self._progress_callback(message, percentage)
+        except Exception as e:
+            # A broken progress consumer must never abort the analysis itself
+            logger.debug(f"Progress callback failed: {e}")
+
+    def _report_file_progress(self, filepath: str):
+        if self._progress_callback is None:
+            return
+        features_so_far = len(self.html_features | self.css_features | self.js_features)
+        total = self._files_total or 1
+        self._report_progress(
+            f"Parsed {Path(filepath).name} ({self._files_done}/{self._files_total} files, "
+            f"{features_so_far} features found)",
+            int(self._files_done / total * _PARSE_PROGRESS_SHARE),
+        )
 
     def _parse_html_files(self, html_files: List[str]):
+        if not html_files:
+            return
         self._parse_files('HTML', html_files, self.html_parser,
-                          self.html_features, self.unrecognized_html, self.html_feature_details)
+                          after_parse=self._parse_inline_sources)
+
+    def _parse_inline_sources(self, filepath: str, result: FileResult):
+        """Analyze the <style>/style=""/<script> code the HTML parser just collected.
+
+        All fragments of one kind go through their parser in a single
+        parse_string call; features count towards CSS/JS like external files.
+        """
+        html_parser = self.html_parser
+        if html_parser.inline_css:
+            self._parse_inline('CSS', html_parser.inline_css, self.css_parser, result)
+        if html_parser.inline_js:
+            self._parse_inline('JS', html_parser.inline_js, self.js_parser, result)
+
+    def _parse_inline(self, label: str, sources, parser, result: FileResult):
+        if not sources:
+            return
+        with profile_stage(f"parse.inline-{label.lower()}"):
+            features = parser.parse_string(sources.text, locate=True)
+        details = []
+        for detail in parser.feature_details:
+            # Fragments holding the code the feature was found in, in document order
+            inline_sources = []
+            for offset in parser.feature_offsets.get(detail['feature'], ()):
+                source = sources.locate(offset)
+                if source is not None and source not in inline_sources:
+                    inline_sources.append(source)
+            details.append({**detail, 'inline_sources': inline_sources})
+        result.add(label.lower(), features, parser.unrecognized_patterns, details)
+        logger.info(f"Parsed inline {label}: {len(sources.segments)} fragments ({len(features)} features)")
 
     def _parse_css_files(self, css_files: List[str]):
-        self._parse_files('CSS', css_files, self.css_parser,
-                          self.css_features, self.unrecognized_css, self.css_feature_details)
+        if not css_files:
+            return
+        self._parse_files('CSS', css_files, self.css_parser)
 
     def _parse_js_files(self, js_files: List[str]):
-        self._parse_files('JS', js_files, self.js_parser,
-                          self.js_features, self.unrecognized_js, self.js_feature_details)
+        if not js_files:
+            return
+        self._parse_files('JS', js_files, self.js_parser)
 
     def _check_compatibility(self, target_browsers: Dict[str, str]) -> Dict:
-        return self.compatibility_analyzer.classify_features(self.all_features, target_browsers)
+        # Sorted so feature lists and score sums do not depend on set order
+        # (which differs between processes, e.g. CI shards and their merge)
+        return self.compatibility_analyzer.classify_features(sorted(self.all_features), target_browsers)
 
     def _calculate_scores(
         self,
@@ -269,6 +614,7 @@ class CrossGuardAnalyzer:
                 'js': sorted(self.unrecognized_js),
                 'total': len(self.unrecognized_html) + len(self.unrecognized_css) + len(self.unrecognized_js)
             },
+            'libraries': self.libraries,
             'issues': {
                 'critical': sorted(critical_issues),
                 'warnings': self.warnings,
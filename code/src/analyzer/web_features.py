@@ -1,14 +1,32 @@
-"""Web Features (Baseline) integration — maps Can I Use IDs to W3C Baseline status."""
+"""Web Features (Baseline) integration — maps Can I Use IDs to W3C Baseline status.
+
+The downloaded web-features data.json is several MB, but only each feature's
+caniuse IDs and Baseline status/dates are needed. Those are written to a
+compact index next to the cache (WEB_FEATURES_INDEX_PATH) the first time the
+download is read, stamped with the download's size and mtime; later runs
+load only the index, until the download changes.
+"""
 
 import json
+import os
+import threading
 from typing import Dict, List, Optional
 from urllib.request import urlopen, Request
 from urllib.error import URLError
 
-from src.utils.config import WEB_FEATURES_URL, WEB_FEATURES_CACHE_PATH, WEB_FEATURES_CACHE_DIR, get_logger
+from src.utils.config import (
+    WEB_FEATURES_URL,
+    WEB_FEATURES_CACHE_PATH,
+    WEB_FEATURES_CACHE_DIR,
+    WEB_FEATURES_INDEX_PATH,
+    get_logger,
+)
 
 logger = get_logger('analyzer.web_features')
 
+# Bump when the index layout changes so old index files are rebuilt
+_INDEX_FORMAT = 1
+
 
 class BaselineInfo:
     """Baseline status for one feature: when it became newly or widely available."""
@@ -29,6 +47,7 @@ class WebFeaturesManager:
 
     def __init__(self):
         self._reverse_map: Optional[Dict[str, BaselineInfo]] = None
+        self.generation = 0  # bumped whenever the data is re-downloaded
 
     def download(self) -> bool:
         """Fetches from unpkg and caches locally"""
@@ -37,13 +56,15 @@ class WebFeaturesManager:
             with urlopen(req, timeout=30) as resp:
                 data = resp.read()
 
-            json.loads(data)  # validate before writing to cache
+            parsed = json.loads(data)  # validate before writing to cache
 
             WEB_FEATURES_CACHE_DIR.mkdir(parents=True, exist_ok=True)
             with open(WEB_FEATURES_CACHE_PATH, 'wb') as f:
                 f.write(data)
+            _write_index(_source_stamp(), _index_entries(parsed))
 
             self._reverse_map = None  # force rebuild on next lookup
+            self.generation += 1
             logger.info("Web features data downloaded successfully")
             return True
 
@@ -61,50 +82,19 @@ class WebFeaturesManager:
         return None
 
     def _build_reverse_map(self) -> Dict[str, BaselineInfo]:
-        data = self._load_cache()
-        if not data:
+        stamp = _source_stamp()
+        if stamp is None:
             return {}
 
-        reverse_map: Dict[str, BaselineInfo] = {}
-
-        # the web-features package wraps everything under a "features" key
-        features = data.get('features', data) if isinstance(data, dict) else data
-
-        for _feature_name, feature_data in features.items():
-            if not isinstance(feature_data, dict):
-                continue
-
-            caniuse_ids = feature_data.get('caniuse')
-            if not caniuse_ids:
-                continue
-
-            status_data = feature_data.get('status', {})
-            if not isinstance(status_data, dict):
-                continue
-
-            baseline = status_data.get('baseline')
-            if baseline == 'high':
-                status = 'high'
-            elif baseline == 'low':
-                status = 'low'
-            elif baseline is False or baseline is None:
-                status = 'limited'
-            else:
-                status = 'limited'
-
-            info = BaselineInfo(
-                status=status,
-                low_date=status_data.get('baseline_low_date'),
-                high_date=status_data.get('baseline_high_date'),
-            )
+        entries = _read_index(stamp)
+        if entries is None:
+            data = self._load_cache()
+            if not data:
+                return {}
+            entries = _index_entries(data)
+            _write_index(stamp, entries)
 
-            if isinstance(caniuse_ids, list):
-                for cid in caniuse_ids:
-                    reverse_map[cid] = info
-            elif isinstance(caniuse_ids, str):
-                reverse_map[caniuse_ids] = info
-
-        return reverse_map
+        return {cid: BaselineInfo(*entry) for cid, entry in entries.items()}
 
     def _ensure_loaded(self):
         if self._reverse_map is None:
@@ -114,6 +104,11 @@ class WebFeaturesManager:
         self._ensure_loaded()
         return self._reverse_map.get(caniuse_id)
 
+    def get_baseline_map(self) -> Dict[str, BaselineInfo]:
+        """Every known Can I Use ID -> BaselineInfo. Treat as read-only."""
+        self._ensure_loaded()
+        return self._reverse_map
+
     def get_baseline_summary(self, feature_ids: List[str]) -> dict:
         self._ensure_loaded()
 
@@ -142,3 +137,97 @@ class WebFeaturesManager:
 
     def has_data(self) -> bool:
         return WEB_FEATURES_CACHE_PATH.exists()
+
+
+def _index_entries(data) -> Dict[str, list]:
+    """caniuse id -> [status, low_date, high_date] from a web-features data.json."""
+    entries: Dict[str, list] = {}
+    if not isinstance(data, dict):
+        return entries
+
+    # the web-features package wraps everything under a "features" key
+    features = data.get('features', data)
+
+    for _feature_name, feature_data in features.items():
+        if not isinstance(feature_data, dict):
+            continue
+
+        caniuse_ids = feature_data.get('caniuse')
+        if not caniuse_ids:
+            continue
+
+        status_data = feature_data.get('status', {})
+        if not isinstance(status_data, dict):
+            continue
+
+        baseline = status_data.get('baseline')
+        if baseline == 'high':
+            status = 'high'
+        elif baseline == 'low':
+            status = 'low'
+        else:
+            status = 'limited'  # False, None or anything unexpected
+
+        entry = [status, status_data.get('baseline_low_date'), status_data.get('baseline_high_date')]
+
+        if isinstance(caniuse_ids, list):
+            for cid in caniuse_ids:
+                entries[cid] = entry
+        elif isinstance(caniuse_ids, str):
+            entries[caniuse_ids] = entry
+
+    return entries
+
+
+def _source_stamp() -> Optional[List[int]]:
+    """[size, mtime_ns] of the downloaded data, or None if there is none."""
+    try:
+        st = WEB_FEATURES_CACHE_PATH.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def _read_index(stamp: List[int]) -> Optional[Dict[str, list]]:
+    """The index entries if the index exists and was built from this download."""
+    try:
+        with open(WEB_FEATURES_INDEX_PATH, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(index, dict) or index.get('format') != _INDEX_FORMAT or index.get('source') != stamp:
+        return None
+    entries = index.get('features')
+    return entries if isinstance(entries, dict) else None
+
+
+def _write_index(stamp: Optional[List[int]], entries: Dict[str, list]):
+    if stamp is None:
+        return
+    tmp_path = WEB_FEATURES_INDEX_PATH.with_name(f"{WEB_FEATURES_INDEX_PATH.name}.{os.getpid()}.tmp")
+    try:
+        WEB_FEATURES_INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'format': _INDEX_FORMAT, 'source': stamp, 'features': entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, WEB_FEATURES_INDEX_PATH)
+    except OSError as e:
+        # Not fatal: the index is rebuilt from the download next time
+        logger.debug(f"Could not write Baseline index: {e}")
+        try:
+            os.unlink(tmp_path)
+        except OSError:
+            pass
+
+
+_manager_instance: Optional[WebFeaturesManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_web_features_manager() -> WebFeaturesManager:
+    """Process-wide manager, so the Baseline map is loaded at most once."""
+    global _manager_instance
+    if _manager_instance is None:
+        with _manager_lock:
+            if _manager_instance is None:
+                _manager_instance = WebFeaturesManager()
+    return _manager_instance
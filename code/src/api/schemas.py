@@ -11,6 +11,18 @@ class AnalysisRequest:
     css_files: List[str] = field(default_factory=list)
     js_files: List[str] = field(default_factory=list)
     target_browsers: Dict[str, str] = field(default_factory=dict)
+    # Record per-stage/per-file/per-rule timings into AnalysisResult.profile
+    profile: bool = False
+    # List known-library files under AnalysisResult.libraries without counting their features
+    group_libraries: bool = False
+    # Minified/generated CSS/JS: 'skip', 'fast' (features only) or 'full'
+    minified: str = 'fast'
+    # Skip files larger than this many bytes (None: no limit)
+    max_file_size: Optional[int] = None
+    # Keep JS parse trees so files analyzed again are re-parsed only where they changed
+    incremental: bool = False
+    # Reuse the previous results of files whose mtime and size are unchanged
+    cache_file_results: bool = False
 
     def has_files(self) -> bool:
         return bool(self.html_files or self.css_files or self.js_files)
@@ -48,6 +60,9 @@ class AnalysisResult:
     recommendations: List[str] = field(default_factory=list)
     baseline_summary: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    profile: Optional[Dict[str, Any]] = None
+    # Files resolved from the library fingerprint store
+    libraries: List[Dict[str, Any]] = field(default_factory=list)
 
     @classmethod
     def from_dict(cls, data: Dict) -> 'AnalysisResult':
@@ -134,6 +149,8 @@ class AnalysisResult:
             unrecognized_patterns=unrecognized_patterns,
             recommendations=data.get('recommendations', []),
             baseline_summary=baseline_summary,
+            profile=data.get('profile'),
+            libraries=data.get('libraries', []),
         )
 
     def to_dict(self) -> Dict:
@@ -141,7 +158,7 @@ class AnalysisResult:
         if not self.success:
             return {'success': False, 'error': self.error}
 
-        return {
+        result = {
             'success': True,
             'summary': self.summary or {
                 'total_features': 0, 'html_features': 0,
@@ -178,6 +195,11 @@ class AnalysisResult:
             'recommendations': self.recommendations,
             'baseline_summary': self.baseline_summary,
         }
+        if self.libraries:
+            result['libraries'] = self.libraries
+        if self.profile is not None:
+            result['profile'] = self.profile
+        return result
 
 
 @dataclass
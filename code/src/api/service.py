@@ -12,13 +12,7 @@ from .schemas import (
     ProgressCallback,
 )
 from src.utils.config import LATEST_VERSIONS, get_logger
-from src.database.repositories import (
-    AnalysisRepository,
-    SettingsRepository,
-    BookmarksRepository,
-    save_analysis_from_result,
-)
-from src.database.statistics import get_statistics_service
+from src.utils.profiling import Profiler, activate_profiler, get_active_profiler, profile_stage
 
 logger = get_logger('api.service')
 
@@ -55,35 +49,117 @@ class AnalyzerService:
 
     def _get_web_features(self):
         if self._web_features is None:
-            from src.analyzer.web_features import WebFeaturesManager
-            self._web_features = WebFeaturesManager()
+            from src.analyzer.web_features import get_web_features_manager
+            self._web_features = get_web_features_manager()
         return self._web_features
 
-    def analyze(self, request: AnalysisRequest) -> AnalysisResult:
+    def analyze(
+        self,
+        request: AnalysisRequest,
+        progress_callback: ProgressCallback = None,
+        cancel_event=None,
+    ) -> AnalysisResult:
+        """Safe to call from a worker thread. progress_callback(message, pct) fires per file;
+        setting cancel_event (threading.Event) ends the run with error 'Analysis cancelled'.
+        With request.profile, result.profile holds the run's timings (see utils.profiling);
+        a profiler already active on this thread is reused so callers can add their own stages.
+        """
         if not request.has_files():
             return AnalysisResult(
                 success=False,
                 error="No files provided for analysis"
             )
 
+        profiler = (get_active_profiler() or Profiler()) if request.profile else None
         try:
-            analyzer = self._get_analyzer()
-            target_browsers = request.target_browsers or self.DEFAULT_BROWSERS
+            with activate_profiler(profiler):
+                with profile_stage('setup'):
+                    analyzer = self._get_analyzer()
+                target_browsers = request.target_browsers or self.DEFAULT_BROWSERS
+
+                report = analyzer.run_analysis(
+                    html_files=request.html_files if request.html_files else None,
+                    css_files=request.css_files if request.css_files else None,
+                    js_files=request.js_files if request.js_files else None,
+                    target_browsers=target_browsers,
+                    progress_callback=progress_callback,
+                    cancel_event=cancel_event,
+                    group_libraries=request.group_libraries,
+                    minified=request.minified,
+                    max_file_size=request.max_file_size,
+                    incremental=request.incremental,
+                    cache_file_results=request.cache_file_results,
+                )
 
-            report = analyzer.run_analysis(
-                html_files=request.html_files if request.html_files else None,
-                css_files=request.css_files if request.css_files else None,
-                js_files=request.js_files if request.js_files else None,
-                target_browsers=target_browsers
+                result = self._result_from_report(report)
+
+            if profiler is not None and result.success:
+                result.profile = profiler.to_dict()
+            return result
+
+        except Exception as e:
+            return AnalysisResult(
+                success=False,
+                error=str(e)
             )
 
-            result = AnalysisResult.from_dict(report)
+    def _result_from_report(self, report: Dict) -> AnalysisResult:
+        result = AnalysisResult.from_dict(report)
 
-            # Enrich with Baseline status if web-features data is available
+        # Enrich with Baseline status if web-features data is available
+        with profile_stage('baseline'):
             result.baseline_summary = self._get_baseline_summary(result)
+        return result
 
-            return result
+    def analyze_partial(
+        self,
+        request: AnalysisRequest,
+        progress_callback: ProgressCallback = None,
+        cancel_event=None,
+    ) -> List[Dict]:
+        """Parse request's files without checking browser support (one CI shard's share).
+
+        Returns each file's raw results (FileResult.to_dict()) in analysis order;
+        merge_file_results turns the results of all shards into one AnalysisResult.
+        Errors are raised, unlike analyze().
+        """
+        analyzer = self._get_analyzer()
+        results = analyzer.collect_file_results(
+            html_files=request.html_files,
+            css_files=request.css_files,
+            js_files=request.js_files,
+            progress_callback=progress_callback,
+            cancel_event=cancel_event,
+            group_libraries=request.group_libraries,
+            minified=request.minified,
+            max_file_size=request.max_file_size,
+        )
+        return [result.to_dict() for result in results]
 
+    def merge_file_results(
+        self,
+        file_results: List[Dict],
+        target_browsers: Optional[Dict[str, str]] = None,
+    ) -> AnalysisResult:
+        """Classify and score the per-file results from analyze_partial once, as one report.
+
+        file_results must be in analysis order (all HTML, then CSS, then JS files,
+        each in the order a single analyze() would get them) for the report to
+        match a single run's.
+        """
+        if not file_results:
+            return AnalysisResult(
+                success=False,
+                error="No files provided for analysis"
+            )
+        try:
+            from src.analyzer.file_results import FileResult
+            analyzer = self._get_analyzer()
+            report = analyzer.report_from_file_results(
+                [FileResult.from_dict(data) for data in file_results],
+                target_browsers=target_browsers or self.DEFAULT_BROWSERS,
+            )
+            return self._result_from_report(report)
         except Exception as e:
             return AnalysisResult(
                 success=False,
@@ -112,16 +188,31 @@ class AnalyzerService:
         html_files: List[str] = None,
         css_files: List[str] = None,
         js_files: List[str] = None,
-        target_browsers: Dict[str, str] = None
+        target_browsers: Dict[str, str] = None,
+        progress_callback: ProgressCallback = None,
+        cancel_event=None,
+        profile: bool = False,
+        group_libraries: bool = False,
+        minified: str = 'fast',
+        max_file_size: Optional[int] = None,
+        incremental: bool = False,
+        cache_file_results: bool = False,
     ) -> AnalysisResult:
         """Convenience wrapper — avoids building an AnalysisRequest by hand."""
         request = AnalysisRequest(
             html_files=html_files or [],
             css_files=css_files or [],
             js_files=js_files or [],
-            target_browsers=target_browsers or self.DEFAULT_BROWSERS
+            target_browsers=target_browsers or self.DEFAULT_BROWSERS,
+            profile=profile,
+            group_libraries=group_libraries,
+            minified=minified,
+            max_file_size=max_file_size,
+            incremental=incremental,
+            cache_file_results=cache_file_results,
         )
-        return self.analyze(request)
+        return self.analyze(request, progress_callback=progress_callback,
+                            cancel_event=cancel_event)
 
     def get_database_info(self) -> DatabaseInfo:
         try:
@@ -208,13 +299,19 @@ class AnalyzerService:
         except Exception:
             pass
 
-    def _analysis_repo(self) -> AnalysisRepository:
+    # The database layer (sqlite3, models, statistics) is only imported by
+    # commands that touch history, settings or bookmarks.
+
+    def _analysis_repo(self):
+        from src.database.repositories import AnalysisRepository
         return AnalysisRepository()
 
-    def _settings_repo(self) -> SettingsRepository:
+    def _settings_repo(self):
+        from src.database.repositories import SettingsRepository
         return SettingsRepository()
 
-    def _bookmarks_repo(self) -> BookmarksRepository:
+    def _bookmarks_repo(self):
+        from src.database.repositories import BookmarksRepository
         return BookmarksRepository()
 
     # -- History ---------------------------------------------------------------
@@ -238,7 +335,9 @@ class AnalyzerService:
                 'file_type': file_type,
             }
 
-            analysis_id = save_analysis_from_result(result_dict, file_info)
+            with profile_stage('history save'):
+                from src.database.repositories import save_analysis_from_result
+                analysis_id = save_analysis_from_result(result_dict, file_info)
             logger.info(f"Saved analysis to history: #{analysis_id}")
             return analysis_id
 
@@ -287,6 +386,7 @@ class AnalyzerService:
 
     def get_statistics(self) -> Dict[str, Any]:
         try:
+            from src.database.statistics import get_statistics_service
             return get_statistics_service().get_summary_statistics()
         except Exception as e:
             return {
@@ -347,6 +447,12 @@ class AnalyzerService:
         except Exception:
             return False
 
+    def get_bookmarked_ids(self, analysis_ids: List[int]) -> Set[int]:
+        try:
+            return self._bookmarks_repo().get_bookmarked_ids(analysis_ids)
+        except Exception:
+            return set()
+
     def toggle_bookmark(self, analysis_id: int, note: str = '') -> bool:
         """Returns True if now bookmarked, False if removed."""
         if self.is_bookmarked(analysis_id):
@@ -365,8 +471,7 @@ class AnalyzerService:
 
     def get_baseline_status(self, feature_id: str) -> Optional[Dict]:
         try:
-            wf = self._get_web_features()
-            info = wf.get_baseline_status(feature_id)
+            info = self._feature_metadata().get(feature_id).baseline
             return info.to_dict() if info else None
         except Exception:
             return None
@@ -545,14 +650,10 @@ class AnalyzerService:
         try:
             wf = self._get_web_features()
             if wf and wf.has_data():
-                from src.analyzer.main import _BASELINE_LABELS
+                metadata = self._feature_metadata()
                 for entries in feature_details_dict.values():
                     for entry in entries:
-                        info = wf.get_baseline_status(entry['feature'])
-                        entry['baseline'] = (
-                            _BASELINE_LABELS.get(info.status, 'Unknown')
-                            if info else 'Unknown'
-                        )
+                        entry['baseline'] = metadata.get(entry['feature']).baseline_label
                 summary = wf.get_baseline_summary(all_ids)
                 if summary:
                     baseline_summary = summary
@@ -601,13 +702,19 @@ class AnalyzerService:
 
     # -- Feature Utilities -----------------------------------------------------
 
+    def _feature_metadata(self):
+        from src.analyzer.feature_metadata import get_feature_metadata
+        return get_feature_metadata(self._get_web_features())
+
+    def get_feature_metadata(self, feature_id: str) -> Dict:
+        """Display name, category, Baseline status, polyfill availability and fix suggestion."""
+        return self._feature_metadata().get(feature_id).to_dict()
+
     def get_feature_display_name(self, feature_id: str) -> str:
-        from src.utils.feature_names import get_feature_name
-        return get_feature_name(feature_id)
+        return self._feature_metadata().get(feature_id).name
 
     def get_fix_suggestion(self, feature_id: str) -> Optional[str]:
-        from src.utils.feature_names import get_fix_suggestion
-        return get_fix_suggestion(feature_id)
+        return self._feature_metadata().get(feature_id).fix_suggestion
 
     def get_version_ranges(self, feature_id: str, browser: str) -> List[Dict]:
         from src.analyzer.version_ranges import get_version_ranges
@@ -788,6 +895,99 @@ class AnalyzerService:
             self._analyzer = None
         return result
 
+    def get_rule_diagnostics(self) -> Dict:
+        """{'quarantined': [...], 'warnings': [...]} from validating custom_rules.json."""
+        from src.parsers.custom_rules_loader import get_rule_diagnostics
+        return get_rule_diagnostics()
+
+    def get_slowest_rules(self, limit: int = 10) -> List[Dict]:
+        """Rule patterns with the most cumulative match time in this process."""
+        from src.parsers.rule_patterns import get_pattern_stats
+        return get_pattern_stats().slowest(limit)
+
+    def reset_rule_timings(self):
+        from src.parsers.rule_patterns import get_pattern_stats
+        get_pattern_stats().reset()
+
+    def enable_metrics(self, port: Optional[int] = None, host: str = '127.0.0.1'):
+        """Start collecting metrics; with a port, also serve them over HTTP on host:port/metrics."""
+        from src.utils.metrics import enable_metrics, start_metrics_server
+        if port is None:
+            enable_metrics()
+            return None
+        return start_metrics_server(port, host)
+
+    def get_metrics_text(self) -> str:
+        """Counters and histograms collected so far, in Prometheus text format."""
+        from src.utils.metrics import render_metrics
+        return render_metrics()
+
+    def add_library_fingerprint(self, filepath: str, library: Optional[str] = None,
+                                version: Optional[str] = None, builtin: bool = False) -> Dict:
+        """Parse a vendored CSS/JS file and store its result under its content hash.
+
+        library/version default to what the file name suggests
+        ('jquery-3.7.1.min.js' -> 'jquery', '3.7.1'). Raises ValueError for
+        other file types. builtin=True stores the entry in the shipped
+        known_libraries.json (for maintainers) instead of the local store.
+        """
+        from src.analyzer.fingerprints import get_library_fingerprints
+        result = self._fingerprint_result(Path(filepath), library, version)
+        return get_library_fingerprints().add(**result, builtin=builtin)
+
+    def rebuild_builtin_fingerprints(self) -> List[Dict]:
+        """Recompute every shipped fingerprint from its source file.
+
+        Run after a version bump or a rule change, since shipped entries are
+        ignored once their rules stamp no longer matches.
+        """
+        from src.analyzer.fingerprints import get_library_fingerprints
+        store = get_library_fingerprints()
+        results = [self._fingerprint_result(path, None, None) for path in store.builtin_source_files()]
+        return store.rebuild_builtin(results)
+
+    def _fingerprint_result(self, path: Path, library: Optional[str], version: Optional[str]) -> Dict:
+        from src.analyzer.fingerprints import guess_library_name
+        from src.parsers.minified import MINIFIED_FULL
+
+        suffix = path.suffix.lower()
+        if suffix == '.css':
+            language = 'css'
+        elif suffix in ('.js', '.mjs', '.cjs'):
+            language = 'js'
+        else:
+            raise ValueError(f"Only .css and .js files can be fingerprinted: {path.name}")
+
+        guessed_name, guessed_version = guess_library_name(path.name)
+        analyzer = self._get_analyzer()
+        parser = analyzer.css_parser if language == 'css' else analyzer.js_parser
+        # Vendored files are usually minified; the stored entry must hold the
+        # full result (details, unrecognized patterns) whatever mode later
+        # analyses use, so it is always parsed in full.
+        mode = parser.minified_mode
+        parser.minified_mode = MINIFIED_FULL
+        try:
+            features = parser.parse_file(str(path))
+        finally:
+            parser.minified_mode = mode
+        return dict(
+            data=path.read_bytes(),
+            language=language,
+            library=library or guessed_name,
+            version=guessed_version if version is None else version,
+            file=path.name,
+            features=features,
+            feature_details=parser.feature_details,
+            unrecognized=parser.unrecognized_patterns,
+        )
+
+    def get_library_fingerprints(self) -> List[Dict]:
+        """Shipped and locally added fingerprint entries."""
+        from src.analyzer.fingerprints import get_library_fingerprints
+        store = get_library_fingerprints()
+        store.refresh()
+        return store.entries()
+
 
 _service_instance: Optional[AnalyzerService] = None
 
@@ -1,7 +1,7 @@
 """Turns analysis results into the strings printed to the terminal (table, summary, JSON)."""
 
 import json
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 import click
 
@@ -173,6 +173,16 @@ def format_table(result: Dict, *, color: bool = False) -> str:
                 if len(unsupported) > 10:
                     lines.append(f"    ... and {len(unsupported) - 10} more")
 
+    libraries = result.get('libraries', [])
+    if libraries:
+        lines.append("")
+        lines.append("  Known Libraries:")
+        for lib in libraries:
+            label = f"{lib.get('library', '?')} {lib.get('version', '')}".strip()
+            counted = "" if lib.get('counted', True) else ", not counted"
+            lines.append(f"    - {label}: {lib.get('file', '')} "
+                         f"({len(lib.get('features', []))} features{counted})")
+
     recs = result.get('recommendations', [])
     if recs:
         lines.append("")
@@ -225,3 +235,139 @@ def format_stats(stats: Dict, *, color: bool = False) -> str:
                          f" ({item.get('count', 0)} occurrences)")
 
     return "\n".join(lines)
+
+
+def _unsupported_by_feature(result: Dict) -> Dict[str, List[str]]:
+    """feature id -> browsers it is unsupported in."""
+    unsupported: Dict[str, List[str]] = {}
+    for browser, data in result.get('browsers', {}).items():
+        for feature_id in data.get('unsupported_features', []):
+            unsupported.setdefault(feature_id, []).append(browser)
+    return unsupported
+
+
+def format_watch_update(previous: Optional[Dict], current: Dict, changed_files: int = 0,
+                        timestamp: str = '', *, color: bool = False) -> str:
+    """One watch-mode re-run: the summary line, score change and feature/issue diff."""
+    prefix = f"[{timestamp}] " if timestamp else ""
+    if changed_files:
+        prefix += f"{changed_files} file(s) changed - "
+    if not current.get('success'):
+        return prefix + format_summary(current, color=color)
+
+    line = prefix + format_summary(current, color=color)
+    if previous is None or not previous.get('success'):
+        return line
+
+    delta = current['scores'].get('simple_score', 0) - previous['scores'].get('simple_score', 0)
+    if abs(delta) >= 0.05:
+        text = f" ({delta:+.1f})"
+        if color:
+            text = click.style(text, fg='green' if delta > 0 else 'red')
+        line += text
+    lines = [line]
+
+    before = set(previous.get('features', {}).get('all', []))
+    after = set(current.get('features', {}).get('all', []))
+    new_issues = _unsupported_by_feature(current)
+    for feature_id in sorted(after - before):
+        text = f"  + {feature_id}"
+        if feature_id in new_issues:
+            text += f"  (unsupported: {', '.join(new_issues[feature_id])})"
+            if color:
+                text = click.style(text, fg='red')
+        lines.append(text)
+    for feature_id in sorted(before - after):
+        lines.append(f"  - {feature_id}")
+    if len(lines) == 1 and changed_files:
+        lines.append("  no feature changes")
+    return "\n".join(lines)
+
+
+def format_rule_check(diagnostics: Dict, slowest: Optional[List[Dict]] = None, *, color: bool = False) -> str:
+    lines: List[str] = []
+    quarantined = diagnostics.get('quarantined', [])
+    warnings = diagnostics.get('warnings', [])
+
+    if not quarantined and not warnings:
+        lines.append("All custom rule patterns compiled; none flagged as slow.")
+
+    if quarantined:
+        heading = f"{len(quarantined)} invalid pattern(s) quarantined:"
+        lines.append(click.style(heading, fg='red') if color else heading)
+        for item in quarantined:
+            lines.append(f"  [{item['category']}] {item['feature']}: {item['pattern']}")
+            lines.append(f"      {item['reason']}")
+
+    if warnings:
+        if lines:
+            lines.append("")
+        heading = f"{len(warnings)} pattern(s) may be slow:"
+        lines.append(click.style(heading, fg='yellow') if color else heading)
+        for item in warnings:
+            lines.append(f"  [{item['category']}] {item['feature']}: {item['pattern']}")
+            for risk in item['risks']:
+                lines.append(f"      {risk}")
+
+    if slowest is not None:
+        lines.append("")
+        lines.append("Slowest rule patterns")
+        lines.append(f"{'Total ms':>10} {'Max ms':>9} {'Calls':>7}  {'Rule':<30} Pattern")
+        lines.append("-" * 80)
+        for item in slowest:
+            flag = " (over budget)" if item['over_budget'] else ""
+            lines.append(
+                f"{item['total_ms']:>10.2f} {item['max_ms']:>9.2f} {item['calls']:>7}  "
+                f"{item['category'] + ':' + item['feature']:<30.30} {item['pattern']}{flag}"
+            )
+
+    return "\n".join(lines)
+
+
+def format_fingerprints(entries: List[Dict]) -> str:
+    if not entries:
+        return "No library fingerprints stored."
+
+    lines: List[str] = []
+    lines.append(f"{'Library':<20} {'Version':<10} {'Lang':<5} {'Features':>8}  {'SHA-256':<12}  File")
+    lines.append("-" * 80)
+    for e in entries:
+        lines.append(
+            f"{e.get('library', ''):<20.20} {e.get('version', ''):<10.10} "
+            f"{e.get('language', ''):<5} {len(e.get('features', [])):>8}  "
+            f"{e.get('sha256', '')[:12]:<12}  {e.get('file', '')}"
+        )
+    return "\n".join(lines)
+
+
+def format_profile(profile: Dict) -> str:
+    lines: List[str] = []
+    lines.append(f"Profile (total {profile.get('total_ms', 0):.1f} ms)")
+    lines.append("")
+    lines.append(f"{'Stage':<28} {'Calls':>7} {'ms':>11}")
+    lines.append("-" * 48)
+    for stage in profile.get('stages', []):
+        lines.append(f"{stage['stage']:<28.28} {stage['calls']:>7} {stage['ms']:>11.2f}")
+
+    files = profile.get('files', [])
+    if files:
+        lines.append("")
+        lines.append(f"Slowest files ({len(files)} of {profile.get('files_profiled', len(files))})")
+        lines.append(f"{'ms':>11} {'Lang':<5} {'Features':>8}  File")
+        lines.append("-" * 60)
+        for item in files:
+            lines.append(f"{item['ms']:>11.2f} {item['language']:<5} {item['features']:>8}  {item['file']}")
+
+    rules = profile.get('rules', [])
+    if rules:
+        lines.append("")
+        lines.append("Most expensive rule patterns")
+        lines.append(f"{'ms':>11} {'Calls':>7}  {'Rule':<30} Pattern")
+        lines.append("-" * 80)
+        for item in rules:
+            lines.append(
+                f"{item['ms']:>11.2f} {item['calls']:>7}  "
+                f"{item['category'] + ':' + item['feature']:<30.30} {item['pattern']}"
+            )
+
+    return "\n".join(lines)
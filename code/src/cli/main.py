@@ -5,6 +5,7 @@ import os
 import sys
 import tempfile
 import time
+from contextlib import ExitStack
 from pathlib import Path
 from typing import Optional
 
@@ -13,14 +14,26 @@ import click
 from src.api.service import AnalyzerService
 from src.config import load_config
 from src.utils.config import LATEST_VERSIONS, set_log_level
+from src.utils.metrics import enable_metrics, write_metrics
+from src.utils.profiling import Profiler, activate_profiler, profile_stage
 
 from .context import CliContext
 from .formatters import (
     format_result,
     format_history,
     format_stats,
+    format_rule_check,
+    format_profile,
+    format_fingerprints,
+    format_watch_update,
 )
 from .gates import ThresholdConfig, evaluate_gates
+from .shards import (
+    build_partial_report,
+    merge_partial_reports,
+    parse_shard_spec,
+    select_shard,
+)
 
 
 _KNOWN_BROWSERS = set(LATEST_VERSIONS.keys())
@@ -67,6 +80,27 @@ def _parse_browsers(browsers_str: Optional[str]) -> Optional[dict]:
     return result or None
 
 
+_SIZE_UNITS = {'': 1, 'b': 1, 'k': 1024, 'kb': 1024, 'm': 1024 ** 2, 'mb': 1024 ** 2,
+               'g': 1024 ** 3, 'gb': 1024 ** 3}
+
+
+def _parse_size(ctx, param, value: Optional[str]) -> Optional[int]:
+    """'512K', '50MB', '1048576' -> bytes (click callback)."""
+    if value is None:
+        return None
+    number = value.strip().lower()
+    unit = number.lstrip('0123456789.')
+    number = number[:len(number) - len(unit)]
+    try:
+        size = float(number) * _SIZE_UNITS[unit.strip()]
+    except (KeyError, ValueError):
+        raise click.BadParameter(
+            f"Invalid size '{value}'. Expected a number of bytes, optionally "
+            f"with a K, M or G suffix (e.g., '50MB').",
+        )
+    return int(size)
+
+
 def _classify_files(paths: list[str]) -> tuple[list, list, list]:
     html, css, js = [], [], []
     ext_map = {
@@ -83,6 +117,62 @@ def _classify_files(paths: list[str]) -> tuple[list, list, list]:
     return html, css, js
 
 
+# Noise directories skipped when a TARGET directory is walked
+_SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '.venv', 'venv',
+              '__pycache__', '.pytest_cache', '.tox', '.next'}
+
+# Files picked up when a TARGET directory is walked
+_TARGET_EXTENSIONS = ('.html', '.htm', '.css', '.js', '.mjs', '.cjs')
+
+
+def _collect_target_files(target_path: Path) -> tuple[list, list, list]:
+    """(html, css, js) for a file or, recursively, a directory. Exits 2 if there is nothing to analyze."""
+    if target_path.is_dir():
+        collected: list[str] = []
+        for path in target_path.rglob('*'):
+            if not path.is_file():
+                continue
+            if any(part in _SKIP_DIRS for part in path.parts):
+                continue
+            if path.suffix.lower() in _TARGET_EXTENSIONS:
+                collected.append(str(path))
+        if not collected:
+            click.echo(f"Error: no .html/.css/.js files found in {target_path}", err=True)
+            sys.exit(2)
+        # Sorted so every machine (and every --shard) sees the same order
+        html, css, js = _classify_files(sorted(collected))
+    else:
+        html, css, js = _classify_files([str(target_path)])
+
+    if not (html or css or js):
+        click.echo(f"Error: Unsupported file type: {target_path}", err=True)
+        sys.exit(2)
+    return html, css, js
+
+
+def _exit_with_gates(score: float, error_count: int, warning_count: int,
+                     fail_on_score, fail_on_errors, fail_on_warnings):
+    """Exit 1 if a --fail-on-* gate fails (or, without gates, if there are any issues), else 0."""
+    gate_config = ThresholdConfig(
+        min_score=fail_on_score,
+        max_errors=fail_on_errors,
+        max_warnings=fail_on_warnings,
+    )
+    has_gates = any(v is not None for v in
+                    [fail_on_score, fail_on_errors, fail_on_warnings])
+
+    if has_gates:
+        gate_result = evaluate_gates(score, error_count, warning_count, gate_config)
+        if not gate_result.passed:
+            for failure in gate_result.failures:
+                click.echo(f"GATE FAILED: {failure}", err=True)
+            sys.exit(1)
+        sys.exit(0)
+
+    has_issues = error_count > 0 or warning_count > 0
+    sys.exit(1 if has_issues else 0)
+
+
 def _count_issues(report: dict) -> tuple[int, int]:
     errors = 0
     warnings = 0
@@ -174,6 +264,22 @@ def cli(ctx, verbose, quiet, debug, no_color, timing):
               help='Write JSON output to this file (independent of --format).')
 @click.option('--output-pdf', 'output_pdf_path', default=None,
               help='Write PDF output to this file (independent of --format). Includes AI suggestions when --ai is set.')
+@click.option('--profile', 'profile', is_flag=True, default=False,
+              help='Time each stage, file and rule; prints a table to stderr and adds '
+                   'a "profile" key to JSON output.')
+@click.option('--metrics-file', 'metrics_file', default=None,
+              help='Write Prometheus-format metrics for this run to this file.')
+@click.option('--group-libraries', is_flag=True, default=False,
+              help='List files matching a known-library fingerprint separately '
+                   'instead of counting their features.')
+@click.option('--minified', type=click.Choice(['skip', 'fast', 'full']), default='fast', show_default=True,
+              help='Minified or generated CSS/JS files: skip them, detect features only (fast), '
+                   'or analyze them fully.')
+@click.option('--max-file-size', default=None, callback=_parse_size,
+              help='Skip files larger than this (e.g. "5MB", "512K").')
+@click.option('--shard', default=None, callback=parse_shard_spec, metavar='I/N',
+              help='Analyze only shard I of N of the files and write a partial report '
+                   '(always JSON) for `crossguard merge-reports`.')
 @click.option('--ai', 'ai_enabled', is_flag=True, default=False,
               help='Enable AI fix suggestions (requires a saved or passed API key).')
 @click.option('--api-key', default=None, envvar='CROSSGUARD_AI_KEY',
@@ -186,15 +292,43 @@ def analyze(ctx, target, browsers, fmt, output, config_path,
             fail_on_score, fail_on_errors, fail_on_warnings,
             use_stdin, stdin_filename,
             output_sarif, output_junit, output_json_path, output_pdf_path,
+            profile, metrics_file, group_libraries, minified, max_file_size, shard,
             ai_enabled, api_key, ai_provider):
     """Analyze a file for browser compatibility.
 
     TARGET is a single HTML, CSS, or JavaScript file.
     Use --stdin to read from standard input.
+    With --shard I/N only part of TARGET's files are analyzed; combine the
+    partial reports of all N shards with `crossguard merge-reports`.
     """
     cli_ctx: CliContext = ctx.obj['cli_ctx']
     start_time = time.perf_counter()
 
+    if shard is not None:
+        conflicting = [flag for flag, value in (
+            ('--stdin', use_stdin), ('--ai', ai_enabled), ('--profile', profile),
+            ('--fail-on-score', fail_on_score is not None),
+            ('--fail-on-errors', fail_on_errors is not None),
+            ('--fail-on-warnings', fail_on_warnings is not None),
+            ('--output-sarif', output_sarif), ('--output-junit', output_junit),
+            ('--output-json', output_json_path), ('--output-pdf', output_pdf_path),
+        ) if value]
+        if conflicting:
+            click.echo(
+                f"Error: --shard cannot be combined with {', '.join(conflicting)} "
+                f"(pass them to `crossguard merge-reports` instead)",
+                err=True,
+            )
+            sys.exit(2)
+
+    # Exports and the history save below are timed too, so the profiler
+    # stays active for the whole command rather than just the analysis.
+    profiler = Profiler() if profile else None
+    profiling = ExitStack()
+    profiling.enter_context(activate_profiler(profiler))
+    if metrics_file:
+        enable_metrics()
+
     config = load_config(config_path=config_path)
     service = AnalyzerService(config=config.to_dict())
 
@@ -241,42 +375,37 @@ def analyze(ctx, target, browsers, fmt, output, config_path,
             click.echo(f"Error: '{target}' not found", err=True)
             sys.exit(2)
 
-        if target_path.is_dir():
-            # Walk the directory recursively and collect every HTML/CSS/JS file.
-            # Skip common noise dirs (node_modules, .git, dist, build, venvs).
-            _SKIP_DIRS = {'node_modules', '.git', 'dist', 'build', '.venv', 'venv',
-                          '__pycache__', '.pytest_cache', '.tox', '.next'}
-            collected: list[str] = []
-            for path in target_path.rglob('*'):
-                if not path.is_file():
-                    continue
-                if any(part in _SKIP_DIRS for part in path.parts):
-                    continue
-                if path.suffix.lower() in ('.html', '.htm', '.css', '.js', '.mjs', '.cjs'):
-                    collected.append(str(path))
-            if not collected:
-                click.echo(f"Error: no .html/.css/.js files found in {target}", err=True)
-                sys.exit(2)
-            html, css, js = _classify_files(collected)
-        else:
-            html, css, js = _classify_files([str(target_path)])
-
-        if not (html or css or js):
-            click.echo(f"Error: Unsupported file type: {target}", err=True)
-            sys.exit(2)
+        html, css, js = _collect_target_files(target_path)
+
+        if shard is not None:
+            _write_partial_report(service, shard, target_path, html, css, js,
+                                  browser_dict or service.DEFAULT_BROWSERS, output,
+                                  group_libraries=group_libraries, minified=minified,
+                                  max_file_size=max_file_size)
+            if cli_ctx.timing:
+                elapsed = time.perf_counter() - start_time
+                click.echo(f"Elapsed: {elapsed:.2f}s", err=True)
+            if metrics_file:
+                write_metrics(metrics_file)
+            sys.exit(0)
 
         result = service.analyze_files(
             html_files=html,
             css_files=css,
             js_files=js,
             target_browsers=browser_dict,
+            profile=profile,
+            group_libraries=group_libraries,
+            minified=minified,
+            max_file_size=max_file_size,
         )
 
         result_dict = result.to_dict()
 
         if fmt in ('sarif', 'junit'):
             result_dict['file_path'] = str(target_path)  # CI exporters need this
-            result_text = _format_ci_output(service, result_dict, fmt)
+            with profile_stage('export'):
+                result_text = _format_ci_output(service, result_dict, fmt)
         else:
             result_text = format_result(result_dict, fmt, color=cli_ctx.color)
 
@@ -371,39 +500,31 @@ def analyze(ctx, target, browsers, fmt, output, config_path,
         else:
             click.echo(result_text)
 
-        _write_secondary_outputs(
-            service,
-            result_dict,
-            sarif=output_sarif,
-            junit=output_junit,
-            json=output_json_path,
-            pdf=output_pdf_path,
-        )
+        with profile_stage('export'):
+            _write_secondary_outputs(
+                service,
+                result_dict,
+                sarif=output_sarif,
+                junit=output_junit,
+                json=output_json_path,
+                pdf=output_pdf_path,
+            )
 
         if cli_ctx.timing:
             elapsed = time.perf_counter() - start_time
             click.echo(f"Elapsed: {elapsed:.2f}s", err=True)
 
-        gate_config = ThresholdConfig(
-            min_score=fail_on_score,
-            max_errors=fail_on_errors,
-            max_warnings=fail_on_warnings,
-        )
-        has_gates = any(v is not None for v in
-                        [fail_on_score, fail_on_errors, fail_on_warnings])
-
-        if has_gates:
-            gate_result = evaluate_gates(score, error_count, warning_count, gate_config)
-            if not gate_result.passed:
-                for failure in gate_result.failures:
-                    click.echo(f"GATE FAILED: {failure}", err=True)
-                sys.exit(1)
-            sys.exit(0)
+        if profiler is not None:
+            click.echo(format_profile(profiler.to_dict()), err=True)
+
+        if metrics_file:
+            write_metrics(metrics_file)
 
-        has_issues = error_count > 0 or warning_count > 0
-        sys.exit(1 if has_issues else 0)
+        _exit_with_gates(score, error_count, warning_count,
+                         fail_on_score, fail_on_errors, fail_on_warnings)
 
     finally:
+        profiling.close()
         if tmp_file and os.path.exists(tmp_file.name):
             os.unlink(tmp_file.name)
 
@@ -415,6 +536,204 @@ def _format_ci_output(service: AnalyzerService, report: dict, fmt: str) -> str:
     return getattr(service, method_name)(report)
 
 
+def _write_partial_report(service: AnalyzerService, shard: tuple, target_path: Path,
+                          html: list, css: list, js: list, browsers: dict,
+                          output: Optional[str], **options):
+    import json
+    from src.api.schemas import AnalysisRequest
+
+    index, count = shard
+    discovered = [*html, *css, *js]
+    html, css, js = select_shard(html, css, js, target_path, index, count)
+    try:
+        file_results = service.analyze_partial(AnalysisRequest(
+            html_files=html, css_files=css, js_files=js, **options,
+        ))
+    except Exception as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(2)
+
+    report = build_partial_report(index, count, str(target_path), browsers, options,
+                                  html, css, js, file_results, discovered)
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(text)
+        click.echo(f"Shard {index}/{count}: {len(file_results)} files, "
+                   f"partial report saved to {output}", err=True)
+    else:
+        click.echo(text)
+
+
+@cli.command('merge-reports')
+@click.argument('partials', nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option('--format', '-f', 'fmt', default=None, envvar='CROSSGUARD_FORMAT',
+              type=click.Choice(['table', 'json', 'summary', 'sarif', 'junit']),
+              help='Output format (falls back to "output" in crossguard.config.json, else "table")')
+@click.option('--output', '-o', default=None,
+              help='Save output to file')
+@click.option('--config', '-c', 'config_path', default=None, envvar='CROSSGUARD_CONFIG',
+              help='Path to crossguard.config.json')
+@click.option('--fail-on-score', type=float, default=None,
+              help='Fail (exit 1) if score is below this value.')
+@click.option('--fail-on-errors', type=int, default=None,
+              help='Fail (exit 1) if unsupported feature count exceeds this.')
+@click.option('--fail-on-warnings', type=int, default=None,
+              help='Fail (exit 1) if partial feature count exceeds this.')
+@click.option('--output-sarif', default=None,
+              help='Write SARIF output to this file (independent of --format).')
+@click.option('--output-junit', default=None,
+              help='Write JUnit XML to this file (independent of --format).')
+@click.option('--output-json', 'output_json_path', default=None,
+              help='Write JSON output to this file (independent of --format).')
+@click.option('--output-pdf', 'output_pdf_path', default=None,
+              help='Write PDF output to this file (independent of --format).')
+@click.pass_context
+def merge_reports(ctx, partials, fmt, output, config_path,
+                  fail_on_score, fail_on_errors, fail_on_warnings,
+                  output_sarif, output_junit, output_json_path, output_pdf_path):
+    """Combine the partial reports of `crossguard analyze --shard I/N` into one report.
+
+    PARTIALS are the partial reports of all N shards. Browser support is
+    checked and scored once, giving the same report as a single
+    `crossguard analyze` of the whole target. Exit codes are those of analyze.
+    """
+    import json
+
+    cli_ctx: CliContext = ctx.obj['cli_ctx']
+    start_time = time.perf_counter()
+
+    config = load_config(config_path=config_path)
+    service = AnalyzerService(config=config.to_dict())
+
+    if fmt is None:
+        fmt = config.output_format
+    if fmt not in ('table', 'json', 'summary', 'sarif', 'junit'):
+        click.echo(
+            f"Error: invalid output format '{fmt}' from config. "
+            f"Valid formats: table, json, summary, sarif, junit",
+            err=True,
+        )
+        sys.exit(2)
+
+    try:
+        reports = []
+        for path in partials:
+            with open(path, encoding='utf-8') as f:
+                reports.append(json.load(f))
+        header, file_results = merge_partial_reports(reports)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        click.echo(f"Error: cannot merge partial reports: {e}", err=True)
+        sys.exit(2)
+
+    result = service.merge_file_results(file_results, target_browsers=header['browsers'])
+    if not result.success:
+        click.echo(f"Error: {result.error}", err=True)
+        sys.exit(2)
+
+    result_dict = result.to_dict()
+    if fmt in ('sarif', 'junit'):
+        result_dict['file_path'] = header['target']  # CI exporters need this
+        result_text = _format_ci_output(service, result_dict, fmt)
+    else:
+        result_text = format_result(result_dict, fmt, color=cli_ctx.color)
+
+    if output:
+        with open(output, 'w', encoding='utf-8') as f:
+            f.write(result_text)
+        if cli_ctx.verbosity >= 1:
+            click.echo(f"Report saved to {output}", err=True)
+    else:
+        click.echo(result_text)
+
+    _write_secondary_outputs(
+        service,
+        result_dict,
+        sarif=output_sarif,
+        junit=output_junit,
+        json=output_json_path,
+        pdf=output_pdf_path,
+    )
+
+    if cli_ctx.timing:
+        elapsed = time.perf_counter() - start_time
+        click.echo(f"Elapsed: {elapsed:.2f}s", err=True)
+
+    score = result.scores['simple_score'] if result.scores else 0.0
+    error_count, warning_count = _count_issues(result_dict)
+    _exit_with_gates(score, error_count, warning_count,
+                     fail_on_score, fail_on_errors, fail_on_warnings)
+
+
+@cli.command()
+@click.argument('target', type=click.Path(exists=True))
+@click.option('--browsers', '-b', default=None, envvar='CROSSGUARD_BROWSERS',
+              help='Target browsers (e.g., "chrome:120,firefox:121")')
+@click.option('--config', '-c', 'config_path', default=None, envvar='CROSSGUARD_CONFIG',
+              help='Path to crossguard.config.json')
+@click.option('--interval', type=click.FloatRange(min=0.05), default=0.5, show_default=True,
+              help='Seconds between checks of the file tree.')
+@click.option('--debounce', type=click.FloatRange(min=0), default=0.3, show_default=True,
+              help='Seconds the tree must stay unchanged before re-analyzing.')
+@click.option('--minified', type=click.Choice(['skip', 'fast', 'full']), default='fast', show_default=True,
+              help='Minified or generated CSS/JS files: skip them, detect features only (fast), '
+                   'or analyze them fully.')
+@click.option('--max-runs', type=int, default=None, hidden=True,
+              help='Stop after this many analyses (for tests and scripts).')
+@click.pass_context
+def watch(ctx, target, browsers, config_path, interval, debounce, minified, max_runs):
+    """Re-analyze TARGET whenever its files change.
+
+    TARGET is a file or a directory (walked like analyze does). After the
+    first full analysis, only changed files are parsed again; the score and
+    the features that appeared or disappeared are printed on every change.
+    Press Ctrl+C to stop.
+    """
+    from .watch import TreeWatcher, snapshot_tree
+
+    cli_ctx: CliContext = ctx.obj['cli_ctx']
+    config = load_config(config_path=config_path)
+    # One service (and so one analyzer, one loaded database and the per-file
+    # result cache) for the whole session
+    service = AnalyzerService(config=config.to_dict())
+    browser_dict = _parse_browsers(browsers) or config.browsers
+    target_path = Path(target)
+
+    watcher = TreeWatcher(lambda: snapshot_tree(target_path, _TARGET_EXTENSIONS, _SKIP_DIRS))
+    previous = None
+    runs = 0
+    changed = 0
+    try:
+        while True:
+            html, css, js = _classify_files(sorted(watcher.snapshot))
+            timestamp = time.strftime('%H:%M:%S')
+            if html or css or js:
+                start = time.perf_counter()
+                current = service.analyze_files(
+                    html_files=html,
+                    css_files=css,
+                    js_files=js,
+                    target_browsers=browser_dict,
+                    minified=minified,
+                    incremental=True,
+                    cache_file_results=True,
+                ).to_dict()
+                click.echo(format_watch_update(previous, current, changed, timestamp, color=cli_ctx.color))
+                if cli_ctx.timing:
+                    click.echo(f"Elapsed: {time.perf_counter() - start:.2f}s", err=True)
+                previous = current
+            else:
+                click.echo(f"[{timestamp}] No .html/.css/.js files in {target_path}")
+            runs += 1
+            if max_runs is not None and runs >= max_runs:
+                return
+            if runs == 1 and cli_ctx.verbosity >= 1:
+                click.echo(f"Watching {target_path} for changes (Ctrl+C to stop)...", err=True)
+            changed = watcher.wait_for_changes(interval, debounce).count()
+    except KeyboardInterrupt:
+        click.echo("Stopped watching.", err=True)
+
+
 @cli.command('export')
 @click.argument('analysis_id', type=int)
 @click.option('--format', '-f', 'fmt', default='json',
@@ -581,6 +900,92 @@ def update_db(check_only):
         sys.exit(2)
 
 
+@cli.command('check-rules')
+@click.argument('target', required=False)
+@click.option('--top', '-n', default=10, help='Number of slowest patterns to show')
+@click.pass_context
+def check_rules(ctx, target, top):
+    """Validate custom_rules.json patterns.
+
+    Reports patterns that failed to compile (quarantined) and patterns prone
+    to slow matching. With TARGET, also analyzes it and lists the slowest
+    rule patterns. Exits 1 if any pattern was quarantined or flagged.
+    """
+    cli_ctx: CliContext = ctx.obj['cli_ctx']
+    service = AnalyzerService()
+    diagnostics = service.get_rule_diagnostics()
+
+    slowest = None
+    if target:
+        target_path = Path(target)
+        if not target_path.exists():
+            click.echo(f"Error: '{target}' not found", err=True)
+            sys.exit(2)
+        html, css, js = _collect_target_files(target_path)
+        service.reset_rule_timings()
+        service.analyze_files(html_files=html, css_files=css, js_files=js)
+        slowest = service.get_slowest_rules(limit=top)
+
+    click.echo(format_rule_check(diagnostics, slowest, color=cli_ctx.color))
+    sys.exit(1 if diagnostics['quarantined'] or diagnostics['warnings'] else 0)
+
+
+@cli.group()
+def fingerprint():
+    """Manage the known-library fingerprint store.
+
+    CSS/JS files whose content matches a stored fingerprint are not parsed;
+    their stored features are used (see analyze --group-libraries).
+    """
+
+
+@fingerprint.command('add')
+@click.argument('file', type=click.Path(exists=True, dir_okay=False))
+@click.option('--name', 'library', default=None,
+              help='Library name (default: taken from the file name).')
+@click.option('--version', 'version', default=None,
+              help='Library version (default: taken from the file name).')
+@click.option('--builtin', is_flag=True, default=False,
+              help='Add to the fingerprints shipped with Cross Guard (maintainers; '
+                   'FILE is kept so `fingerprint rebuild` can recompute it).')
+def fingerprint_add(file, library, version, builtin):
+    """Parse FILE and store its result under its content hash."""
+    service = AnalyzerService()
+    try:
+        entry = service.add_library_fingerprint(file, library=library, version=version, builtin=builtin)
+    except (ValueError, OSError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(2)
+    label = f"{entry['library']} {entry['version']}".strip()
+    click.echo(f"Added {label} ({entry['language']}, {len(entry['features'])} features) "
+               f"sha256:{entry['sha256'][:12]}")
+
+
+@fingerprint.command('rebuild')
+def fingerprint_rebuild():
+    """Recompute the shipped fingerprints from their source files.
+
+    Shipped entries are ignored once the Cross Guard version or the
+    detection rules change; maintainers run this before a release.
+    """
+    try:
+        entries = AnalyzerService().rebuild_builtin_fingerprints()
+    except (ValueError, OSError) as e:
+        click.echo(f"Error: {e}", err=True)
+        sys.exit(2)
+    for entry in sorted(entries, key=lambda e: (e['library'], e['version'])):
+        label = f"{entry['library']} {entry['version']}".strip()
+        click.echo(f"Rebuilt {label} ({entry['language']}, {len(entry['features'])} features) "
+                   f"sha256:{entry['sha256'][:12]}")
+    click.echo(f"{len(entries)} shipped fingerprint(s) written")
+
+
+@fingerprint.command('list')
+def fingerprint_list():
+    """List the shipped and locally added fingerprints."""
+    click.echo(format_fingerprints(AnalyzerService().get_library_fingerprints()))
+
+
 @cli.command('init-ci')
 @click.option('--provider', '-p', required=True,
               type=click.Choice(['github']),
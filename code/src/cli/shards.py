@@ -0,0 +1,182 @@
+"""Splitting `crossguard analyze` across CI machines (--shard i/N) and merging the results.
+
+Each shard parses its share of the target's files and writes a partial
+report holding every file's raw results (features, unrecognized patterns,
+feature details, library matches, warnings and errors). `crossguard
+merge-reports` combines the partial reports and classifies and scores once,
+so the merged report is the one a single run would give.
+
+Files are assigned by size, largest first, each to the least loaded shard;
+ties are broken by a hash of the file's path relative to the target, so
+every machine computes the same partition without talking to the others --
+as long as they see the same files. Each partial report therefore records a
+digest of every discovered file's relative path and size, and the merge
+refuses reports whose digests differ, that analyzed a file twice, or that
+together miss a file.
+"""
+
+import hashlib
+import os
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import click
+
+PARTIAL_REPORT_FORMAT = 'crossguard-partial-report'
+PARTIAL_REPORT_VERSION = 2
+
+# Order in which a single run analyzes file kinds
+_KIND_ORDER = ('html', 'css', 'js')
+
+# Keys of a partial report's file entries that are not part of the file's results
+_ENTRY_KEYS = ('kind', 'relative_path', 'size')
+
+
+def parse_shard_spec(ctx, param, value):
+    """'2/4' -> (2, 4) (click callback); shards are numbered from 1."""
+    if value is None:
+        return None
+    index, sep, count = value.partition('/')
+    try:
+        index, count = int(index), int(count)
+    except ValueError:
+        index = count = 0
+    if not sep or count < 1 or not 1 <= index <= count:
+        raise click.BadParameter(
+            f"Invalid shard '{value}'. Expected 'i/N' with 1 <= i <= N (e.g., '1/4')."
+        )
+    return index, count
+
+
+def _relative_path(path: str, target: Path) -> str:
+    if target.is_dir():
+        return Path(os.path.relpath(path, target)).as_posix()
+    return Path(path).name
+
+
+def _path_hash(rel: str) -> int:
+    return int(hashlib.sha1(rel.encode('utf-8')).hexdigest()[:16], 16)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def file_set_digest(entries: Iterable[Tuple[str, int]]) -> str:
+    """Digest of (relative path, size) pairs, independent of their order."""
+    digest = hashlib.sha256()
+    for rel, size in sorted(entries):
+        digest.update(f"{rel}\0{size}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def partition_files(paths: Sequence[str], target: Path, count: int) -> List[List[str]]:
+    """Split paths into count shards of about the same total size.
+
+    Depends only on the files' sizes and their paths relative to target, so
+    it is the same on every machine with the same checkout. Each shard keeps
+    the order of paths.
+    """
+    entries = [(-_file_size(path), _path_hash(_relative_path(path, target)), path) for path in paths]
+    entries.sort()
+
+    loads = [0] * count
+    assigned: Dict[str, int] = {}
+    for neg_size, path_hash, path in entries:
+        # Among equally loaded shards, start looking at the one the hash points at
+        shard = min(range(count), key=lambda k: (loads[k], (k - path_hash) % count))
+        loads[shard] += 1 - neg_size  # +1 so empty files are spread out too
+        assigned[path] = shard
+
+    shards: List[List[str]] = [[] for _ in range(count)]
+    for path in paths:
+        shards[assigned[path]].append(path)
+    return shards
+
+
+def select_shard(html: List[str], css: List[str], js: List[str], target: Path,
+                 index: int, count: int) -> Tuple[List[str], List[str], List[str]]:
+    """The (html, css, js) files shard index (1-based) of count analyzes."""
+    mine = set(partition_files([*html, *css, *js], target, count)[index - 1])
+    return ([p for p in html if p in mine], [p for p in css if p in mine],
+            [p for p in js if p in mine])
+
+
+def build_partial_report(index: int, count: int, target: str, browsers: Dict[str, str],
+                         options: Dict, html: List[str], css: List[str], js: List[str],
+                         file_results: List[Dict], discovered: Sequence[str]) -> Dict:
+    """Partial report of one shard; file_results come from AnalyzerService.analyze_partial.
+
+    discovered are all files found in target (every shard's), before select_shard.
+    """
+    root = Path(target)
+    kinds = [('html', p) for p in html] + [('css', p) for p in css] + [('js', p) for p in js]
+    if [p for _, p in kinds] != [r['path'] for r in file_results]:
+        raise ValueError("File results do not match the shard's files")
+    return {
+        'format': PARTIAL_REPORT_FORMAT,
+        'version': PARTIAL_REPORT_VERSION,
+        'shard': {'index': index, 'count': count},
+        'target': target,
+        'browsers': browsers,
+        'options': options,
+        'discovered': {
+            'files': len(discovered),
+            'digest': file_set_digest((_relative_path(p, root), _file_size(p)) for p in discovered),
+        },
+        'files': [
+            {'kind': kind, 'relative_path': _relative_path(path, root), 'size': _file_size(path), **result}
+            for (kind, path), result in zip(kinds, file_results)
+        ],
+    }
+
+
+def merge_partial_reports(reports: Sequence[Dict]) -> Tuple[Dict, List[Dict]]:
+    """(first report's header, all file results in single-run order).
+
+    Raises ValueError unless the reports are one each of shards 1..N of
+    the same target, analyzed with the same browsers and options, and
+    together analyzed each of the files every shard discovered exactly once.
+    """
+    if not reports:
+        raise ValueError("No partial reports given")
+    for report in reports:
+        if report.get('format') != PARTIAL_REPORT_FORMAT:
+            raise ValueError("Not a partial report (run `crossguard analyze --shard i/N` to create one)")
+        if report.get('version') != PARTIAL_REPORT_VERSION:
+            raise ValueError(f"Unsupported partial report version: {report.get('version')}")
+
+    first = reports[0]
+    count = first['shard']['count']
+    for key in ('target', 'browsers', 'options'):
+        if any(report.get(key) != first.get(key) for report in reports):
+            raise ValueError(f"Partial reports were created with different {key}")
+    if any(report['shard']['count'] != count for report in reports):
+        raise ValueError("Partial reports were created with different shard counts")
+    indexes = [report['shard']['index'] for report in reports]
+    if len(set(indexes)) != len(indexes):
+        raise ValueError("The same shard was given more than once")
+    missing = sorted(set(range(1, count + 1)) - set(indexes))
+    if missing:
+        raise ValueError(f"Missing shard(s) {', '.join(f'{i}/{count}' for i in missing)}")
+
+    discovered = first['discovered']
+    if any(report['discovered'] != discovered for report in reports):
+        raise ValueError("Partial reports were created from different files (paths or sizes differ "
+                         "between the shards' checkouts); every shard must see the same files")
+    files = [entry for report in reports for entry in report['files']]
+    twice = sorted(rel for rel, n in Counter(entry['relative_path'] for entry in files).items() if n > 1)
+    if twice:
+        raise ValueError(f"File(s) analyzed by more than one shard: {', '.join(twice[:5])}"
+                         f"{' ...' if len(twice) > 5 else ''}")
+    if file_set_digest((entry['relative_path'], entry['size']) for entry in files) != discovered['digest']:
+        raise ValueError(f"Partial reports do not cover the discovered files: {len(files)} analyzed, "
+                         f"{discovered['files']} discovered")
+
+    files.sort(key=lambda entry: (_KIND_ORDER.index(entry['kind']), entry['path']))
+    header = {key: first[key] for key in ('target', 'browsers', 'options')}
+    return header, [{k: v for k, v in entry.items() if k not in _ENTRY_KEYS} for entry in files]
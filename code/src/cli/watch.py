@@ -0,0 +1,109 @@
+"""Polling file watcher for `crossguard watch`.
+
+No OS notification API is used: every interval the tree is walked and each
+file's (mtime_ns, size) compared with the previous snapshot. Changes are
+collected until the tree has been quiet for the debounce window, so one
+save (or a branch switch touching many files) triggers a single re-run.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+Snapshot = Dict[str, Tuple[int, int]]
+
+
+@dataclass
+class Changes:
+    added: Set[str] = field(default_factory=set)
+    modified: Set[str] = field(default_factory=set)
+    removed: Set[str] = field(default_factory=set)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.modified or self.removed)
+
+    def update(self, other: 'Changes'):
+        # A file added and then modified within one window is still "added";
+        # one added and removed again is no change at all.
+        for path in other.added:
+            if path in self.removed:
+                self.removed.discard(path)
+                self.modified.add(path)
+            else:
+                self.added.add(path)
+        for path in other.modified:
+            if path not in self.added:
+                self.modified.add(path)
+        for path in other.removed:
+            if path in self.added:
+                self.added.discard(path)
+            else:
+                self.modified.discard(path)
+                self.removed.add(path)
+
+    def count(self) -> int:
+        return len(self.added) + len(self.modified) + len(self.removed)
+
+
+def snapshot_tree(root: Path, extensions: Iterable[str], skip_dirs: Iterable[str]) -> Snapshot:
+    """path -> (mtime_ns, size) for the files under root (or root itself) with one of extensions."""
+    extensions = {ext.lower() for ext in extensions}
+    skip_dirs = set(skip_dirs)
+    snapshot: Snapshot = {}
+
+    def add(path: str):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return  # deleted while walking
+        snapshot[path] = (st.st_mtime_ns, st.st_size)
+
+    if root.is_file():
+        add(str(root))
+        return snapshot
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = [d for d in dirnames if d not in skip_dirs]
+        for name in filenames:
+            if os.path.splitext(name)[1].lower() in extensions:
+                add(os.path.join(dirpath, name))
+    return snapshot
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Changes:
+    return Changes(
+        added={p for p in new if p not in old},
+        modified={p for p, stamp in new.items() if p in old and old[p] != stamp},
+        removed={p for p in old if p not in new},
+    )
+
+
+class TreeWatcher:
+    """Reports what changed in a tree since the last poll."""
+
+    def __init__(self, scan: Callable[[], Snapshot]):
+        self._scan = scan
+        self.snapshot = scan()
+
+    def poll(self) -> Changes:
+        snapshot = self._scan()
+        changes = diff_snapshots(self.snapshot, snapshot)
+        self.snapshot = snapshot
+        return changes
+
+    def wait_for_changes(self, interval: float, debounce: float,
+                         sleep: Callable[[float], None] = time.sleep,
+                         clock: Callable[[], float] = time.monotonic) -> Changes:
+        """Block until something changed and then stayed unchanged for debounce seconds."""
+        pending = Changes()
+        quiet_since: Optional[float] = None
+        while True:
+            changes = self.poll()
+            now = clock()
+            if changes:
+                pending.update(changes)
+                quiet_since = now
+            elif pending and now - quiet_since >= debounce:
+                return pending
+            sleep(interval)
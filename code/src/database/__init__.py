@@ -1,6 +1,12 @@
 """SQLite storage for analysis history, settings, and bookmarks."""
 
-from .connection import get_connection, get_db_path
+from .connection import (
+    ConnectionPool,
+    get_connection,
+    get_db_path,
+    close_connection,
+    close_all_connections,
+)
 from .models import (
     Analysis,
     AnalysisFeature,
@@ -16,8 +22,11 @@ from .statistics import StatisticsService
 from .migrations import create_tables, drop_tables, reset_database
 
 __all__ = [
+    'ConnectionPool',
     'get_connection',
     'get_db_path',
+    'close_connection',
+    'close_all_connections',
     'Analysis',
     'AnalysisFeature',
     'BrowserResult',
@@ -1,8 +1,14 @@
-"""Thread-safe singleton SQLite connection with auto table init."""
+"""Per-thread SQLite connection pool with WAL and auto table init.
+
+sqlite3 connections must not be shared across threads while statements are
+in flight, so each thread gets its own connection. WAL lets readers (history
+list, statistics) run while another thread writes, and busy_timeout makes a
+writer wait for the lock instead of failing with "database is locked".
+"""
 
 import sqlite3
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 import threading
 
 from src.utils.config import get_logger
@@ -10,8 +16,13 @@ from src.utils.config import get_logger
 logger = get_logger('database.connection')
 
 _DB_NAME = 'crossguard.db'
-_connection: Optional[sqlite3.Connection] = None
-_lock = threading.Lock()
+
+# How long a connection waits on a locked database before raising (ms).
+BUSY_TIMEOUT_MS = 5000
+# Size of sqlite3's per-connection prepared statement LRU. The repositories
+# use a few dozen distinct statements; the default of 128 is already enough,
+# but we size it explicitly so nothing gets evicted mid-save.
+STATEMENT_CACHE_SIZE = 128
 
 
 def get_db_path() -> Path:
@@ -19,27 +30,117 @@ def get_db_path() -> Path:
     return PROJECT_ROOT / _DB_NAME
 
 
-def get_connection() -> sqlite3.Connection:
-    """Returns the singleton connection, creating it on first call"""
-    global _connection
+class ConnectionPool:
+    """Hands out one connection per thread, all pointing at the same database file."""
+
+    def __init__(self, db_path: Optional[Path] = None):
+        self._db_path = db_path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # thread ident -> connection, so close_all() can reach every thread's connection
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._tables_ready = False
+
+    @property
+    def db_path(self) -> Path:
+        return self._db_path if self._db_path is not None else get_db_path()
+
+    def get(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            return conn
+
+        conn = self._open()
+        self._local.conn = conn
+        with self._lock:
+            self._prune_dead_threads()
+            self._connections[threading.get_ident()] = conn
+            if not self._tables_ready:
+                _init_tables(conn)
+                self._tables_ready = True
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        db_path = self.db_path
+        logger.info(f"Opening database connection: {db_path} "
+                    f"(thread {threading.current_thread().name})")
+
+        conn = sqlite3.connect(
+            str(db_path),
+            timeout=BUSY_TIMEOUT_MS / 1000,
+            # Each connection is only used by the thread that opened it, but
+            # close_all() may run on another thread at shutdown.
+            check_same_thread=False,
+            isolation_level=None,  # autocommit — repositories manage transactions manually
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+
+        conn.execute("PRAGMA foreign_keys = ON")
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        if str(db_path) != ':memory:':
+            conn.execute("PRAGMA journal_mode = WAL")
+            # NORMAL is durable across application crashes in WAL mode and
+            # avoids an fsync on every history write.
+            conn.execute("PRAGMA synchronous = NORMAL")
+        conn.row_factory = sqlite3.Row
+        return conn
 
-    with _lock:
-        if _connection is None:
-            db_path = get_db_path()
-            logger.info(f"Opening database connection: {db_path}")
+    def _prune_dead_threads(self):
+        """Close connections owned by threads that have exited (GUI workers come and go)."""
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._connections if i not in alive]:
+            try:
+                self._connections.pop(ident).close()
+            except sqlite3.Error:
+                pass
+
+    def close_current(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+        self._local.conn = None
+        with self._lock:
+            self._connections.pop(threading.get_ident(), None)
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            connections = list(self._connections.values())
+            self._connections.clear()
+            self._tables_ready = False
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+        # Other threads' locals still point at closed connections; a fresh
+        # local makes every thread reopen on its next get().
+        self._local = threading.local()
+
+    def size(self) -> int:
+        with self._lock:
+            return len(self._connections)
+
+
+_pool = ConnectionPool()
+
+
+def get_pool() -> ConnectionPool:
+    return _pool
+
+
+def get_connection() -> sqlite3.Connection:
+    """Returns the calling thread's connection, creating it on first call"""
+    return _pool.get()
 
-            _connection = sqlite3.connect(
-                str(db_path),
-                check_same_thread=False,
-                isolation_level=None,  # autocommit — repositories manage transactions manually
-            )
 
-            _connection.execute("PRAGMA foreign_keys = ON")
-            _connection.row_factory = sqlite3.Row
+def close_connection():
+    """Close the calling thread's connection (e.g. at the end of a worker thread)."""
+    _pool.close_current()
 
-            _init_tables(_connection)
 
-        return _connection
+def close_all_connections():
+    _pool.close_all()
 
 
 def _init_tables(conn: sqlite3.Connection):
@@ -1,12 +1,14 @@
 """CRUD repositories for analyses, settings, bookmarks, and tags."""
 
 import sqlite3
-from typing import List, Optional, Dict, Any
+import time
+from typing import Iterable, List, Optional, Dict, Any, Set
 from datetime import datetime
 
 from .models import Analysis, AnalysisFeature, BrowserResult
 from .connection import get_connection
 from src.utils.config import get_logger
+from src.utils.metrics import HISTORY_WRITE_SECONDS
 
 logger = get_logger('database.repositories')
 
@@ -29,10 +31,16 @@ class AnalysisRepository(_BaseRepository):
     """Save, load, and delete past analyses (and their features and per-browser results)."""
 
     def save_analysis(self, analysis: Analysis) -> int:
+        start = time.perf_counter()
         conn = self.conn
         cursor = conn.cursor()
 
         try:
+            # Take the write lock up front so the whole save is one transaction;
+            # a concurrent writer waits here (busy_timeout) instead of failing
+            # halfway through the feature rows.
+            if not conn.in_transaction:
+                cursor.execute("BEGIN IMMEDIATE")
             cursor.execute("""
                 INSERT INTO analyses
                 (file_name, file_path, file_type, overall_score, grade,
@@ -84,6 +92,7 @@ class AnalysisRepository(_BaseRepository):
                     browser_result.analysis_feature_id = feature_id
 
             conn.commit()
+            HISTORY_WRITE_SECONDS.observe(time.perf_counter() - start)
 
             logger.info(f"Saved analysis #{analysis_id} for {analysis.file_name}")
             return analysis_id
@@ -214,8 +223,9 @@ class AnalysisRepository(_BaseRepository):
 
 def save_analysis_from_result(result: Dict[str, Any], file_info: Dict[str, str]) -> int:
     """Convert an analyzer result dict into model objects and save to DB."""
-    from src.utils.feature_names import get_feature_name
+    from src.analyzer.feature_metadata import get_feature_metadata
 
+    metadata = get_feature_metadata()
     scores = result.get('scores', {})
     summary = result.get('summary', {})
     browsers = result.get('browsers', {})
@@ -245,7 +255,7 @@ def save_analysis_from_result(result: Dict[str, Any], file_info: Dict[str, str])
     for feature_id, category in all_feature_ids:
         feature = AnalysisFeature(
             feature_id=feature_id,
-            feature_name=get_feature_name(feature_id),
+            feature_name=metadata.get(feature_id).name,
             category=category,
         )
 
@@ -338,6 +348,21 @@ class BookmarksRepository(_BaseRepository):
         )
         return cursor.fetchone() is not None
 
+    def get_bookmarked_ids(self, analysis_ids: Iterable[int]) -> Set[int]:
+        """Which of the given analyses are bookmarked, in one query instead of one per row."""
+        ids = [i for i in analysis_ids if i is not None]
+        found = set()
+        # Older SQLite builds cap bound parameters at 999 per statement
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor = self.conn.execute(
+                f"SELECT analysis_id FROM bookmarks WHERE analysis_id IN ({placeholders})",
+                chunk
+            )
+            found.update(row[0] for row in cursor.fetchall())
+        return found
+
     def get_all_bookmarks(self, limit: int = 50) -> List[Dict[str, Any]]:
         from .models import Bookmark, Analysis
 
@@ -114,6 +114,9 @@ def main():
 
     app.mainloop()
 
+    from src.database.connection import close_all_connections
+    close_all_connections()
+
 
 if __name__ == '__main__':
     main()
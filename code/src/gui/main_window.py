@@ -1,8 +1,10 @@
 """Main window -- sidebar nav, file table, results, history, and settings."""
 
+import queue
+import threading
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Set
 
 import customtkinter as ctk
 
@@ -29,6 +31,8 @@ from .widgets import (
     QuickStatsBar,
     BrowserSelector,
     HistoryCard,
+    VirtualList,
+    FeatureRow,
     StatisticsPanel,
     PolyfillCard,
     AIFixCard,
@@ -37,6 +41,12 @@ from .widgets.rules_manager import show_rules_manager
 
 from .export_manager import ExportManager
 
+# How often the Tk main loop drains the analysis worker's progress queue (ms).
+_ANALYSIS_POLL_MS = 100
+# The history list is virtualized, so it can show far more than a page of cards.
+_HISTORY_LIMIT = 500
+_HISTORY_ROW_HEIGHT = 72
+
 
 class MainWindow(ctk.CTkFrame):
     """The main application window. Holds the sidebar, header, content area, and four pages."""
@@ -51,6 +61,9 @@ class MainWindow(ctk.CTkFrame):
         self._current_view = "files"
         self._last_files: List[str] = []
         self._selected_browsers: Dict[str, str] = None  # None = use widget defaults
+        self._analysis_thread: threading.Thread = None
+        self._bookmarked_ids: Set[int] = set()
+        self._results_cache = None  # (report, results page frame)
         self._init_layout()
         self._show_view("files")
 
@@ -92,8 +105,12 @@ class MainWindow(ctk.CTkFrame):
         self._show_view(view_id)
 
     def _show_view(self, view_id: str):
+        cached_results = self._results_cache[1] if self._results_cache else None
         for widget in self.content_frame.winfo_children():
-            widget.destroy()
+            if widget is cached_results:
+                widget.pack_forget()  # kept alive so returning to results is instant
+            else:
+                widget.destroy()
 
         self._current_view = view_id
 
@@ -230,6 +247,14 @@ class MainWindow(ctk.CTkFrame):
 
         report = self.current_report
 
+        if self._results_cache:
+            cached_report, cached_frame = self._results_cache
+            if cached_report is report and cached_frame.winfo_exists():
+                cached_frame.pack(fill="both", expand=True, padx=SPACING['xl'], pady=SPACING['xl'])
+                return
+            cached_frame.destroy()
+            self._results_cache = None
+
         scroll_frame = ctk.CTkScrollableFrame(
             self.content_frame,
             fg_color="transparent",
@@ -238,6 +263,9 @@ class MainWindow(ctk.CTkFrame):
         )
         scroll_frame.pack(fill="both", expand=True, padx=SPACING['xl'], pady=SPACING['xl'])
         enable_smooth_scrolling(scroll_frame)
+        # Collapsed sections build on first expand; the whole page is reused
+        # until a new report replaces current_report.
+        self._results_cache = (report, scroll_frame)
 
         self._build_results_score_section(scroll_frame, report)
         self._build_results_issues_section(scroll_frame, report)
@@ -368,37 +396,40 @@ class MainWindow(ctk.CTkFrame):
                 badge_text=str(rec_count),
                 badge_color=COLORS['info'],
                 expanded=False,
+                build_content=lambda content: self._fill_results_recommendations(
+                    content, polyfill_data, recommendations
+                ),
             )
             rec_section.pack(fill="x", pady=(0, SPACING['lg']))
-            rec_content = rec_section.get_content_frame()
 
+    def _fill_results_recommendations(self, rec_content, polyfill_data, recommendations):
+        if polyfill_data['has_recommendations']:
+            polyfill_card = PolyfillCard(
+                rec_content,
+                install_command=polyfill_data['install_command'],
+                import_statements=polyfill_data['imports'],
+                npm_recommendations=polyfill_data['npm'],
+                css_fallbacks=polyfill_data['css'],
+                total_size_kb=polyfill_data['total_size_kb'],
+                on_generate_file=self._generate_polyfills_file,
+            )
+            polyfill_card.pack(fill="x")
+
+        if recommendations:
             if polyfill_data['has_recommendations']:
-                polyfill_card = PolyfillCard(
-                    rec_content,
-                    install_command=polyfill_data['install_command'],
-                    import_statements=polyfill_data['imports'],
-                    npm_recommendations=polyfill_data['npm'],
-                    css_fallbacks=polyfill_data['css'],
-                    total_size_kb=polyfill_data['total_size_kb'],
-                    on_generate_file=self._generate_polyfills_file,
+                ctk.CTkFrame(rec_content, fg_color=COLORS['border'], height=1).pack(
+                    fill="x", pady=SPACING['sm']
                 )
-                polyfill_card.pack(fill="x")
-
-            if recommendations:
-                if polyfill_data['has_recommendations']:
-                    ctk.CTkFrame(rec_content, fg_color=COLORS['border'], height=1).pack(
-                        fill="x", pady=SPACING['sm']
-                    )
-                for i, rec in enumerate(recommendations, 1):
-                    rec_row = ctk.CTkFrame(rec_content, fg_color=COLORS['bg_dark'], corner_radius=4, height=28)
-                    rec_row.pack(fill="x", pady=(0, 1))
-                    rec_row.pack_propagate(False)
-                    ctk.CTkLabel(
-                        rec_row, text=f"{i}. {rec}",
-                        font=ctk.CTkFont(size=11),
-                        text_color=COLORS['text_secondary'],
-                        anchor="w",
-                    ).pack(side="left", padx=SPACING['sm'])
+            for i, rec in enumerate(recommendations, 1):
+                rec_row = ctk.CTkFrame(rec_content, fg_color=COLORS['bg_dark'], corner_radius=4, height=28)
+                rec_row.pack(fill="x", pady=(0, 1))
+                rec_row.pack_propagate(False)
+                ctk.CTkLabel(
+                    rec_row, text=f"{i}. {rec}",
+                    font=ctk.CTkFont(size=11),
+                    text_color=COLORS['text_secondary'],
+                    anchor="w",
+                ).pack(side="left", padx=SPACING['sm'])
 
     def _build_results_browsers_section(self, scroll_frame, report):
         browsers = report.get('browsers', {})
@@ -410,166 +441,169 @@ class MainWindow(ctk.CTkFrame):
                 badge_text=f"{browsers_count} browsers",
                 badge_color=COLORS['accent'],
                 expanded=False,
+                build_content=lambda content: self._fill_results_browsers(content, browsers),
             )
             browser_section.pack(fill="x", pady=(0, SPACING['lg']))
 
-            browser_content = browser_section.get_content_frame()
-            from .widgets.browser_card import StackedBarWidget
-
-            for browser_name, details in browsers.items():
-                supported = details.get('supported', 0)
-                partial_count = details.get('partial', 0)
-                unsupported = details.get('unsupported', 0)
-                pct = details.get('compatibility_percentage', 0)
-                version = details.get('version', '')
-                unsupported_list = details.get('unsupported_features', [])
-                partial_list = details.get('partial_features', [])
-
-                card = ctk.CTkFrame(browser_content, fg_color=COLORS['bg_dark'], corner_radius=6,
-                                    border_width=1, border_color=COLORS['border'])
-                card.pack(fill="x", pady=(0, SPACING['sm']))
+    def _fill_results_browsers(self, browser_content, browsers):
+        from .widgets.browser_card import StackedBarWidget
 
-                header_row = ctk.CTkFrame(card, fg_color="transparent")
-                header_row.pack(fill="x", padx=SPACING['md'], pady=(SPACING['sm'], SPACING['xs']))
+        for browser_name, details in browsers.items():
+            supported = details.get('supported', 0)
+            partial_count = details.get('partial', 0)
+            unsupported = details.get('unsupported', 0)
+            pct = details.get('compatibility_percentage', 0)
+            version = details.get('version', '')
+            unsupported_list = details.get('unsupported_features', [])
+            partial_list = details.get('partial_features', [])
 
-                ctk.CTkLabel(
-                    header_row,
-                    text=f"{browser_name.title()} {version}",
-                    font=ctk.CTkFont(size=13, weight="bold"),
-                    text_color=COLORS['text_primary'],
-                    width=120, anchor="w",
-                ).pack(side="left")
-
-                bar = StackedBarWidget(header_row, height=12, bg_color=COLORS['bg_dark'])
-                bar.pack(side="left", fill="x", expand=True, padx=SPACING['sm'])
-                bar.set_values(supported, partial_count, unsupported, animate=False)
+            card = ctk.CTkFrame(browser_content, fg_color=COLORS['bg_dark'], corner_radius=6,
+                                border_width=1, border_color=COLORS['border'])
+            card.pack(fill="x", pady=(0, SPACING['sm']))
 
-                pct_color = COLORS['success'] if pct >= 80 else (COLORS['warning'] if pct >= 50 else COLORS['danger'])
-                ctk.CTkLabel(
-                    header_row,
-                    text=f"{pct:.0f}%",
-                    font=ctk.CTkFont(size=13, weight="bold"),
-                    text_color=pct_color,
-                    width=45, anchor="e",
-                ).pack(side="right")
+            header_row = ctk.CTkFrame(card, fg_color="transparent")
+            header_row.pack(fill="x", padx=SPACING['md'], pady=(SPACING['sm'], SPACING['xs']))
 
-                tab_row = ctk.CTkFrame(card, fg_color="transparent")
-                tab_row.pack(fill="x", padx=SPACING['md'], pady=(0, SPACING['xs']))
-
-                tab_content = ctk.CTkFrame(card, fg_color="transparent")
-                tab_content.pack(fill="x", padx=SPACING['md'], pady=(0, SPACING['sm']))
-
-                active_tab = [None]
-                tab_buttons = {}
-                tab_frames = {}
-
-                def build_overview(parent, s, p, u):
-                    frame = ctk.CTkFrame(parent, fg_color="transparent")
-                    row = ctk.CTkFrame(frame, fg_color="transparent")
-                    row.pack(fill="x")
-                    for label, count, color in [("Supported", s, COLORS['success']), ("Partial", p, COLORS['warning']), ("Unsupported", u, COLORS['danger'])]:
-                        block = ctk.CTkFrame(row, fg_color=COLORS['bg_medium'], corner_radius=4)
-                        block.pack(side="left", fill="x", expand=True, padx=(0, SPACING['xs']))
-                        ctk.CTkLabel(block, text=str(count), font=ctk.CTkFont(size=16, weight="bold"),
-                                     text_color=color).pack(pady=(SPACING['xs'], 0))
-                        ctk.CTkLabel(block, text=label, font=ctk.CTkFont(size=9),
-                                     text_color=COLORS['text_muted']).pack(pady=(0, SPACING['xs']))
-                    return frame
+            ctk.CTkLabel(
+                header_row,
+                text=f"{browser_name.title()} {version}",
+                font=ctk.CTkFont(size=13, weight="bold"),
+                text_color=COLORS['text_primary'],
+                width=120, anchor="w",
+            ).pack(side="left")
 
-                def build_issues(parent, u_list, p_list):
-                    frame = ctk.CTkFrame(parent, fg_color="transparent")
-                    if u_list:
-                        ctk.CTkLabel(frame, text="Not Supported", font=ctk.CTkFont(size=10, weight="bold"),
-                                     text_color=COLORS['danger']).pack(anchor="w", pady=(0, 2))
-                        for feat in u_list:
-                            r = ctk.CTkFrame(frame, fg_color=COLORS['bg_medium'], corner_radius=3, height=22)
-                            r.pack(fill="x", pady=(0, 1))
-                            r.pack_propagate(False)
-                            ctk.CTkFrame(r, fg_color=COLORS['danger'], width=3, corner_radius=0).place(x=0, y=0, relheight=1)
-                            ctk.CTkLabel(r, text=self._analyzer_service.get_feature_display_name(feat),
-                                         font=ctk.CTkFont(size=9), text_color=COLORS['text_primary']).pack(side="left", padx=(SPACING['sm'], 0))
-                    if p_list:
-                        ctk.CTkLabel(frame, text="Partial Support", font=ctk.CTkFont(size=10, weight="bold"),
-                                     text_color=COLORS['warning']).pack(anchor="w", pady=(SPACING['xs'], 2))
-                        for feat in p_list:
-                            r = ctk.CTkFrame(frame, fg_color=COLORS['bg_medium'], corner_radius=3, height=22)
-                            r.pack(fill="x", pady=(0, 1))
-                            r.pack_propagate(False)
-                            ctk.CTkFrame(r, fg_color=COLORS['warning'], width=3, corner_radius=0).place(x=0, y=0, relheight=1)
-                            ctk.CTkLabel(r, text=self._analyzer_service.get_feature_display_name(feat),
-                                         font=ctk.CTkFont(size=9), text_color=COLORS['text_primary']).pack(side="left", padx=(SPACING['sm'], 0))
-                    if not u_list and not p_list:
-                        ctk.CTkLabel(frame, text="All features fully supported.",
-                                     font=ctk.CTkFont(size=10), text_color=COLORS['text_muted']).pack(anchor="w")
-                    return frame
+            bar = StackedBarWidget(header_row, height=12, bg_color=COLORS['bg_dark'])
+            bar.pack(side="left", fill="x", expand=True, padx=SPACING['sm'])
+            bar.set_values(supported, partial_count, unsupported, animate=False)
 
-                def build_versions(parent, u_list, p_list, b_name):
-                    frame = ctk.CTkFrame(parent, fg_color="transparent")
-                    problem_feats = list(u_list) + list(p_list)
-                    if not problem_feats:
-                        ctk.CTkLabel(frame, text="No version history needed.",
-                                     font=ctk.CTkFont(size=10), text_color=COLORS['text_muted']).pack(anchor="w")
-                        return frame
-                    for fid in problem_feats:
-                        ranges = self._analyzer_service.get_version_ranges(fid, b_name)
-                        if not ranges:
-                            continue
-                        r = ctk.CTkFrame(frame, fg_color=COLORS['bg_medium'], corner_radius=3, height=24)
+            pct_color = COLORS['success'] if pct >= 80 else (COLORS['warning'] if pct >= 50 else COLORS['danger'])
+            ctk.CTkLabel(
+                header_row,
+                text=f"{pct:.0f}%",
+                font=ctk.CTkFont(size=13, weight="bold"),
+                text_color=pct_color,
+                width=45, anchor="e",
+            ).pack(side="right")
+
+            tab_row = ctk.CTkFrame(card, fg_color="transparent")
+            tab_row.pack(fill="x", padx=SPACING['md'], pady=(0, SPACING['xs']))
+
+            tab_content = ctk.CTkFrame(card, fg_color="transparent")
+            tab_content.pack(fill="x", padx=SPACING['md'], pady=(0, SPACING['sm']))
+
+            def build_overview(parent, s, p, u):
+                frame = ctk.CTkFrame(parent, fg_color="transparent")
+                row = ctk.CTkFrame(frame, fg_color="transparent")
+                row.pack(fill="x")
+                for label, count, color in [("Supported", s, COLORS['success']), ("Partial", p, COLORS['warning']), ("Unsupported", u, COLORS['danger'])]:
+                    block = ctk.CTkFrame(row, fg_color=COLORS['bg_medium'], corner_radius=4)
+                    block.pack(side="left", fill="x", expand=True, padx=(0, SPACING['xs']))
+                    ctk.CTkLabel(block, text=str(count), font=ctk.CTkFont(size=16, weight="bold"),
+                                 text_color=color).pack(pady=(SPACING['xs'], 0))
+                    ctk.CTkLabel(block, text=label, font=ctk.CTkFont(size=9),
+                                 text_color=COLORS['text_muted']).pack(pady=(0, SPACING['xs']))
+                return frame
+
+            def build_issues(parent, u_list, p_list):
+                frame = ctk.CTkFrame(parent, fg_color="transparent")
+                if u_list:
+                    ctk.CTkLabel(frame, text="Not Supported", font=ctk.CTkFont(size=10, weight="bold"),
+                                 text_color=COLORS['danger']).pack(anchor="w", pady=(0, 2))
+                    for feat in u_list:
+                        r = ctk.CTkFrame(frame, fg_color=COLORS['bg_medium'], corner_radius=3, height=22)
+                        r.pack(fill="x", pady=(0, 1))
+                        r.pack_propagate(False)
+                        ctk.CTkFrame(r, fg_color=COLORS['danger'], width=3, corner_radius=0).place(x=0, y=0, relheight=1)
+                        ctk.CTkLabel(r, text=self._analyzer_service.get_feature_display_name(feat),
+                                     font=ctk.CTkFont(size=9), text_color=COLORS['text_primary']).pack(side="left", padx=(SPACING['sm'], 0))
+                if p_list:
+                    ctk.CTkLabel(frame, text="Partial Support", font=ctk.CTkFont(size=10, weight="bold"),
+                                 text_color=COLORS['warning']).pack(anchor="w", pady=(SPACING['xs'], 2))
+                    for feat in p_list:
+                        r = ctk.CTkFrame(frame, fg_color=COLORS['bg_medium'], corner_radius=3, height=22)
                         r.pack(fill="x", pady=(0, 1))
                         r.pack_propagate(False)
-                        ctk.CTkLabel(r, text=self._analyzer_service.get_feature_display_name(fid),
-                                     font=ctk.CTkFont(size=9, weight="bold"), text_color=COLORS['text_primary'],
-                                     width=170, anchor="w").pack(side="left", padx=(SPACING['sm'], 0))
-                        for rng in ranges[-4:]:
-                            v = rng['start'] if rng['start'] == rng['end'] else f"{rng['start']}-{rng['end']}"
-                            c = COLORS['success'] if rng['status'] == 'y' else (
-                                COLORS['warning'] if rng['status'] in ('a', 'p') else COLORS['danger'])
-                            ctk.CTkLabel(r, text=f" {v} ", font=ctk.CTkFont(size=8),
-                                         text_color="#FFFFFF", fg_color=c, corner_radius=3).pack(side="left", padx=(2, 0))
+                        ctk.CTkFrame(r, fg_color=COLORS['warning'], width=3, corner_radius=0).place(x=0, y=0, relheight=1)
+                        ctk.CTkLabel(r, text=self._analyzer_service.get_feature_display_name(feat),
+                                     font=ctk.CTkFont(size=9), text_color=COLORS['text_primary']).pack(side="left", padx=(SPACING['sm'], 0))
+                if not u_list and not p_list:
+                    ctk.CTkLabel(frame, text="All features fully supported.",
+                                 font=ctk.CTkFont(size=10), text_color=COLORS['text_muted']).pack(anchor="w")
+                return frame
+
+            def build_versions(parent, u_list, p_list, b_name):
+                frame = ctk.CTkFrame(parent, fg_color="transparent")
+                problem_feats = list(u_list) + list(p_list)
+                if not problem_feats:
+                    ctk.CTkLabel(frame, text="No version history needed.",
+                                 font=ctk.CTkFont(size=10), text_color=COLORS['text_muted']).pack(anchor="w")
                     return frame
+                for fid in problem_feats:
+                    ranges = self._analyzer_service.get_version_ranges(fid, b_name)
+                    if not ranges:
+                        continue
+                    r = ctk.CTkFrame(frame, fg_color=COLORS['bg_medium'], corner_radius=3, height=24)
+                    r.pack(fill="x", pady=(0, 1))
+                    r.pack_propagate(False)
+                    ctk.CTkLabel(r, text=self._analyzer_service.get_feature_display_name(fid),
+                                 font=ctk.CTkFont(size=9, weight="bold"), text_color=COLORS['text_primary'],
+                                 width=170, anchor="w").pack(side="left", padx=(SPACING['sm'], 0))
+                    for rng in ranges[-4:]:
+                        v = rng['start'] if rng['start'] == rng['end'] else f"{rng['start']}-{rng['end']}"
+                        c = COLORS['success'] if rng['status'] == 'y' else (
+                            COLORS['warning'] if rng['status'] in ('a', 'p') else COLORS['danger'])
+                        ctk.CTkLabel(r, text=f" {v} ", font=ctk.CTkFont(size=8),
+                                     text_color="#FFFFFF", fg_color=c, corner_radius=3).pack(side="left", padx=(2, 0))
+                return frame
+
+            # Tabs are built the first time they are shown. Versions does a
+            # version-range lookup per problem feature, so most cards never pay for it.
+            _builders = {
+                "overview": lambda parent, s=supported, p=partial_count, u=unsupported:
+                    build_overview(parent, s, p, u),
+                "issues": lambda parent, u=unsupported_list, p=partial_list:
+                    build_issues(parent, u, p),
+                "versions": lambda parent, u=unsupported_list, p=partial_list, b=browser_name:
+                    build_versions(parent, u, p, b),
+            }
+            _frames = {}
+            _buttons = {}
+
+            def make_switcher(container, builders_ref, frames_ref, buttons_ref):
+                def switch(tab_name):
+                    for f in frames_ref.values():
+                        f.pack_forget()
+                    if tab_name not in frames_ref:
+                        frames_ref[tab_name] = builders_ref[tab_name](container)
+                    frames_ref[tab_name].pack(fill="x")
+                    for n, b in buttons_ref.items():
+                        if n == tab_name:
+                            b.configure(fg_color=COLORS['accent'], text_color="#FFFFFF")
+                        else:
+                            b.configure(fg_color=COLORS['bg_light'], text_color=COLORS['text_muted'])
+                return switch
 
-                overview_frame = build_overview(tab_content, supported, partial_count, unsupported)
-                issues_frame = build_issues(tab_content, unsupported_list, partial_list)
-                versions_frame = build_versions(tab_content, unsupported_list, partial_list, browser_name)
-
-                _frames = {"overview": overview_frame, "issues": issues_frame, "versions": versions_frame}
-                _buttons = {}
-
-                def make_switcher(frames_ref, buttons_ref):
-                    def switch(tab_name):
-                        for f in frames_ref.values():
-                            f.pack_forget()
-                        frames_ref[tab_name].pack(fill="x")
-                        for n, b in buttons_ref.items():
-                            if n == tab_name:
-                                b.configure(fg_color=COLORS['accent'], text_color="#FFFFFF")
-                            else:
-                                b.configure(fg_color=COLORS['bg_light'], text_color=COLORS['text_muted'])
-                    return switch
-
-                switcher = make_switcher(_frames, _buttons)
-
-                for tab_name, tab_label in [("overview", "Overview"), ("issues", "Issues"), ("versions", "Versions")]:
-                    btn = ctk.CTkButton(
-                        tab_row, text=tab_label,
-                        font=ctk.CTkFont(size=10), width=80, height=24,
-                        corner_radius=4,
-                        fg_color=COLORS['bg_light'],
-                        hover_color=COLORS['hover_bg'],
-                        text_color=COLORS['text_muted'],
-                    )
-                    btn.configure(command=lambda t=tab_name, s=switcher: s(t))
-                    btn.pack(side="left", padx=(0, SPACING['xs']))
-                    _buttons[tab_name] = btn
+            switcher = make_switcher(tab_content, _builders, _frames, _buttons)
+
+            for tab_name, tab_label in [("overview", "Overview"), ("issues", "Issues"), ("versions", "Versions")]:
+                btn = ctk.CTkButton(
+                    tab_row, text=tab_label,
+                    font=ctk.CTkFont(size=10), width=80, height=24,
+                    corner_radius=4,
+                    fg_color=COLORS['bg_light'],
+                    hover_color=COLORS['hover_bg'],
+                    text_color=COLORS['text_muted'],
+                )
+                btn.configure(command=lambda t=tab_name, s=switcher: s(t))
+                btn.pack(side="left", padx=(0, SPACING['xs']))
+                _buttons[tab_name] = btn
 
-                switcher("overview")
+            switcher("overview")
 
     def _build_results_features_section(self, scroll_frame, report):
         summary = report.get('summary', {})
-        browsers = report.get('browsers', {})
         features = report.get('features', {})
         total_features = summary.get('total_features', 0)
-        feature_details = report.get('feature_details', {})
         if features and any([features.get('html'), features.get('css'), features.get('js')]):
             features_section = CollapsibleSection(
                 scroll_frame,
@@ -577,231 +611,202 @@ class MainWindow(ctk.CTkFrame):
                 badge_text=str(total_features),
                 badge_color=COLORS['info'],
                 expanded=False,
+                build_content=lambda content: self._fill_results_features(content, report),
             )
             features_section.pack(fill="x", pady=(0, SPACING['lg']))
 
-            features_content = features_section.get_content_frame()
-
-            feature_support = {}  # feature_id -> {browser: status}
-            browser_names_ordered = list(browsers.keys())
-            for b_name, b_data in browsers.items():
-                for fid in b_data.get('unsupported_features', []):
-                    feature_support.setdefault(fid, {})[b_name] = 'unsupported'
-                for fid in b_data.get('partial_features', []):
-                    feature_support.setdefault(fid, {})[b_name] = 'partial'
-
-            legend_row = ctk.CTkFrame(features_content, fg_color="transparent")
-            legend_row.pack(fill="x", pady=(0, SPACING['sm']))
-
-            browser_labels = {}
-            used_labels = set()
-            for b_name in browser_names_ordered:
-                label = b_name[0].upper()
-                if label in used_labels:
-                    label = b_name[:2].upper()
-                used_labels.add(label)
-                browser_labels[b_name] = label
-
-            for b_name in browser_names_ordered:
-                ctk.CTkLabel(
-                    legend_row, text=browser_labels[b_name],
-                    font=ctk.CTkFont(size=8, weight="bold"),
-                    text_color=COLORS['success'], width=14,
-                ).pack(side="left")
-                ctk.CTkLabel(legend_row, text=b_name.title(), font=ctk.CTkFont(size=8),
-                             text_color=COLORS['text_muted']).pack(side="left", padx=(1, SPACING['md']))
+    def _fill_results_features(self, features_content, report):
+        browsers = report.get('browsers', {})
+        features = report.get('features', {})
+        feature_details = report.get('feature_details', {})
 
-            for label, color in [("Supported", COLORS['success']), ("Partial", COLORS['warning']), ("Unsupported", COLORS['danger'])]:
-                ctk.CTkLabel(
-                    legend_row, text=label,
-                    font=ctk.CTkFont(size=8),
-                    text_color=color,
-                ).pack(side="right", padx=(SPACING['sm'], 0))
+        feature_support = {}  # feature_id -> {browser: status}
+        browser_names_ordered = list(browsers.keys())
+        for b_name, b_data in browsers.items():
+            for fid in b_data.get('unsupported_features', []):
+                feature_support.setdefault(fid, {})[b_name] = 'unsupported'
+            for fid in b_data.get('partial_features', []):
+                feature_support.setdefault(fid, {})[b_name] = 'partial'
+
+        legend_row = ctk.CTkFrame(features_content, fg_color="transparent")
+        legend_row.pack(fill="x", pady=(0, SPACING['sm']))
+
+        browser_labels = {}
+        used_labels = set()
+        for b_name in browser_names_ordered:
+            label = b_name[0].upper()
+            if label in used_labels:
+                label = b_name[:2].upper()
+            used_labels.add(label)
+            browser_labels[b_name] = label
+
+        for b_name in browser_names_ordered:
+            ctk.CTkLabel(
+                legend_row, text=browser_labels[b_name],
+                font=ctk.CTkFont(size=8, weight="bold"),
+                text_color=COLORS['success'], width=14,
+            ).pack(side="left")
+            ctk.CTkLabel(legend_row, text=b_name.title(), font=ctk.CTkFont(size=8),
+                         text_color=COLORS['text_muted']).pack(side="left", padx=(1, SPACING['md']))
+
+        for label, color in [("Supported", COLORS['success']), ("Partial", COLORS['warning']), ("Unsupported", COLORS['danger'])]:
+            ctk.CTkLabel(
+                legend_row, text=label,
+                font=ctk.CTkFont(size=8),
+                text_color=color,
+            ).pack(side="right", padx=(SPACING['sm'], 0))
+
+        search_var = ctk.StringVar()
+        search_entry = ctk.CTkEntry(
+            features_content,
+            placeholder_text="Search features...",
+            textvariable=search_var,
+            height=28,
+            font=ctk.CTkFont(size=11),
+            fg_color=COLORS['bg_medium'],
+            border_color=COLORS['border'],
+            text_color=COLORS['text_primary'],
+        )
+        search_entry.pack(fill="x", pady=(0, SPACING['sm']))
+
+        feature_lists = []  # (VirtualList, all items) per feature type
+        detail_maps = {}
+        for lang in ('html', 'css', 'js'):
+            detail_maps[lang] = {}
+            for detail in feature_details.get(lang, []):
+                fid = detail.get('feature')
+                if fid:
+                    detail_maps[lang][fid] = detail
+
+        feature_types = [
+            ("HTML", features.get('html', []), COLORS['html_color'], detail_maps['html']),
+            ("CSS", features.get('css', []), COLORS['css_color'], detail_maps['css']),
+            ("JavaScript", features.get('js', []), COLORS['js_color'], detail_maps['js']),
+        ]
+
+        for type_name, feature_list, type_color, details_map in feature_types:
+            if not feature_list:
+                continue
+
+            type_header = ctk.CTkFrame(features_content, fg_color="transparent", cursor="hand2")
+            type_header.pack(fill="x", pady=(SPACING['sm'], SPACING['xs']))
+
+            type_toggle = ctk.CTkLabel(
+                type_header, text="\u25BC",
+                font=ctk.CTkFont(size=8), text_color=COLORS['text_muted'], width=12,
+            )
+            type_toggle.pack(side="left", padx=(0, SPACING['xs']))
 
-            search_var = ctk.StringVar()
-            search_entry = ctk.CTkEntry(
-                features_content,
-                placeholder_text="Search features...",
-                textvariable=search_var,
-                height=28,
-                font=ctk.CTkFont(size=11),
-                fg_color=COLORS['bg_medium'],
-                border_color=COLORS['border'],
+            ctk.CTkLabel(
+                type_header,
+                text=f" {type_name} ({len(feature_list)}) ",
+                font=ctk.CTkFont(size=10, weight="bold"),
                 text_color=COLORS['text_primary'],
-            )
-            search_entry.pack(fill="x", pady=(0, SPACING['sm']))
-
-            all_feature_frames = []
-            detail_maps = {}
-            for lang in ('html', 'css', 'js'):
-                detail_maps[lang] = {}
-                for detail in feature_details.get(lang, []):
-                    fid = detail.get('feature')
-                    if fid:
-                        detail_maps[lang][fid] = detail
-
-            feature_types = [
-                ("HTML", features.get('html', []), COLORS['html_color'], detail_maps['html']),
-                ("CSS", features.get('css', []), COLORS['css_color'], detail_maps['css']),
-                ("JavaScript", features.get('js', []), COLORS['js_color'], detail_maps['js']),
-            ]
+                fg_color=type_color,
+                corner_radius=4,
+            ).pack(side="left")
 
-            for type_name, feature_list, type_color, details_map in feature_types:
-                if not feature_list:
-                    continue
+            ctk.CTkLabel(
+                type_header, text="Collapse",
+                font=ctk.CTkFont(size=8), text_color=COLORS['text_muted'],
+            ).pack(side="right")
+
+            type_container = ctk.CTkFrame(features_content, fg_color="transparent")
+            type_container.pack(fill="x")
+            type_expanded = [True]
+
+            def make_type_toggle(container, toggle_lbl, expanded, hint_parent):
+                hint = [w for w in hint_parent.winfo_children() if hasattr(w, 'cget') and w.cget("text") in ("Collapse", "Expand")]
+                def toggle():
+                    expanded[0] = not expanded[0]
+                    if expanded[0]:
+                        container.pack(fill="x")
+                        toggle_lbl.configure(text="\u25BC")
+                        if hint:
+                            hint[0].configure(text="Collapse")
+                    else:
+                        container.pack_forget()
+                        toggle_lbl.configure(text="\u25B6")
+                        if hint:
+                            hint[0].configure(text="Expand")
+                return toggle
+
+            toggler = make_type_toggle(type_container, type_toggle, type_expanded, type_header)
+            type_header.bind("<Button-1>", lambda e=None, t=toggler: t())
+            for child in type_header.winfo_children():
+                child.bind("<Button-1>", lambda e=None, t=toggler: t())
+
+            feature_items = []
+            for feature_id in feature_list:
+                detail = details_map.get(feature_id, {})
+                matched = (
+                    detail.get('matched_properties', []) or
+                    detail.get('matched_apis', []) or
+                    detail.get('matched_items', [])
+                )
+                name = detail.get('description', self._analyzer_service.get_feature_display_name(feature_id))
+                match_text = ", ".join(matched[:3]) if matched else ""
+                search_text = f"{name} {feature_id} {match_text}".lower()
+                feature_items.append((name, match_text, feature_support.get(feature_id, {}), search_text))
+
+            # Only the visible rows exist as widgets; scrolling rebinds them
+            feature_list_view = VirtualList(
+                type_container,
+                create_row=lambda parent: FeatureRow(parent, browser_labels),
+                bind_row=lambda row, item: row.set_feature(item[0], item[1], item[2]),
+                row_height=26,
+                row_gap=1,
+                max_visible_rows=15,
+            )
+            feature_list_view.pack(fill="x")
+            feature_list_view.set_items(feature_items)
+            feature_lists.append((feature_list_view, feature_items))
 
-                type_header = ctk.CTkFrame(features_content, fg_color="transparent", cursor="hand2")
-                type_header.pack(fill="x", pady=(SPACING['sm'], SPACING['xs']))
+        def filter_features(*args):
+            query = search_var.get().lower().strip()
+            for list_view, items in feature_lists:
+                list_view.set_items([item for item in items if query in item[3]])
 
-                type_toggle = ctk.CTkLabel(
-                    type_header, text="\u25BC",
-                    font=ctk.CTkFont(size=8), text_color=COLORS['text_muted'], width=12,
-                )
-                type_toggle.pack(side="left", padx=(0, SPACING['xs']))
+        search_var.trace_add("write", filter_features)
 
-                ctk.CTkLabel(
-                    type_header,
-                    text=f" {type_name} ({len(feature_list)}) ",
-                    font=ctk.CTkFont(size=10, weight="bold"),
-                    text_color=COLORS['text_primary'],
-                    fg_color=type_color,
-                    corner_radius=4,
-                ).pack(side="left")
+        unrecognized = report.get('unrecognized', {})
+        if unrecognized and unrecognized.get('total', 0) > 0:
+            ctk.CTkFrame(features_content, fg_color=COLORS['border'], height=1).pack(fill="x", pady=SPACING['sm'])
 
-                ctk.CTkLabel(
-                    type_header, text="Collapse",
-                    font=ctk.CTkFont(size=8), text_color=COLORS['text_muted'],
-                ).pack(side="right")
+            ctk.CTkLabel(
+                features_content,
+                text=f" Unrecognized ({unrecognized.get('total', 0)}) ",
+                font=ctk.CTkFont(size=10, weight="bold"),
+                text_color=COLORS['text_primary'],
+                fg_color=COLORS['bg_light'],
+                corner_radius=4,
+            ).pack(anchor="w", pady=(0, SPACING['xs']))
+
+            unrec_types = [
+                ("HTML", unrecognized.get('html', []), COLORS['html_color']),
+                ("CSS", unrecognized.get('css', []), COLORS['css_color']),
+                ("JavaScript", unrecognized.get('js', []), COLORS['js_color']),
+            ]
 
-                type_container = ctk.CTkFrame(features_content, fg_color="transparent")
-                type_container.pack(fill="x")
-                type_expanded = [True]
-
-                def make_type_toggle(container, toggle_lbl, expanded, hint_parent):
-                    hint = [w for w in hint_parent.winfo_children() if hasattr(w, 'cget') and w.cget("text") in ("Collapse", "Expand")]
-                    def toggle():
-                        expanded[0] = not expanded[0]
-                        if expanded[0]:
-                            container.pack(fill="x")
-                            toggle_lbl.configure(text="\u25BC")
-                            if hint:
-                                hint[0].configure(text="Collapse")
-                        else:
-                            container.pack_forget()
-                            toggle_lbl.configure(text="\u25B6")
-                            if hint:
-                                hint[0].configure(text="Expand")
-                    return toggle
-
-                toggler = make_type_toggle(type_container, type_toggle, type_expanded, type_header)
-                type_header.bind("<Button-1>", lambda e=None, t=toggler: t())
-                for child in type_header.winfo_children():
-                    child.bind("<Button-1>", lambda e=None, t=toggler: t())
-
-                for feature_id in feature_list:
-                    detail = details_map.get(feature_id, {})
-                    matched = (
-                        detail.get('matched_properties', []) or
-                        detail.get('matched_apis', []) or
-                        detail.get('matched_items', [])
-                    )
-                    name = detail.get('description', self._analyzer_service.get_feature_display_name(feature_id))
-                    match_text = ", ".join(matched[:3]) if matched else ""
-                    search_text = f"{name} {feature_id} {match_text}".lower()
-
-                    row = ctk.CTkFrame(type_container, fg_color=COLORS['bg_dark'], corner_radius=3, height=26)
+            for type_name, pattern_list, color in unrec_types:
+                for pattern in pattern_list:
+                    row = ctk.CTkFrame(features_content, fg_color=COLORS['bg_dark'], corner_radius=3, height=26)
                     row.pack(fill="x", pady=(0, 1))
                     row.pack_propagate(False)
 
                     ctk.CTkLabel(
-                        row, text=name,
+                        row, text=pattern,
                         font=ctk.CTkFont(size=10, weight="bold"),
-                        text_color=COLORS['text_primary'],
-                        anchor="w",
+                        text_color=COLORS['text_muted'],
                     ).pack(side="left", padx=(SPACING['sm'], 0))
 
-                    if match_text:
-                        ctk.CTkLabel(
-                            row, text=match_text,
-                            font=ctk.CTkFont(size=9),
-                            text_color=COLORS['text_muted'],
-                            anchor="w",
-                        ).pack(side="left", padx=(SPACING['sm'], 0))
-
-                    badges_frame = ctk.CTkFrame(row, fg_color="transparent")
-                    badges_frame.pack(side="right", padx=SPACING['sm'])
-
-                    support_info = feature_support.get(feature_id, {})
-                    for b_name in browser_names_ordered:
-                        status = support_info.get(b_name, 'supported')
-                        badge_color = COLORS['success'] if status == 'supported' else (
-                            COLORS['warning'] if status == 'partial' else COLORS['danger'])
-                        ctk.CTkLabel(
-                            badges_frame,
-                            text=browser_labels[b_name],
-                            font=ctk.CTkFont(size=8, weight="bold"),
-                            text_color=badge_color,
-                            width=16,
-                        ).pack(side="left", padx=(1, 0))
-
-                    def on_enter(e, r=row):
-                        r.configure(fg_color=COLORS['bg_medium'])
-                    def on_leave(e, r=row):
-                        r.configure(fg_color=COLORS['bg_dark'])
-                    row.bind("<Enter>", on_enter)
-                    row.bind("<Leave>", on_leave)
-
-                    all_feature_frames.append((row, search_text))
-
-            def filter_features(*args):
-                query = search_var.get().lower().strip()
-                for frame, text in all_feature_frames:
-                    if query == "" or query in text:
-                        frame.pack(fill="x", pady=(0, 1))
-                    else:
-                        frame.pack_forget()
-
-            search_var.trace_add("write", filter_features)
-
-            unrecognized = report.get('unrecognized', {})
-            if unrecognized and unrecognized.get('total', 0) > 0:
-                ctk.CTkFrame(features_content, fg_color=COLORS['border'], height=1).pack(fill="x", pady=SPACING['sm'])
-
-                ctk.CTkLabel(
-                    features_content,
-                    text=f" Unrecognized ({unrecognized.get('total', 0)}) ",
-                    font=ctk.CTkFont(size=10, weight="bold"),
-                    text_color=COLORS['text_primary'],
-                    fg_color=COLORS['bg_light'],
-                    corner_radius=4,
-                ).pack(anchor="w", pady=(0, SPACING['xs']))
-
-                unrec_types = [
-                    ("HTML", unrecognized.get('html', []), COLORS['html_color']),
-                    ("CSS", unrecognized.get('css', []), COLORS['css_color']),
-                    ("JavaScript", unrecognized.get('js', []), COLORS['js_color']),
-                ]
-
-                for type_name, pattern_list, color in unrec_types:
-                    for pattern in pattern_list:
-                        row = ctk.CTkFrame(features_content, fg_color=COLORS['bg_dark'], corner_radius=3, height=26)
-                        row.pack(fill="x", pady=(0, 1))
-                        row.pack_propagate(False)
-
-                        ctk.CTkLabel(
-                            row, text=pattern,
-                            font=ctk.CTkFont(size=10, weight="bold"),
-                            text_color=COLORS['text_muted'],
-                        ).pack(side="left", padx=(SPACING['sm'], 0))
-
-                        ctk.CTkLabel(
-                            row, text=type_name,
-                            font=ctk.CTkFont(size=8),
-                            text_color=COLORS['text_muted'],
-                        ).pack(side="right", padx=SPACING['sm'])
+                    ctk.CTkLabel(
+                        row, text=type_name,
+                        font=ctk.CTkFont(size=8),
+                        text_color=COLORS['text_muted'],
+                    ).pack(side="right", padx=SPACING['sm'])
 
     def _build_results_viz_section(self, scroll_frame, report):
-        summary = report.get('summary', {})
         browsers = report.get('browsers', {})
         if browsers:
             viz_section = CollapsibleSection(
@@ -810,43 +815,46 @@ class MainWindow(ctk.CTkFrame):
                 badge_text="Charts",
                 badge_color=COLORS['accent_dim'],
                 expanded=False,
+                build_content=lambda content: self._fill_results_viz(content, report),
             )
             viz_section.pack(fill="x", pady=(0, SPACING['lg']))
 
-            viz_content = viz_section.get_content_frame()
+    def _fill_results_viz(self, viz_content, report):
+        summary = report.get('summary', {})
+        browsers = report.get('browsers', {})
 
-            charts_frame = ctk.CTkFrame(viz_content, fg_color="transparent")
-            charts_frame.pack(fill="x", pady=(0, SPACING['sm']))
+        charts_frame = ctk.CTkFrame(viz_content, fg_color="transparent")
+        charts_frame.pack(fill="x", pady=(0, SPACING['sm']))
 
-            charts_frame.grid_columnconfigure(0, weight=1)
-            charts_frame.grid_columnconfigure(1, weight=1)
+        charts_frame.grid_columnconfigure(0, weight=1)
+        charts_frame.grid_columnconfigure(1, weight=1)
 
-            chart_data = {
-                name: {
-                    'supported': d.get('supported', 0),
-                    'partial': d.get('partial', 0),
-                    'unsupported': d.get('unsupported', 0),
-                    'compatibility_percentage': d.get('compatibility_percentage', 0)
-                }
-                for name, d in browsers.items()
+        chart_data = {
+            name: {
+                'supported': d.get('supported', 0),
+                'partial': d.get('partial', 0),
+                'unsupported': d.get('unsupported', 0),
+                'compatibility_percentage': d.get('compatibility_percentage', 0)
             }
+            for name, d in browsers.items()
+        }
 
-            radar_chart = BrowserRadarChart(charts_frame)
-            radar_chart.grid(row=0, column=0, sticky="nsew", padx=(0, SPACING['sm']))
-            radar_chart.set_data(chart_data)
-
-            feature_chart = FeatureDistributionChart(charts_frame)
-            feature_chart.grid(row=0, column=1, sticky="nsew", padx=(SPACING['sm'], 0))
-            feature_chart.set_data(
-                summary.get('html_features', 0),
-                summary.get('css_features', 0),
-                summary.get('js_features', 0),
-                summary.get('total_features', None)
-            )
+        radar_chart = BrowserRadarChart(charts_frame)
+        radar_chart.grid(row=0, column=0, sticky="nsew", padx=(0, SPACING['sm']))
+        radar_chart.set_data(chart_data)
+
+        feature_chart = FeatureDistributionChart(charts_frame)
+        feature_chart.grid(row=0, column=1, sticky="nsew", padx=(SPACING['sm'], 0))
+        feature_chart.set_data(
+            summary.get('html_features', 0),
+            summary.get('css_features', 0),
+            summary.get('js_features', 0),
+            summary.get('total_features', None)
+        )
 
-            breakdown_chart = CompatibilityBarChart(viz_content)
-            breakdown_chart.pack(fill="x", pady=(SPACING['sm'], 0))
-            breakdown_chart.set_data(chart_data)
+        breakdown_chart = CompatibilityBarChart(viz_content)
+        breakdown_chart.pack(fill="x", pady=(SPACING['sm'], 0))
+        breakdown_chart.set_data(chart_data)
 
     def _build_results_actions_section(self, scroll_frame, report):
         actions_frame = ctk.CTkFrame(
@@ -984,7 +992,7 @@ class MainWindow(ctk.CTkFrame):
         for widget in self._history_list_frame.winfo_children():
             widget.destroy()
 
-        history = self._analyzer_service.get_analysis_history(limit=50)
+        history = self._analyzer_service.get_analysis_history(limit=_HISTORY_LIMIT)
 
         if not history:
             ctk.CTkLabel(
@@ -993,35 +1001,55 @@ class MainWindow(ctk.CTkFrame):
             ).pack(fill="x", pady=SPACING['md'])
             return
 
-        for analysis in history:
-            analysis_id = analysis.get('id')
-            is_bookmarked = self._analyzer_service.is_bookmarked(analysis_id) if analysis_id else False
-
-            card = HistoryCard(
-                self._history_list_frame,
-                analysis_data=analysis,
-                on_click=self._on_history_item_click,
-                on_delete=self._on_history_item_delete,
-                on_bookmark_toggle=self._on_bookmark_toggle,
-                is_bookmarked=is_bookmarked,
-            )
-            card.pack(fill="x", pady=(0, SPACING['sm']))
+        # One query for the whole page instead of is_bookmarked() per row
+        self._bookmarked_ids = self._analyzer_service.get_bookmarked_ids(
+            [analysis.get('id') for analysis in history]
+        )
+        self._build_history_list(history)
+
+    def _build_history_list(self, items: List[Dict]):
+        history_list = VirtualList(
+            self._history_list_frame,
+            create_row=self._create_history_row,
+            bind_row=lambda card, analysis: card.set_data(
+                analysis, analysis.get('id') in self._bookmarked_ids
+            ),
+            row_height=_HISTORY_ROW_HEIGHT,
+            row_gap=SPACING['sm'],
+            max_visible_rows=8,
+        )
+        history_list.pack(fill="x")
+        history_list.set_items(items)
+
+    def _create_history_row(self, parent) -> HistoryCard:
+        card = HistoryCard(
+            parent,
+            analysis_data={},
+            on_click=self._on_history_item_click,
+            on_delete=self._on_history_item_delete,
+            on_bookmark_toggle=self._on_bookmark_toggle,
+            height=_HISTORY_ROW_HEIGHT,
+        )
+        card.pack_propagate(False)
+        return card
 
     def _on_bookmark_toggle(self, analysis_id: int, is_bookmarked: bool):
         if is_bookmarked:
             success = self._analyzer_service.add_bookmark(analysis_id)
             if success:
+                self._bookmarked_ids.add(analysis_id)
                 self.status_bar.set_status("Analysis bookmarked", "success")
         else:
             success = self._analyzer_service.remove_bookmark(analysis_id)
             if success:
+                self._bookmarked_ids.discard(analysis_id)
                 self.status_bar.set_status("Bookmark removed", "info")
 
     def _show_bookmarks_only(self):
         for widget in self._history_list_frame.winfo_children():
             widget.destroy()
 
-        bookmarks = self._analyzer_service.get_all_bookmarks(limit=50)
+        bookmarks = self._analyzer_service.get_all_bookmarks(limit=_HISTORY_LIMIT)
 
         if not bookmarks:
             empty_frame = ctk.CTkFrame(self._history_list_frame, fg_color=COLORS['bg_medium'], corner_radius=8)
@@ -1058,19 +1086,14 @@ class MainWindow(ctk.CTkFrame):
         )
         all_btn.pack(anchor="w", pady=(0, SPACING['sm']))
 
+        items = []
         for bookmark in bookmarks:
             analysis_data = bookmark.get('analysis', {})
             analysis_data['id'] = bookmark.get('analysis_id')
+            items.append(analysis_data)
 
-            card = HistoryCard(
-                self._history_list_frame,
-                analysis_data=analysis_data,
-                on_click=self._on_history_item_click,
-                on_delete=self._on_history_item_delete,
-                on_bookmark_toggle=self._on_bookmark_toggle,
-                is_bookmarked=True,
-            )
-            card.pack(fill="x", pady=(0, SPACING['sm']))
+        self._bookmarked_ids = {item['id'] for item in items}
+        self._build_history_list(items)
 
     def _on_history_item_click(self, analysis_id: int):
         analysis = self._analyzer_service.get_analysis_by_id(analysis_id)
@@ -1142,29 +1165,25 @@ class MainWindow(ctk.CTkFrame):
 
         issues = []
 
-        for feature_id, affected_browsers in unsupported_map.items():
-            baseline = self._analyzer_service.get_baseline_status(feature_id)
-            issues.append({
-                'feature_name': self._analyzer_service.get_feature_display_name(feature_id),
+        def issue(feature_id, severity, affected_browsers):
+            meta = self._analyzer_service.get_feature_metadata(feature_id)
+            baseline = meta['baseline']
+            return {
+                'feature_name': meta['name'],
                 'feature_id': feature_id,
-                'severity': 'critical',
+                'severity': severity,
                 'browsers': affected_browsers,
-                'fix_suggestion': self._analyzer_service.get_fix_suggestion(feature_id),
+                'fix_suggestion': meta['fix_suggestion'],
                 'baseline_status': baseline.get('status') if baseline else None,
-            })
+            }
+
+        for feature_id, affected_browsers in unsupported_map.items():
+            issues.append(issue(feature_id, 'critical', affected_browsers))
 
         # Only add partial issues if the feature isn't already listed as unsupported
         for feature_id, affected_browsers in partial_map.items():
             if feature_id not in unsupported_map:
-                baseline = self._analyzer_service.get_baseline_status(feature_id)
-                issues.append({
-                    'feature_name': self._analyzer_service.get_feature_display_name(feature_id),
-                    'feature_id': feature_id,
-                    'severity': 'warning',
-                    'browsers': affected_browsers,
-                    'fix_suggestion': self._analyzer_service.get_fix_suggestion(feature_id),
-                    'baseline_status': baseline.get('status') if baseline else None,
-                })
+                issues.append(issue(feature_id, 'warning', affected_browsers))
 
         return issues
 
@@ -1236,8 +1255,6 @@ class MainWindow(ctk.CTkFrame):
         }
 
     def _on_ai_suggestions_click(self, browsers: Dict, scroll_frame):
-        import threading
-
         for w in self._ai_placeholder.winfo_children():
             w.destroy()
 
@@ -1785,31 +1802,97 @@ class MainWindow(ctk.CTkFrame):
             self._run_analysis(files)
 
     def _run_analysis(self, files: List[str]):
+        """Analyze on a worker thread; the Tk thread polls a queue for progress and the result."""
+        if self._analysis_thread is not None and self._analysis_thread.is_alive():
+            return
+
         self._last_files = list(files)
 
         html_files = [f for f in files if Path(f).suffix.lower() in ['.html', '.htm']]
         css_files = [f for f in files if Path(f).suffix.lower() == '.css']
         js_files = [f for f in files if Path(f).suffix.lower() in ['.js', '.jsx', '.ts', '.tsx', '.mjs']]
+        target_browsers = self._selected_browsers if self._selected_browsers else None
+
+        updates: queue.Queue = queue.Queue()
+        cancel_event = threading.Event()
 
         try:
-            progress = ProgressDialog(self.master, "Analyzing", "Starting analysis...")
-            progress.set_progress(10)
-            self.master.update()
+            progress = ProgressDialog(
+                self.master, "Analyzing", "Starting analysis...",
+                on_cancel=cancel_event.set,
+            )
+            progress.set_progress(0)
+        except Exception as e:
+            show_error(self.master, "Error", str(e))
+            return
 
-            progress.set_progress(30, message="Analyzing browser compatibility...")
+        def worker():
+            # Never touch Tk from here -- everything goes through the queue.
+            try:
+                result = self._analyzer_service.analyze_files(
+                    html_files=html_files if html_files else None,
+                    css_files=css_files if css_files else None,
+                    js_files=js_files if js_files else None,
+                    target_browsers=target_browsers,
+                    progress_callback=lambda msg, pct: updates.put(('progress', msg, pct)),
+                    cancel_event=cancel_event,
+                    # Re-checks of the same files only re-parse what changed
+                    incremental=True,
+                    cache_file_results=True,
+                )
+                updates.put(('done', result))
+            except Exception as e:
+                updates.put(('error', e))
+
+        self._analysis_thread = threading.Thread(target=worker, name="crossguard-analysis", daemon=True)
+        self._analysis_thread.start()
+        self.status_bar.set_status(f"Analyzing {len(files)} file(s)...", "info")
+        self.after(_ANALYSIS_POLL_MS, lambda: self._poll_analysis(updates, progress, cancel_event, files))
+
+    def _poll_analysis(self, updates: queue.Queue, progress, cancel_event: threading.Event,
+                       files: List[str]):
+        latest_progress = None
+        outcome = None
+        while True:
+            try:
+                item = updates.get_nowait()
+            except queue.Empty:
+                break
+            if item[0] == 'progress':
+                latest_progress = item  # only the newest message is worth drawing
+            else:
+                outcome = item
+                break
+
+        if outcome is None:
+            if latest_progress is not None and not cancel_event.is_set():
+                _, message, pct = latest_progress
+                try:
+                    progress.set_progress(pct, message=message)
+                except Exception:
+                    pass
+            self.after(_ANALYSIS_POLL_MS,
+                       lambda: self._poll_analysis(updates, progress, cancel_event, files))
+            return
 
-            target_browsers = self._selected_browsers if self._selected_browsers else None
+        try:
+            progress.close()
+        except Exception:
+            pass
+        self._analysis_thread = None
 
-            result = self._analyzer_service.analyze_files(
-                html_files=html_files if html_files else None,
-                css_files=css_files if css_files else None,
-                js_files=js_files if js_files else None,
-                target_browsers=target_browsers,
-            )
+        kind, payload = outcome
+        if kind == 'error':
+            show_error(self.master, "Error", str(payload))
+            return
+        self._on_analysis_complete(payload, files, cancelled=cancel_event.is_set())
 
-            progress.set_progress(100)
-            progress.close()
+    def _on_analysis_complete(self, result, files: List[str], cancelled: bool = False):
+        if cancelled and not result.success:
+            self.status_bar.set_status("Analysis cancelled", "warning")
+            return
 
+        try:
             if result.success:
                 self.current_report = result.to_dict()
                 self.status_bar.set_last_analysis()
@@ -33,6 +33,8 @@ from .browser_selector import BrowserSelector, get_available_browsers
 from .version_range_card import VersionRangeCard, VersionRangeBar, VersionRangePopup
 
 from .history_card import HistoryCard
+from .virtual_list import VirtualList
+from .feature_row import FeatureRow
 from .statistics_panel import StatisticsPanel, CompactStatsBar
 
 from .bookmark_button import BookmarkButton
@@ -72,6 +74,8 @@ __all__ = [
     'VersionRangeBar',
     'VersionRangePopup',
     'HistoryCard',
+    'VirtualList',
+    'FeatureRow',
     'StatisticsPanel',
     'CompactStatsBar',
     'BookmarkButton',
@@ -16,8 +16,10 @@ class CollapsibleSection(ctk.CTkFrame):
         badge_color: Optional[str] = None,
         expanded: bool = False,
         on_toggle: Optional[Callable[[bool], None]] = None,
+        build_content: Optional[Callable[[ctk.CTkFrame], None]] = None,
         **kwargs
     ):
+        """build_content(content_frame), if given, fills the section on first expand."""
         super().__init__(
             master,
             fg_color=COLORS['bg_medium'],
@@ -32,6 +34,7 @@ class CollapsibleSection(ctk.CTkFrame):
         self._badge_color = badge_color or COLORS['accent']
         self._expanded = expanded
         self._on_toggle = on_toggle
+        self._build_content = build_content
 
         self._init_ui()
         self._update_state()
@@ -103,6 +106,7 @@ class CollapsibleSection(ctk.CTkFrame):
 
     def _update_state(self):
         if self._expanded:
+            self._ensure_built()
             self.chevron_label.configure(text=ICONS['chevron_down'])
             self.action_label.configure(text="Collapse")
             self.separator.pack(fill="x", padx=SPACING['md'], pady=(0, SPACING['sm']))
@@ -113,6 +117,14 @@ class CollapsibleSection(ctk.CTkFrame):
             self.separator.pack_forget()
             self.content_frame.pack_forget()
 
+    def _ensure_built(self):
+        if self._build_content is not None:
+            build, self._build_content = self._build_content, None
+            build(self.content_frame)
+
+    def is_built(self) -> bool:
+        return self._build_content is None
+
     def toggle(self):
         self._expanded = not self._expanded
         self._update_state()
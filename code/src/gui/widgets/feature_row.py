@@ -0,0 +1,62 @@
+"""Single-line feature row with per-browser support badges (reused by VirtualList)."""
+
+from typing import Dict
+import customtkinter as ctk
+
+from ..theme import COLORS, SPACING
+
+_STATUS_COLORS = {
+    'supported': COLORS['success'],
+    'partial': COLORS['warning'],
+    'unsupported': COLORS['danger'],
+}
+
+
+class FeatureRow(ctk.CTkFrame):
+
+    def __init__(self, master, browser_labels: Dict[str, str], **kwargs):
+        super().__init__(master, fg_color=COLORS['bg_dark'], corner_radius=3, height=26, **kwargs)
+        self.pack_propagate(False)
+
+        self._name_label = ctk.CTkLabel(
+            self, text="",
+            font=ctk.CTkFont(size=10, weight="bold"),
+            text_color=COLORS['text_primary'],
+            anchor="w",
+        )
+        self._name_label.pack(side="left", padx=(SPACING['sm'], 0))
+
+        self._match_label = ctk.CTkLabel(
+            self, text="",
+            font=ctk.CTkFont(size=9),
+            text_color=COLORS['text_muted'],
+            anchor="w",
+        )
+        self._match_label.pack(side="left", padx=(SPACING['sm'], 0))
+
+        badges_frame = ctk.CTkFrame(self, fg_color="transparent")
+        badges_frame.pack(side="right", padx=SPACING['sm'])
+
+        # Browser order is fixed for a report, so the badge labels are built
+        # once and only recoloured when the row is rebound.
+        self._badges = {}
+        for b_name, label in browser_labels.items():
+            badge = ctk.CTkLabel(
+                badges_frame,
+                text=label,
+                font=ctk.CTkFont(size=8, weight="bold"),
+                text_color=COLORS['success'],
+                width=16,
+            )
+            badge.pack(side="left", padx=(1, 0))
+            self._badges[b_name] = badge
+
+        self.bind("<Enter>", lambda e: self.configure(fg_color=COLORS['bg_medium']))
+        self.bind("<Leave>", lambda e: self.configure(fg_color=COLORS['bg_dark']))
+
+    def set_feature(self, name: str, match_text: str, support: Dict[str, str]):
+        self._name_label.configure(text=name)
+        self._match_label.configure(text=match_text)
+        for b_name, badge in self._badges.items():
+            status = support.get(b_name, 'supported')
+            badge.configure(text_color=_STATUS_COLORS.get(status, COLORS['danger']))
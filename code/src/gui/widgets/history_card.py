@@ -44,94 +44,58 @@ class HistoryCard(ctk.CTkFrame):
         left_frame = ctk.CTkFrame(container, fg_color="transparent")
         left_frame.pack(side="left", fill="x", expand=True)
 
-        file_type = self._data.get('file_type', 'unknown')
-        icon_colors = {
-            'html': COLORS['html_color'],
-            'htm': COLORS['html_color'],
-            'css': COLORS['css_color'],
-            'js': COLORS['js_color'],
-            'mixed': COLORS['accent'],
-        }
-        icon_color = icon_colors.get(file_type.lower(), COLORS['text_muted'])
-
-        icons = {
-            'html': ICONS.get('html', '\u25B6'),
-            'htm': ICONS.get('html', '\u25B6'),
-            'css': ICONS.get('css', '\u25C6'),
-            'js': ICONS.get('js', '\u2605'),
-            'mixed': '\u25A0',
-        }
-        icon = icons.get(file_type.lower(), ICONS.get('file', '\u25A0'))
-
-        icon_label = ctk.CTkLabel(
+        self._icon_label = ctk.CTkLabel(
             left_frame,
-            text=icon,
+            text="",
             font=ctk.CTkFont(size=18),
-            text_color=icon_color,
             width=30,
         )
-        icon_label.pack(side="left")
+        self._icon_label.pack(side="left")
 
         info_frame = ctk.CTkFrame(left_frame, fg_color="transparent")
         info_frame.pack(side="left", fill="x", expand=True, padx=(SPACING['xs'], 0))
 
-        file_name = self._data.get('file_name', 'Unknown file')
-        name_label = ctk.CTkLabel(
+        self._name_label = ctk.CTkLabel(
             info_frame,
-            text=file_name,
+            text="",
             font=ctk.CTkFont(size=13, weight="bold"),
             text_color=COLORS['text_primary'],
             anchor="w",
         )
-        name_label.pack(anchor="w")
+        self._name_label.pack(anchor="w")
 
-        score = self._data.get('overall_score', 0)
-        grade = self._data.get('grade', 'N/A')
-        total_features = self._data.get('total_features', 0)
-        score_color = get_score_color(score)
-
-        analyzed_at = self._data.get('analyzed_at')
-        date_str = self._format_date(analyzed_at)
-
-        details_text = f"Score: {score:.0f}% ({grade})  |  {total_features} features  |  {date_str}"
-
-        details_label = ctk.CTkLabel(
+        self._details_label = ctk.CTkLabel(
             info_frame,
-            text=details_text,
+            text="",
             font=ctk.CTkFont(size=11),
             text_color=COLORS['text_muted'],
             anchor="w",
         )
-        details_label.pack(anchor="w")
+        self._details_label.pack(anchor="w")
 
         right_frame = ctk.CTkFrame(container, fg_color="transparent")
         right_frame.pack(side="right")
 
-        bookmark_icon = ICONS.get('bookmark_filled', '\u2605') if self._is_bookmarked else ICONS.get('bookmark', '\u2606')
-        bookmark_color = COLORS['warning'] if self._is_bookmarked else COLORS['text_muted']
-
         self._bookmark_btn = ctk.CTkButton(
             right_frame,
-            text=bookmark_icon,
+            text="",
             font=ctk.CTkFont(size=14),
             width=28,
             height=28,
             fg_color="transparent",
             hover_color=COLORS['bg_light'],
-            text_color=bookmark_color,
             command=self._handle_bookmark_toggle,
         )
         self._bookmark_btn.pack(side="left", padx=(0, SPACING['xs']))
 
-        score_badge = ctk.CTkLabel(
+        self._score_badge = ctk.CTkLabel(
             right_frame,
-            text=f" {score:.0f}% ",
+            text="",
             font=ctk.CTkFont(size=12, weight="bold"),
             text_color=COLORS['text_primary'],
-            fg_color=score_color,
             corner_radius=4,
         )
-        score_badge.pack(side="left", padx=(0, SPACING['sm']))
+        self._score_badge.pack(side="left", padx=(0, SPACING['sm']))
 
         delete_btn = ctk.CTkButton(
             right_frame,
@@ -146,8 +110,50 @@ class HistoryCard(ctk.CTkFrame):
         )
         delete_btn.pack(side="left")
 
-        self._name_label = name_label
-        self._details_label = details_label
+        self._render_data()
+
+    def _render_data(self):
+        file_type = (self._data.get('file_type') or 'unknown').lower()
+        icon_colors = {
+            'html': COLORS['html_color'],
+            'htm': COLORS['html_color'],
+            'css': COLORS['css_color'],
+            'js': COLORS['js_color'],
+            'mixed': COLORS['accent'],
+        }
+        icons = {
+            'html': ICONS.get('html', '\u25B6'),
+            'htm': ICONS.get('html', '\u25B6'),
+            'css': ICONS.get('css', '\u25C6'),
+            'js': ICONS.get('js', '\u2605'),
+            'mixed': '\u25A0',
+        }
+        self._icon_label.configure(
+            text=icons.get(file_type, ICONS.get('file', '\u25A0')),
+            text_color=icon_colors.get(file_type, COLORS['text_muted']),
+        )
+
+        self._name_label.configure(text=self._data.get('file_name', 'Unknown file'))
+
+        score = self._data.get('overall_score', 0)
+        grade = self._data.get('grade', 'N/A')
+        total_features = self._data.get('total_features', 0)
+        date_str = self._format_date(self._data.get('analyzed_at'))
+        self._details_label.configure(
+            text=f"Score: {score:.0f}% ({grade})  |  {total_features} features  |  {date_str}"
+        )
+
+        self._score_badge.configure(text=f" {score:.0f}% ", fg_color=get_score_color(score))
+        self._update_bookmark_appearance()
+
+    def set_data(self, analysis_data: Dict[str, Any], is_bookmarked: bool = False):
+        """Rebind this card to another analysis (used when VirtualList recycles rows)."""
+        if analysis_data is self._data and is_bookmarked == self._is_bookmarked:
+            return
+        self._data = analysis_data
+        self._analysis_id = analysis_data.get('id')
+        self._is_bookmarked = is_bookmarked
+        self._render_data()
 
     def _format_date(self, date_str: str) -> str:
         if not date_str:
@@ -1,6 +1,6 @@
 """Themed message dialogs: info, warning, error, question, and progress."""
 
-from typing import Optional
+from typing import Callable, Optional
 
 import customtkinter as ctk
 
@@ -164,9 +164,12 @@ class ProgressDialog(ctk.CTkToplevel):
         parent,
         title: str,
         message: str = "Processing...",
+        on_cancel: Optional[Callable[[], None]] = None,
     ):
         super().__init__(parent)
 
+        self._on_cancel = on_cancel
+
         self.title(title)
         self.configure(fg_color=COLORS['bg_medium'])
         self.resizable(False, False)
@@ -177,8 +180,8 @@ class ProgressDialog(ctk.CTkToplevel):
         self._build_ui(message)
         self._center_on_parent(parent)
 
-        # Block the X button while in progress
-        self.protocol("WM_DELETE_WINDOW", lambda: None)
+        # Block the X button while in progress, unless the work can be cancelled
+        self.protocol("WM_DELETE_WINDOW", self._cancel if on_cancel else (lambda: None))
 
     def _build_ui(self, message: str):
         main_frame = ctk.CTkFrame(self, fg_color="transparent")
@@ -211,6 +214,27 @@ class ProgressDialog(ctk.CTkToplevel):
         )
         self.percent_label.pack(pady=(SPACING['sm'], 0))
 
+        if self._on_cancel:
+            self.cancel_button = ctk.CTkButton(
+                main_frame,
+                text="Cancel",
+                font=ctk.CTkFont(size=13),
+                width=100,
+                height=32,
+                fg_color="transparent",
+                border_width=1,
+                border_color=COLORS['border'],
+                text_color=COLORS['text_primary'],
+                hover_color=COLORS['hover_bg'],
+                command=self._cancel,
+            )
+            self.cancel_button.pack(pady=(SPACING['md'], 0))
+
+    def _cancel(self):
+        self.cancel_button.configure(state="disabled", text="Cancelling...")
+        self.status_label.configure(text="Cancelling...")
+        self._on_cancel()
+
     def _center_on_parent(self, parent):
         self.update_idletasks()
 
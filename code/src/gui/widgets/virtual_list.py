@@ -0,0 +1,142 @@
+"""Scrollable list that only builds widgets for the rows currently in view."""
+
+import tkinter as tk
+from typing import Any, Callable, List, Sequence
+
+import customtkinter as ctk
+
+from ..theme import COLORS
+
+
+class VirtualList(ctk.CTkFrame):
+    """Fixed-height rows, recycled on scroll.
+
+    create_row(parent) builds one empty row widget, row_height tall (CTk only
+    accepts sizes in the constructor); bind_row(row, item) fills it with an
+    item's data. Only enough rows to cover the viewport (plus one for partial
+    rows) are ever created, so a list of thousands of items costs the same as
+    a list of fifteen.
+    """
+
+    def __init__(
+        self,
+        master,
+        create_row: Callable[[Any], Any],
+        bind_row: Callable[[Any, Any], None],
+        row_height: int = 28,
+        row_gap: int = 1,
+        max_visible_rows: int = 15,
+        **kwargs
+    ):
+        kwargs.setdefault('fg_color', "transparent")
+        super().__init__(master, **kwargs)
+
+        self._create_row = create_row
+        self._bind_row = bind_row
+        self._row_height = row_height
+        self._stride = row_height + row_gap
+        self._max_visible_rows = max_visible_rows
+
+        self._items: List[Any] = []
+        self._rows: List[Any] = []
+        self._offset = 0  # pixels scrolled from the top
+
+        self._viewport = ctk.CTkFrame(self, fg_color="transparent", height=0)
+        self._viewport.pack(side="left", fill="x", expand=True)
+
+        self._scrollbar = ctk.CTkScrollbar(
+            self,
+            orientation="vertical",
+            command=self._on_scrollbar,
+            button_color=COLORS['border'],
+            button_hover_color=COLORS['text_muted'],
+        )
+        self._bind_wheel(self._viewport)
+
+    # -- Public API ------------------------------------------------------------
+
+    def set_items(self, items: Sequence[Any]):
+        self._items = list(items)
+        self._offset = min(self._offset, self._max_offset())
+
+        visible = min(len(self._items), self._max_visible_rows)
+        self._viewport.configure(height=max(visible * self._stride, 1))
+
+        if len(self._items) > self._max_visible_rows:
+            self._scrollbar.pack(side="right", fill="y")
+        else:
+            self._scrollbar.pack_forget()
+
+        self._ensure_rows(visible + 1 if len(self._items) > visible else visible)
+        self._render()
+
+    def get_items(self) -> List[Any]:
+        return list(self._items)
+
+    def scroll_to_index(self, index: int):
+        self._offset = max(0, min(index * self._stride, self._max_offset()))
+        self._render()
+
+    # -- Layout ----------------------------------------------------------------
+
+    def _max_offset(self) -> int:
+        visible_height = min(len(self._items), self._max_visible_rows) * self._stride
+        return max(0, len(self._items) * self._stride - visible_height)
+
+    def _ensure_rows(self, count: int):
+        while len(self._rows) < count:
+            row = self._create_row(self._viewport)
+            self._bind_wheel(row)
+            self._rows.append(row)
+
+    def _render(self):
+        first = self._offset // self._stride
+        shift = self._offset % self._stride
+
+        for slot, row in enumerate(self._rows):
+            index = first + slot
+            if index >= len(self._items):
+                row.place_forget()
+                continue
+            self._bind_row(row, self._items[index])
+            row.place(x=0, y=slot * self._stride - shift, relwidth=1.0)
+
+        total = len(self._items) * self._stride
+        if total:
+            visible_height = min(len(self._items), self._max_visible_rows) * self._stride
+            self._scrollbar.set(self._offset / total, (self._offset + visible_height) / total)
+
+    # -- Scrolling -------------------------------------------------------------
+
+    def _scroll_to(self, offset: int):
+        offset = max(0, min(int(offset), self._max_offset()))
+        if offset != self._offset:
+            self._offset = offset
+            self._render()
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._scroll_to(float(args[0]) * len(self._items) * self._stride)
+        elif action == "scroll":
+            amount, unit = int(args[0]), args[1]
+            step = self._max_visible_rows * self._stride if unit == "pages" else self._stride
+            self._scroll_to(self._offset + amount * step)
+
+    def _on_wheel(self, event):
+        if self._max_offset() == 0:
+            return None  # nothing to scroll; let the enclosing page scroll instead
+        if getattr(event, 'num', None) == 4:
+            direction = -1
+        elif getattr(event, 'num', None) == 5:
+            direction = 1
+        else:
+            direction = -1 if event.delta > 0 else 1
+        self._scroll_to(self._offset + direction * self._stride * 3)
+        # Stop the enclosing CTkScrollableFrame's bind_all handler from scrolling too
+        return "break"
+
+    def _bind_wheel(self, widget):
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            tk.Misc.bind(widget, sequence, self._on_wheel, add="+")
+        for child in widget.winfo_children():
+            self._bind_wheel(child)
@@ -1,11 +1,25 @@
 """Parsers for HTML, CSS, and JS feature extraction."""
 
-from .html_parser import HTMLParser
-from .css_parser import CSSParser
-from .js_parser import JavaScriptParser
+import importlib
+
+# Exported lazily so importing one parser (or src.parsers.rule_registry)
+# does not also load tinycss2, tree-sitter and the HTML backends.
+_EXPORTS = {
+    'HTMLParser': '.html_parser',
+    'CSSParser': '.css_parser',
+    'JavaScriptParser': '.js_parser',
+}
 
 __all__ = [
     'HTMLParser',
     'CSSParser',
     'JavaScriptParser',
 ]
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,22 +1,170 @@
-"""CSS parser -- extracts browser features using tinycss2 AST + regex matching."""
+"""CSS parser -- extracts browser features using tinycss2 AST + indexed rule matching."""
 
 from typing import Set, List, Dict, Tuple
 from collections import OrderedDict
 from pathlib import Path
+import os
 import re
 
 import tinycss2
 
-from .css_feature_maps import ALL_CSS_FEATURES
-from .custom_rules_loader import get_custom_css_rules
+from .css_rule_index import get_css_rule_index, strip_css_strings
+from .feature_details import FeatureDetails
+from .minified import DEFAULT_MINIFIED_MODE, MINIFIED_FULL, MINIFIED_SKIP, detect_minified
+from .rule_patterns import timed_search
+from .rule_registry import get_rule_snapshot
 from ..utils.config import get_logger
+from ..utils.metrics import BYTES_PROCESSED, metrics_enabled
+from ..utils.profiling import profile_stage
 
 logger = get_logger('parsers.css')
 
-# Matches CSS string literals (double- or single-quoted, with escapes).
-# Used to strip string CONTENTS before regex feature matching so that text
-# inside strings (e.g. content: "display: flex") does not false-positive.
-_CSS_STRING_RE = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+# tinycss2.serialize() only adds separators between certain token pairs; a
+# node list without them serializes to the concatenation of its nodes
+_BAD_PAIRS = tinycss2.serializer.BAD_PAIRS
+# Identifiers and names tinycss2 would serialize unchanged
+_PLAIN_IDENT_RE = re.compile(r'-?[a-zA-Z_][-a-zA-Z0-9_]*|--[-a-zA-Z0-9_]*')
+_PLAIN_NAME_RE = re.compile(r'[-a-zA-Z0-9_]+')
+_BLOCK_BRACKETS = {'() block': ('(', ')'), '[] block': ('[', ']'), '{} block': ('{', '}')}
+
+
+# Stylesheets longer than this are parsed one run of top-level rules at a
+# time, so only one chunk's tinycss2 node tree is alive at once
+CSS_CHUNK_SIZE = 1024 * 1024
+
+# What the chunk splitter has to see: comments, strings, escapes and unquoted
+# url() tokens (which may contain braces), and block delimiters
+_SPLIT_TOKEN_RE = re.compile(
+    r"""/\*.*?(?:\*/|\Z)"""
+    r"""|"(?:\\.|[^"\\\n])*"?|'(?:\\.|[^'\\\n])*'?"""
+    r"""|\\."""
+    r"""|url\(\s*(?:[^\s"'()\\]|\\.)*\s*\)"""
+    r"""|[{}()\[\]]""",
+    re.DOTALL | re.IGNORECASE,
+)
+_CLOSERS = {'{': '}', '(': ')', '[': ']'}
+
+
+def _split_top_level_rules(css: str, chunk_size: int) -> List[str]:
+    """css cut after top-level '}'s into pieces of about chunk_size characters.
+
+    Each piece holds whole top-level rules, so parsing the pieces one by one
+    gives the same rules as parsing the whole text. Text with a stray
+    top-level '}' (where error recovery spans rules) is not split.
+    """
+    if len(css) <= chunk_size:
+        return [css]
+    chunks = []
+    start = 0
+    open_blocks = []
+    for m in _SPLIT_TOKEN_RE.finditer(css):
+        token = m.group()
+        if token in _CLOSERS:
+            open_blocks.append(_CLOSERS[token])
+        elif token in ('}', ')', ']'):
+            if open_blocks and open_blocks[-1] == token:
+                open_blocks.pop()
+                if not open_blocks and token == '}' and m.end() - start >= chunk_size:
+                    chunks.append(css[start:m.end()])
+                    start = m.end()
+            elif not open_blocks and token == '}':
+                return [css]
+    chunks.append(css[start:])
+    return chunks
+
+
+def _serialize_plain(nodes, parts: List[str]) -> bool:
+    """Append what tinycss2.serialize(nodes) would produce to parts.
+
+    Covers the tokens that make up almost every selector and value, without
+    tinycss2's per-character escaping; returns False when a node needs
+    escaping or a separator, and the caller must use tinycss2 instead.
+    """
+    previous_type = None
+    for node in nodes:
+        node_type = node.type
+        if node_type == 'whitespace':
+            parts.append(node.value)
+        elif node_type == 'ident':
+            if not _PLAIN_IDENT_RE.fullmatch(node.value):
+                return False
+            parts.append(node.value)
+        elif node_type == 'literal':
+            node_type = node.value
+            if node_type == '\\':
+                return False
+            parts.append(node_type)
+        elif node_type == 'number' or node_type == 'string':
+            parts.append(node.representation)
+        elif node_type == 'percentage':
+            parts.append(node.representation + '%')
+        elif node_type == 'dimension':
+            unit = node.unit
+            if unit[:1] in ('e', 'E') or not _PLAIN_IDENT_RE.fullmatch(unit):
+                return False
+            parts.append(node.representation + unit)
+        elif node_type == 'hash':
+            if not (_PLAIN_IDENT_RE if node.is_identifier else _PLAIN_NAME_RE).fullmatch(node.value):
+                return False
+            parts.append('#' + node.value)
+        elif node_type == 'function':
+            arguments = node.arguments
+            # An unterminated string at the end drops the closing ')'
+            if not _PLAIN_IDENT_RE.fullmatch(node.name) or (
+                    arguments and arguments[-1].type in ('error', 'function')):
+                return False
+            parts.append(node.name + '(')
+            if not _serialize_plain(arguments, parts):
+                return False
+            parts.append(')')
+        elif node_type in _BLOCK_BRACKETS:
+            opening, closing = _BLOCK_BRACKETS[node_type]
+            parts.append(opening)
+            if not _serialize_plain(node.content, parts):
+                return False
+            parts.append(closing)
+        else:
+            return False
+        if (previous_type, node_type) in _BAD_PAIRS:
+            return False
+        previous_type = node_type
+    return True
+
+
+def _serialize(nodes) -> str:
+    parts: List[str] = []
+    if _serialize_plain(nodes, parts):
+        return ''.join(parts)
+    return tinycss2.serialize(nodes)
+
+
+# Line breaks as tinycss2 counts them for source_line
+_LINE_BREAK_RE = re.compile(r'\r\n|[\r\n\f]')
+
+
+class _SourcePositions:
+    """Offsets in the parsed text of what _extract_components collects,
+    recorded when parse_string is asked to locate its hits."""
+
+    def __init__(self):
+        self.declarations: List[int] = []
+        self.at_rules: List[int] = []
+        self.selectors: List[int] = []
+        self.blocks: Dict[int, int] = {}
+        self.nested_rules: List[int] = []
+        self._base = 0
+        self._line_starts = [0]
+
+    def start_chunk(self, chunk: str, base: int):
+        self._base = base
+        self._line_starts = [0] + [m.end() for m in _LINE_BREAK_RE.finditer(chunk)]
+
+    def of(self, node) -> int:
+        return self._base + self._line_starts[node.source_line - 1] + node.source_column - 1
+
+
+# Leading property name of a pattern, reported in matched_properties
+_PROPERTY_NAME_RE = re.compile(r'^([a-z][-a-z0-9]*)', re.IGNORECASE)
 
 
 # Universally-supported properties we don't need to flag
@@ -75,9 +223,28 @@ class CSSParser:
         self.features_found = set()
         self.feature_details = []
         self.unrecognized_patterns = set()
+        # feature id -> offsets in the text of the rules that matched it (parse_string(locate=True))
+        self.feature_offsets: Dict[str, List[int]] = {}
+        self._positions = None
+        self._details = FeatureDetails()
+        # What parse_file does with minified/generated files (see parsers.minified),
+        # and why the last file counted as one (None if it did not)
+        self.minified_mode = DEFAULT_MINIFIED_MODE
+        self.minified_reason = None
         self._block_counter = 0  # Preserves block boundaries in matchable text
         self._has_nesting = False
-        self._all_features = {**ALL_CSS_FEATURES, **get_custom_css_rules()}
+        self._rules = None
+        self._refresh_rules()
+
+    def _refresh_rules(self):
+        # Rules Manager edits (overrides, additions, deletions) bump the rules
+        # version, so they take effect on the next analysis without a restart.
+        snapshot = get_rule_snapshot()
+        if snapshot is not self._rules:
+            self._all_features = snapshot.css
+            self._patterns = snapshot.css_patterns
+            self._index = get_css_rule_index(snapshot)
+            self._rules = snapshot
 
     def parse_file(self, filepath: str) -> Set[str]:
         filepath = Path(filepath)
@@ -86,52 +253,84 @@ class CSSParser:
             raise FileNotFoundError(f"CSS file not found: {filepath}")
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
+            with profile_stage('read'), open(filepath, 'r', encoding='utf-8') as f:
                 css_content = f.read()
-
-            return self.parse_string(css_content)
+                if metrics_enabled():
+                    BYTES_PROCESSED.inc('css', amount=os.fstat(f.fileno()).st_size)
+
+            reason = None
+            if self.minified_mode != MINIFIED_FULL:
+                reason = detect_minified(css_content)
+            if reason is not None and self.minified_mode == MINIFIED_SKIP:
+                self.features_found = set()
+                self.feature_details = []
+                self.unrecognized_patterns = set()
+                features = self.features_found
+            else:
+                features = self.parse_string(css_content, fast=reason is not None)
+            self.minified_reason = reason
+            return features
 
         except UnicodeDecodeError as e:
             raise ValueError(f"File is not valid UTF-8: {filepath}") from e
         except Exception as e:
             raise ValueError(f"Error parsing CSS file: {e}") from e
 
-    def parse_string(self, css_content: str) -> Set[str]:
-        # Re-merge built-ins with custom rules every time the parser runs, so
-        # edits made in the Rules Manager (overrides, additions, deletions)
-        # take effect on the next analysis without restarting the app.
-        self._all_features = {**ALL_CSS_FEATURES, **get_custom_css_rules()}
+    def parse_string(self, css_content: str, fast: bool = False, locate: bool = False) -> Set[str]:
+        """With fast, only features are detected: unrecognized patterns and
+        feature_details stay empty (used for minified files). With locate,
+        feature_offsets tells where in css_content each feature was found."""
+        self._refresh_rules()
+        self.minified_reason = None
 
         self.features_found = set()
         self.feature_details = []
         self.unrecognized_patterns = set()
+        self.feature_offsets = {}
+        self._positions = _SourcePositions() if locate else None
+        self._details = FeatureDetails()
         self._block_counter = 0
         self._has_nesting = False
 
-        rules = tinycss2.parse_stylesheet(
-            css_content, skip_comments=True, skip_whitespace=True
-        )
-
-        declarations, at_rules, selectors = self._extract_components(rules)
-
-        # Reconstruct text that preserves block structure for regex patterns
-        matchable_text = self._build_matchable_text(
-            declarations, at_rules, selectors
-        )
+        with profile_stage('css.ast'):
+            declarations, at_rules, selectors = [], [], []
+            chunk_start = 0
+            for chunk in _split_top_level_rules(css_content, CSS_CHUNK_SIZE):
+                if locate:
+                    self._positions.start_chunk(chunk, chunk_start)
+                    chunk_start += len(chunk)
+                rules = tinycss2.parse_stylesheet(
+                    chunk, skip_comments=True, skip_whitespace=True
+                )
+                chunk_declarations, chunk_at_rules, chunk_selectors = self._extract_components(rules)
+                declarations += chunk_declarations
+                at_rules += chunk_at_rules
+                selectors += chunk_selectors
+                del rules
+
+            # Reconstruct text that preserves block structure for regex patterns
+            matchable_text = self._build_matchable_text(
+                declarations, at_rules, selectors
+            )
 
-        self._detect_features(matchable_text)
+        with profile_stage('css.index'):
+            hits = self._match_indexed_rules(declarations, at_rules)
+        with profile_stage('css.regex'):
+            self._match_text_rules(matchable_text, hits)
+        self._detect_features(hits)
         # AST-based nesting detection catches unprefixed nesting (no '&') that the
         # regex patterns can't see after matchable_text flattens nested rules.
         if self._has_nesting and 'css-nesting' not in self.features_found:
             nesting_info = self._all_features.get('css-nesting', {})
             self.features_found.add('css-nesting')
-            self.feature_details.append({
-                'feature': 'css-nesting',
-                'description': nesting_info.get('description', 'CSS Nesting'),
-                'matched_properties': [],
-            })
-        self._find_unrecognized_patterns_structured(declarations, at_rules)
-
+            self._details.add('css-nesting', nesting_info.get('description', 'CSS Nesting'))
+        if locate:
+            self.feature_offsets = self._locate_hits(declarations, at_rules, selectors, hits)
+            self._positions = None
+        if not fast:
+            with profile_stage('css.unrecognized'):
+                self._find_unrecognized_patterns_structured(declarations, at_rules)
+            self.feature_details = self._details.to_list('matched_properties')
         return self.features_found
 
     def _extract_components(self, rules) -> Tuple[
@@ -139,90 +338,73 @@ class CSSParser:
         List[Tuple[str, str]],
         List[str]
     ]:
+        """Declarations, at-rules and selectors of a stylesheet, in document order.
+
+        One iterative walk over the tinycss2 nodes; each rule body is parsed
+        once, straight into the three result lists. A stack entry is either a
+        rule list (top level, @media, ...) or a declaration block (a style
+        rule, @font-face, or a nested rule) with its selector and block id.
+        """
         declarations = []
         at_rules_list = []
         selectors = []
-
-        for rule in rules:
-            if isinstance(rule, tinycss2.ast.ParseError):
-                logger.warning(f"CSS parse error: {rule.message}")
+        positions = self._positions
+        stack = [(iter(rules), None, 0)]
+
+        while stack:
+            nodes, block_selector, block_id = stack[-1]
+            node = next(nodes, None)
+            if node is None:
+                stack.pop()
                 continue
-
-            if isinstance(rule, tinycss2.ast.QualifiedRule):
-                selector_text = tinycss2.serialize(rule.prelude).strip()
+            node_type = node.type
+
+            if node_type == 'declaration':
+                if block_selector is not None:
+                    declarations.append((node.name, _serialize(node.value).strip(), block_selector, block_id))
+                    if positions is not None:
+                        positions.declarations.append(positions.of(node))
+
+            elif node_type == 'qualified-rule':
+                if block_selector is not None:
+                    # A style rule inside a declaration block is CSS nesting
+                    # (@keyframes stops arrive in a rule list instead)
+                    self._has_nesting = True
+                    if positions is not None:
+                        positions.nested_rules.append(positions.of(node))
+                selector_text = _serialize(node.prelude).strip()
                 selectors.append(selector_text)
-
-                self._extract_block_contents(
-                    rule.content, selector_text,
-                    declarations, at_rules_list, selectors
-                )
-
-            elif isinstance(rule, tinycss2.ast.AtRule):
-                keyword = rule.at_keyword.lower()
-                prelude_text = tinycss2.serialize(rule.prelude).strip()
-                at_rules_list.append((keyword, prelude_text))
-
-                if rule.content is not None:
-                    if keyword == 'font-face':
+                if positions is not None:
+                    positions.selectors.append(positions.of(node))
+                    positions.blocks[self._block_counter] = positions.of(node)
+                stack.append(self._enter_block(node.content, selector_text))
+
+            elif node_type == 'at-rule':
+                keyword = node.at_keyword.lower()
+                at_rules_list.append((keyword, _serialize(node.prelude).strip()))
+                if positions is not None:
+                    positions.at_rules.append(positions.of(node))
+                if node.content is not None:
+                    if keyword == 'font-face' and block_selector is None:
                         # @font-face has declarations directly, not nested rules
-                        self._extract_block_contents(
-                            rule.content, '@font-face',
-                            declarations, at_rules_list, selectors
-                        )
+                        if positions is not None:
+                            positions.blocks[self._block_counter] = positions.of(node)
+                        stack.append(self._enter_block(node.content, '@font-face'))
                     else:
-                        # @media, @supports, @keyframes, etc. -- recurse
-                        inner_rules = tinycss2.parse_blocks_contents(
-                            rule.content
-                        )
-                        inner_rules = [
-                            r for r in inner_rules
-                            if not isinstance(r, tinycss2.ast.WhitespaceToken)
-                        ]
-                        sub_decls, sub_at, sub_sel = self._extract_components(
-                            inner_rules
-                        )
-                        declarations.extend(sub_decls)
-                        at_rules_list.extend(sub_at)
-                        selectors.extend(sub_sel)
+                        # @media, @supports, @keyframes, etc.
+                        stack.append((iter(tinycss2.parse_blocks_contents(
+                            node.content, skip_comments=True, skip_whitespace=True)), None, 0))
+
+            elif node_type == 'error' and block_selector is None:
+                logger.warning(f"CSS parse error: {node.message}")
 
         return declarations, at_rules_list, selectors
 
-    def _extract_block_contents(
-        self, content, selector_text,
-        declarations, at_rules_list, selectors
-    ):
+    def _enter_block(self, content, selector_text: str):
         block_id = self._block_counter
         self._block_counter += 1
-        parsed = tinycss2.parse_blocks_contents(content)
-        for item in parsed:
-            if isinstance(item, tinycss2.ast.Declaration):
-                value_text = tinycss2.serialize(item.value).strip()
-                declarations.append((item.name, value_text, selector_text, block_id))
-            elif isinstance(item, tinycss2.ast.QualifiedRule):
-                # Nested rule (CSS nesting inside a normal rule; @keyframes stops
-                # take a different path via _extract_components). A nested rule
-                # arriving here means the source uses CSS nesting.
-                self._has_nesting = True
-                nested_sel = tinycss2.serialize(item.prelude).strip()
-                selectors.append(nested_sel)
-                self._extract_block_contents(
-                    item.content, nested_sel,
-                    declarations, at_rules_list, selectors
-                )
-            elif isinstance(item, tinycss2.ast.AtRule):
-                keyword = item.at_keyword.lower()
-                prelude_text = tinycss2.serialize(item.prelude).strip()
-                at_rules_list.append((keyword, prelude_text))
-                if item.content is not None:
-                    inner = tinycss2.parse_blocks_contents(item.content)
-                    inner = [
-                        r for r in inner
-                        if not isinstance(r, tinycss2.ast.WhitespaceToken)
-                    ]
-                    sub_d, sub_a, sub_s = self._extract_components(inner)
-                    declarations.extend(sub_d)
-                    at_rules_list.extend(sub_a)
-                    selectors.extend(sub_s)
+        nodes = tinycss2.parse_blocks_contents(content, skip_comments=True, skip_whitespace=True)
+        return iter(nodes), selector_text, block_id
 
     def _build_matchable_text(self, declarations, at_rules, selectors) -> str:
         # Block boundaries are preserved so [^}]* patterns (e.g. flexbox-gap) can't match across rules.
@@ -257,36 +439,97 @@ class CSSParser:
 
         # Strip contents of string literals so feature keywords inside strings
         # (e.g. content: "display: flex") don't trigger false positives.
-        return _CSS_STRING_RE.sub('""', '\n'.join(parts))
-
-    def _detect_features(self, css_content: str):
+        return strip_css_strings('\n'.join(parts))
+
+    def _match_indexed_rules(self, declarations, at_rules) -> Set:
+        """Patterns matched by property, value and at-rule lookups (see css_rule_index)."""
+        hits = set()
+        self._index.match_declarations(((prop, value) for prop, value, _, _ in declarations), hits)
+        self._index.match_at_rules(at_rules, hits)
+        return hits
+
+    def _match_text_rules(self, css_content: str, hits: Set):
+        """Add the literal and free-form patterns found in the matchable text to hits."""
+        lowered = css_content.lower()
+        for pattern, literal in self._index.literal_rules:
+            if literal in lowered:
+                hits.add(pattern)
+        for pattern in self._index.text_rules:
+            if not pattern.disabled and timed_search(pattern, css_content):
+                hits.add(pattern)
+
+    def _detect_features(self, hits: Set):
         for feature_id, feature_info in self._all_features.items():
-            patterns = feature_info.get('patterns', [])
-            matched_properties = []
+            matched_properties = {}
             feature_found = False
 
-            for pattern in patterns:
-                try:
-                    matches = re.findall(pattern, css_content, re.IGNORECASE)
-                    if matches:
-                        feature_found = True
-                        # Try to pull a property name from the pattern for reporting
-                        prop_match = re.match(r'^([a-z][-a-z0-9]*)', pattern, re.IGNORECASE)
-                        if prop_match:
-                            prop_name = prop_match.group(1)
-                            if prop_name not in matched_properties:
-                                matched_properties.append(prop_name)
-                except re.error as e:
-                    logger.warning(f"Invalid regex pattern for {feature_id}: {e}")
-                    continue
+            for pattern in self._patterns.get(feature_id, ()):
+                if pattern in hits:
+                    feature_found = True
+                    # Try to pull a property name from the pattern for reporting
+                    prop_match = _PROPERTY_NAME_RE.match(pattern.source)
+                    if prop_match:
+                        matched_properties[prop_match.group(1)] = None
 
             if feature_found:
                 self.features_found.add(feature_id)
-                self.feature_details.append({
-                    'feature': feature_id,
-                    'description': feature_info.get('description', ''),
-                    'matched_properties': matched_properties,
-                })
+                self._details.add(feature_id, feature_info.get('description', ''), matched_properties)
+
+    def _locate_hits(self, declarations, at_rules, selectors, hits: Set) -> Dict[str, List[int]]:
+        """feature id -> offsets of the declarations, rules and at-rules matching its patterns.
+
+        Each piece is matched on its own, the same way parse_string matched
+        the whole stylesheet; rules that only match across rules stay unlocated.
+        """
+        positions = self._positions
+        index = self._index
+        found: Dict = {}
+
+        def record(patterns, offset):
+            for pattern in patterns:
+                if pattern in hits:
+                    found.setdefault(pattern, []).append(offset)
+
+        for (name, value, _, _), offset in zip(declarations, positions.declarations):
+            local = set()
+            index.match_declarations([(name, value)], local)
+            record(local, offset)
+        for at_rule, offset in zip(at_rules, positions.at_rules):
+            local = set()
+            index.match_at_rules([at_rule], local)
+            record(local, offset)
+
+        literals = [(p, literal) for p, literal in index.literal_rules if p in hits]
+        text_rules = [p for p in index.text_rules if p in hits]
+        if literals or text_rules:
+            for text, offset in self._located_texts(declarations, at_rules, selectors):
+                lowered = text.lower()
+                record([p for p, literal in literals if literal in lowered], offset)
+                record([p for p in text_rules if timed_search(p, text)], offset)
+
+        offsets = {}
+        for feature_id in self.features_found:
+            feature_offsets = {o for p in self._patterns.get(feature_id, ()) for o in found.get(p, ())}
+            if feature_id == 'css-nesting':
+                feature_offsets.update(positions.nested_rules)
+            if feature_offsets:
+                offsets[feature_id] = sorted(feature_offsets)
+        return offsets
+
+    def _located_texts(self, declarations, at_rules, selectors):
+        """(matchable text, offset) of each block, selector and at-rule, built as in _build_matchable_text."""
+        positions = self._positions
+        blocks = OrderedDict()
+        for (prop, value, sel, block_id), offset in zip(declarations, positions.declarations):
+            if block_id not in blocks:
+                blocks[block_id] = (sel, [], positions.blocks.get(block_id, offset))
+            blocks[block_id][1].append(f"{prop}: {value}")
+        for sel, decl_texts, offset in blocks.values():
+            yield strip_css_strings(f"{sel} {{ {'; '.join(decl_texts)}; }}"), offset
+        for sel, offset in zip(selectors, positions.selectors):
+            yield strip_css_strings(f"{sel} {{ }}"), offset
+        for (keyword, prelude), offset in zip(at_rules, positions.at_rules):
+            yield strip_css_strings(f"@{keyword} {prelude}" if prelude else f"@{keyword}"), offset
 
     def _find_unrecognized_patterns_structured(self, declarations, at_rules):
         found_properties = set(prop for prop, _, _, _ in declarations)
@@ -300,21 +543,7 @@ class CSSParser:
                 continue
 
             # Test "property:" against feature patterns
-            test_string = f"{prop}:"
-            matched = False
-            for feature_info in self._all_features.values():
-                patterns = feature_info.get('patterns', [])
-                for pattern in patterns:
-                    try:
-                        if re.search(pattern, test_string, re.IGNORECASE):
-                            matched = True
-                            break
-                    except re.error:
-                        continue
-                if matched:
-                    break
-
-            if not matched:
+            if not self._index.is_recognized(f"{prop}:"):
                 self.unrecognized_patterns.add(f"property: {prop}")
 
         basic_at_rules = {'media', 'import', 'charset', 'font-face', 'page'}
@@ -324,20 +553,7 @@ class CSSParser:
             if at_rule_lower in basic_at_rules:
                 continue
 
-            matched = False
-            for feature_info in self._all_features.values():
-                patterns = feature_info.get('patterns', [])
-                for pattern in patterns:
-                    try:
-                        if re.search(pattern, f"@{at_rule}", re.IGNORECASE):
-                            matched = True
-                            break
-                    except re.error:
-                        continue
-                if matched:
-                    break
-
-            if not matched:
+            if not self._index.is_recognized(f"@{at_rule}"):
                 self.unrecognized_patterns.add(f"@-rule: @{at_rule}")
 
     def get_detailed_report(self) -> Dict:
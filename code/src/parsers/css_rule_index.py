@@ -0,0 +1,208 @@
+"""Structured forms of the CSS detection rules, indexed for the CSS parser.
+
+Most CSS rules are written as regexes but really test one declaration
+("property X", "property X with value Y"), one at-rule ("@Z ...") or a
+plain string. Each compiled pattern is sorted into one of these forms:
+
+- property:  'name\\s*:' (optionally guarded by a lookbehind or \\b). Decided
+  per distinct property name, once per rule-set version, so every later
+  declaration with that name is a dict lookup.
+- value:     'name\\s*:\\s*<value regex>', where the value regex cannot run
+  past the end of the declaration. Candidates come from the same property
+  name lookup; the regex only runs on 'name: value' of those declarations.
+- at-rule:   '@keyword...'. Only runs on the at-rules with that keyword.
+- literal:   a pattern with no regex syntax (':hover', 'translate\\('); a
+  substring test on the stylesheet text.
+- text:      everything else, including rules that span declarations
+  (flexbox-gap); matched against the reconstructed stylesheet as before.
+
+Property and value rules are also checked against at-rule preludes, so
+'@supports (display: grid)' still counts, but no longer against selectors.
+Custom patterns always stay in the text form, where the per-pattern time
+budget (see rule_patterns) applies to them.
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from .rule_patterns import CompiledPattern, pattern_literal
+
+# Property-name memo entries beyond this are computed but not kept
+# (custom properties are unbounded)
+_MAX_MEMO_NAMES = 4096
+
+_DECLARATION_RULE_RE = re.compile(
+    r'^(?P<head>(?:\(\?<!\[[^\]]*\]\)|\\b)?-?[a-zA-Z][-a-zA-Z0-9]*\\s\*:)(?P<rest>.*)$', re.DOTALL)
+_AT_RULE_HEAD_RE = re.compile(r'^@(?P<keyword>[-a-zA-Z]+)')
+
+# Names followed by a colon in an at-rule prelude, e.g. '(min-width: 40em)'
+_PRELUDE_NAME_RE = re.compile(r'([-\w]+)\s*:')
+
+# CSS string literals (double- or single-quoted, with escapes). Their contents
+# are blanked before matching so that e.g. content: "display: flex" does not
+# count as flexbox.
+_CSS_STRING_RE = re.compile(r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'')
+
+# Escapes that can match ';' or '}' (or anchor to the end of the text)
+_UNBOUNDED_ESCAPES = frozenset('SWDZA')
+
+
+def strip_css_strings(text: str) -> str:
+    return _CSS_STRING_RE.sub('""', text)
+
+
+def _stays_in_declaration(rest: str) -> bool:
+    """True if the value part of a rule cannot match past the end of the declaration."""
+    depth = 0
+    i = 0
+    while i < len(rest):
+        c = rest[i]
+        if c == '\\':
+            if rest[i + 1:i + 2] in _UNBOUNDED_ESCAPES:
+                return False
+            i += 2
+            continue
+        if c in '.;{}$^':
+            return False
+        if c == '(':
+            depth += 1
+        elif c == ')':
+            depth -= 1
+        elif c == '|' and depth == 0:
+            return False
+        i += 1
+    return True
+
+
+class PropertyEntry(NamedTuple):
+    properties: Tuple[CompiledPattern, ...]   # property rules matching the name
+    values: Tuple[CompiledPattern, ...]       # value rules whose property part matches the name
+
+
+_NO_PROPERTY = PropertyEntry((), ())
+
+
+class CSSRuleIndex:
+    """The rules of one RuleSnapshot, sorted by form. Shared by all CSSParsers."""
+
+    def __init__(self, snapshot, flags: int = re.IGNORECASE):
+        self.snapshot = snapshot
+        self._all_patterns = [p for group in snapshot.css_patterns.values() for p in group]
+        self.property_rules: List[CompiledPattern] = []
+        self.value_rules: List[Tuple[CompiledPattern, re.Pattern]] = []
+        self.at_rules: List[Tuple[CompiledPattern, str]] = []        # (pattern, '@keyword' lowercased)
+        self.literal_rules: List[Tuple[CompiledPattern, str]] = []   # (pattern, literal lowercased)
+        self.text_rules: List[CompiledPattern] = []
+
+        for pattern in self._all_patterns:
+            self._classify(pattern, flags)
+
+        self._lock = threading.Lock()
+        self._names: Dict[str, PropertyEntry] = {}
+        self._at_keywords: Dict[str, Tuple[CompiledPattern, ...]] = {}
+        self._recognized: Dict[str, bool] = {}
+
+    def _classify(self, pattern: CompiledPattern, flags: int):
+        if pattern.custom:
+            self.text_rules.append(pattern)
+            return
+        source = pattern.source
+        m = _DECLARATION_RULE_RE.match(source)
+        if m:
+            rest = m.group('rest')
+            if not rest:
+                self.property_rules.append(pattern)
+                return
+            if _stays_in_declaration(rest):
+                self.value_rules.append((pattern, re.compile(m.group('head'), flags)))
+                return
+        m = _AT_RULE_HEAD_RE.match(source)
+        if m:
+            self.at_rules.append((pattern, '@' + m.group('keyword').lower()))
+            return
+        literal = pattern_literal(source, flags)
+        if literal is not None:
+            self.literal_rules.append((pattern, literal.lower()))
+            return
+        self.text_rules.append(pattern)
+
+    def _remember(self, memo: Dict, key: str, value):
+        if len(memo) < _MAX_MEMO_NAMES:
+            with self._lock:
+                memo[key] = value
+        return value
+
+    def property_entry(self, name: str) -> PropertyEntry:
+        """Property and value rules that apply to declarations of this property."""
+        entry = self._names.get(name)
+        if entry is None:
+            probe = name + ':'
+            properties = tuple(p for p in self.property_rules if p.regex.search(probe))
+            values = tuple(p for p, head in self.value_rules if head.search(probe))
+            entry = PropertyEntry(properties, values) if properties or values else _NO_PROPERTY
+            entry = self._remember(self._names, name, entry)
+        return entry
+
+    def at_rule_candidates(self, keyword: str) -> Tuple[CompiledPattern, ...]:
+        """At-rule rules whose '@keyword' head could match an '@keyword' rule."""
+        candidates = self._at_keywords.get(keyword)
+        if candidates is None:
+            at_keyword = '@' + keyword.lower()
+            candidates = tuple(p for p, head in self.at_rules if at_keyword.startswith(head))
+            candidates = self._remember(self._at_keywords, keyword, candidates)
+        return candidates
+
+    def is_recognized(self, probe: str) -> bool:
+        """Whether any rule pattern at all matches probe ('prop:' or '@keyword')."""
+        recognized = self._recognized.get(probe)
+        if recognized is None:
+            recognized = any(p.regex.search(probe) for p in self._all_patterns)
+            recognized = self._remember(self._recognized, probe, recognized)
+        return recognized
+
+    def match_declarations(self, declarations: Iterable[Tuple[str, str]], hits: Set[CompiledPattern]) -> None:
+        """Add the property/value rules matching any (name, value) to hits."""
+        checked = set()
+        for name, value in declarations:
+            entry = self.property_entry(name)
+            if entry is _NO_PROPERTY:
+                continue
+            hits.update(entry.properties)
+            if entry.values and (name, value) not in checked:
+                checked.add((name, value))
+                text = strip_css_strings(f"{name}: {value}")
+                for pattern in entry.values:
+                    if pattern not in hits and pattern.regex.search(text):
+                        hits.add(pattern)
+
+    def match_at_rules(self, at_rules: Iterable[Tuple[str, str]], hits: Set[CompiledPattern]) -> None:
+        """Add the at-rule rules, and property/value rules inside preludes, to hits."""
+        for keyword, prelude in set(at_rules):
+            line = strip_css_strings(f"@{keyword} {prelude}" if prelude else f"@{keyword}")
+            for pattern in self.at_rule_candidates(keyword):
+                if pattern not in hits and pattern.regex.search(line):
+                    hits.add(pattern)
+            if ':' in prelude:
+                for name in _PRELUDE_NAME_RE.findall(prelude):
+                    entry = self.property_entry(name)
+                    hits.update(entry.properties)
+                    for pattern in entry.values:
+                        if pattern not in hits and pattern.regex.search(line):
+                            hits.add(pattern)
+
+
+_index_lock = threading.Lock()
+_index: Optional[CSSRuleIndex] = None
+
+
+def get_css_rule_index(snapshot) -> CSSRuleIndex:
+    """The CSSRuleIndex for a RuleSnapshot, rebuilt when the snapshot changes."""
+    global _index
+    index = _index
+    if index is not None and index.snapshot is snapshot:
+        return index
+    with _index_lock:
+        if _index is None or _index.snapshot is not snapshot:
+            _index = CSSRuleIndex(snapshot)
+        return _index
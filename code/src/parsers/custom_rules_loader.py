@@ -1,15 +1,31 @@
 """Loads user-defined detection rules from custom_rules.json."""
 
+import itertools
 import json
+import time
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
+from .rule_patterns import validate_patterns
 from ..utils.config import get_logger
 
 logger = get_logger('parsers.custom_rules')
 
 CUSTOM_RULES_PATH = Path(__file__).parent / "custom_rules.json"
 
+# Module-level so a fresh loader instance never reuses an old version number.
+_versions = itertools.count(1)
+
+# How often (seconds) get_version() looks at custom_rules.json's mtime
+MTIME_CHECK_INTERVAL = 1.0
+
+
+def _rules_mtime() -> Optional[int]:
+    try:
+        return CUSTOM_RULES_PATH.stat().st_mtime_ns
+    except OSError:
+        return None
+
 
 class CustomRulesLoader:
     """Singleton that loads and caches custom detection rules."""
@@ -35,9 +51,20 @@ class CustomRulesLoader:
             'input_types': {},
             'attribute_values': {}
         }
+        self._quarantined: List[Dict] = []
+        self._pattern_warnings: List[Dict] = []
         self._load_rules()
 
     def _load_rules(self):
+        self._mtime = _rules_mtime()
+        self._mtime_checked_at = time.monotonic()
+        self._read_rules()
+        # Bumped last: parsers cache their merged rule tables per version
+        # (see rule_registry), so the new number must only be visible once
+        # the rules it stands for are in place.
+        self._version = next(_versions)
+
+    def _read_rules(self):
         if not CUSTOM_RULES_PATH.exists():
             logger.debug("No custom_rules.json found, using built-in rules only")
             return
@@ -53,16 +80,20 @@ class CustomRulesLoader:
                 if feature_id.startswith('_'):
                     continue  # Skip metadata keys
                 if isinstance(feature_info, dict) and isinstance(feature_info.get('patterns'), list):
-                    self._css_rules[feature_id] = feature_info
-                    logger.debug(f"Loaded custom CSS rule: {feature_id}")
+                    rule = self._validate_rule('css', feature_id, feature_info)
+                    if rule is not None:
+                        self._css_rules[feature_id] = rule
+                        logger.debug(f"Loaded custom CSS rule: {feature_id}")
 
             js_data = data.get('javascript', {})
             for feature_id, feature_info in js_data.items():
                 if feature_id.startswith('_'):
                     continue
                 if isinstance(feature_info, dict) and isinstance(feature_info.get('patterns'), list):
-                    self._js_rules[feature_id] = feature_info
-                    logger.debug(f"Loaded custom JS rule: {feature_id}")
+                    rule = self._validate_rule('javascript', feature_id, feature_info)
+                    if rule is not None:
+                        self._js_rules[feature_id] = rule
+                        logger.debug(f"Loaded custom JS rule: {feature_id}")
 
             html_data = data.get('html', {})
 
@@ -97,6 +128,30 @@ class CustomRulesLoader:
         except Exception as e:
             logger.error(f"Error loading custom rules: {e}")
 
+    def _validate_rule(self, category: str, feature_id: str, feature_info: Dict) -> Optional[Dict]:
+        """Compile every pattern once. Invalid patterns are quarantined (dropped
+        from the rule); a rule left with no valid pattern is not loaded at all.
+        """
+        valid, invalid, warnings = validate_patterns(feature_info['patterns'])
+
+        for pattern, error in invalid:
+            self._quarantined.append({
+                'category': category, 'feature': feature_id, 'pattern': pattern, 'reason': error,
+            })
+            logger.warning(f"Quarantined invalid {category} pattern for '{feature_id}': {pattern} ({error})")
+        for pattern, risks in warnings.items():
+            self._pattern_warnings.append({
+                'category': category, 'feature': feature_id, 'pattern': pattern, 'risks': risks,
+            })
+            logger.warning(f"Custom {category} pattern for '{feature_id}' may be slow: {pattern} ({'; '.join(risks)})")
+
+        if not invalid:
+            return feature_info
+        if not valid:
+            logger.warning(f"Custom {category} rule '{feature_id}' has no valid patterns, skipping it")
+            return None
+        return {**feature_info, 'patterns': valid}
+
     def get_custom_css_rules(self) -> Dict[str, Dict]:
         return self._css_rules.copy()
 
@@ -106,6 +161,26 @@ class CustomRulesLoader:
     def get_custom_html_rules(self) -> Dict[str, Any]:
         return self._html_rules.copy()
 
+    def get_quarantined_patterns(self) -> List[Dict]:
+        """Patterns rejected at load: {'category', 'feature', 'pattern', 'reason'}."""
+        return list(self._quarantined)
+
+    def get_pattern_warnings(self) -> List[Dict]:
+        """Valid patterns flagged as potentially slow: {'category', 'feature', 'pattern', 'risks'}."""
+        return list(self._pattern_warnings)
+
+    def get_version(self) -> int:
+        """Monotonically increasing; bumps on every (re)load, including when
+        custom_rules.json is edited on disk (checked every MTIME_CHECK_INTERVAL).
+        """
+        now = time.monotonic()
+        if now - self._mtime_checked_at >= MTIME_CHECK_INTERVAL:
+            self._mtime_checked_at = now
+            if _rules_mtime() != self._mtime:
+                logger.info("custom_rules.json changed on disk, reloading")
+                self.reload()
+        return self._version
+
     def reload(self):
         self._css_rules = {}
         self._js_rules = {}
@@ -115,6 +190,8 @@ class CustomRulesLoader:
             'input_types': {},
             'attribute_values': {}
         }
+        self._quarantined = []
+        self._pattern_warnings = []
         self._load_rules()
 
 
@@ -140,6 +217,20 @@ def get_custom_html_rules() -> Dict[str, Any]:
     return get_custom_rules_loader().get_custom_html_rules()
 
 
+def get_custom_rules_version() -> int:
+    """Changes whenever the custom rules are (re)loaded."""
+    return get_custom_rules_loader().get_version()
+
+
+def get_rule_diagnostics() -> Dict[str, List[Dict]]:
+    """Load-time validation results for custom_rules.json."""
+    loader = get_custom_rules_loader()
+    return {
+        'quarantined': loader.get_quarantined_patterns(),
+        'warnings': loader.get_pattern_warnings(),
+    }
+
+
 def reload_custom_rules():
     get_custom_rules_loader().reload()
 
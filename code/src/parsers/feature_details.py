@@ -0,0 +1,67 @@
+"""Per-parse accumulator for feature_details, keyed by feature id.
+
+Detectors record a hit for every matching node, attribute or pattern, so
+a large file can report the same feature thousands of times. Looking the
+feature up in the report list on each hit made that quadratic; here every
+hit is a dict lookup plus an ordered-set insert, and the list-of-dicts
+report shape is built once when the parse is done.
+"""
+
+from typing import Dict, Iterable, List
+
+
+class FeatureDetail:
+    """One feature's description and matched items (item -> group, in first-seen order)."""
+
+    __slots__ = ('feature', 'description', 'items')
+
+    def __init__(self, feature: str, description: str = ''):
+        self.feature = feature
+        self.description = description
+        self.items: Dict[str, int] = {}
+
+    def add(self, item: str, group: int = 0):
+        # An item is kept once, in the group it was first seen in
+        if item not in self.items:
+            self.items[item] = group
+
+    def ordered_items(self) -> List[str]:
+        """Items grouped by ascending group number, first-seen order within a group."""
+        items = self.items
+        if any(items.values()):
+            return sorted(items, key=items.__getitem__)
+        return list(items)
+
+
+class FeatureDetails:
+    """feature id -> FeatureDetail, in the order features were first seen."""
+
+    def __init__(self):
+        self._records: Dict[str, FeatureDetail] = {}
+
+    def __contains__(self, feature_id: str) -> bool:
+        return feature_id in self._records
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def add(self, feature_id: str, description: str = '', items: Iterable[str] = (),
+            group: int = 0) -> FeatureDetail:
+        """Record feature_id (description is only kept from the first call) and its items."""
+        record = self._records.get(feature_id)
+        if record is None:
+            record = self._records[feature_id] = FeatureDetail(feature_id, description)
+        for item in items:
+            record.add(item, group)
+        return record
+
+    def to_list(self, items_key: str, descriptions: bool = True) -> List[Dict]:
+        """The report shape: [{'feature', 'description'?, items_key: [...]}, ...]."""
+        details = []
+        for record in self._records.values():
+            entry = {'feature': record.feature}
+            if descriptions:
+                entry['description'] = record.description
+            entry[items_key] = record.ordered_items()
+            details.append(entry)
+        return details
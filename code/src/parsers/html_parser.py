@@ -1,23 +1,23 @@
-"""HTML parser -- extracts browser features from HTML using BeautifulSoup."""
+"""HTML parser -- extracts browser features from HTML.
 
-from typing import Set, Dict
+The markup is tokenized by a backend from html_scanner (streaming by default,
+BeautifulSoup as the fallback); this module only sees start/end tag events
+and the raw text of <script>/<style> elements.
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Set
 from pathlib import Path
-from bs4 import BeautifulSoup
+import os
 import re
 
-from .html_feature_maps import (
-    HTML_ELEMENTS,
-    HTML_INPUT_TYPES,
-    HTML_ATTRIBUTES,
-    HTML_ATTRIBUTE_VALUES,
-    HTML_SPECIAL_ELEMENTS,
-    HTML_ARIA_ATTRIBUTES,
-    HTML_MEDIA_TYPE_VALUES,
-    HTML_CSP_ATTRIBUTES,
-    ELEMENT_SPECIFIC_ATTRIBUTES,
-)
-from .custom_rules_loader import get_custom_html_rules
+from .feature_details import FeatureDetails
+from .html_feature_maps import ELEMENT_SPECIFIC_ATTRIBUTES
+from .rule_registry import get_rule_snapshot
+from .html_scanner import SoupBackend, get_backend
 from ..utils.config import get_logger
+from ..utils.metrics import BYTES_PROCESSED, metrics_enabled
+from ..utils.profiling import profile_stage
 
 logger = get_logger('parsers.html')
 
@@ -78,30 +78,199 @@ _BASIC_ATTRIBUTES = frozenset({
 })
 
 
+# SVG elements whose names contain a hyphen but are not custom elements
+_SVG_HYPHENATED_ELEMENTS = frozenset({
+    'font-face', 'font-face-src', 'font-face-uri', 'font-face-format',
+    'font-face-name', 'missing-glyph', 'color-profile', 'glyph-ref',
+})
+
+_LINK_REL_FEATURES = {
+    'preload': 'link-rel-preload',
+    'prefetch': 'link-rel-prefetch',
+    'dns-prefetch': 'link-rel-dns-prefetch',
+    'preconnect': 'link-rel-preconnect',
+    'modulepreload': 'link-rel-modulepreload',
+}
+
+# Checked in this order; the first attribute carrying a data: URI is reported
+_DATA_URI_ATTRS = ('src', 'href', 'poster', 'data')
+
+# Order of the match types within a feature's matched_items
+_MATCH_GROUPS = {'elements': 0, 'attributes': 1, 'values': 2}
+
+_SVG_SRC_RE = re.compile(r'\.svg(\?.*)?$', re.IGNORECASE)
+_SVG_FRAGMENT_RE = re.compile(r'\.svg#\w+', re.IGNORECASE)
+_MEDIA_FRAGMENT_RE = re.compile(r'#(t|track|xywh|id)=', re.IGNORECASE)
+_VTT_RE = re.compile(r'\.vtt(\?.*)?$', re.IGNORECASE)
+_DATA_URI_RE = re.compile(r'^data:', re.IGNORECASE)
+
+# <script type=...> values that hold JavaScript (type-less scripts are JS too)
+_JS_SCRIPT_TYPES = frozenset({
+    '', 'module', 'text/javascript', 'application/javascript', 'text/ecmascript',
+    'application/ecmascript', 'text/jscript', 'text/livescript', 'application/x-javascript',
+})
+_CSS_STYLE_TYPES = frozenset({'', 'text/css'})
+
+
+class InlineSources:
+    """Inline code fragments from one document, concatenated for a single parse.
+
+    Fragments are joined with a separator that keeps them syntactically apart
+    ("\n" for CSS, "\n;\n" for JS so one script can't continue another's
+    statement). segments maps offsets in `text` back to where each fragment
+    came from, e.g. "<style> #2" or "style attribute on <div>".
+    """
+
+    def __init__(self, separator: str):
+        self._separator = separator
+        self._fragments: List[list] = []    # [label, [text pieces]]
+        self._text: Optional[str] = None
+        self._starts: List[int] = []
+        self._segments: List[tuple] = []    # (start, end, label)
+
+    def begin(self, label: str, text: str = ''):
+        """Start a new fragment; more text can be appended until the next begin()."""
+        self._fragments.append([label, [text] if text else []])
+        self._text = None
+
+    def append(self, text: str):
+        self._fragments[-1][1].append(text)
+        self._text = None
+
+    @property
+    def text(self) -> str:
+        if self._text is None:
+            self._build()
+        return self._text
+
+    @property
+    def segments(self) -> List[tuple]:
+        """(start, end, label) for each non-empty fragment in `text`."""
+        if self._text is None:
+            self._build()
+        return self._segments
+
+    def _build(self):
+        parts = []
+        self._segments = []
+        offset = 0
+        for label, pieces in self._fragments:
+            fragment = ''.join(pieces)
+            if not fragment.strip():
+                continue
+            if parts:
+                parts.append(self._separator)
+                offset += len(self._separator)
+            parts.append(fragment)
+            self._segments.append((offset, offset + len(fragment), label))
+            offset += len(fragment)
+        self._text = ''.join(parts)
+        self._starts = [start for start, _, _ in self._segments]
+
+    def locate(self, offset: int) -> Optional[str]:
+        """Label of the fragment containing offset in `text`, or None for a separator."""
+        segments = self.segments
+        index = bisect_right(self._starts, offset) - 1
+        if index >= 0:
+            start, end, label = segments[index]
+            if start <= offset < end:
+                return label
+        return None
+
+    def __bool__(self):
+        return bool(self.text)
+
+
+def _attr_text(attrs: Dict, name: str) -> str:
+    value = attrs.get(name, '')
+    return value.strip() if isinstance(value, str) else ' '.join(value)
+
+
+class _DocumentScan:
+    """Everything the detectors need, collected in a single pass over the markup.
+
+    Lists keep document order so the report (elements_found, attributes_found,
+    feature_details) comes out in the same order as a per-detector search would.
+    """
+
+    def __init__(self):
+        self.element_counts: Dict[str, int] = {}
+        self.input_types: List[str] = []
+        self.attribute_hits: List[tuple] = []   # (attr, element, feature_id)
+        self.value_hits: List[tuple] = []       # (attr, value, element, feature_id)
+        self.has_srcset = False
+        self.has_sizes = False
+        self.picture_with_source = False
+        self.data_attributes: List[str] = []    # first data-* attr of each element
+        self.script_flags: List[tuple] = []     # (feature_id, match_type, match_value)
+        self.link_rels: List[str] = []
+        self.theme_color = False
+        self.svg_img_src: Optional[str] = None
+        self.svg_source_srcset: Optional[str] = None
+        self.svg_use_href: Optional[str] = None
+        self.svg_fragment_value: Optional[str] = None
+        self.media_fragment_src: Optional[str] = None
+        self.custom_element: Optional[str] = None
+        self.fieldset_disabled = False
+        self.video_tracks = False
+        self.audio_tracks = False
+        self.vtt_src: Optional[str] = None
+        self.data_uri_attrs: Set[str] = set()
+        self.srcset_data_uri = False
+        self.html_xmlns: Optional[str] = None
+        self.element_names: Set[str] = set()
+        self.attribute_names: Set[str] = set()
+        # How many of each element are currently open (i.e. enclose the next element)
+        self.open_elements: Dict[str, int] = {}
+        self.inline_css = InlineSources('\n')
+        self.inline_js = InlineSources('\n;\n')
+        self.style_blocks = 0
+        self.inline_scripts = 0
+        # Where the text of the open <script>/<style> goes (None when it isn't analyzed)
+        self.text_target: Optional[InlineSources] = None
+
+    def inside(self, *names: str) -> bool:
+        return any(self.open_elements.get(name) for name in names)
+
+
 class HTMLParser:
     """Extracts Can I Use feature IDs from HTML files."""
 
-    def __init__(self):
+    def __init__(self, backend: Optional[str] = None):
+        """backend: 'stream' (default), 'lxml' or 'soup'; see html_scanner."""
+        self._backend = get_backend(backend)
         self.features_found = set()
         self.elements_found = []
         self.attributes_found = []
         self.unrecognized_patterns = set()
         self.feature_details = []
-        self._feature_matches = {}
+        self._details = FeatureDetails()
+        # Inline CSS/JS of the last parsed document, for CSSParser/JavaScriptParser
+        self.inline_css = InlineSources('\n')
+        self.inline_js = InlineSources('\n;\n')
 
-        # Merge built-in + custom rules
-        custom_html = get_custom_html_rules()
-        self._elements = {**HTML_ELEMENTS, **HTML_SPECIAL_ELEMENTS, **custom_html.get('elements', {})}
-        self._input_types = {**HTML_INPUT_TYPES, **custom_html.get('input_types', {})}
-        self._attributes = {**HTML_ATTRIBUTES, **HTML_ARIA_ATTRIBUTES, **custom_html.get('attributes', {})}
         self._element_specific_attributes = ELEMENT_SPECIFIC_ATTRIBUTES
-        # Convert custom "attr:value" keys to (attr, value) tuples
-        custom_attr_values = {}
-        for key, value in custom_html.get('attribute_values', {}).items():
-            if ':' in key:
-                attr, val = key.split(':', 1)
-                custom_attr_values[(attr, val)] = value
-        self._attribute_values = {**HTML_ATTRIBUTE_VALUES, **HTML_MEDIA_TYPE_VALUES, **HTML_CSP_ATTRIBUTES, **custom_attr_values}
+        self._element_specific_attr_names = frozenset(
+            attr for attrs in ELEMENT_SPECIFIC_ATTRIBUTES.values() for attr in attrs
+        )
+        self._rules = None
+        self._refresh_rules()
+
+    def _refresh_rules(self):
+        """Pick up the current merged rule tables when the custom rules have changed.
+
+        Edits made in the Rules Manager (overrides, additions, deletions) bump
+        the rules version, so they still take effect on the next analysis
+        without restarting the app.
+        """
+        snapshot = get_rule_snapshot()
+        if snapshot is self._rules:
+            return
+        self._elements = snapshot.html.elements
+        self._input_types = snapshot.html.input_types
+        self._attributes = snapshot.html.attributes
+        self._attribute_values = snapshot.html.attribute_values
+        self._rules = snapshot
 
     def parse_file(self, filepath: str) -> Set[str]:
         filepath = Path(filepath)
@@ -110,8 +279,10 @@ class HTMLParser:
             raise FileNotFoundError(f"HTML file not found: {filepath}")
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
+            with profile_stage('read'), open(filepath, 'r', encoding='utf-8') as f:
                 html_content = f.read()
+                if metrics_enabled():
+                    BYTES_PROCESSED.inc('html', amount=os.fstat(f.fileno()).st_size)
 
             return self.parse_string(html_content)
 
@@ -121,47 +292,188 @@ class HTMLParser:
             raise ValueError(f"Error parsing HTML file: {e}") from e
 
     def parse_string(self, html_content: str) -> Set[str]:
-        # Re-merge built-ins with custom rules every time the parser runs, so
-        # edits made in the Rules Manager (overrides, additions, deletions)
-        # take effect on the next analysis without restarting the app.
-        custom_html = get_custom_html_rules()
-        self._elements = {**HTML_ELEMENTS, **HTML_SPECIAL_ELEMENTS, **custom_html.get('elements', {})}
-        self._input_types = {**HTML_INPUT_TYPES, **custom_html.get('input_types', {})}
-        self._attributes = {**HTML_ATTRIBUTES, **HTML_ARIA_ATTRIBUTES, **custom_html.get('attributes', {})}
-        custom_attr_values = {}
-        for key, value in custom_html.get('attribute_values', {}).items():
-            if ':' in key:
-                attr, val = key.split(':', 1)
-                custom_attr_values[(attr, val)] = value
-        self._attribute_values = {**HTML_ATTRIBUTE_VALUES, **HTML_MEDIA_TYPE_VALUES, **HTML_CSP_ATTRIBUTES, **custom_attr_values}
+        self._refresh_rules()
 
         self.features_found = set()
         self.elements_found = []
         self.attributes_found = []
         self.unrecognized_patterns = set()
         self.feature_details = []
-        self._feature_matches = {}
-
-        soup = BeautifulSoup(html_content, 'html.parser')
-
-        self._detect_elements(soup)
-        self._detect_input_types(soup)
-        self._detect_attributes(soup)
-        self._detect_attribute_values(soup)
-        self._detect_special_patterns(soup)
-        self._find_unrecognized_patterns(soup)
+        self._details = FeatureDetails()
+
+        with profile_stage('html.scan'):
+            scan = self._scan(html_content)
+        self.inline_css = scan.inline_css
+        self.inline_js = scan.inline_js
+
+        with profile_stage('html.detect'):
+            self._detect_elements(scan)
+            self._detect_input_types(scan)
+            self._detect_attributes(scan)
+            self._detect_attribute_values(scan)
+            self._detect_special_patterns(scan)
+        with profile_stage('html.unrecognized'):
+            self._find_unrecognized_patterns(scan)
         self._build_feature_details()
 
         return self.features_found
 
-    def _detect_elements(self, soup: BeautifulSoup):
-        counts = {}
-        for element in soup.find_all():
-            name = element.name
-            if name in self._elements:
-                counts[name] = counts.get(name, 0) + 1
+    def _scan(self, html_content: str) -> _DocumentScan:
+        scan = _DocumentScan()
+
+        def on_start(name: str, attrs: Dict):
+            self._scan_element(scan, name, attrs)
+            scan.open_elements[name] = scan.open_elements.get(name, 0) + 1
+
+        def on_end(name: str):
+            scan.open_elements[name] -= 1
+            if name in ('script', 'style'):
+                scan.text_target = None
+
+        def on_text(name: str, text: str):
+            if scan.text_target is not None:
+                scan.text_target.append(text)
+
+        try:
+            self._backend.scan(html_content, on_start, on_end, on_text)
+        except Exception as e:
+            if isinstance(self._backend, SoupBackend):
+                raise
+            # A streaming backend gave up on this markup; start over with the tree builder
+            logger.debug(f"{self._backend.name} backend failed ({e}), retrying with BeautifulSoup")
+            scan = _DocumentScan()
+            SoupBackend().scan(html_content, on_start, on_end, on_text)
+        return scan
+
+    def _scan_element(self, scan: _DocumentScan, name: str, attrs: Dict):
+        scan.element_names.add(name.lower())
+
+        if name in self._elements:
+            scan.element_counts[name] = scan.element_counts.get(name, 0) + 1
+
+        if attrs:
+            self._scan_attributes(scan, name, attrs)
 
-        for element_name, count in counts.items():
+        self._scan_special(scan, name, attrs)
+
+    def _scan_attributes(self, scan: _DocumentScan, name: str, attrs: Dict):
+        elem_attrs = self._element_specific_attributes.get(name, {})
+        data_attr_seen = False
+        for attr_name, attr_value in attrs.items():
+            if isinstance(attr_name, str):
+                scan.attribute_names.add(attr_name.lower())
+
+            if attr_name in self._attributes:
+                scan.attribute_hits.append((attr_name, name, self._attributes[attr_name]))
+            elif attr_name in elem_attrs:
+                scan.attribute_hits.append((attr_name, name, elem_attrs[attr_name]))
+
+            values = [attr_value] if isinstance(attr_value, str) else attr_value
+            for value in values:
+                value_lower = value.lower() if isinstance(value, str) else value
+                key = (attr_name, value_lower)
+                if key in self._attribute_values:
+                    scan.value_hits.append((attr_name, value, name, self._attribute_values[key]))
+                # Handle media types with codec params (e.g. "video/webm; codecs=vp9")
+                elif attr_name == 'type' and isinstance(value_lower, str) and ';' in value_lower:
+                    base_key = (attr_name, value_lower.split(';')[0].strip())
+                    if base_key in self._attribute_values:
+                        scan.value_hits.append((attr_name, value, name, self._attribute_values[base_key]))
+
+            if not data_attr_seen and attr_name.startswith('data-'):
+                data_attr_seen = True
+                scan.data_attributes.append(attr_name)
+
+            if attr_name == 'style' and isinstance(attr_value, str) and attr_value.strip():
+                # Wrapped in a rule so the CSS parser sees an ordinary declaration block
+                scan.inline_css.begin(f"style attribute on <{name}>", f"* {{ {attr_value} }}")
+
+            if isinstance(attr_value, str):
+                if scan.svg_fragment_value is None and _SVG_FRAGMENT_RE.search(attr_value):
+                    scan.svg_fragment_value = attr_value
+                if attr_name in _DATA_URI_ATTRS and _DATA_URI_RE.search(attr_value):
+                    scan.data_uri_attrs.add(attr_name)
+
+        if 'srcset' in attrs:
+            scan.has_srcset = True
+            if 'data:' in attrs['srcset']:
+                scan.srcset_data_uri = True
+        if 'sizes' in attrs:
+            scan.has_sizes = True
+
+    def _scan_special(self, scan: _DocumentScan, name: str, attrs: Dict):
+        """Per-element checks for patterns that need more than a table lookup."""
+        if '-' in name and scan.custom_element is None and name.lower() not in _SVG_HYPHENATED_ELEMENTS:
+            scan.custom_element = name
+
+        if name == 'input':
+            scan.input_types.append(attrs.get('type', '').lower())
+        elif name == 'style':
+            if _attr_text(attrs, 'type').lower() in _CSS_STYLE_TYPES:
+                scan.style_blocks += 1
+                scan.inline_css.begin(f"<style> #{scan.style_blocks}")
+                scan.text_target = scan.inline_css
+        elif name == 'script':
+            # External scripts ignore their content; JSON, templates etc. aren't JS
+            if 'src' not in attrs and _attr_text(attrs, 'type').lower() in _JS_SCRIPT_TYPES:
+                scan.inline_scripts += 1
+                scan.inline_js.begin(f"<script> #{scan.inline_scripts}")
+                scan.text_target = scan.inline_js
+            if attrs.get('async') is not None:
+                scan.script_flags.append(('script-async', 'attributes', 'async'))
+            if attrs.get('defer') is not None:
+                scan.script_flags.append(('script-defer', 'attributes', 'defer'))
+            if attrs.get('type') == 'module':
+                scan.script_flags.append(('es6-module', 'values', 'type="module"'))
+        elif name == 'link':
+            rel = attrs.get('rel', [])
+            scan.link_rels.extend([rel] if isinstance(rel, str) else rel)
+        elif name == 'meta':
+            if attrs.get('name') == 'theme-color':
+                scan.theme_color = True
+        elif name == 'img':
+            src = attrs.get('src', '')
+            if scan.svg_img_src is None and _SVG_SRC_RE.search(src):
+                scan.svg_img_src = src
+        elif name == 'source':
+            srcset = attrs.get('srcset', '')
+            if scan.svg_source_srcset is None and _SVG_SRC_RE.search(srcset):
+                scan.svg_source_srcset = srcset
+            if not scan.picture_with_source and scan.inside('picture'):
+                scan.picture_with_source = True
+            if scan.media_fragment_src is None:
+                src = attrs.get('src', '')
+                if _MEDIA_FRAGMENT_RE.search(src) and scan.inside('video', 'audio'):
+                    scan.media_fragment_src = src
+        elif name == 'use':
+            href = attrs.get('href', '') or attrs.get('xlink:href', '')
+            if scan.svg_use_href is None and '#' in href:
+                scan.svg_use_href = href
+        elif name in ('video', 'audio'):
+            src = attrs.get('src', '')
+            if scan.media_fragment_src is None and _MEDIA_FRAGMENT_RE.search(src):
+                scan.media_fragment_src = src
+        elif name == 'track':
+            if not scan.video_tracks and scan.inside('video'):
+                scan.video_tracks = True
+            if not scan.audio_tracks and scan.inside('audio'):
+                scan.audio_tracks = True
+            src = attrs.get('src', '')
+            if scan.vtt_src is None and _VTT_RE.search(src):
+                scan.vtt_src = src
+        elif name == 'fieldset':
+            if 'disabled' in attrs:
+                scan.fieldset_disabled = True
+        elif name == 'html':
+            if scan.html_xmlns is None:
+                scan.html_xmlns = attrs.get('xmlns', '')
+
+    def _add_feature(self, feature_id: str, match_type: str, match_value: str):
+        self.features_found.add(feature_id)
+        self._add_match(feature_id, match_type, match_value)
+
+    def _detect_elements(self, scan: _DocumentScan):
+        for element_name, count in scan.element_counts.items():
             feature_id = self._elements[element_name]
             self.features_found.add(feature_id)
             self.elements_found.append({
@@ -171,12 +483,8 @@ class HTMLParser:
             })
             self._add_match(feature_id, 'elements', f'<{element_name}>')
 
-    def _detect_input_types(self, soup: BeautifulSoup):
-        inputs = soup.find_all('input')
-
-        for input_elem in inputs:
-            input_type = input_elem.get('type', '').lower()
-
+    def _detect_input_types(self, scan: _DocumentScan):
+        for input_type in scan.input_types:
             if input_type in self._input_types:
                 feature_id = self._input_types[input_type]
                 self.features_found.add(feature_id)
@@ -187,285 +495,100 @@ class HTMLParser:
                 })
                 self._add_match(feature_id, 'elements', f'<input type="{input_type}">')
 
-    def _detect_attributes(self, soup: BeautifulSoup):
-        all_elements = soup.find_all()
-
-        for element in all_elements:
-            elem_attrs = self._element_specific_attributes.get(element.name, {})
-            for attr_name in element.attrs:
-                if attr_name in self._attributes:
-                    feature_id = self._attributes[attr_name]
-                    self.features_found.add(feature_id)
-                    self.attributes_found.append({
-                        'attribute': attr_name,
-                        'element': element.name,
-                        'feature': feature_id
-                    })
-                    self._add_match(feature_id, 'attributes', attr_name)
-                elif attr_name in elem_attrs:
-                    feature_id = elem_attrs[attr_name]
-                    self.features_found.add(feature_id)
-                    self.attributes_found.append({
-                        'attribute': attr_name,
-                        'element': element.name,
-                        'feature': feature_id
-                    })
-                    self._add_match(feature_id, 'attributes', attr_name)
-
-    def _detect_attribute_values(self, soup: BeautifulSoup):
-        all_elements = soup.find_all()
-
-        for element in all_elements:
-            for attr_name, attr_value in element.attrs.items():
-                values = [attr_value] if isinstance(attr_value, str) else attr_value
-
-                for value in values:
-                    value_lower = value.lower() if isinstance(value, str) else value
-                    key = (attr_name, value_lower)
-
-                    if key in self._attribute_values:
-                        feature_id = self._attribute_values[key]
-                        self.features_found.add(feature_id)
-                        self.attributes_found.append({
-                            'attribute': f'{attr_name}="{value}"',
-                            'element': element.name,
-                            'feature': feature_id
-                        })
-                        self._add_match(feature_id, 'values', f'{attr_name}="{value}"')
-                    # Handle media types with codec params (e.g. "video/webm; codecs=vp9")
-                    elif attr_name == 'type' and isinstance(value_lower, str) and ';' in value_lower:
-                        base_type = value_lower.split(';')[0].strip()
-                        base_key = (attr_name, base_type)
-
-                        if base_key in self._attribute_values:
-                            feature_id = self._attribute_values[base_key]
-                            self.features_found.add(feature_id)
-                            self.attributes_found.append({
-                                'attribute': f'{attr_name}="{value}"',
-                                'element': element.name,
-                                'feature': feature_id
-                            })
-                            self._add_match(feature_id, 'values', f'{attr_name}="{value}"')
-
-    def _detect_special_patterns(self, soup: BeautifulSoup):
+    def _detect_attributes(self, scan: _DocumentScan):
+        for attr_name, element_name, feature_id in scan.attribute_hits:
+            self.features_found.add(feature_id)
+            self.attributes_found.append({
+                'attribute': attr_name,
+                'element': element_name,
+                'feature': feature_id
+            })
+            self._add_match(feature_id, 'attributes', attr_name)
+
+    def _detect_attribute_values(self, scan: _DocumentScan):
+        for attr_name, value, element_name, feature_id in scan.value_hits:
+            self.features_found.add(feature_id)
+            self.attributes_found.append({
+                'attribute': f'{attr_name}="{value}"',
+                'element': element_name,
+                'feature': feature_id
+            })
+            self._add_match(feature_id, 'values', f'{attr_name}="{value}"')
+
+    def _detect_special_patterns(self, scan: _DocumentScan):
         """Detect patterns that need custom logic beyond simple element/attribute matching."""
         # Responsive images (srcset/sizes)
-        elements_with_srcset = soup.find_all(attrs={'srcset': True})
-        if elements_with_srcset:
-            self.features_found.add('srcset')
-            self._add_match('srcset', 'attributes', 'srcset')
-
-        elements_with_sizes = soup.find_all(attrs={'sizes': True})
-        if elements_with_sizes:
-            self.features_found.add('srcset')  # Same feature
-            self._add_match('srcset', 'attributes', 'sizes')
+        if scan.has_srcset:
+            self._add_feature('srcset', 'attributes', 'srcset')
+        if scan.has_sizes:
+            self._add_feature('srcset', 'attributes', 'sizes')  # Same feature
 
         # <picture> with <source> children
-        pictures = soup.find_all('picture')
-        for picture in pictures:
-            sources = picture.find_all('source')
-            if sources:
-                self.features_found.add('picture')
-                self._add_match('picture', 'elements', '<picture>')
-
-        # data-* attributes
-        all_elements = soup.find_all()
-        for element in all_elements:
-            for attr in element.attrs:
-                if attr.startswith('data-'):
-                    self.features_found.add('dataset')
-                    # Record the matched attr so feature_details (and the PDF
-                    # inventory) include this feature instead of dropping it.
-                    self._add_match('dataset', 'attributes', attr)
-                    break
+        if scan.picture_with_source:
+            self._add_feature('picture', 'elements', '<picture>')
+
+        # data-* attributes. Record the matched attr so feature_details (and
+        # the PDF inventory) include this feature instead of dropping it.
+        for attr in scan.data_attributes:
+            self._add_feature('dataset', 'attributes', attr)
 
         # Script loading attributes
-        scripts = soup.find_all('script')
-        for script in scripts:
-            if script.get('async') is not None:
-                self.features_found.add('script-async')
-                self._add_match('script-async', 'attributes', 'async')
-            if script.get('defer') is not None:
-                self.features_found.add('script-defer')
-                self._add_match('script-defer', 'attributes', 'defer')
-            if script.get('type') == 'module':
-                self.features_found.add('es6-module')
-                self._add_match('es6-module', 'values', 'type="module"')
+        for feature_id, match_type, match_value in scan.script_flags:
+            self._add_feature(feature_id, match_type, match_value)
 
         # Link rel values (preload, prefetch, etc.)
-        links = soup.find_all('link')
-        for link in links:
-            rel = link.get('rel', [])
-            if isinstance(rel, str):
-                rel = [rel]
-
-            for rel_value in rel:
-                rel_lower = rel_value.lower()
-                if rel_lower == 'preload':
-                    self.features_found.add('link-rel-preload')
-                    self._add_match('link-rel-preload', 'values', 'rel="preload"')
-                elif rel_lower == 'prefetch':
-                    self.features_found.add('link-rel-prefetch')
-                    self._add_match('link-rel-prefetch', 'values', 'rel="prefetch"')
-                elif rel_lower == 'dns-prefetch':
-                    self.features_found.add('link-rel-dns-prefetch')
-                    self._add_match('link-rel-dns-prefetch', 'values', 'rel="dns-prefetch"')
-                elif rel_lower == 'preconnect':
-                    self.features_found.add('link-rel-preconnect')
-                    self._add_match('link-rel-preconnect', 'values', 'rel="preconnect"')
-                elif rel_lower == 'modulepreload':
-                    self.features_found.add('link-rel-modulepreload')
-                    self._add_match('link-rel-modulepreload', 'values', 'rel="modulepreload"')
+        for rel_value in scan.link_rels:
+            rel_lower = rel_value.lower()
+            if rel_lower in _LINK_REL_FEATURES:
+                self._add_feature(_LINK_REL_FEATURES[rel_lower], 'values', f'rel="{rel_lower}"')
 
         # Meta theme-color
-        theme_color_meta = soup.find('meta', attrs={'name': 'theme-color'})
-        if theme_color_meta:
-            self.features_found.add('meta-theme-color')
-            self._add_match('meta-theme-color', 'values', 'name="theme-color"')
-
-        self._detect_svg_in_img(soup)
-        self._detect_svg_fragments(soup)
-        self._detect_media_fragments(soup)
-        self._detect_custom_elements(soup)
-        self._detect_fieldset_disabled(soup)
-        self._detect_track_elements(soup)
-        self._detect_webvtt(soup)
-        self._detect_data_uris(soup)
-        self._detect_xhtml(soup)
+        if scan.theme_color:
+            self._add_feature('meta-theme-color', 'values', 'name="theme-color"')
+
+        if scan.svg_img_src is not None:
+            self._add_feature('svg-img', 'values', f'src="{scan.svg_img_src}"')
+        elif scan.svg_source_srcset is not None:
+            self._add_feature('svg-img', 'values', f'srcset="{scan.svg_source_srcset}"')
+
+        # SVG fragment identifiers (<use href="...#id">)
+        if scan.svg_use_href is not None:
+            self._add_feature('svg-fragment', 'values', f'href="{scan.svg_use_href}"')
+        elif scan.svg_fragment_value is not None:
+            self._add_feature('svg-fragment', 'values', scan.svg_fragment_value)
+
+        # Media fragment URIs (#t=start,end)
+        if scan.media_fragment_src is not None:
+            self._add_feature('media-fragments', 'values', f'src="{scan.media_fragment_src}"')
+
+        # Custom elements must have a hyphen in the tag name
+        if scan.custom_element is not None:
+            self._add_feature('custom-elementsv1', 'elements', f'<{scan.custom_element}>')
+
+        if scan.fieldset_disabled:
+            self._add_feature('fieldset-disabled', 'attributes', 'disabled')
+
+        if scan.video_tracks:
+            self._add_feature('videotracks', 'elements', '<video><track></video>')
+        if scan.audio_tracks:
+            self._add_feature('audiotracks', 'elements', '<audio><track></audio>')
+
+        if scan.vtt_src is not None:
+            self._add_feature('webvtt', 'values', f'src="{scan.vtt_src}"')
+
+        data_uri_attr = next((a for a in _DATA_URI_ATTRS if a in scan.data_uri_attrs), None)
+        if data_uri_attr is not None:
+            self._add_feature('datauri', 'attributes', data_uri_attr)
+        elif scan.srcset_data_uri:
+            self._add_feature('datauri', 'values', 'srcset with data: URI')
+
+        if scan.html_xmlns and 'xhtml' in scan.html_xmlns.lower():
+            self._add_feature('xhtml', 'values', f'xmlns="{scan.html_xmlns}"')
 
         # meta charset is universally supported, not tracked in Can I Use
 
-    def _detect_svg_in_img(self, soup: BeautifulSoup):
-        svg_pattern = re.compile(r'\.svg(\?.*)?$', re.IGNORECASE)
-
-        for img in soup.find_all('img'):
-            src = img.get('src', '')
-            if svg_pattern.search(src):
-                self.features_found.add('svg-img')
-                self._add_match('svg-img', 'values', f'src="{src}"')
-                return
-
-        for source in soup.find_all('source'):
-            srcset = source.get('srcset', '')
-            if svg_pattern.search(srcset):
-                self.features_found.add('svg-img')
-                self._add_match('svg-img', 'values', f'srcset="{srcset}"')
-                return
-
-    def _detect_svg_fragments(self, soup: BeautifulSoup):
-        """Detect SVG fragment identifiers (<use href="...#id">)."""
-        for use in soup.find_all('use'):
-            href = use.get('href', '') or use.get('xlink:href', '')
-            if '#' in href:
-                self.features_found.add('svg-fragment')
-                self._add_match('svg-fragment', 'values', f'href="{href}"')
-                return
-
-        fragment_pattern = re.compile(r'\.svg#\w+', re.IGNORECASE)
-        all_elements = soup.find_all()
-        for element in all_elements:
-            for attr_value in element.attrs.values():
-                if isinstance(attr_value, str) and fragment_pattern.search(attr_value):
-                    self.features_found.add('svg-fragment')
-                    self._add_match('svg-fragment', 'values', attr_value)
-                    return
-
-    def _detect_media_fragments(self, soup: BeautifulSoup):
-        """Detect media fragment URIs (#t=start,end)."""
-        fragment_pattern = re.compile(r'#(t|track|xywh|id)=', re.IGNORECASE)
-
-        for media in soup.find_all(['video', 'audio']):
-            src = media.get('src', '')
-            if fragment_pattern.search(src):
-                self.features_found.add('media-fragments')
-                self._add_match('media-fragments', 'values', f'src="{src}"')
-                return
-
-            for source in media.find_all('source'):
-                src = source.get('src', '')
-                if fragment_pattern.search(src):
-                    self.features_found.add('media-fragments')
-                    self._add_match('media-fragments', 'values', f'src="{src}"')
-                    return
-
-    def _detect_custom_elements(self, soup: BeautifulSoup):
-        """Custom elements must have a hyphen in the tag name."""
-        all_elements = soup.find_all()
-        for element in all_elements:
-            if element.name and '-' in element.name:
-                # Skip SVG elements that happen to have hyphens
-                svg_elements = {'font-face', 'font-face-src', 'font-face-uri',
-                               'font-face-format', 'font-face-name', 'missing-glyph',
-                               'color-profile', 'glyph-ref'}
-                if element.name.lower() not in svg_elements:
-                    self.features_found.add('custom-elementsv1')
-                    self._add_match('custom-elementsv1', 'elements', f'<{element.name}>')
-                    return
-
-    def _detect_fieldset_disabled(self, soup: BeautifulSoup):
-        for fieldset in soup.find_all('fieldset'):
-            if fieldset.has_attr('disabled'):
-                self.features_found.add('fieldset-disabled')
-                self._add_match('fieldset-disabled', 'attributes', 'disabled')
-                return
-
-    def _detect_track_elements(self, soup: BeautifulSoup):
-        for video in soup.find_all('video'):
-            tracks = video.find_all('track')
-            if tracks:
-                self.features_found.add('videotracks')
-                self._add_match('videotracks', 'elements', '<video><track></video>')
-
-        for audio in soup.find_all('audio'):
-            tracks = audio.find_all('track')
-            if tracks:
-                self.features_found.add('audiotracks')
-                self._add_match('audiotracks', 'elements', '<audio><track></audio>')
-
-    def _detect_webvtt(self, soup: BeautifulSoup):
-        vtt_pattern = re.compile(r'\.vtt(\?.*)?$', re.IGNORECASE)
-
-        for track in soup.find_all('track'):
-            src = track.get('src', '')
-            if vtt_pattern.search(src):
-                self.features_found.add('webvtt')
-                self._add_match('webvtt', 'values', f'src="{src}"')
-                return
-
-    def _detect_data_uris(self, soup: BeautifulSoup):
-        data_uri_pattern = re.compile(r'^data:', re.IGNORECASE)
-
-        url_attrs = ['src', 'href', 'poster', 'data']
-        for attr in url_attrs:
-            for element in soup.find_all(attrs={attr: data_uri_pattern}):
-                self.features_found.add('datauri')
-                self._add_match('datauri', 'attributes', attr)
-                return
-
-        for element in soup.find_all(attrs={'srcset': True}):
-            srcset = element.get('srcset', '')
-            if 'data:' in srcset:
-                self.features_found.add('datauri')
-                self._add_match('datauri', 'values', 'srcset with data: URI')
-                return
-
-    def _detect_xhtml(self, soup: BeautifulSoup):
-        html_elem = soup.find('html')
-        if html_elem:
-            xmlns = html_elem.get('xmlns', '')
-            if 'xhtml' in xmlns.lower():
-                self.features_found.add('xhtml')
-                self._add_match('xhtml', 'values', f'xmlns="{xmlns}"')
-
-    def _find_unrecognized_patterns(self, soup: BeautifulSoup):
-        all_elements = soup.find_all()
-
-        found_element_names = set()
-        for elem in all_elements:
-            if elem.name:
-                found_element_names.add(elem.name.lower())
-
-        for elem_name in found_element_names:
+    def _find_unrecognized_patterns(self, scan: _DocumentScan):
+        for elem_name in scan.element_names:
             if elem_name in _BASIC_ELEMENTS:
                 continue
             if elem_name in self._elements:
@@ -474,13 +597,7 @@ class HTMLParser:
             if '-' in elem_name:
                 self.unrecognized_patterns.add(f"element: <{elem_name}>")
 
-        found_attributes = set()
-        for elem in all_elements:
-            for attr_name in elem.attrs:
-                if isinstance(attr_name, str):
-                    found_attributes.add(attr_name.lower())
-
-        for attr_name in found_attributes:
+        for attr_name in scan.attribute_names:
             if attr_name in _BASIC_ATTRIBUTES:
                 continue
             if attr_name.startswith('data-'):
@@ -489,33 +606,17 @@ class HTMLParser:
                 continue
             if attr_name in self._attributes:
                 continue
-            if any(attr_name in attrs for attrs in self._element_specific_attributes.values()):
+            if attr_name in self._element_specific_attr_names:
                 continue
 
             self.unrecognized_patterns.add(f"attribute: {attr_name}")
 
     def _add_match(self, feature_id: str, match_type: str, match_value: str):
-        if feature_id not in self._feature_matches:
-            self._feature_matches[feature_id] = {
-                'elements': [],
-                'attributes': [],
-                'values': []
-            }
-        if match_value not in self._feature_matches[feature_id][match_type]:
-            self._feature_matches[feature_id][match_type].append(match_value)
+        self._details.add(feature_id).add(match_value, _MATCH_GROUPS[match_type])
 
     def _build_feature_details(self):
-        for feature_id, matches in self._feature_matches.items():
-            matched_items = []
-            matched_items.extend(matches.get('elements', []))
-            matched_items.extend(matches.get('attributes', []))
-            matched_items.extend(matches.get('values', []))
-
-            if matched_items:
-                self.feature_details.append({
-                    'feature': feature_id,
-                    'matched_items': matched_items,
-                })
+        # matched_items lists elements, then attributes, then values
+        self.feature_details = self._details.to_list('matched_items', descriptions=False)
 
     def get_detailed_report(self) -> Dict:
         return {
@@ -0,0 +1,237 @@
+"""Pluggable HTML backends that report start/end tag events without keeping a tree.
+
+HTMLParser only needs to see each element once (name, attributes, and which
+elements enclose it), so the default backend streams the markup through the
+standard library tokenizer and never builds a DOM. The lxml backend does the
+same with libxml2's pull parser, and the BeautifulSoup backend builds a tree
+and walks it; it is the fallback when a streaming backend rejects the markup.
+
+Every backend calls on_start(name, attrs) for each element in document order
+and on_end(name) when it closes, with attrs shaped like BeautifulSoup's:
+lowercase names, '' for valueless attributes, and space-separated
+multi-valued attributes (class, rel, ...) split into lists. If on_text is
+given, the raw content of <script> and <style> elements is passed to
+on_text(name, text) between their start and end events, possibly in several
+pieces.
+"""
+
+import re
+from html.parser import HTMLParser as _StdlibHTMLParser
+from typing import Callable, Dict, List, Optional
+
+from ..utils.config import get_logger
+
+logger = get_logger('parsers.html_scanner')
+
+StartHandler = Callable[[str, Dict], None]
+EndHandler = Callable[[str], None]
+TextHandler = Callable[[str, str], None]
+
+# Mirrors BeautifulSoup's HTMLTreeBuilder so every backend reports the same values
+_MULTI_VALUED_ATTRIBUTES = {
+    '*': frozenset({'class', 'accesskey', 'dropzone'}),
+    'a': frozenset({'rel', 'rev'}),
+    'link': frozenset({'rel', 'rev'}),
+    'td': frozenset({'headers'}),
+    'th': frozenset({'headers'}),
+    'form': frozenset({'accept-charset'}),
+    'object': frozenset({'archive'}),
+    'area': frozenset({'rel'}),
+    'icon': frozenset({'sizes'}),
+    'iframe': frozenset({'sandbox'}),
+    'output': frozenset({'for'}),
+}
+_NO_EXTRA_MULTI_VALUED = frozenset()
+
+# Elements that never have content, so they are closed as soon as they open
+_VOID_ELEMENTS = frozenset({
+    'area', 'base', 'basefont', 'bgsound', 'br', 'col', 'command', 'embed',
+    'frame', 'hr', 'image', 'img', 'input', 'isindex', 'keygen', 'link',
+    'menuitem', 'meta', 'nextid', 'param', 'source', 'spacer', 'track', 'wbr',
+})
+
+# Elements whose content is reported through on_text
+_RAW_TEXT_ELEMENTS = frozenset({'script', 'style'})
+
+_NON_WHITESPACE_RE = re.compile(r'\S+')
+
+# Markup is fed to the streaming tokenizers in pieces this size (characters)
+_FEED_CHUNK_SIZE = 64 * 1024
+
+
+def _normalize_attrs(tag: str, attrs) -> Dict:
+    """(name, value) pairs -> dict; later duplicates win, None becomes ''."""
+    result = {}
+    for key, value in attrs:
+        result[key] = '' if value is None else value
+    if result:
+        multi = _MULTI_VALUED_ATTRIBUTES['*'] | _MULTI_VALUED_ATTRIBUTES.get(tag, _NO_EXTRA_MULTI_VALUED)
+        for key in multi.intersection(result):
+            value = result[key]
+            if isinstance(value, str):
+                result[key] = _NON_WHITESPACE_RE.findall(value)
+    return result
+
+
+def _chunks(text: str):
+    for start in range(0, len(text), _FEED_CHUNK_SIZE):
+        yield text[start:start + _FEED_CHUNK_SIZE]
+
+
+class _EventTokenizer(_StdlibHTMLParser):
+    """html.parser callbacks -> on_start/on_end, nesting resolved like BeautifulSoup's."""
+
+    def __init__(self, on_start: StartHandler, on_end: EndHandler,
+                 on_text: Optional[TextHandler] = None):
+        # Same tokenizer settings BeautifulSoup uses for its 'html.parser' builder
+        super().__init__(convert_charrefs=False)
+        self._on_start = on_start
+        self._on_end = on_end
+        self._on_text = on_text
+        self._open: List[str] = []
+        self._open_counts: Dict[str, int] = {}
+
+    def handle_starttag(self, tag, attrs):
+        self._on_start(tag, _normalize_attrs(tag, attrs))
+        if tag in _VOID_ELEMENTS:
+            self._on_end(tag)
+            return
+        self._open.append(tag)
+        self._open_counts[tag] = self._open_counts.get(tag, 0) + 1
+
+    def handle_data(self, data):
+        # Inside <script>/<style> the tokenizer is in CDATA mode, so this is the raw content
+        if self._on_text is not None and self._open and self._open[-1] in _RAW_TEXT_ELEMENTS:
+            self._on_text(self._open[-1], data)
+
+    def handle_startendtag(self, tag, attrs):
+        self._on_start(tag, _normalize_attrs(tag, attrs))
+        self._on_end(tag)
+
+    def handle_endtag(self, tag):
+        # A stray end tag is ignored; otherwise everything opened after the
+        # matching start tag is closed with it.
+        if not self._open_counts.get(tag):
+            return
+        while self._open:
+            name = self._open.pop()
+            self._open_counts[name] -= 1
+            self._on_end(name)
+            if name == tag:
+                break
+
+    def close(self):
+        super().close()
+        while self._open:
+            self._on_end(self._open.pop())
+        self._open_counts.clear()
+
+
+class StreamingBackend:
+    """Standard-library tokenizer; tokenizes exactly like BeautifulSoup's 'html.parser'."""
+
+    name = 'stream'
+
+    def scan(self, html_content: str, on_start: StartHandler, on_end: EndHandler,
+             on_text: Optional[TextHandler] = None):
+        tokenizer = _EventTokenizer(on_start, on_end, on_text)
+        for chunk in _chunks(html_content):
+            tokenizer.feed(chunk)
+        tokenizer.close()
+
+
+class LxmlBackend:
+    """libxml2 pull parser. Fastest, but repairs markup the way libxml2 does
+    (implied <html>/<body>/<p>), so nesting can differ from the other backends.
+    """
+
+    name = 'lxml'
+
+    def __init__(self):
+        from lxml import etree
+        self._etree = etree
+
+    def scan(self, html_content: str, on_start: StartHandler, on_end: EndHandler,
+             on_text: Optional[TextHandler] = None):
+        parser = self._etree.HTMLPullParser(events=('start', 'end'))
+        for chunk in _chunks(html_content):
+            parser.feed(chunk)
+            self._drain(parser, on_start, on_end, on_text)
+        parser.close()
+        self._drain(parser, on_start, on_end, on_text)
+
+    @staticmethod
+    def _drain(parser, on_start: StartHandler, on_end: EndHandler,
+               on_text: Optional[TextHandler]):
+        for event, element in parser.read_events():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # comments, processing instructions
+            if event == 'start':
+                on_start(tag, _normalize_attrs(tag, element.attrib.items()))
+            else:
+                # Content is only complete once the element has ended
+                if on_text is not None and tag in _RAW_TEXT_ELEMENTS and element.text:
+                    on_text(tag, element.text)
+                on_end(tag)
+                # Drop finished subtrees so memory stays flat on large pages
+                element.clear()
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+
+class SoupBackend:
+    """Builds a BeautifulSoup tree and walks it. Slowest; used as the fallback."""
+
+    name = 'soup'
+
+    def scan(self, html_content: str, on_start: StartHandler, on_end: EndHandler,
+             on_text: Optional[TextHandler] = None):
+        from bs4 import BeautifulSoup, Tag
+
+        soup = BeautifulSoup(html_content, 'html.parser')
+        # Iterative walk: deeply nested documents must not hit the recursion limit
+        stack = [iter(soup.children)]
+        names = []
+        while stack:
+            child = next(stack[-1], None)
+            if child is None:
+                stack.pop()
+                if names:
+                    on_end(names.pop())
+                continue
+            if isinstance(child, Tag):
+                on_start(child.name, child.attrs)
+                if on_text is not None and child.name in _RAW_TEXT_ELEMENTS:
+                    text = child.get_text()
+                    if text:
+                        on_text(child.name, text)
+                names.append(child.name)
+                stack.append(iter(child.children))
+
+
+_BACKENDS = {
+    StreamingBackend.name: StreamingBackend,
+    LxmlBackend.name: LxmlBackend,
+    SoupBackend.name: SoupBackend,
+}
+
+DEFAULT_BACKEND = StreamingBackend.name
+
+
+def available_backends() -> List[str]:
+    return list(_BACKENDS)
+
+
+def get_backend(name: Optional[str] = None):
+    """Instantiate a backend by name; falls back to the soup backend if lxml is missing."""
+    name = name or DEFAULT_BACKEND
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown HTML backend '{name}'. Choose from: {', '.join(_BACKENDS)}")
+    try:
+        return _BACKENDS[name]()
+    except ImportError as e:
+        logger.warning(f"HTML backend '{name}' unavailable ({e}), using BeautifulSoup")
+        return SoupBackend()
@@ -0,0 +1,130 @@
+"""Incremental re-parsing of JavaScript files that change between analyses.
+
+When the same file is analyzed again (GUI re-check, watch mode), most of it
+is usually unchanged. With incremental parsing enabled, JavaScriptParser
+keeps the last tree-sitter tree of each file together with its source and
+the per-statement detection results:
+
+- the edit between the old and the new source (common prefix and suffix)
+  is applied to the old tree, and tree-sitter re-parses only around it;
+- AST detection results are cached per top-level statement, keyed by the
+  statement's node type and source bytes, so only statements whose text
+  changed are walked again. Moving code around keeps its results.
+
+tree-sitter's changed_ranges() only reports structural differences (renaming
+fetch to fetcx changes no node), which is why statements are matched by
+content rather than by the ranges tree-sitter reports.
+"""
+
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Optional, Set, Tuple
+
+# How many files keep their last tree
+TREE_CACHE_SIZE = 32
+
+# Compare sources this many bytes at a time before narrowing down
+_COMPARE_BLOCK = 4096
+
+
+class TextEdit(NamedTuple):
+    """A single replacement turning the old source into the new one (byte offsets)."""
+    start_byte: int
+    old_end_byte: int
+    new_end_byte: int
+
+
+class FileState:
+    """What is kept about one file between parses."""
+
+    __slots__ = ('source', 'tree', 'statements', 'api_hits', 'shadowed')
+
+    def __init__(self, source: bytes, tree):
+        self.source = source
+        self.tree = tree
+        # (node type, statement bytes) -> (syntax hits, matchable-text replacements)
+        self.statements: Dict[Tuple[str, bytes], Tuple[list, list]] = {}
+        # (node type, statement bytes) -> API hits, valid for the shadowed names below
+        self.api_hits: Dict[Tuple[str, bytes], list] = {}
+        self.shadowed: Set[str] = set()
+
+
+class TreeCache:
+    """path -> FileState for the most recently parsed files (LRU)."""
+
+    def __init__(self, max_files: int = TREE_CACHE_SIZE):
+        self.max_files = max_files
+        self._files: 'OrderedDict[str, FileState]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def get(self, key: str) -> Optional[FileState]:
+        state = self._files.get(key)
+        if state is not None:
+            self._files.move_to_end(key)
+        return state
+
+    def put(self, key: str, state: FileState):
+        self._files[key] = state
+        self._files.move_to_end(key)
+        while len(self._files) > self.max_files:
+            self._files.popitem(last=False)
+
+    def discard(self, key: str):
+        self._files.pop(key, None)
+
+    def clear(self):
+        self._files.clear()
+
+
+def _common_prefix_length(a: bytes, b: bytes, limit: int) -> int:
+    pos = 0
+    while pos < limit:
+        end = min(pos + _COMPARE_BLOCK, limit)
+        if a[pos:end] != b[pos:end]:
+            while a[pos] == b[pos]:
+                pos += 1
+            return pos
+        pos = end
+    return limit
+
+
+def _common_suffix_length(a: bytes, b: bytes, limit: int) -> int:
+    length = 0
+    la, lb = len(a), len(b)
+    while length < limit:
+        size = min(_COMPARE_BLOCK, limit - length)
+        if a[la - length - size:la - length] != b[lb - length - size:lb - length]:
+            while a[la - length - 1] == b[lb - length - 1]:
+                length += 1
+            return length
+        length += size
+    return limit
+
+
+def compute_edit(old: bytes, new: bytes) -> Optional[TextEdit]:
+    """The smallest single edit turning old into new, or None if they are equal."""
+    if old == new:
+        return None
+    shorter = min(len(old), len(new))
+    prefix = _common_prefix_length(old, new, shorter)
+    suffix = _common_suffix_length(old, new, shorter - prefix)
+    return TextEdit(prefix, len(old) - suffix, len(new) - suffix)
+
+
+def _point(source: bytes, offset: int) -> Tuple[int, int]:
+    # tree-sitter points are (row, byte column)
+    row = source.count(b'\n', 0, offset)
+    return row, offset - (source.rfind(b'\n', 0, offset) + 1)
+
+
+def apply_edit(tree, edit: TextEdit, old: bytes, new: bytes):
+    """Tell tree (parsed from old) about edit, so it can be reused to parse new."""
+    tree.edit(
+        start_byte=edit.start_byte,
+        old_end_byte=edit.old_end_byte,
+        new_end_byte=edit.new_end_byte,
+        start_point=_point(old, edit.start_byte),
+        old_end_point=_point(old, edit.old_end_byte),
+        new_end_point=_point(new, edit.new_end_byte),
+    )
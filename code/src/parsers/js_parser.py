@@ -2,10 +2,11 @@
 
 from typing import Set, List, Dict, Optional
 from pathlib import Path
+import importlib.util
 import re
 
+from .feature_details import FeatureDetails
 from .js_feature_maps import (
-    ALL_JS_FEATURES,
     AST_SYNTAX_NODE_MAP,
     AST_NEW_EXPRESSION_MAP,
     AST_CALL_EXPRESSION_MAP,
@@ -13,25 +14,37 @@ from .js_feature_maps import (
     AST_IDENTIFIER_MAP,
     AST_OPERATOR_MAP,
 )
-from .custom_rules_loader import get_custom_js_rules
+from .js_incremental import FileState, TreeCache, apply_edit, compute_edit
+from .minified import DEFAULT_MINIFIED_MODE, MINIFIED_FULL, MINIFIED_SKIP, detect_minified
+from .rule_patterns import timed_search
+from .rule_registry import get_rule_snapshot
+from .source_reader import check_utf8, open_source
+from .text_offsets import OffsetMap, byte_to_char, char_to_byte
 from ..utils.config import get_logger
+from ..utils.metrics import BYTES_PROCESSED, metrics_enabled
+from ..utils.profiling import profile_stage
 
 logger = get_logger('parsers.js')
 
-# tree-sitter is optional -- falls back to regex-only if unavailable
-_TREE_SITTER_AVAILABLE = False
-_JS_LANGUAGE = None
+# tree-sitter is optional -- falls back to regex-only if unavailable. The
+# grammar is only loaded when the first JS file is parsed (see _get_ts_parser).
+_TREE_SITTER_AVAILABLE = importlib.util.find_spec('tree_sitter_languages') is not None
 _JS_PARSER = None
-try:
-    import warnings
-    with warnings.catch_warnings():
-        warnings.simplefilter("ignore", FutureWarning)
-        from tree_sitter_languages import get_language, get_parser as _get_ts_parser
-        _JS_LANGUAGE = get_language('javascript')
-        _JS_PARSER = _get_ts_parser('javascript')
-    _TREE_SITTER_AVAILABLE = True
-except (ImportError, Exception):
-    pass
+
+
+def _get_ts_parser():
+    global _TREE_SITTER_AVAILABLE, _JS_PARSER
+    if _JS_PARSER is None and _TREE_SITTER_AVAILABLE:
+        try:
+            import warnings
+            with warnings.catch_warnings():
+                warnings.simplefilter("ignore", FutureWarning)
+                from tree_sitter_languages import get_parser
+                _JS_PARSER = get_parser('javascript')
+        except Exception as e:
+            logger.debug(f"tree-sitter unavailable, using regex only: {e}")
+            _TREE_SITTER_AVAILABLE = False
+    return _JS_PARSER
 
 
 # Universally supported -- no need to flag
@@ -292,6 +305,108 @@ _COMMON_GLOBALS = frozenset({
     'Theme', 'Style', 'Config', 'Options', 'Params', 'Query', 'Data', 'Model',
 })
 
+# Comment/string stripping for the regex fallback. One search per token
+# instead of one Python step per character; string bodies, comments and
+# template text are skipped whole. Unterminated tokens run to the end.
+_JS_TOKEN_RE = re.compile(r"""
+      //[^\n]*                              # line comment (newline kept)
+    | /\*(?:[\s\S]*?\*/|[\s\S]*)            # block comment
+    | "(?:[^"\\]+|\\[\s\S]?)*("?)           # double-quoted string; group 1 = closing quote
+    | '(?:[^'\\]+|\\[\s\S]?)*('?)           # single-quoted string; group 2 = closing quote
+    | `                                     # template literal, see _skip_template
+""", re.VERBOSE)
+_TEMPLATE_STOP_RE = re.compile(r'\\[\s\S]?|`|\$\{')
+_BRACE_RE = re.compile(r'[{}]')
+
+
+# bytes.translate table for blanking comments: everything but newlines -> space
+_BLANK_EXCEPT_NEWLINES = bytes(10 if b == 10 else 32 for b in range(256))
+# Nodes replaced as a whole in the matchable text; their descendants are not visited
+_REPLACED_NODES = frozenset({'comment', 'string', 'template_string'})
+
+
+def _skip_template(js_content: str, pos: int, out: List[str]) -> int:
+    """Skip a template literal body starting after its opening backtick.
+
+    Appends '${x}' per substitution and the closing backtick; returns the
+    position after the literal. Substitutions end at the matching brace.
+    """
+    length = len(js_content)
+    while True:
+        m = _TEMPLATE_STOP_RE.search(js_content, pos)
+        if m is None:
+            return length
+        token = m.group()
+        if token == '`':
+            out.append('`')
+            return m.end()
+        pos = m.end()
+        if token == '${':
+            out.append('${x}')
+            depth = 1
+            while depth:
+                brace = _BRACE_RE.search(js_content, pos)
+                if brace is None:
+                    return length
+                depth += 1 if brace.group() == '{' else -1
+                pos = brace.end()
+
+
+def strip_comments_and_strings(js_content: str, offset_map: Optional[OffsetMap] = None) -> str:
+    """Drop comments and string/template contents, keeping quote delimiters and ${x} markers.
+
+    offset_map, if given, is filled to map offsets in the result back to js_content.
+    """
+    out: List[str] = []
+    out_len = 0
+    pos = 0
+    search = _JS_TOKEN_RE.search
+    while True:
+        m = search(js_content, pos)
+        if m is None:
+            if offset_map is not None:
+                offset_map.add(out_len, pos)
+            out.append(js_content[pos:])
+            return ''.join(out)
+        start = m.start()
+        if start > pos:
+            out.append(js_content[pos:start])
+        if offset_map is not None:
+            offset_map.add(out_len, pos)
+            out_len += start - pos
+            offset_map.add(out_len, start)
+        quote = js_content[start]
+        pos = m.end()
+        appended = len(out)
+        if quote == '`':
+            out.append('`')
+            pos = _skip_template(js_content, pos, out)
+        elif quote == '"':
+            out.append('"' + m.group(1))
+        elif quote == "'":
+            out.append("'" + m.group(2))
+        if offset_map is not None:
+            out_len += sum(map(len, out[appended:]))
+
+
+
+def _walk_postorder(root_node, prune: frozenset = frozenset()):
+    """root_node and its descendants, each node after its children, read
+    through one TreeCursor. Every Node wrapper is dropped once visited;
+    node.children would keep the whole subtree's wrappers alive for as long
+    as root_node is. Nodes of a type in prune are visited without their
+    descendants."""
+    cursor = root_node.walk()
+    while (not prune or cursor.node.type not in prune) and cursor.goto_first_child():
+        pass
+    while True:
+        yield cursor.node
+        if cursor.goto_next_sibling():
+            while (not prune or cursor.node.type not in prune) and cursor.goto_first_child():
+                pass
+        elif not cursor.goto_parent():
+            return
+
 
 class JavaScriptParser:
     """Extracts Can I Use feature IDs from JavaScript files."""
@@ -300,8 +415,34 @@ class JavaScriptParser:
         self.features_found = set()
         self.feature_details = []
         self.unrecognized_patterns = set()
+        # feature id -> offsets in the text of the code that matched it (parse_string(locate=True))
+        self.feature_offsets: Dict[str, List[int]] = {}
+        self._located = None
+        self._statement_start = 0
+        self._hit_start = 0
+        self._details = FeatureDetails()
+        # What parse_file does with minified/generated files (see parsers.minified),
+        # and why the last file counted as one (None if it did not)
+        self.minified_mode = DEFAULT_MINIFIED_MODE
+        self.minified_reason = None
+        # With incremental, parse_file keeps each file's last tree and
+        # per-statement results and only re-walks what changed (see
+        # parsers.js_incremental). Worth it when files are analyzed again.
+        self.incremental = False
+        self._trees = TreeCache()
+        self._ast_hits = []
         self._matched_apis = set()
-        self._all_features = {**ALL_JS_FEATURES, **get_custom_js_rules()}
+        self._rules = None
+        self._refresh_rules()
+
+    def _refresh_rules(self):
+        # Rules Manager edits (overrides, additions, deletions) bump the rules
+        # version, so they take effect on the next analysis without a restart.
+        snapshot = get_rule_snapshot()
+        if snapshot is not self._rules:
+            self._all_features = snapshot.js
+            self._patterns = snapshot.js_patterns
+            self._rules = snapshot
 
     def parse_file(self, filepath: str) -> Set[str]:
         filepath = Path(filepath)
@@ -310,79 +451,188 @@ class JavaScriptParser:
             raise FileNotFoundError(f"JavaScript file not found: {filepath}")
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                js_content = f.read()
-
-            return self.parse_string(js_content)
+            # The file is read (or, when large, mapped) once as bytes and
+            # handed to tree-sitter as is; no str copy of it is made.
+            with open_source(filepath) as source:
+                with profile_stage('read'):
+                    check_utf8(source)
+                if metrics_enabled():
+                    BYTES_PROCESSED.inc('javascript', amount=len(source))
+
+                reason = None
+                if self.minified_mode != MINIFIED_FULL:
+                    reason = detect_minified(source)
+                if reason is not None and self.minified_mode == MINIFIED_SKIP:
+                    self.features_found = set()
+                    self.feature_details = []
+                    self.unrecognized_patterns = set()
+                    features = self.features_found
+                else:
+                    # Mapped (large) sources are not kept for the next parse
+                    cache_key = None
+                    if self.incremental and isinstance(source, bytes):
+                        cache_key = str(filepath.resolve())
+                    features = self._parse_source(source, fast=reason is not None,
+                                                  cache_key=cache_key)
+            self.minified_reason = reason
+            return features
 
         except UnicodeDecodeError as e:
             raise ValueError(f"File is not valid UTF-8: {filepath}") from e
         except Exception as e:
             raise ValueError(f"Error parsing JavaScript file: {e}") from e
 
-    def parse_string(self, js_content: str) -> Set[str]:
-        # Re-merge built-ins with custom rules every time the parser runs, so
-        # edits made in the Rules Manager (overrides, additions, deletions)
-        # take effect on the next analysis without restarting the app.
-        self._all_features = {**ALL_JS_FEATURES, **get_custom_js_rules()}
+    def parse_string(self, js_content: str, fast: bool = False, locate: bool = False) -> Set[str]:
+        """With fast, only features are detected: unrecognized patterns and
+        feature_details stay empty (used for minified files). With locate,
+        feature_offsets tells where in js_content each feature was found."""
+        return self._parse_source(js_content.encode('utf-8'), fast, js_content, locate=locate)
+
+    def _parse_source(self, source, fast: bool = False, js_content: Optional[str] = None,
+                      cache_key: Optional[str] = None, locate: bool = False) -> Set[str]:
+        """Detect features in UTF-8 source (bytes or mmap); js_content is its
+        decoded text when the caller already has it (required with locate).
+        With a cache_key, the tree and per-statement results are kept for the
+        next parse of it."""
+        self._refresh_rules()
+        self.minified_reason = None
 
         self.features_found = set()
         self.feature_details = []
         self.unrecognized_patterns = set()
+        self.feature_offsets = {}
+        # feature id -> byte offsets in source of AST and raw-text hits
+        self._located = {} if locate else None
+        self._details = FeatureDetails()
         self._matched_apis = set()
         self._shadowed_names: Set[str] = set()
+        offset_map = OffsetMap() if locate else None
 
-        self._detect_directives(js_content)
-        self._detect_event_listeners(js_content)
+        with profile_stage('js.raw-text'):
+            self._detect_directives(source)
+            self._detect_event_listeners(source)
 
-        tree = self._parse_with_tree_sitter(js_content)
+        previous = self._trees.get(cache_key) if cache_key is not None else None
+        with profile_stage('js.ast'):
+            tree = self._parse_with_tree_sitter(source, previous)
 
         if tree is not None:
-            source_bytes = js_content.encode('utf-8')
+            source_bytes = source
             root_node = tree.root_node
+            statements = root_node.children
+            state = None
+            if cache_key is not None:
+                state = FileState(source, tree)
+                self._trees.put(cache_key, state)
 
             # Tier 1: syntax features from node types (zero false positives)
-            self._detect_ast_syntax_features(root_node, source_bytes)
+            with profile_stage('js.ast.syntax'):
+                results = self._statement_results(statements, source_bytes, previous, state)
+                # Statements are visited last-first, as a walk from the root would
+                for node, (syntax_hits, _) in zip(reversed(statements), reversed(results)):
+                    self._apply_ast_hits(syntax_hits, node.start_byte)
 
             # Tier 2: API features from identifiers, calls, member expressions
-            self._detect_ast_api_features(root_node, source_bytes)
+            with profile_stage('js.ast.api'):
+                self._shadowed_names = self._collect_top_level_declarations(root_node, source_bytes)
+                api_results = self._statement_api_hits(statements, source_bytes, previous, state)
+                for node, api_hits in zip(reversed(statements), reversed(api_results)):
+                    self._apply_ast_hits(api_hits, node.start_byte)
 
             # Build text with comments/strings stripped via AST
-            matchable = self._build_matchable_text_from_ast(root_node, source_bytes)
-
-            # Tier 3: regex patterns on cleaned text
-            self._detect_features(matchable)
-            self._find_unrecognized_patterns(matchable)
+            with profile_stage('js.strip'):
+                matchable = self._build_matchable_text_from_ast(
+                    statements, [replacements for _, replacements in results], source_bytes, offset_map)
         else:
+            if cache_key is not None:
+                self._trees.discard(cache_key)
             # Fallback: regex-only pipeline
-            cleaned_content = self._remove_comments(js_content)
-            self._detect_features(cleaned_content)
-            self._find_unrecognized_patterns(cleaned_content)
+            with profile_stage('js.strip'):
+                if js_content is None:
+                    js_content = source[:].decode('utf-8')
+                matchable = self._remove_comments(js_content, offset_map)
 
+        # Tier 3: regex patterns on cleaned text
+        with profile_stage('js.regex'):
+            self._detect_features(matchable)
+        if locate:
+            self.feature_offsets = self._locate_hits(js_content, matchable, offset_map, tree is not None)
+            self._located = None
+        if not fast:
+            with profile_stage('js.unrecognized'):
+                self._find_unrecognized_patterns(matchable)
+            self.feature_details = self._details.to_list('matched_apis')
         return self.features_found
 
-    def _detect_directives(self, js_content: str):
+    def _statement_results(self, statements, source_bytes: bytes,
+                           previous: Optional[FileState], state: Optional[FileState]) -> List[tuple]:
+        """(syntax hits, matchable-text replacements) of each top-level statement,
+        taken from previous for statements whose text has not changed."""
+        results = []
+        for node in statements:
+            key = None
+            if state is not None and not node.has_error:
+                key = (node.type, source_bytes[node.start_byte:node.end_byte])
+                result = previous.statements.get(key) if previous is not None else None
+                if result is not None:
+                    state.statements[key] = result
+                    results.append(result)
+                    continue
+            self._ast_hits = []
+            self._statement_start = node.start_byte
+            self._detect_ast_syntax_features(node, source_bytes)
+            result = (self._ast_hits, self._collect_replacements(node, source_bytes))
+            if key is not None:
+                state.statements[key] = result
+            results.append(result)
+        return results
+
+    def _statement_api_hits(self, statements, source_bytes: bytes,
+                            previous: Optional[FileState], state: Optional[FileState]) -> List[list]:
+        """API hits of each top-level statement. They depend on the shadowed
+        top-level names, so previous results only count if those are the same."""
+        reusable = previous is not None and previous.shadowed == self._shadowed_names
+        if state is not None:
+            state.shadowed = self._shadowed_names
+        results = []
+        for node in statements:
+            key = None
+            if state is not None and not node.has_error:
+                key = (node.type, source_bytes[node.start_byte:node.end_byte])
+                hits = previous.api_hits.get(key) if reusable else None
+                if hits is not None:
+                    state.api_hits[key] = hits
+                    results.append(hits)
+                    continue
+            self._ast_hits = []
+            self._statement_start = node.start_byte
+            self._detect_ast_api_features(node, source_bytes)
+            if key is not None:
+                state.api_hits[key] = self._ast_hits
+            results.append(self._ast_hits)
+        return results
+
+    def _detect_directives(self, source: bytes):
         # Must run before string removal -- these ARE string literals
         directives = [
-            ('use-strict', [r'["\']use strict["\']'], 'ECMAScript 5 Strict Mode'),
-            ('asmjs', [r'["\']use asm["\']'], 'asm.js'),
+            ('use-strict', [rb'["\']use strict["\']'], 'ECMAScript 5 Strict Mode'),
+            ('asmjs', [rb'["\']use asm["\']'], 'asm.js'),
         ]
 
         for feature_id, patterns, description in directives:
             for pattern in patterns:
                 try:
-                    if re.search(pattern, js_content):
+                    m = re.search(pattern, source)
+                    if m:
+                        self._locate(feature_id, m.start())
                         self.features_found.add(feature_id)
-                        self.feature_details.append({
-                            'feature': feature_id,
-                            'description': description,
-                            'matched_apis': ['"use strict"' if 'strict' in pattern else '"use asm"'],
-                        })
+                        self._details.add(feature_id, description,
+                                          ['"use strict"' if b'strict' in pattern else '"use asm"'])
                         break
                 except re.error:
                     continue
 
-    def _detect_event_listeners(self, js_content: str):
+    def _detect_event_listeners(self, source: bytes):
         # Event names live inside string args and would be lost after stripping string content.
         event_features = {
             'unhandledrejection': ('unhandledrejection', 'unhandledrejection event'),
@@ -410,258 +660,227 @@ class JavaScriptParser:
             'auxclick': ('auxclick', 'auxclick event'),
         }
 
-        event_pattern = r'''(?:addEventListener|on)\s*\(\s*['"](\w+)['"]'''
+        event_pattern = rb'''(?:addEventListener|on)\s*\(\s*['"](\w+)['"]'''
 
-        for match in re.finditer(event_pattern, js_content):
-            event_name = match.group(1)
+        for match in re.finditer(event_pattern, source):
+            event_name = match.group(1).decode('ascii')
             if event_name in event_features:
                 feature_id, description = event_features[event_name]
+                self._locate(feature_id, match.start())
                 if feature_id not in self.features_found:
                     self.features_found.add(feature_id)
-                    self.feature_details.append({
-                        'feature': feature_id,
-                        'description': description,
-                        'matched_apis': [f"addEventListener('{event_name}')"],
-                    })
+                    self._details.add(feature_id, description, [f"addEventListener('{event_name}')"])
 
-    def _remove_comments_and_strings(self, js_content: str) -> str:
+    def _remove_comments_and_strings(self, js_content: str, offset_map: Optional[OffsetMap] = None) -> str:
         # Keeps quote delimiters and backtick/${x} structure so template-literal detection still works.
-        result = []
-        i = 0
-        length = len(js_content)
+        return strip_comments_and_strings(js_content, offset_map)
 
-        while i < length:
-            if i < length - 1 and js_content[i:i+2] == '//':
-                while i < length and js_content[i] != '\n':
-                    i += 1
-                continue
-
-            if i < length - 1 and js_content[i:i+2] == '/*':
-                i += 2
-                while i < length - 1 and js_content[i:i+2] != '*/':
-                    i += 1
-                i += 2
-                continue
-
-            if js_content[i] == '"':
-                result.append('"')
-                i += 1
-                while i < length:
-                    if js_content[i] == '\\' and i + 1 < length:
-                        i += 2
-                    elif js_content[i] == '"':
-                        result.append('"')
-                        i += 1
-                        break
-                    else:
-                        i += 1
-                continue
-
-            if js_content[i] == "'":
-                result.append("'")
-                i += 1
-                while i < length:
-                    if js_content[i] == '\\' and i + 1 < length:
-                        i += 2
-                    elif js_content[i] == "'":
-                        result.append("'")
-                        i += 1
-                        break
-                    else:
-                        i += 1
-                continue
-
-            if js_content[i] == '`':
-                result.append('`')
-                i += 1
-                while i < length:
-                    if js_content[i] == '\\' and i + 1 < length:
-                        i += 2
-                    elif js_content[i] == '`':
-                        result.append('`')
-                        i += 1
-                        break
-                    elif js_content[i:i+2] == '${':
-                        # Keep ${x} structure for template literal detection
-                        result.append('${x}')
-                        i += 2
-                        depth = 1
-                        while i < length and depth > 0:
-                            if js_content[i] == '{':
-                                depth += 1
-                            elif js_content[i] == '}':
-                                depth -= 1
-                            i += 1
-                    else:
-                        i += 1
-                continue
-
-            result.append(js_content[i])
-            i += 1
-
-        return ''.join(result)
-
-    def _remove_comments(self, js_content: str) -> str:
-        return self._remove_comments_and_strings(js_content)
+    def _remove_comments(self, js_content: str, offset_map: Optional[OffsetMap] = None) -> str:
+        return self._remove_comments_and_strings(js_content, offset_map)
 
     # --- Tree-sitter AST methods ---
 
-    def _parse_with_tree_sitter(self, js_content: str):
-        if not _TREE_SITTER_AVAILABLE or _JS_PARSER is None:
+    def _parse_with_tree_sitter(self, source: bytes, previous: Optional[FileState] = None):
+        parser = _get_ts_parser()
+        if parser is None:
             return None
         try:
-            tree = _JS_PARSER.parse(js_content.encode('utf-8'))
-            return tree
+            if previous is None:
+                return parser.parse(source)
+            edit = compute_edit(previous.source, source)
+            if edit is None:
+                return previous.tree
+            # The old tree is edited in place; only the region around the
+            # edit is re-parsed.
+            apply_edit(previous.tree, edit, previous.source, source)
+            return parser.parse(source, previous.tree)
         except Exception as e:
             logger.debug(f"tree-sitter parse failed: {e}")
             return None
 
+    def _locate(self, feature_id: str, byte_offset: int):
+        if self._located is not None:
+            self._located.setdefault(feature_id, []).append(byte_offset)
+
     def _add_ast_feature(self, feature_id: str, api_name: str, description: str):
-        self.features_found.add(feature_id)
-        for detail in self.feature_details:
-            if detail['feature'] == feature_id:
-                if api_name not in detail['matched_apis']:
-                    detail['matched_apis'].append(api_name)
-                return
-        self.feature_details.append({
-            'feature': feature_id,
-            'description': description,
-            'matched_apis': [api_name],
-        })
+        # Collected per statement (so they can be cached), applied by _apply_ast_hits.
+        # The hit is at the node being visited, kept relative to its statement
+        # so cached results stay valid when the statement moves.
+        self._ast_hits.append((feature_id, api_name, description, self._hit_start - self._statement_start))
+
+    def _apply_ast_hits(self, hits: list, statement_start: int):
+        for feature_id, api_name, description, offset in hits:
+            self.features_found.add(feature_id)
+            self._details.add(feature_id, description).add(api_name)
+            self._locate(feature_id, statement_start + offset)
+
+    def _locate_hits(self, js_content: str, matchable: str, offset_map: OffsetMap,
+                     bytes_map: bool) -> Dict[str, List[int]]:
+        """feature id -> offsets in js_content of the code each feature was found in.
+
+        AST and raw-text hits are at their node or match; regex hits are
+        searched again in matchable and mapped back through offset_map
+        (byte offsets when built from the tree, else str offsets).
+        """
+        to_char = byte_to_char(js_content)
+        located = {feature_id: {to_char(o) for o in offsets}
+                   for feature_id, offsets in self._located.items()}
+        to_bytes = char_to_byte(matchable) if bytes_map else None
+        for feature_id in self.features_found:
+            for pattern in self._patterns.get(feature_id, ()):
+                if pattern.disabled or self._pattern_uses_shadowed_name(pattern.source):
+                    continue
+                for m in pattern.regex.finditer(matchable):
+                    if bytes_map:
+                        offset = to_char(offset_map.original(to_bytes(m.start())))
+                    else:
+                        offset = offset_map.original(m.start())
+                    located.setdefault(feature_id, set()).add(offset)
+        return {feature_id: sorted(offsets) for feature_id, offsets in located.items()}
+
+    def _visit_last_first(self, root_node, visit):
+        """visit(node) for root_node and its descendants, hits kept in the order
+        of a walk that visits a node before its children, last child first.
+
+        The nodes come children-first from _walk_postorder, whose reverse is
+        that order, so the hits are regrouped by node and the groups reversed.
+        """
+        hits = self._ast_hits
+        groups = []
+        for node in _walk_postorder(root_node):
+            start = len(hits)
+            self._hit_start = node.start_byte
+            visit(node)
+            if len(hits) > start:
+                groups.append((start, len(hits)))
+        if len(groups) > 1:
+            hits[:] = [hit for start, end in reversed(groups) for hit in hits[start:end]]
 
     def _detect_ast_syntax_features(self, root_node, source_bytes: bytes):
-        stack = [root_node]
-        while stack:
-            node = stack.pop()
-            node_type = node.type
-
-            if node_type in AST_SYNTAX_NODE_MAP:
-                feature_id = AST_SYNTAX_NODE_MAP[node_type]
-                self._add_ast_feature(feature_id, node_type, feature_id)
-
-            # const/let via lexical_declaration
-            if node_type == 'lexical_declaration':
-                if node.child_count > 0:
-                    keyword = node.children[0].type
-                    if keyword == 'const':
-                        self._add_ast_feature('const', 'const', 'Const declaration')
-                    elif keyword == 'let':
-                        self._add_ast_feature('let', 'let', 'Let declaration')
-                    # Destructuring in variable declarators
-                    for child in node.children:
-                        if child.type == 'variable_declarator':
-                            name_node = child.child_by_field_name('name')
-                            if name_node and name_node.type in ('object_pattern', 'array_pattern'):
-                                self._add_ast_feature('es6', 'destructuring', 'ES6 destructuring')
-
-            # async functions -- check if node text starts with 'async'
-            if node_type in ('function_declaration', 'function',
-                             'arrow_function', 'method_definition'):
-                text_start = source_bytes[node.start_byte:min(node.start_byte + 20, len(source_bytes))].decode('utf-8', errors='replace')
-                if text_start.startswith('async'):
-                    self._add_ast_feature('async-functions', 'async', 'Async/await')
-
-            # Optional chaining (?.) via optional_chain child.
-            # subscript_expression covers `a?.[x]` (computed access), which
-            # tree-sitter emits as its own node separate from member/call.
-            if node_type in ('member_expression', 'call_expression', 'subscript_expression'):
+        self._visit_last_first(root_node, lambda node: self._visit_syntax(node, source_bytes))
+
+    def _visit_syntax(self, node, source_bytes: bytes):
+        node_type = node.type
+
+        if node_type in AST_SYNTAX_NODE_MAP:
+            feature_id = AST_SYNTAX_NODE_MAP[node_type]
+            self._add_ast_feature(feature_id, node_type, feature_id)
+
+        # const/let via lexical_declaration
+        if node_type == 'lexical_declaration':
+            if node.child_count > 0:
+                keyword = node.children[0].type
+                if keyword == 'const':
+                    self._add_ast_feature('const', 'const', 'Const declaration')
+                elif keyword == 'let':
+                    self._add_ast_feature('let', 'let', 'Let declaration')
+                # Destructuring in variable declarators
                 for child in node.children:
-                    if child.type == 'optional_chain':
-                        self._add_ast_feature(
-                            AST_OPERATOR_MAP.get('?.', 'mdn-javascript_operators_optional_chaining'),
-                            '?.', 'Optional chaining'
-                        )
-                        break
-
-            # Private fields (#x)
-            if node_type == 'private_property_identifier':
-                self._add_ast_feature(
-                    'mdn-javascript_classes_private_class_fields',
-                    '#private', 'Private class fields'
-                )
-
-            # Nullish coalescing (??) via binary_expression operator
-            if node_type == 'binary_expression':
-                operator_node = node.child_by_field_name('operator')
-                if operator_node:
-                    op_text = source_bytes[operator_node.start_byte:operator_node.end_byte].decode('utf-8', errors='replace')
-                    if op_text == '??':
-                        self._add_ast_feature(
-                            AST_OPERATOR_MAP.get('??', 'mdn-javascript_operators_nullish_coalescing'),
-                            '??', 'Nullish coalescing'
-                        )
-
+                    if child.type == 'variable_declarator':
+                        name_node = child.child_by_field_name('name')
+                        if name_node and name_node.type in ('object_pattern', 'array_pattern'):
+                            self._add_ast_feature('es6', 'destructuring', 'ES6 destructuring')
+
+        # async functions -- check if node text starts with 'async'
+        if node_type in ('function_declaration', 'function',
+                         'arrow_function', 'method_definition'):
+            text_start = source_bytes[node.start_byte:min(node.start_byte + 20, len(source_bytes))].decode('utf-8', errors='replace')
+            if text_start.startswith('async'):
+                self._add_ast_feature('async-functions', 'async', 'Async/await')
+
+        # Optional chaining (?.) via optional_chain child.
+        # subscript_expression covers `a?.[x]` (computed access), which
+        # tree-sitter emits as its own node separate from member/call.
+        if node_type in ('member_expression', 'call_expression', 'subscript_expression'):
             for child in node.children:
-                stack.append(child)
-
-    def _detect_ast_api_features(self, root_node, source_bytes: bytes):
-        self._shadowed_names = self._collect_top_level_declarations(root_node, source_bytes)
+                if child.type == 'optional_chain':
+                    self._add_ast_feature(
+                        AST_OPERATOR_MAP.get('?.', 'mdn-javascript_operators_optional_chaining'),
+                        '?.', 'Optional chaining'
+                    )
+                    break
 
-        stack = [root_node]
-        while stack:
-            node = stack.pop()
-            node_type = node.type
+        # Private fields (#x)
+        if node_type == 'private_property_identifier':
+            self._add_ast_feature(
+                'mdn-javascript_classes_private_class_fields',
+                '#private', 'Private class fields'
+            )
+
+        # Nullish coalescing (??) via binary_expression operator
+        if node_type == 'binary_expression':
+            operator_node = node.child_by_field_name('operator')
+            if operator_node:
+                op_text = source_bytes[operator_node.start_byte:operator_node.end_byte].decode('utf-8', errors='replace')
+                if op_text == '??':
+                    self._add_ast_feature(
+                        AST_OPERATOR_MAP.get('??', 'mdn-javascript_operators_nullish_coalescing'),
+                        '??', 'Nullish coalescing'
+                    )
 
-            if node_type == 'new_expression':
-                constructor = node.child_by_field_name('constructor')
-                if constructor:
-                    name = source_bytes[constructor.start_byte:constructor.end_byte].decode('utf-8', errors='replace')
-                    if name not in self._shadowed_names and name in AST_NEW_EXPRESSION_MAP:
-                        feature_id = AST_NEW_EXPRESSION_MAP[name]
-                        self._add_ast_feature(feature_id, f'new {name}', feature_id)
-
-            elif node_type == 'call_expression':
-                func_node = node.child_by_field_name('function')
-                if func_node:
-                    func_text = source_bytes[func_node.start_byte:func_node.end_byte].decode('utf-8', errors='replace')
-
-                    if func_text not in self._shadowed_names and func_text in AST_CALL_EXPRESSION_MAP:
-                        feature_id = AST_CALL_EXPRESSION_MAP[func_text]
-                        self._add_ast_feature(feature_id, f'{func_text}()', feature_id)
-
-                    if func_node.type == 'member_expression':
-                        obj_node = func_node.child_by_field_name('object')
-                        prop_node = func_node.child_by_field_name('property')
-                        if obj_node and prop_node:
-                            obj_text = source_bytes[obj_node.start_byte:obj_node.end_byte].decode('utf-8', errors='replace')
-                            prop_text = source_bytes[prop_node.start_byte:prop_node.end_byte].decode('utf-8', errors='replace')
-
-                            if prop_text == 'includes':
-                                self._detect_includes_by_receiver(obj_node)
-
-                            if prop_text == 'addEventListener':
-                                self._detect_event_listener_type(node, source_bytes)
-
-                            member_key = f'{obj_text}.{prop_text}'
-                            if member_key in AST_MEMBER_EXPRESSION_MAP:
-                                feature_id = AST_MEMBER_EXPRESSION_MAP[member_key]
-                                self._add_ast_feature(feature_id, member_key, feature_id)
-
-            # Member expressions (non-call): navigator.geolocation, document.hidden
-            elif node_type == 'member_expression':
-                # Skip if already handled as call_expression function
-                parent = node.parent
-                if parent and parent.type == 'call_expression' and parent.child_by_field_name('function') == node:
-                    pass
-                else:
-                    obj_node = node.child_by_field_name('object')
-                    prop_node = node.child_by_field_name('property')
+    def _detect_ast_api_features(self, root_node, source_bytes: bytes):
+        self._visit_last_first(root_node, lambda node: self._visit_api(node, source_bytes))
+
+    def _visit_api(self, node, source_bytes: bytes):
+        node_type = node.type
+
+        if node_type == 'new_expression':
+            constructor = node.child_by_field_name('constructor')
+            if constructor:
+                name = source_bytes[constructor.start_byte:constructor.end_byte].decode('utf-8', errors='replace')
+                if name not in self._shadowed_names and name in AST_NEW_EXPRESSION_MAP:
+                    feature_id = AST_NEW_EXPRESSION_MAP[name]
+                    self._add_ast_feature(feature_id, f'new {name}', feature_id)
+
+        elif node_type == 'call_expression':
+            func_node = node.child_by_field_name('function')
+            if func_node:
+                func_text = source_bytes[func_node.start_byte:func_node.end_byte].decode('utf-8', errors='replace')
+
+                if func_text not in self._shadowed_names and func_text in AST_CALL_EXPRESSION_MAP:
+                    feature_id = AST_CALL_EXPRESSION_MAP[func_text]
+                    self._add_ast_feature(feature_id, f'{func_text}()', feature_id)
+
+                if func_node.type == 'member_expression':
+                    obj_node = func_node.child_by_field_name('object')
+                    prop_node = func_node.child_by_field_name('property')
                     if obj_node and prop_node:
                         obj_text = source_bytes[obj_node.start_byte:obj_node.end_byte].decode('utf-8', errors='replace')
                         prop_text = source_bytes[prop_node.start_byte:prop_node.end_byte].decode('utf-8', errors='replace')
+
+                        if prop_text == 'includes':
+                            self._detect_includes_by_receiver(obj_node)
+
+                        if prop_text == 'addEventListener':
+                            self._detect_event_listener_type(node, source_bytes)
+
                         member_key = f'{obj_text}.{prop_text}'
                         if member_key in AST_MEMBER_EXPRESSION_MAP:
                             feature_id = AST_MEMBER_EXPRESSION_MAP[member_key]
                             self._add_ast_feature(feature_id, member_key, feature_id)
 
-            elif node_type == 'identifier':
-                name = source_bytes[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
-                if name not in self._shadowed_names and name in AST_IDENTIFIER_MAP:
-                    feature_id = AST_IDENTIFIER_MAP[name]
-                    self._add_ast_feature(feature_id, name, feature_id)
-
-            for child in node.children:
-                stack.append(child)
+        # Member expressions (non-call): navigator.geolocation, document.hidden
+        elif node_type == 'member_expression':
+            # Skip if already handled as call_expression function
+            parent = node.parent
+            if parent and parent.type == 'call_expression' and parent.child_by_field_name('function') == node:
+                pass
+            else:
+                obj_node = node.child_by_field_name('object')
+                prop_node = node.child_by_field_name('property')
+                if obj_node and prop_node:
+                    obj_text = source_bytes[obj_node.start_byte:obj_node.end_byte].decode('utf-8', errors='replace')
+                    prop_text = source_bytes[prop_node.start_byte:prop_node.end_byte].decode('utf-8', errors='replace')
+                    member_key = f'{obj_text}.{prop_text}'
+                    if member_key in AST_MEMBER_EXPRESSION_MAP:
+                        feature_id = AST_MEMBER_EXPRESSION_MAP[member_key]
+                        self._add_ast_feature(feature_id, member_key, feature_id)
+
+        elif node_type == 'identifier':
+            name = source_bytes[node.start_byte:node.end_byte].decode('utf-8', errors='replace')
+            if name not in self._shadowed_names and name in AST_IDENTIFIER_MAP:
+                feature_id = AST_IDENTIFIER_MAP[name]
+                self._add_ast_feature(feature_id, name, feature_id)
 
     def _collect_top_level_declarations(self, root_node, source_bytes: bytes) -> Set[str]:
         declared: Set[str] = set()
@@ -739,64 +958,70 @@ class JavaScriptParser:
         if feature_id is not None:
             self._add_ast_feature(feature_id, f'.addEventListener("{event_name}")', feature_id)
 
-    def _build_matchable_text_from_ast(self, root_node, source_bytes: bytes) -> str:
+    def _collect_replacements(self, root_node, source_bytes: bytes) -> list:
+        """Sorted (start, end, replacement) for the comments, strings and template
+        literals under root_node, offsets relative to its start."""
         # Comments → spaces (preserving line structure), strings → empty delimiters, template literals → backticks with ${x} markers.
-        source_text = source_bytes.decode('utf-8', errors='replace')
-        length = len(source_text)
-
         replacements = []
 
-        stack = [root_node]
-        while stack:
-            node = stack.pop()
+        for node in _walk_postorder(root_node, _REPLACED_NODES):
             node_type = node.type
 
             if node_type == 'comment':
                 start, end = node.start_byte, node.end_byte
-                comment_text = source_text[start:end]
-                replacement = ''.join('\n' if c == '\n' else ' ' for c in comment_text)
+                replacement = source_bytes[start:end].translate(_BLANK_EXCEPT_NEWLINES)
                 replacements.append((start, end, replacement))
-                continue
 
-            if node_type == 'string':
+            elif node_type == 'string':
                 start, end = node.start_byte, node.end_byte
-                text = source_text[start:end]
-                if len(text) >= 2:
-                    quote = text[0]
+                if end - start >= 2:
+                    quote = source_bytes[start:start + 1]
                     replacement = quote + quote
                 else:
-                    replacement = text
+                    replacement = source_bytes[start:end]
                 replacements.append((start, end, replacement))
-                continue
 
-            if node_type == 'template_string':
-                self._process_template_string(node, source_text, replacements)
-                continue
-
-            for child in node.children:
-                stack.append(child)
-
-        if not replacements:
-            return source_text
+            elif node_type == 'template_string':
+                self._process_template_string(node, source_bytes, replacements)
 
+        base = root_node.start_byte
         replacements.sort(key=lambda x: x[0])
+        return [(start - base, end - base, replacement) for start, end, replacement in replacements]
 
+    def _build_matchable_text_from_ast(self, statements, replacement_lists, source_bytes: bytes,
+                                       offset_map: Optional[OffsetMap] = None) -> str:
+        # Built from byte slices of the source (node offsets are byte offsets) and decoded once.
+        # offset_map, if given, is filled to map its byte offsets back to source_bytes.
         parts = []
         last_end = 0
-        for start, end, replacement in replacements:
-            if start < last_end:
-                continue  # Skip overlapping
-            parts.append(source_text[last_end:start])
-            parts.append(replacement)
-            last_end = end
-        parts.append(source_text[last_end:])
-
-        return ''.join(parts)
-
-    def _process_template_string(self, node, source_text: str, replacements: list):
+        out_len = 0
+        for node, replacements in zip(statements, replacement_lists):
+            base = node.start_byte
+            for start, end, replacement in replacements:
+                start += base
+                if start < last_end:
+                    continue  # Skip overlapping
+                if offset_map is not None:
+                    offset_map.add(out_len, last_end)
+                    out_len += start - last_end
+                    offset_map.add(out_len, start)
+                    out_len += len(replacement)
+                parts.append(source_bytes[last_end:start])
+                parts.append(replacement)
+                last_end = end + base
+
+        if offset_map is not None:
+            offset_map.add(out_len, last_end)
+        if not parts:
+            return source_bytes[:].decode('utf-8', errors='replace')
+        parts.append(source_bytes[last_end:])
+
+        return b''.join(parts).decode('utf-8', errors='replace')
+
+    def _process_template_string(self, node, source_bytes: bytes, replacements: list):
         start = node.start_byte
         end = node.end_byte
-        text = source_text[start:end]
+        text = source_bytes[start:end]
 
         result = []
         i = 0
@@ -805,58 +1030,52 @@ class JavaScriptParser:
         if length == 0:
             return
 
-        result.append('`')
+        result.append(b'`')
         i = 1
 
+        # text is bytes: compare single bytes via slices
         while i < length:
-            if text[i] == '`':
-                result.append('`')
+            c = text[i:i + 1]
+            if c == b'`':
+                result.append(b'`')
                 i += 1
                 break
-            elif text[i] == '\\' and i + 1 < length:
+            elif c == b'\\' and i + 1 < length:
                 i += 2
-            elif text[i:i+2] == '${':
-                result.append('${x}')
+            elif text[i:i + 2] == b'${':
+                result.append(b'${x}')
                 i += 2
                 depth = 1
                 while i < length and depth > 0:
-                    if text[i] == '{':
+                    c = text[i:i + 1]
+                    if c == b'{':
                         depth += 1
-                    elif text[i] == '}':
+                    elif c == b'}':
                         depth -= 1
                     i += 1
             else:
                 i += 1
 
-        replacements.append((start, end, ''.join(result)))
+        replacements.append((start, end, b''.join(result)))
 
     def _detect_features(self, js_content: str):
         for feature_id, feature_info in self._all_features.items():
-            patterns = feature_info.get('patterns', [])
             matched_apis = []
             feature_found = False
 
-            for pattern in patterns:
-                if self._pattern_uses_shadowed_name(pattern):
-                    continue
-                try:
-                    if re.search(pattern, js_content):
-                        feature_found = True
-                        api_name = self._extract_api_name(pattern)
-                        if api_name and api_name not in matched_apis:
-                            matched_apis.append(api_name)
-                except re.error as e:
-                    logger.warning(f"Invalid regex pattern for {feature_id}: {e}")
+            for pattern in self._patterns.get(feature_id, ()):
+                if pattern.disabled or self._pattern_uses_shadowed_name(pattern.source):
                     continue
+                if timed_search(pattern, js_content):
+                    feature_found = True
+                    api_name = self._extract_api_name(pattern.source)
+                    if api_name and api_name not in matched_apis:
+                        matched_apis.append(api_name)
 
             if feature_found:
                 self.features_found.add(feature_id)
-                if not any(d['feature'] == feature_id for d in self.feature_details):
-                    self.feature_details.append({
-                        'feature': feature_id,
-                        'description': feature_info.get('description', ''),
-                        'matched_apis': matched_apis,
-                    })
+                if feature_id not in self._details:
+                    self._details.add(feature_id, feature_info.get('description', ''), matched_apis)
                 # Track matched API names for unrecognized pattern filtering
                 for api in matched_apis:
                     api_clean = api.replace('()', '').replace('new ', '')
@@ -0,0 +1,273 @@
+"""Compiled detection patterns, static cost checks and per-pattern match timings.
+
+Rule patterns are compiled once per rule-set version (see rule_registry)
+instead of being handed to re as strings on every match. Custom patterns are
+validated when custom_rules.json is loaded: invalid ones are quarantined, and
+ones that are prone to catastrophic backtracking are flagged.
+
+Python's re cannot interrupt a running match, so the time budget is enforced
+after the fact: a custom pattern whose single match takes longer than its
+budget is disabled for the rest of the process, which stops a runaway rule
+from stalling every following file. The budget grows with the size of the
+searched text (see pattern_time_budget), so a linear pattern is not disabled
+just for scanning a large bundle. Disabled patterns are listed by
+PatternStats.disabled_patterns for the analysis report.
+"""
+
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..utils.config import get_logger
+from ..utils.metrics import RULES_EVALUATED
+from ..utils.profiling import get_active_profiler
+
+try:
+    from re import _parser as _sre_parse  # Python 3.11+
+except ImportError:  # pragma: no cover
+    import sre_parse as _sre_parse
+
+logger = get_logger('parsers.rule_patterns')
+
+# Seconds a single custom-pattern match may take before the pattern is
+# disabled: PATTERN_TIME_BUDGET plus PATTERN_TIME_PER_MB for every MB searched
+PATTERN_TIME_BUDGET = 0.25
+PATTERN_TIME_PER_MB = 0.2
+
+_MAXREPEAT = _sre_parse.MAXREPEAT
+_REPEAT_OPS = tuple(
+    op for op in (
+        _sre_parse.MAX_REPEAT,
+        _sre_parse.MIN_REPEAT,
+        getattr(_sre_parse, 'POSSESSIVE_REPEAT', None),
+    ) if op is not None
+)
+_ATOMIC_GROUP = getattr(_sre_parse, 'ATOMIC_GROUP', None)
+
+NESTED_QUANTIFIER = 'nested quantifier (e.g. (a+)+) can backtrack exponentially'
+UNBOUNDED_SPAN = 'unbounded negated-class span (e.g. [^}]*) scans to the end of the block on every attempt'
+
+
+class CompiledPattern:
+    """One detection pattern of one rule, ready to match."""
+
+    __slots__ = ('category', 'feature_id', 'source', 'regex', 'custom', 'disabled')
+
+    def __init__(self, category: str, feature_id: str, source: str, regex, custom: bool):
+        self.category = category
+        self.feature_id = feature_id
+        self.source = source
+        self.regex = regex
+        self.custom = custom
+        self.disabled = False
+
+    def __repr__(self):
+        return f"CompiledPattern({self.category}:{self.feature_id} {self.source!r})"
+
+
+# -- Static analysis ---------------------------------------------------------
+
+def _children(op, av) -> Iterable:
+    if op in _REPEAT_OPS:
+        return (av[2],)
+    if op is _sre_parse.SUBPATTERN:
+        return (av[-1],)
+    if op is _sre_parse.BRANCH:
+        return av[1]
+    if op in (_sre_parse.ASSERT, _sre_parse.ASSERT_NOT):
+        return (av[1],)
+    if _ATOMIC_GROUP is not None and op is _ATOMIC_GROUP:
+        return (av,)
+    if op is _sre_parse.GROUPREF_EXISTS:
+        return tuple(p for p in av[1:] if p is not None)
+    return ()
+
+
+def _has_unbounded_repeat(items) -> bool:
+    for op, av in items:
+        if op in _REPEAT_OPS and av[1] == _MAXREPEAT:
+            return True
+        if any(_has_unbounded_repeat(child) for child in _children(op, av)):
+            return True
+    return False
+
+
+def _is_negated_class(items) -> bool:
+    items = list(items)
+    if len(items) != 1:
+        return False
+    op, av = items[0]
+    if op is _sre_parse.NOT_LITERAL:
+        return True
+    return op is _sre_parse.IN and bool(av) and av[0][0] is _sre_parse.NEGATE
+
+
+def _collect_risks(items, risks: List[str]):
+    for op, av in items:
+        if op in _REPEAT_OPS and av[1] == _MAXREPEAT:
+            body = av[2]
+            if NESTED_QUANTIFIER not in risks and _has_unbounded_repeat(body):
+                risks.append(NESTED_QUANTIFIER)
+            if UNBOUNDED_SPAN not in risks and _is_negated_class(body):
+                risks.append(UNBOUNDED_SPAN)
+        for child in _children(op, av):
+            _collect_risks(child, risks)
+
+
+def analyze_pattern_cost(pattern: str, flags: int = 0) -> List[str]:
+    """Reasons a (valid) pattern may be slow; empty when it looks safe."""
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return []
+    risks: List[str] = []
+    _collect_risks(parsed, risks)
+    return risks
+
+
+def pattern_literal(pattern: str, flags: int = 0) -> Optional[str]:
+    """The plain string a pattern matches when it has no regex syntax in effect
+    (e.g. 'translate\\(' -> 'translate('); None otherwise."""
+    try:
+        parsed = _sre_parse.parse(pattern, flags)
+    except Exception:
+        return None
+    chars = []
+    for op, av in parsed:
+        if op is not _sre_parse.LITERAL:
+            return None
+        chars.append(chr(av))
+    return ''.join(chars) or None
+
+
+def validate_patterns(patterns: Iterable) -> Tuple[List[str], List[Tuple[str, str]], Dict[str, List[str]]]:
+    """Split patterns into (valid, invalid [(pattern, error)], warnings {pattern: risks})."""
+    valid, invalid, warnings = [], [], {}
+    for pattern in patterns:
+        if not isinstance(pattern, str):
+            invalid.append((repr(pattern), 'pattern is not a string'))
+            continue
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            invalid.append((pattern, str(e)))
+            continue
+        valid.append(pattern)
+        risks = analyze_pattern_cost(pattern)
+        if risks:
+            warnings[pattern] = risks
+    return valid, invalid, warnings
+
+
+def compile_patterns(category: str, feature_id: str, patterns: Iterable,
+                     flags: int = 0, custom: bool = False) -> Tuple[CompiledPattern, ...]:
+    compiled = []
+    for pattern in patterns:
+        try:
+            compiled.append(CompiledPattern(category, feature_id, pattern, re.compile(pattern, flags), custom))
+        except (re.error, TypeError) as e:
+            logger.warning(f"Invalid regex pattern for {feature_id}: {e}")
+    return tuple(compiled)
+
+
+# -- Match timings -----------------------------------------------------------
+
+def pattern_time_budget(length: int) -> float:
+    """Seconds one search of a text of length characters may take."""
+    return PATTERN_TIME_BUDGET + PATTERN_TIME_PER_MB * length / (1024 * 1024)
+
+
+class PatternStats:
+    """Cumulative match time per pattern, for the slowest-rules report."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[Tuple[str, str, str], list] = {}   # key -> [calls, total, max, over_budget]
+        self._disabled: List[Dict] = []
+
+    def record(self, pattern: CompiledPattern, elapsed: float, length: int = 0):
+        """length is that of the searched text, which the budget scales with."""
+        key = (pattern.category, pattern.feature_id, pattern.source)
+        budget = pattern_time_budget(length)
+        over_budget = elapsed > budget
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                entry = self._stats[key] = [0, 0.0, 0.0, False]
+            entry[0] += 1
+            entry[1] += elapsed
+            if elapsed > entry[2]:
+                entry[2] = elapsed
+            if over_budget:
+                entry[3] = True
+
+        if over_budget and pattern.custom and not pattern.disabled:
+            pattern.disabled = True
+            entry = {
+                'category': pattern.category,
+                'feature': pattern.feature_id,
+                'pattern': pattern.source,
+                'elapsed_ms': round(elapsed * 1000),
+                'budget_ms': round(budget * 1000),
+            }
+            with self._lock:
+                self._disabled.append(entry)
+            logger.warning(f"{describe_disabled(entry)}; disabled for this session")
+
+    def disabled_patterns(self) -> List[Dict]:
+        """Custom patterns disabled for going over budget, in the order it happened."""
+        with self._lock:
+            return list(self._disabled)
+
+    def forget_disabled(self):
+        """Rules were recompiled; their new custom patterns start out enabled."""
+        with self._lock:
+            self._disabled.clear()
+
+    def slowest(self, limit: int = 10) -> List[Dict]:
+        with self._lock:
+            items = list(self._stats.items())
+        items.sort(key=lambda item: item[1][1], reverse=True)
+        return [
+            {
+                'category': category,
+                'feature': feature_id,
+                'pattern': source,
+                'calls': calls,
+                'total_ms': round(total * 1000, 3),
+                'max_ms': round(worst * 1000, 3),
+                'over_budget': over_budget,
+            }
+            for (category, feature_id, source), (calls, total, worst, over_budget) in items[:limit]
+        ]
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+def describe_disabled(entry: Dict) -> str:
+    """One line about an entry of PatternStats.disabled_patterns."""
+    return (f"Custom {entry['category']} rule '{entry['feature']}' pattern {entry['pattern']!r} "
+            f"took {entry['elapsed_ms']} ms (budget {entry['budget_ms']} ms)")
+
+
+_stats = PatternStats()
+
+
+def get_pattern_stats() -> PatternStats:
+    return _stats
+
+
+def timed_search(pattern: CompiledPattern, text: str) -> Optional[re.Match]:
+    """pattern.regex.search(text), timed and checked against the budget."""
+    start = time.perf_counter()
+    match = pattern.regex.search(text)
+    elapsed = time.perf_counter() - start
+    _stats.record(pattern, elapsed, len(text))
+    RULES_EVALUATED.inc(pattern.category)
+    profiler = get_active_profiler()
+    if profiler is not None:
+        profiler.record_rule(pattern.category, pattern.feature_id, pattern.source, elapsed)
+    return match
@@ -0,0 +1,141 @@
+"""Versioned snapshots of the merged (built-in + custom) detection rules.
+
+Merging the built-in feature maps with custom_rules.json costs a few dict
+copies, which used to happen on every parse_string call. The registry merges
+once per custom-rules version and hands every parser the same read-only
+snapshot; a parser only swaps its tables when the version moves on (rules
+saved or reloaded from the Rules Manager, or custom_rules.json edited on disk).
+Each snapshot also carries the rules' patterns precompiled (see rule_patterns).
+"""
+
+import re
+import threading
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from .css_feature_maps import ALL_CSS_FEATURES
+from .js_feature_maps import ALL_JS_FEATURES
+from .html_feature_maps import (
+    HTML_ELEMENTS,
+    HTML_INPUT_TYPES,
+    HTML_ATTRIBUTES,
+    HTML_ATTRIBUTE_VALUES,
+    HTML_SPECIAL_ELEMENTS,
+    HTML_ARIA_ATTRIBUTES,
+    HTML_MEDIA_TYPE_VALUES,
+    HTML_CSP_ATTRIBUTES,
+)
+from .custom_rules_loader import (
+    get_custom_css_rules,
+    get_custom_html_rules,
+    get_custom_js_rules,
+    get_custom_rules_version,
+)
+from .rule_patterns import CompiledPattern, compile_patterns, get_pattern_stats
+from ..utils.metrics import CACHE_REQUESTS
+
+# Flags each parser matches its feature patterns with
+_PATTERN_FLAGS = {'css': re.IGNORECASE, 'javascript': 0}
+
+CompiledRules = Dict[str, Tuple[CompiledPattern, ...]]
+
+
+class HTMLRules(NamedTuple):
+    elements: Dict[str, str]
+    input_types: Dict[str, str]
+    attributes: Dict[str, str]
+    attribute_values: Dict[Tuple[str, str], str]
+
+
+class RuleSnapshot(NamedTuple):
+    """Merged rule tables for one custom-rules version. Treat as read-only."""
+    version: int
+    css: Dict[str, Dict]
+    js: Dict[str, Dict]
+    html: HTMLRules
+    css_patterns: CompiledRules
+    js_patterns: CompiledRules
+
+
+# Built-in patterns never change, so they are compiled once per process
+_builtin_patterns: Dict[str, CompiledRules] = {}
+
+
+def _compile_rules(category: str, builtin: Dict[str, Dict], custom: Dict[str, Dict]) -> CompiledRules:
+    flags = _PATTERN_FLAGS[category]
+    if category not in _builtin_patterns:
+        _builtin_patterns[category] = {
+            feature_id: compile_patterns(category, feature_id, info.get('patterns', []), flags)
+            for feature_id, info in builtin.items()
+        }
+    compiled = dict(_builtin_patterns[category])
+    for feature_id, info in custom.items():
+        compiled[feature_id] = compile_patterns(category, feature_id, info.get('patterns', []), flags, custom=True)
+    return compiled
+
+
+def _build_snapshot(version: int) -> RuleSnapshot:
+    custom_html = get_custom_html_rules()
+    # Custom "attr:value" keys become (attr, value) tuples like the built-ins
+    custom_attr_values = {}
+    for key, value in custom_html.get('attribute_values', {}).items():
+        if ':' in key:
+            attr, val = key.split(':', 1)
+            custom_attr_values[(attr, val)] = value
+
+    html = HTMLRules(
+        elements={**HTML_ELEMENTS, **HTML_SPECIAL_ELEMENTS, **custom_html.get('elements', {})},
+        input_types={**HTML_INPUT_TYPES, **custom_html.get('input_types', {})},
+        attributes={**HTML_ATTRIBUTES, **HTML_ARIA_ATTRIBUTES, **custom_html.get('attributes', {})},
+        attribute_values={**HTML_ATTRIBUTE_VALUES, **HTML_MEDIA_TYPE_VALUES,
+                          **HTML_CSP_ATTRIBUTES, **custom_attr_values},
+    )
+    custom_css = get_custom_css_rules()
+    custom_js = get_custom_js_rules()
+    return RuleSnapshot(
+        version=version,
+        css={**ALL_CSS_FEATURES, **custom_css},
+        js={**ALL_JS_FEATURES, **custom_js},
+        html=html,
+        css_patterns=_compile_rules('css', ALL_CSS_FEATURES, custom_css),
+        js_patterns=_compile_rules('javascript', ALL_JS_FEATURES, custom_js),
+    )
+
+
+class RuleRegistry:
+    """Builds at most one RuleSnapshot per custom-rules version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot: Optional[RuleSnapshot] = None
+
+    def get_version(self) -> int:
+        return get_custom_rules_version()
+
+    def get_snapshot(self) -> RuleSnapshot:
+        version = get_custom_rules_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            CACHE_REQUESTS.inc('rules', 'hit')
+            return snapshot
+
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                CACHE_REQUESTS.inc('rules', 'miss')
+                snapshot = _build_snapshot(version)
+                self._snapshot = snapshot
+                get_pattern_stats().forget_disabled()
+            else:
+                CACHE_REQUESTS.inc('rules', 'hit')
+            return snapshot
+
+
+_registry = RuleRegistry()
+
+
+def get_rule_registry() -> RuleRegistry:
+    return _registry
+
+
+def get_rule_snapshot() -> RuleSnapshot:
+    return _registry.get_snapshot()
@@ -0,0 +1,49 @@
+"""Reading source files once, as bytes, without extra copies for large ones.
+
+Files of LARGE_FILE_SIZE or more are memory-mapped instead of read: the
+parsers (and tree-sitter) work on the mapped pages directly, so a 50 MB
+bundle is not also held as a 50 MB bytes object plus a decoded str.
+"""
+
+import codecs
+import mmap
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+# Files at least this large are memory-mapped
+LARGE_FILE_SIZE = 8 * 1024 * 1024
+
+# UTF-8 validation decodes this much at a time
+_VALIDATE_CHUNK = 1024 * 1024
+
+Source = Union[bytes, mmap.mmap]
+
+
+@contextmanager
+def open_source(filepath: Union[str, Path]) -> Iterator[Source]:
+    """The file's content as bytes, or as a read-only mmap for large files.
+
+    The mmap is closed when the block exits, so nothing may keep slices
+    of it as memoryviews beyond that (bytes slices are fine).
+    """
+    with open(filepath, 'rb') as f:
+        f.seek(0, 2)
+        size = f.tell()
+        f.seek(0)
+        if size < LARGE_FILE_SIZE:
+            yield f.read()
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def check_utf8(source: Source):
+    """Raise UnicodeDecodeError unless source is valid UTF-8, decoding it piecewise."""
+    decoder = codecs.getincrementaldecoder('utf-8')()
+    for start in range(0, len(source), _VALIDATE_CHUNK):
+        decoder.decode(source[start:start + _VALIDATE_CHUNK])
+    decoder.decode(b'', final=True)
@@ -0,0 +1,56 @@
+"""Offset bookkeeping for reporting where in a source a feature was found.
+
+Parsers match on derived text (JS with comments and strings blanked, bytes
+instead of str); these helpers map a hit's offset back to a character
+offset in the text that was parsed, e.g. to tell which inline <script> or
+<style> fragment of an HTML document it came from.
+"""
+
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, List
+
+
+def byte_to_char(text: str) -> Callable[[int], int]:
+    """Function mapping byte offsets in text's UTF-8 encoding to offsets in text."""
+    if text.isascii():
+        return lambda offset: offset
+    starts = list(accumulate((len(c.encode('utf-8')) for c in text), initial=0))
+    return lambda offset: bisect_right(starts, offset) - 1
+
+
+def char_to_byte(text: str) -> Callable[[int], int]:
+    """Function mapping offsets in text to byte offsets in its UTF-8 encoding."""
+    if text.isascii():
+        return lambda offset: offset
+    starts = list(accumulate((len(c.encode('utf-8')) for c in text), initial=0))
+    return lambda offset: starts[min(offset, len(starts) - 1)]
+
+
+class OffsetMap:
+    """Offsets in a derived text -> offsets in the text it was built from.
+
+    The derived text is built piece by piece; add(derived, original) is
+    called where each piece starts. Offsets inside a piece keep their
+    distance from its start (clamped to the next piece's start for
+    replacements shorter in the original).
+    """
+
+    __slots__ = ('_derived', '_original')
+
+    def __init__(self):
+        self._derived: List[int] = []
+        self._original: List[int] = []
+
+    def add(self, derived: int, original: int):
+        self._derived.append(derived)
+        self._original.append(original)
+
+    def original(self, offset: int) -> int:
+        index = bisect_right(self._derived, offset) - 1
+        if index < 0:
+            return offset
+        mapped = self._original[index] + offset - self._derived[index]
+        if index + 1 < len(self._original):
+            mapped = min(mapped, max(self._original[index + 1] - 1, self._original[index]))
+        return mapped
@@ -2,7 +2,7 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Optional, Any
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from ..utils.config import get_logger
 
@@ -28,9 +28,11 @@ class PolyfillLoader:
         PolyfillLoader._loaded = True
 
         self._data: Dict[str, Any] = {}
+        self.version = 0
         self._load_data()
 
     def _load_data(self):
+        self.version += 1
         if not POLYFILL_MAP_PATH.exists():
             logger.warning(f"Polyfill map not found at {POLYFILL_MAP_PATH}")
             self._data = {'javascript': {}, 'css': {}, 'html': {}}
@@ -66,6 +68,12 @@ class PolyfillLoader:
 
         return None
 
+    def iter_polyfills(self) -> Iterator[Tuple[str, str, Dict]]:
+        """(category, feature_id, entry) for every mapped feature."""
+        for category in ('javascript', 'css', 'html'):
+            for feature_id, entry in self._data.get(category, {}).items():
+                yield category, feature_id, entry
+
     def reload(self):
         self._load_data()
 
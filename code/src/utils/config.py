@@ -15,6 +15,10 @@ NPM_REGISTRY_URL = "https://registry.npmjs.org/caniuse-db/latest"
 WEB_FEATURES_URL = "https://unpkg.com/web-features/data.json"
 WEB_FEATURES_CACHE_DIR = Path.home() / ".crossguard"
 WEB_FEATURES_CACHE_PATH = WEB_FEATURES_CACHE_DIR / "web_features.json"
+# Compact caniuse id -> Baseline status/dates, derived from the cache above
+WEB_FEATURES_INDEX_PATH = WEB_FEATURES_CACHE_DIR / "baseline_index.json"
+# Locally added library fingerprints (crossguard fingerprint add)
+LIBRARY_FINGERPRINTS_PATH = WEB_FEATURES_CACHE_DIR / "fingerprints.json"
 
 # Hardcoded fallback used only when the Can I Use database can't be read.
 # Real defaults are computed from the live database below so GUI and CLI
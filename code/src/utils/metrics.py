@@ -0,0 +1,257 @@
+"""In-process counters and histograms, rendered in Prometheus text format.
+
+Metrics are off by default. Every instrument checks a single flag before
+touching its lock, so instrumented hot paths (per file, per rule pattern)
+cost one attribute lookup when nobody is collecting. Enable collection with
+enable_metrics() (or CROSSGUARD_METRICS=1), then read it back with
+render_metrics() or serve it on a local port with start_metrics_server().
+
+Label values are passed positionally, in the order the metric declared its
+label names: FILES_PARSED.inc('css').
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .config import get_logger
+
+logger = get_logger('utils.metrics')
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Seconds; covers a sub-millisecond parse up to a pathological 10 s file
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 10.0)
+
+_INF_BUCKET = 'le="+Inf"'
+
+
+class _State:
+    enabled = os.environ.get('CROSSGUARD_METRICS', '') not in ('', '0')
+
+
+_state = _State()
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class Counter:
+    """Monotonic total, one series per label-value combination."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1):
+        if not _state.enabled:
+            return
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def value(self, *label_values: str) -> float:
+        with self._lock:
+            return self._values.get(label_values, 0)
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_label_text(self.label_names, key)} {_format_value(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram:
+    """Observations counted into cumulative buckets, plus their sum and count."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, ...], list] = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *label_values: str):
+        if not _state.enabled:
+            return
+        with self._lock:
+            series = self._series.get(label_values)
+            if series is None:
+                series = self._series[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, *label_values: str) -> int:
+        with self._lock:
+            series = self._series.get(label_values)
+            return series[-1] if series else 0
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            cumulative = 0
+            for bound, hits in zip(self.buckets, series):
+                cumulative += hits
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_bucket{_label_text(self.label_names, key, _INF_BUCKET)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_label_text(self.label_names, key)} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{_label_text(self.label_names, key)} {series[-1]}")
+        return lines
+
+
+class MetricsRegistry:
+    """Named instruments, in registration order."""
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labels))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help_text, labels, buckets))
+
+    def _register(self, metric):
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric '{metric.name}' is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def get(self, name: str):
+        return self._metrics.get(name)
+
+    def reset(self):
+        for metric in self._metrics.values():
+            metric.reset()
+
+    def render(self) -> str:
+        """Every metric in the Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+_registry = MetricsRegistry()
+
+FILES_PARSED = _registry.counter(
+    'crossguard_files_parsed_total', 'Source files parsed, by language.', ('language',))
+BYTES_PROCESSED = _registry.counter(
+    'crossguard_bytes_processed_total', 'Bytes of source read by the parsers, by language.', ('language',))
+PARSE_SECONDS = _registry.histogram(
+    'crossguard_parse_duration_seconds', 'Time to parse one file, by language.', ('language',))
+RULES_EVALUATED = _registry.counter(
+    'crossguard_rules_evaluated_total', 'Detection pattern searches run, by rule category.', ('category',))
+CACHE_REQUESTS = _registry.counter(
+    'crossguard_cache_requests_total', 'Cache lookups, by cache and hit/miss.', ('cache', 'result'))
+DB_LOOKUPS = _registry.counter(
+    'crossguard_db_lookups_total',
+    'Can I Use support lookups, by outcome (exact version, nearest version, unknown).', ('result',))
+HISTORY_WRITE_SECONDS = _registry.histogram(
+    'crossguard_history_write_duration_seconds', 'Time to save one analysis to the history database.')
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    return _registry
+
+
+def metrics_enabled() -> bool:
+    return _state.enabled
+
+
+def enable_metrics():
+    _state.enabled = True
+
+
+def disable_metrics():
+    _state.enabled = False
+
+
+def render_metrics() -> str:
+    return _registry.render()
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1'):
+    """Serve /metrics from a daemon thread and enable collection.
+
+    Binds to localhost by default; port 0 picks a free port (see
+    server.server_address). Stop it with server.shutdown().
+    """
+    # Imported here: http.server pulls in ssl/email, which every CLI start would pay for
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+
+        def do_GET(self):
+            if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                self.send_error(404)
+                return
+            body = render_metrics().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', CONTENT_TYPE)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logger.debug(f"metrics {self.address_string()} {format % args}")
+
+    server = ThreadingHTTPServer((host, port), MetricsHandler)
+    thread = threading.Thread(target=server.serve_forever, name='crossguard-metrics', daemon=True)
+    thread.start()
+    enable_metrics()
+    logger.info(f"Serving metrics on http://{host}:{server.server_address[1]}/metrics")
+    return server
+
+
+def write_metrics(path: Optional[str]) -> str:
+    """Render the metrics and write them to path (if given); returns the text."""
+    text = render_metrics()
+    if path:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return text
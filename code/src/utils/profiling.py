@@ -0,0 +1,107 @@
+"""Opt-in wall-clock profiling of the analysis pipeline.
+
+A Profiler is activated for the current thread; code on the hot path marks
+its work with profile_stage('name'), which is a shared no-op context manager
+when nothing is being profiled. Stage names are dotted ('parse.css',
+'css.regex'); a stage nested in another counts towards both.
+"""
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Dict, List, Optional
+
+_local = threading.local()
+_NO_STAGE = nullcontext()
+
+# How many files/rules Profiler.to_dict() lists by default
+DEFAULT_TOP_N = 10
+
+
+class Profiler:
+    """Collects per-stage, per-file and per-rule timings for one run."""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._stages: Dict[str, list] = {}     # name -> [calls, seconds]
+        self._files: List[Dict] = []
+        self._rules: Dict[tuple, list] = {}    # (category, feature, pattern) -> [calls, seconds]
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - start)
+
+    def add_stage(self, name: str, seconds: float):
+        entry = self._stages.get(name)
+        if entry is None:
+            entry = self._stages[name] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def record_file(self, path: str, language: str, seconds: float, features: int = 0):
+        self._files.append({
+            'file': path,
+            'language': language,
+            'ms': round(seconds * 1000, 3),
+            'features': features,
+        })
+
+    def record_rule(self, category: str, feature_id: str, pattern: str, seconds: float):
+        key = (category, feature_id, pattern)
+        entry = self._rules.get(key)
+        if entry is None:
+            entry = self._rules[key] = [0, 0.0]
+        entry[0] += 1
+        entry[1] += seconds
+
+    def to_dict(self, top_n: int = DEFAULT_TOP_N) -> Dict:
+        """Plain-dict summary, stages in first-seen order, files and rules slowest first."""
+        rules = sorted(self._rules.items(), key=lambda item: item[1][1], reverse=True)
+        return {
+            'total_ms': round((time.perf_counter() - self._started) * 1000, 3),
+            'stages': [
+                {'stage': name, 'calls': calls, 'ms': round(seconds * 1000, 3)}
+                for name, (calls, seconds) in self._stages.items()
+            ],
+            'files': sorted(self._files, key=lambda f: f['ms'], reverse=True)[:top_n],
+            'files_profiled': len(self._files),
+            'rules': [
+                {
+                    'category': category,
+                    'feature': feature_id,
+                    'pattern': pattern,
+                    'calls': calls,
+                    'ms': round(seconds * 1000, 3),
+                }
+                for (category, feature_id, pattern), (calls, seconds) in rules[:top_n]
+            ],
+        }
+
+
+def get_active_profiler() -> Optional[Profiler]:
+    return getattr(_local, 'profiler', None)
+
+
+@contextmanager
+def activate_profiler(profiler: Optional[Profiler]):
+    """Make profiler the current thread's profiler for the block (None leaves it unchanged)."""
+    if profiler is None:
+        yield None
+        return
+    previous = get_active_profiler()
+    _local.profiler = profiler
+    try:
+        yield profiler
+    finally:
+        _local.profiler = previous
+
+
+def profile_stage(name: str):
+    profiler = getattr(_local, 'profiler', None)
+    if profiler is None:
+        return _NO_STAGE
+    return profiler.stage(name)
@@ -3,6 +3,14 @@
 Module-scoped database loading avoids re-reading 570+ JSON feature files per test.
 """
 
+import base64
+import hashlib
+import io
+import json
+import tarfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 
 from src.analyzer.database import CanIUseDatabase
@@ -54,3 +62,106 @@ def modern_browsers():
 def well_supported_features():
     """Features with near-universal modern browser support."""
     return {'flexbox', 'css-grid', 'promises', 'arrow-functions'}
+
+
+# ─── npm Registry Stand-in ──────────────────────────────────────────────
+
+def make_caniuse_tarball(version: str, features: dict) -> bytes:
+    """A caniuse-db style .tgz: package/{package.json,data.json,features-json/*.json} plus noise."""
+    files = {
+        'package/package.json': json.dumps({'name': 'caniuse-db', 'version': version}),
+        'package/data.json': json.dumps({'updated': 1700000000, 'data': features}),
+        'package/README.md': 'not installed',
+        'package/fulldata-json/data-2.0.json': '{}',
+    }
+    for feature_id, data in features.items():
+        files[f'package/features-json/{feature_id}.json'] = json.dumps(data)
+    buffer = io.BytesIO()
+    with tarfile.open(fileobj=buffer, mode='w:gz') as tar:
+        for name, text in files.items():
+            payload = text.encode()
+            info = tarfile.TarInfo(name)
+            info.size = len(payload)
+            tar.addfile(info, io.BytesIO(payload))
+    return buffer.getvalue()
+
+
+class FakeNpmRegistry:
+    """Serves /caniuse-db/latest and the tarball, with ETag, 304 and Range support."""
+
+    def __init__(self):
+        self.requests = []           # (path, headers) per request
+        self.publish('1.0.0', {'css-grid': {'title': 'Grid', 'stats': {}}})
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def registry_url(self) -> str:
+        return f"{self.base_url}/caniuse-db/latest"
+
+    def publish(self, version: str, features: dict):
+        self.version = version
+        self.tarball = make_caniuse_tarball(version, features)
+        self.integrity = 'sha512-' + base64.b64encode(hashlib.sha512(self.tarball).digest()).decode()
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                registry.requests.append((self.path, dict(self.headers)))
+                if self.path == '/caniuse-db/latest':
+                    self._metadata()
+                elif self.path == f'/caniuse-db-{registry.version}.tgz':
+                    self._tarball()
+                else:
+                    self.send_error(404)
+
+            def _metadata(self):
+                etag = f'"meta-{registry.version}"'
+                if self.headers.get('If-None-Match') == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                body = json.dumps({'version': registry.version, 'dist': {
+                    'tarball': f'{registry.base_url}/caniuse-db-{registry.version}.tgz',
+                    'integrity': registry.integrity,
+                }}).encode()
+                self._send(200, body, {'ETag': etag})
+
+            def _tarball(self):
+                etag = f'"tgz-{registry.version}"'
+                body = registry.tarball
+                range_header = self.headers.get('Range', '')
+                if range_header.startswith('bytes=') and self.headers.get('If-Range') == etag:
+                    start = int(range_header[len('bytes='):].rstrip('-'))
+                    self._send(206, body[start:], {
+                        'ETag': etag, 'Content-Range': f'bytes {start}-{len(body) - 1}/{len(body)}'})
+                    return
+                self._send(200, body, {'ETag': etag})
+
+            def _send(self, status, body, headers):
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def npm_registry():
+    """Local HTTP stand-in for the npm registry; see FakeNpmRegistry."""
+    registry = FakeNpmRegistry()
+    yield registry
+    registry.close()
@@ -1,12 +1,27 @@
-"""White-box tests for analyzer internals -- database loading.
+"""White-box tests for analyzer internals -- database loading, progress, cancellation
+the feature metadata table, the Baseline index, database downloads, library
+fingerprints, the per-file result cache and merging per-file results.
 
 Tests internal state and loading correctness that is not exposed through the
 public analysis API.
 """
 
+import base64
+import json
+import os
+import threading
+
 import pytest
 
 from src.analyzer.database import CanIUseDatabase
+from src.analyzer.database_updater import DatabaseUpdater
+from src.analyzer.feature_metadata import get_feature_metadata
+from src.analyzer.file_results import FileResult
+import src.analyzer.fingerprints as fingerprints_module
+from src.analyzer.fingerprints import LibraryFingerprints, content_hash, guess_library_name, rules_stamp
+from src.analyzer.main import AnalysisCancelledError, CrossGuardAnalyzer
+import src.analyzer.web_features as web_features_module
+from src.analyzer.web_features import BaselineInfo, WebFeaturesManager, get_web_features_manager
 
 
 # ============================================================================
@@ -21,3 +36,640 @@ class TestDatabaseLoading:
         assert caniuse_db.loaded is True
         assert len(caniuse_db.features) > 500
         assert len(caniuse_db.feature_index) > 0
+
+
+# ============================================================================
+# Inline CSS/JS in HTML
+# ============================================================================
+
+class TestInlineSources:
+    """<style>, style="" and <script> content in HTML is analyzed as CSS/JS."""
+
+    @pytest.mark.whitebox
+    def test_inline_code_counts_towards_css_and_js(self, tmp_path, modern_browsers):
+        page = tmp_path / 'page.html'
+        page.write_text(
+            '<style>.a { display: grid; }</style>'
+            '<div style="aspect-ratio: 1 / 1"></div>'
+            '<script>fetch("/api");</script>',
+            encoding='utf-8',
+        )
+        analyzer = CrossGuardAnalyzer()
+        report = analyzer.run_analysis(html_files=[str(page)], target_browsers=modern_browsers)
+
+        assert report['success'] is True
+        assert {'css-grid', 'css-aspect-ratio'} <= analyzer.css_features
+        assert 'fetch' in analyzer.js_features
+        fetch = next(d for d in analyzer.js_feature_details if d['feature'] == 'fetch')
+        assert fetch['inline_sources'] == ['<script> #1']
+
+    @pytest.mark.whitebox
+    def test_features_are_credited_to_the_fragment_they_were_found_in(self, tmp_path, modern_browsers):
+        page = tmp_path / 'page.html'
+        page.write_text(
+            '<style>.a { display: grid; }</style>'
+            '<div style="display: flex; gap: 1px"></div>'
+            '<script>// fetch() is not used here\nconst url = "fetch(x)";</script>'
+            '<script>fetch(url);</script>',
+            encoding='utf-8',
+        )
+        analyzer = CrossGuardAnalyzer()
+        analyzer.run_analysis(html_files=[str(page)], target_browsers=modern_browsers)
+
+        sources = {d['feature']: d['inline_sources']
+                   for d in analyzer.css_feature_details + analyzer.js_feature_details}
+        assert sources['css-grid'] == ['<style> #1']
+        assert sources['flexbox'] == ['style attribute on <div>']
+        assert sources['flexbox-gap'] == ['style attribute on <div>']
+        assert sources['fetch'] == ['<script> #2']
+
+
+# ============================================================================
+# Progress Reporting and Cancellation
+# ============================================================================
+
+class TestProgressAndCancel:
+    """run_analysis() reports per-file progress and stops when cancel_event is set."""
+
+    @pytest.fixture
+    def css_files(self, tmp_path):
+        paths = []
+        for name, body in [('a.css', '.a { display: grid; }'), ('b.css', '.b { display: flex; }')]:
+            path = tmp_path / name
+            path.write_text(body, encoding='utf-8')
+            paths.append(str(path))
+        return paths
+
+    @pytest.mark.whitebox
+    def test_progress_reported_after_each_file(self, css_files, modern_browsers):
+        updates = []
+        CrossGuardAnalyzer().run_analysis(
+            css_files=css_files,
+            target_browsers=modern_browsers,
+            progress_callback=lambda msg, pct: updates.append((msg, pct)),
+        )
+
+        messages = [msg for msg, _ in updates]
+        assert messages[0].startswith('Parsed a.css (1/2 files')
+        assert messages[1].startswith('Parsed b.css (2/2 files')
+        percentages = [pct for _, pct in updates]
+        assert percentages == sorted(percentages)
+        assert percentages[-1] <= 100
+
+    @pytest.mark.whitebox
+    def test_failing_callback_does_not_abort_analysis(self, css_files, modern_browsers):
+        def broken(msg, pct):
+            raise RuntimeError("widget destroyed")
+
+        report = CrossGuardAnalyzer().run_analysis(
+            css_files=css_files, target_browsers=modern_browsers, progress_callback=broken,
+        )
+        assert report['success'] is True
+
+    @pytest.mark.whitebox
+    def test_cancel_event_stops_before_next_file(self, css_files, modern_browsers):
+        cancel = threading.Event()
+        parsed = []
+
+        def on_progress(msg, pct):
+            parsed.append(msg)
+            cancel.set()
+
+        with pytest.raises(AnalysisCancelledError):
+            CrossGuardAnalyzer().run_analysis(
+                css_files=css_files,
+                target_browsers=modern_browsers,
+                progress_callback=on_progress,
+                cancel_event=cancel,
+            )
+        assert len(parsed) == 1
+
+
+# ============================================================================
+# Feature metadata table
+# ============================================================================
+
+class _StubWebFeatures(WebFeaturesManager):
+    """Baseline data from a dict instead of the web-features download."""
+
+    def __init__(self, baseline):
+        super().__init__()
+        self._reverse_map = baseline
+        self.builds = 0
+
+    def get_baseline_map(self):
+        self.builds += 1
+        return self._reverse_map
+
+    def has_data(self):
+        return True
+
+
+class TestFeatureMetadata:
+
+    @pytest.fixture
+    def web_features(self):
+        return _StubWebFeatures({'css-grid': BaselineInfo('high', '2017-10-17', '2020-04-17')})
+
+    @pytest.mark.whitebox
+    def test_resolves_every_source_once(self, web_features):
+        table = get_feature_metadata(web_features)
+        grid = table.get('css-grid')
+
+        assert grid.name == 'CSS Grid Layout'
+        assert grid.category == 'css'
+        assert grid.baseline_label == 'Widely'
+        assert grid.to_dict()['baseline']['high_date'] == '2020-04-17'
+        assert table.get('details').category == 'html'
+        assert table.get('promises').category == 'js'
+        assert table.get('promises').baseline_label == 'Unknown'
+        assert get_feature_metadata(web_features) is table
+        assert web_features.builds == 1
+
+    @pytest.mark.whitebox
+    def test_unknown_feature_gets_fallback_name(self, web_features):
+        table = get_feature_metadata(web_features)
+        entry = table.get('made-up-feature')
+        assert entry.name == 'Made Up Feature'
+        assert entry.category is None
+        assert table.get('made-up-feature') is entry
+
+    @pytest.mark.whitebox
+    def test_rebuilt_when_baseline_data_changes(self, web_features):
+        table = get_feature_metadata(web_features)
+        web_features.generation += 1
+        assert get_feature_metadata(web_features) is not table
+        assert web_features.builds == 2
+
+
+# ============================================================================
+# Baseline index
+# ============================================================================
+
+class TestBaselineIndex:
+    """The compact caniuse-id index persisted next to the web-features download."""
+
+    @pytest.fixture
+    def cache_paths(self, tmp_path, monkeypatch):
+        cache = tmp_path / "web_features.json"
+        index = tmp_path / "baseline_index.json"
+        monkeypatch.setattr(web_features_module, "WEB_FEATURES_CACHE_PATH", cache)
+        monkeypatch.setattr(web_features_module, "WEB_FEATURES_INDEX_PATH", index)
+        cache.write_text(json.dumps({"features": {
+            "grid": {"caniuse": ["css-grid"], "status": {
+                "baseline": "high", "baseline_low_date": "2017-10-17", "baseline_high_date": "2020-04-17"}},
+            "dialog": {"caniuse": "dialog", "status": {"baseline": False}},
+            "no-caniuse": {"status": {"baseline": "low"}},
+        }}))
+        return cache, index
+
+    @pytest.mark.whitebox
+    def test_first_lookup_writes_index(self, cache_paths):
+        _, index = cache_paths
+        info = WebFeaturesManager().get_baseline_status('css-grid')
+
+        assert (info.status, info.low_date, info.high_date) == ('high', '2017-10-17', '2020-04-17')
+        assert json.loads(index.read_text())['features'] == {
+            'css-grid': ['high', '2017-10-17', '2020-04-17'],
+            'dialog': ['limited', None, None],
+        }
+
+    @pytest.mark.whitebox
+    def test_later_lookups_skip_the_full_download(self, cache_paths, monkeypatch):
+        WebFeaturesManager().get_baseline_status('css-grid')
+
+        def fail():
+            raise AssertionError("full web-features JSON was parsed again")
+        manager = WebFeaturesManager()
+        monkeypatch.setattr(manager, '_load_cache', fail)
+        assert manager.get_baseline_status('dialog').status == 'limited'
+
+    @pytest.mark.whitebox
+    def test_index_rebuilt_when_download_changes(self, cache_paths):
+        cache, _ = cache_paths
+        WebFeaturesManager().get_baseline_status('css-grid')
+
+        cache.write_text(json.dumps({"features": {
+            "grid": {"caniuse": ["css-grid"], "status": {"baseline": "low"}},
+        }}))
+        os.utime(cache, ns=(0, 1))  # a distinct mtime even on coarse filesystems
+        assert WebFeaturesManager().get_baseline_status('css-grid').status == 'low'
+
+    @pytest.mark.whitebox
+    def test_analyzer_and_service_share_one_manager(self):
+        from src.api.service import AnalyzerService
+        assert CrossGuardAnalyzer().web_features is get_web_features_manager()
+        assert AnalyzerService()._get_web_features() is get_web_features_manager()
+
+
+# ============================================================================
+# npm database downloads
+# ============================================================================
+
+class TestDatabaseDownload:
+    """download_npm_update against a local registry stand-in."""
+
+    @pytest.fixture
+    def updater(self, tmp_path, npm_registry):
+        return DatabaseUpdater(tmp_path / "caniuse", registry_url=npm_registry.registry_url)
+
+    @pytest.mark.whitebox
+    def test_installs_only_needed_members_and_keeps_extra_entries(self, updater):
+        (updater.caniuse_dir / ".git").mkdir(parents=True)
+        (updater.caniuse_dir / "data.json").write_text("{}")
+
+        result = updater.download_npm_update()
+
+        assert result['success'] is True, result
+        installed = sorted(p.relative_to(updater.caniuse_dir).as_posix()
+                           for p in updater.caniuse_dir.rglob('*'))
+        assert installed == ['.git', 'data.json', 'features-json',
+                             'features-json/css-grid.json', 'package.json']
+        assert updater.get_local_npm_version() == '1.0.0'
+        # The real directory was moved behind the symlink, then replaced by the new version
+        assert updater.caniuse_dir.is_symlink()
+        [version_dir] = updater.caniuse_dir.parent.glob('.caniuse.*')
+        assert updater.caniuse_dir.resolve() == version_dir.resolve()
+        assert not list(updater.caniuse_dir.parent.glob('.caniuse-*-*'))  # no links or retired dirs left
+
+    @pytest.mark.whitebox
+    def test_unchanged_registry_answers_304(self, updater, npm_registry):
+        updater.download_npm_update()
+        result = updater.download_npm_update()
+
+        assert result.get('no_changes') is True
+        path, headers = npm_registry.requests[-1]
+        assert headers.get('If-None-Match') == '"meta-1.0.0"'
+
+        npm_registry.publish('1.1.0', {'flexbox': {'title': 'Flexbox', 'stats': {}}})
+        assert updater.download_npm_update()['npm_version'] == '1.1.0'
+        assert (updater.caniuse_dir / 'features-json' / 'flexbox.json').exists()
+        assert not (updater.caniuse_dir / 'features-json' / 'css-grid.json').exists()
+
+    @staticmethod
+    def _fail_replace_into(monkeypatch, target, after=0):
+        """Make os.replace fail for the (after+1)-th and later moves onto target or into it."""
+        real_replace = os.replace
+        calls = []
+
+        def replace(src, dst, *args, **kwargs):
+            if str(dst) == str(target) or str(dst).startswith(str(target) + os.sep):
+                calls.append(dst)
+                if len(calls) > after:
+                    raise OSError("simulated failure")
+            return real_replace(src, dst, *args, **kwargs)
+        monkeypatch.setattr(os, 'replace', replace)
+
+    @pytest.mark.whitebox
+    def test_new_install_is_swapped_in_through_a_symlink(self, updater, npm_registry):
+        updater.download_npm_update()
+        assert updater.caniuse_dir.is_symlink()
+        (updater.caniuse_dir / ".git").mkdir()
+        (updater.caniuse_dir / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+
+        npm_registry.publish('1.1.0', {'flexbox': {'title': 'Flexbox', 'stats': {}}})
+        assert updater.download_npm_update()['success'] is True
+
+        assert (updater.caniuse_dir / ".git" / "HEAD").read_text() == "ref: refs/heads/main\n"
+        assert updater.get_local_npm_version() == '1.1.0'
+        [version_dir] = updater.caniuse_dir.parent.glob('.caniuse.*')  # the old version is gone
+        assert updater.caniuse_dir.resolve() == version_dir.resolve()
+
+    @pytest.mark.whitebox
+    def test_failed_swap_keeps_old_version_and_extra_entries(self, updater, npm_registry, monkeypatch):
+        updater.download_npm_update()
+        (updater.caniuse_dir / ".git").mkdir()
+        (updater.caniuse_dir / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+        old_version = updater.caniuse_dir.resolve()
+        npm_registry.publish('1.1.0', {'flexbox': {'title': 'Flexbox', 'stats': {}}})
+        self._fail_replace_into(monkeypatch, updater.caniuse_dir)
+
+        result = updater.download_npm_update()
+
+        assert result['success'] is False
+        assert updater.caniuse_dir.resolve() == old_version
+        assert (updater.caniuse_dir / ".git" / "HEAD").read_text() == "ref: refs/heads/main\n"
+        assert updater.get_local_npm_version() == '1.0.0'
+        assert [p.name for p in updater.caniuse_dir.parent.glob('.caniuse.*')] == [old_version.name]
+        assert not list(updater.caniuse_dir.parent.glob('.caniuse-link-*'))
+
+    @pytest.mark.whitebox
+    @pytest.mark.parametrize('fail_after', [0, 1], ids=['migration-fails', 'swap-fails'])
+    def test_failed_update_of_real_directory_keeps_it_whole(self, updater, monkeypatch, fail_after):
+        (updater.caniuse_dir / ".git").mkdir(parents=True)
+        (updater.caniuse_dir / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+        (updater.caniuse_dir / "data.json").write_text("{}")
+        self._fail_replace_into(monkeypatch, updater.caniuse_dir, after=fail_after)
+
+        result = updater.download_npm_update()
+
+        assert result['success'] is False
+        # Only the old database, whole: no new feature files next to the old data.json
+        installed = sorted(p.relative_to(updater.caniuse_dir).as_posix()
+                           for p in updater.caniuse_dir.rglob('*'))
+        assert installed == ['.git', '.git/HEAD', 'data.json']
+        assert (updater.caniuse_dir / ".git" / "HEAD").read_text() == "ref: refs/heads/main\n"
+        assert (updater.caniuse_dir / "data.json").read_text() == "{}"
+        assert updater.caniuse_dir.is_symlink() == (fail_after == 1)
+        assert len(list(updater.caniuse_dir.parent.glob('.caniuse.*'))) == fail_after
+        assert not list(updater.caniuse_dir.parent.glob('.caniuse-*-*'))
+
+    @pytest.mark.whitebox
+    def test_without_symlinks_directories_are_swapped(self, updater, monkeypatch):
+        def no_symlinks(*args, **kwargs):
+            raise OSError("symbolic links are not available")
+        monkeypatch.setattr(os, 'symlink', no_symlinks)
+        (updater.caniuse_dir / ".git").mkdir(parents=True)
+        (updater.caniuse_dir / ".git" / "HEAD").write_text("ref: refs/heads/main\n")
+
+        assert updater.download_npm_update()['success'] is True
+
+        assert not updater.caniuse_dir.is_symlink()
+        assert (updater.caniuse_dir / ".git" / "HEAD").read_text() == "ref: refs/heads/main\n"
+        assert updater.get_local_npm_version() == '1.0.0'
+        assert not list(updater.caniuse_dir.parent.glob('.caniuse.*'))
+        assert not list(updater.caniuse_dir.parent.glob('.caniuse-*-*'))
+
+    @pytest.mark.whitebox
+    def test_integrity_mismatch_leaves_database_untouched(self, updater, npm_registry):
+        updater.download_npm_update()
+        npm_registry.publish('2.0.0', {'flexbox': {}})
+        npm_registry.integrity = 'sha512-' + base64.b64encode(b'x' * 64).decode()
+
+        result = updater.download_npm_update()
+
+        assert result['success'] is False
+        assert 'integrity' in result['message']
+        assert updater.get_local_npm_version() == '1.0.0'
+        assert not list(updater.download_dir.glob('*.part'))
+
+    @pytest.mark.whitebox
+    def test_interrupted_download_is_resumed(self, updater, npm_registry):
+        url = f"{npm_registry.base_url}/caniuse-db-1.0.0.tgz"
+        updater.download_dir.mkdir(parents=True)
+        (updater.download_dir / 'caniuse-db.tgz.part').write_bytes(npm_registry.tarball[:100])
+        (updater.download_dir / 'state.json').write_text(json.dumps(
+            {'tarball_url': url, 'tarball_etag': '"tgz-1.0.0"'}))
+
+        result = updater.download_npm_update()
+
+        assert result['success'] is True, result
+        _, headers = npm_registry.requests[-1]
+        assert headers.get('Range') == 'bytes=100-'
+
+
+# ============================================================================
+# Known-library fingerprints
+# ============================================================================
+
+_VENDOR_JS = "/*! tinylib v2.1.0 */\nfetch('/api').then(r => r.json());\nnew Promise(() => {});\n"
+# One 3 KB line, as a bundler would write it
+_MINIFIED_VENDOR_JS = ';'.join(f'fetch("/a{i}").then(function(r){{return r.json()}})' for i in range(60)) + \
+    ';foo.unknownThing();new Promise(function(){})'
+
+
+class TestLibraryFingerprints:
+    """Vendored files matched by content hash instead of being parsed."""
+
+    @pytest.fixture
+    def store(self, tmp_path, monkeypatch):
+        store = LibraryFingerprints(builtin_path=tmp_path / "known.json", local_path=tmp_path / "local.json")
+        monkeypatch.setattr(fingerprints_module, "_store", store)
+        return store
+
+    @pytest.fixture
+    def vendored(self, tmp_path, store):
+        from src.api.service import AnalyzerService
+        lib = tmp_path / "tinylib-2.1.0.min.js"
+        lib.write_text(_VENDOR_JS, encoding='utf-8')
+        AnalyzerService().add_library_fingerprint(str(lib))
+        copy = tmp_path / "vendor" / "tinylib.js"
+        copy.parent.mkdir()
+        copy.write_bytes(_VENDOR_JS.replace('\n', '\r\n').encode('utf-8'))
+        return copy
+
+    @pytest.mark.whitebox
+    def test_hash_ignores_bom_and_line_endings(self):
+        assert content_hash(b'\xef\xbb\xbfa\r\nb') == content_hash(b'a\nb')
+        assert content_hash(b'a\nb') != content_hash(b'a\nc')
+
+    @pytest.mark.whitebox
+    def test_name_and_version_from_file_name(self):
+        assert guess_library_name('jquery-3.7.1.min.js') == ('jquery', '3.7.1')
+        assert guess_library_name('normalize.css') == ('normalize', '')
+        assert guess_library_name('bootstrap.bundle.min.js') == ('bootstrap.bundle', '')
+
+    @pytest.mark.whitebox
+    def test_added_entry_is_stored_locally(self, vendored, store, tmp_path):
+        [entry] = store.entries()
+        assert (entry['library'], entry['version'], entry['language']) == ('tinylib', '2.1.0', 'js')
+        assert {'fetch', 'promises'} <= set(entry['features'])
+        saved = json.loads((tmp_path / "local.json").read_text())
+        assert list(saved['libraries']) == [entry['sha256']]
+
+    @pytest.mark.whitebox
+    def test_matching_file_is_not_parsed(self, vendored, store, modern_browsers, monkeypatch):
+        analyzer = CrossGuardAnalyzer()
+
+        def fail(_path):
+            raise AssertionError("fingerprinted file was parsed")
+        monkeypatch.setattr(analyzer.js_parser, 'parse_file', fail)
+        report = analyzer.run_analysis(js_files=[str(vendored)], target_browsers=modern_browsers)
+
+        assert report['issues']['errors'] == []
+        assert {'fetch', 'promises'} <= set(report['features']['js'])
+        assert report['libraries'][0]['library'] == 'tinylib'
+        assert report['libraries'][0]['counted'] is True
+        assert any(d['feature'] == 'fetch' for d in report['feature_details']['js'])
+
+    @pytest.mark.whitebox
+    def test_files_of_other_sizes_are_not_read(self, vendored, store, modern_browsers, tmp_path, monkeypatch):
+        size = len(_VENDOR_JS.encode('utf-8'))
+        assert store.may_match(size, 'js') and store.may_match(vendored.stat().st_size, 'js')  # LF and CRLF
+        assert not store.may_match(size - 1, 'js') and not store.may_match(size, 'css')
+
+        def fail(_content, _language):
+            raise AssertionError("file was read for a fingerprint lookup")
+        monkeypatch.setattr(store, 'lookup', fail)
+        own = tmp_path / "app.js"
+        own.write_text('fetch("/x");\n' * 100, encoding='utf-8')
+        report = CrossGuardAnalyzer().run_analysis(js_files=[str(own)], target_browsers=modern_browsers)
+
+        assert report['issues']['errors'] == []
+        assert 'fetch' in report['features']['js']
+
+    @pytest.mark.whitebox
+    def test_shipped_entries_match_the_current_rules(self, tmp_path):
+        shipped = LibraryFingerprints(local_path=tmp_path / "local.json")
+        entries = shipped.entries()
+        assert entries, "known_libraries.json ships without entries"
+        for entry in entries:
+            assert entry['rules'] == rules_stamp(entry['language']), (
+                f"{entry['file']} is stale: run `crossguard fingerprint rebuild`")
+        sources = {content_hash(p.read_bytes()): p.name for p in shipped.builtin_source_files()}
+        assert {e['sha256']: e['file'] for e in entries} == sources
+
+    @pytest.mark.whitebox
+    def test_shipped_library_is_matched(self, tmp_path, modern_browsers, monkeypatch):
+        shipped = LibraryFingerprints(local_path=tmp_path / "local.json")
+        monkeypatch.setattr(fingerprints_module, "_store", shipped)
+        [source] = [p for p in shipped.builtin_source_files() if p.name.startswith('es6-promise')]
+        copy = tmp_path / "vendor" / "es6-promise.auto.js"
+        copy.parent.mkdir()
+        copy.write_bytes(source.read_bytes())
+        report = CrossGuardAnalyzer().run_analysis(js_files=[str(copy)], target_browsers=modern_browsers)
+
+        [library] = report['libraries']
+        assert (library['library'], library['version']) == ('es6-promise', '4.2.8')
+        assert 'promises' in report['features']['js']
+
+    @pytest.mark.whitebox
+    def test_grouped_libraries_do_not_count(self, vendored, modern_browsers, tmp_path):
+        own = tmp_path / "app.js"
+        own.write_text("const el = document.querySelector('.a');", encoding='utf-8')
+        report = CrossGuardAnalyzer().run_analysis(
+            js_files=[str(own), str(vendored)], target_browsers=modern_browsers, group_libraries=True)
+
+        assert 'fetch' not in report['features']['js']
+        [library] = report['libraries']
+        assert library['counted'] is False
+        assert 'fetch' in library['features']
+
+    @pytest.fixture
+    def minified_vendored(self, tmp_path, store):
+        from src.api.service import AnalyzerService
+        lib = tmp_path / "tinylib-2.1.0.min.js"
+        lib.write_text(_MINIFIED_VENDOR_JS, encoding='utf-8')
+        AnalyzerService().add_library_fingerprint(str(lib))
+        return lib
+
+    @pytest.mark.whitebox
+    def test_minified_library_is_fingerprinted_in_full(self, minified_vendored, store):
+        [entry] = store.entries()
+        match = store.lookup(minified_vendored.read_bytes(), 'js')
+        assert {'fetch', 'promises'} <= set(entry['features'])
+        assert any(d['feature'] == 'fetch' for d in match.feature_details)
+        assert match.unrecognized
+
+    @pytest.mark.whitebox
+    @pytest.mark.parametrize('mode', ['skip', 'fast', 'full'])
+    def test_minified_mode_applies_to_library_matches(self, minified_vendored, modern_browsers, mode):
+        report = CrossGuardAnalyzer().run_analysis(
+            js_files=[str(minified_vendored)], target_browsers=modern_browsers, minified=mode)
+
+        skipped = any('Skipped minified' in w for w in report['issues']['warnings'])
+        assert skipped is (mode == 'skip')
+        if mode == 'skip':
+            assert report['features']['js'] == [] and report['libraries'] == []
+            return
+        assert 'fetch' in report['features']['js']
+        assert report['libraries'][0]['library'] == 'tinylib'
+        has_details = bool(report['feature_details']['js'])
+        assert has_details is (mode == 'full')
+        assert bool(report['unrecognized']['js']) is (mode == 'full')
+
+    @pytest.mark.whitebox
+    def test_entry_for_other_rules_is_ignored(self, vendored, store, monkeypatch):
+        data = vendored.read_bytes()
+        assert store.lookup(data, 'js') is not None
+        monkeypatch.setattr(fingerprints_module, "rules_stamp", lambda language: "other-rules")
+        assert store.lookup(data, 'js') is None
+
+
+# ============================================================================
+# Per-file result cache
+# ============================================================================
+
+class TestFileResultCache:
+    """run_analysis(cache_file_results=True) only parses files that changed."""
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        page = tmp_path / 'index.html'
+        page.write_text('<dialog></dialog><style>.a { gap: 1px; }</style>', encoding='utf-8')
+        sheet = tmp_path / 'site.css'
+        sheet.write_text('.a { display: grid; }', encoding='utf-8')
+        script = tmp_path / 'app.js'
+        script.write_text('fetch("/a");', encoding='utf-8')
+        return {'html_files': [str(page)], 'css_files': [str(sheet)], 'js_files': [str(script)]}
+
+    @staticmethod
+    def _without_timestamp(report):
+        return {k: v for k, v in report.items() if k != 'timestamp'}
+
+    @pytest.mark.whitebox
+    def test_unchanged_files_are_not_parsed_again(self, project, modern_browsers, monkeypatch):
+        analyzer = CrossGuardAnalyzer()
+        first = analyzer.run_analysis(**project, target_browsers=modern_browsers, cache_file_results=True)
+
+        parsed = []
+
+        def recording(parse_file):
+            def parse(path):
+                parsed.append(path)
+                return parse_file(path)
+            return parse
+
+        for parser in (analyzer.html_parser, analyzer.css_parser, analyzer.js_parser):
+            monkeypatch.setattr(parser, 'parse_file', recording(parser.parse_file))
+        second = analyzer.run_analysis(**project, target_browsers=modern_browsers, cache_file_results=True)
+        assert parsed == []
+        assert self._without_timestamp(second) == self._without_timestamp(first)
+
+        script = project['js_files'][0]
+        with open(script, 'a', encoding='utf-8') as f:
+            f.write('new IntersectionObserver(cb);')
+        third = analyzer.run_analysis(**project, target_browsers=modern_browsers, cache_file_results=True)
+        assert parsed == [script]
+        assert 'intersectionobserver' in third['features']['js']
+        assert 'css-grid' in third['features']['css']
+
+    @pytest.mark.whitebox
+    def test_changed_options_invalidate_the_cache(self, project, modern_browsers):
+        analyzer = CrossGuardAnalyzer()
+        analyzer.run_analysis(**project, target_browsers=modern_browsers, cache_file_results=True)
+        assert len(analyzer._file_cache) == 3
+        analyzer.run_analysis(js_files=project['js_files'], target_browsers=modern_browsers,
+                              cache_file_results=True, minified='full')
+        assert len(analyzer._file_cache) == 1
+        analyzer.run_analysis(**project, target_browsers=modern_browsers)
+        assert len(analyzer._file_cache) == 0
+
+
+class TestFileResultsMerge:
+    """Per-file results collected in parts (CI shards) merge into the single-run report."""
+
+    @pytest.mark.whitebox
+    def test_merged_parts_match_single_run(self, tmp_path, modern_browsers):
+        page = tmp_path / 'index.html'
+        page.write_text('<dialog></dialog><style>.a { gap: 1px; }</style>', encoding='utf-8')
+        sheets = []
+        for i, rule in enumerate(['display: grid', 'aspect-ratio: 1', 'container-type: size']):
+            sheet = tmp_path / f'{i}.css'
+            sheet.write_text(f'.a {{ {rule}; }}', encoding='utf-8')
+            sheets.append(str(sheet))
+        script = tmp_path / 'app.js'
+        script.write_text('fetch("/a"); const b = {...a};', encoding='utf-8')
+
+        single = CrossGuardAnalyzer().run_analysis(
+            html_files=[str(page)], css_files=sheets, js_files=[str(script)],
+            target_browsers=modern_browsers)
+
+        first = CrossGuardAnalyzer().collect_file_results(html_files=[str(page)], css_files=sheets[:1])
+        second = CrossGuardAnalyzer().collect_file_results(css_files=sheets[1:], js_files=[str(script)])
+        # Through JSON, as partial reports are
+        parts = json.loads(json.dumps([r.to_dict() for r in first + second]))
+        merged = CrossGuardAnalyzer().report_from_file_results(
+            [FileResult.from_dict(data) for data in parts], target_browsers=modern_browsers)
+
+        assert merged.pop('timestamp') and single.pop('timestamp')
+        assert merged == single
+
+    @pytest.mark.whitebox
+    def test_no_files_give_no_results(self):
+        assert CrossGuardAnalyzer().collect_file_results() == []
+
+    @pytest.mark.whitebox
+    def test_missing_file_raises(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            CrossGuardAnalyzer().collect_file_results(js_files=[str(tmp_path / 'missing.js')])
@@ -39,7 +39,7 @@ class TestAnalyze:
 class TestHistory:
 
     @pytest.mark.blackbox
-    @patch('src.api.service.save_analysis_from_result')
+    @patch('src.database.repositories.save_analysis_from_result')
     def test_save_success(self, mock_save, service, sample_success_result):
         mock_save.return_value = 42
         aid = service.save_analysis_to_history(sample_success_result, file_name='test.css')
@@ -53,7 +53,7 @@ class TestHistory:
 class TestBookmarks:
 
     @pytest.mark.blackbox
-    @patch('src.api.service.BookmarksRepository')
+    @patch('src.database.repositories.BookmarksRepository')
     def test_toggle_bookmark_adds_when_not_bookmarked(self, MockRepo, service):
         repo_instance = MockRepo.return_value
         repo_instance.is_bookmarked.return_value = False
@@ -1,12 +1,20 @@
 """Whitebox tests for AnalyzerService internals.
 
-Tests baseline enrichment logic for analysis results.
+Tests baseline enrichment, profiling and metrics collection.
 """
 
+import sqlite3
+
 import pytest
 from unittest.mock import patch, MagicMock
 
 from src.api.schemas import AnalysisRequest
+from src.database.migrations import create_tables
+from src.database.models import Analysis
+from src.database.repositories import AnalysisRepository
+from src.parsers.css_parser import CSSParser
+from src.utils import metrics
+from src.utils.profiling import Profiler, activate_profiler, profile_stage
 
 
 # ===================================================================
@@ -58,3 +66,128 @@ class TestBaselineEnrichment:
         assert result.success is True
         assert result.baseline_summary is not None
         assert result.baseline_summary['widely_available'] == 2
+
+
+# ===================================================================
+# Profiling
+# ===================================================================
+
+class TestProfiling:
+
+    @pytest.fixture
+    def analyzer(self):
+        report = {
+            'success': True,
+            'summary': {'total_features': 0},
+            'scores': {},
+            'browsers': {},
+            'features': {'html': [], 'css': [], 'js': [], 'all': []},
+            'feature_details': {'css': [], 'js': [], 'html': []},
+            'unrecognized': {'html': [], 'css': [], 'js': [], 'total': 0},
+            'recommendations': [],
+        }
+
+        def run_analysis(**kwargs):
+            with profile_stage('parse.css'):
+                pass
+            return report
+
+        mock_analyzer = MagicMock()
+        mock_analyzer.run_analysis.side_effect = run_analysis
+        return mock_analyzer
+
+    @pytest.mark.whitebox
+    def test_profile_attached_only_when_requested(self, service, analyzer):
+        with patch.object(service, '_get_analyzer', return_value=analyzer):
+            plain = service.analyze(AnalysisRequest(css_files=['a.css']))
+            profiled = service.analyze(AnalysisRequest(css_files=['a.css'], profile=True))
+
+        assert plain.profile is None
+        assert 'profile' not in plain.to_dict()
+        stages = [s['stage'] for s in profiled.to_dict()['profile']['stages']]
+        assert stages[:2] == ['setup', 'parse.css']
+
+    @pytest.mark.whitebox
+    def test_parser_records_stages_and_rule_timings(self):
+        profiler = Profiler()
+        with activate_profiler(profiler):
+            CSSParser().parse_string(".a { display: grid; }")
+        data = profiler.to_dict(top_n=3)
+
+        stages = {s['stage'] for s in data['stages']}
+        assert {'css.ast', 'css.regex', 'css.unrecognized'} <= stages
+        assert len(data['rules']) == 3
+        assert data['rules'][0]['ms'] >= data['rules'][-1]['ms']
+
+    @pytest.mark.whitebox
+    def test_inactive_profiler_is_a_no_op(self):
+        assert profile_stage('anything') is profile_stage('other')
+
+
+# ===================================================================
+# Metrics
+# ===================================================================
+
+class TestMetrics:
+
+    @pytest.fixture(autouse=True)
+    def clean_registry(self):
+        was_enabled = metrics.metrics_enabled()
+        metrics.get_metrics_registry().reset()
+        yield
+        metrics.get_metrics_registry().reset()
+        if not was_enabled:
+            metrics.disable_metrics()
+
+    @pytest.mark.whitebox
+    def test_disabled_metrics_record_nothing(self):
+        metrics.disable_metrics()
+        CSSParser().parse_string(".a { display: grid; }")
+        assert metrics.RULES_EVALUATED.value('css') == 0
+
+    @pytest.mark.whitebox
+    def test_parsers_and_history_are_counted(self, tmp_path):
+        metrics.enable_metrics()
+        css_file = tmp_path / "a.css"
+        css_file.write_text(".a { display: grid; }")
+        CSSParser().parse_file(str(css_file))
+
+        assert metrics.BYTES_PROCESSED.value('css') == css_file.stat().st_size
+        assert metrics.RULES_EVALUATED.value('css') > 0
+
+        conn = sqlite3.connect(":memory:")
+        create_tables(conn)
+        AnalysisRepository(conn=conn).save_analysis(Analysis(
+            file_name='a.css', file_type='css', overall_score=100.0, grade='A', total_features=1))
+        conn.close()
+        assert metrics.HISTORY_WRITE_SECONDS.count() == 1
+
+    @pytest.mark.whitebox
+    def test_prometheus_text_format(self):
+        metrics.enable_metrics()
+        metrics.FILES_PARSED.inc('css', amount=2)
+        metrics.PARSE_SECONDS.observe(0.003, 'css')
+        text = metrics.render_metrics()
+
+        assert '# TYPE crossguard_files_parsed_total counter' in text
+        assert 'crossguard_files_parsed_total{language="css"} 2' in text
+        assert 'crossguard_parse_duration_seconds_bucket{language="css",le="0.001"} 0' in text
+        assert 'crossguard_parse_duration_seconds_bucket{language="css",le="0.005"} 1' in text
+        assert 'crossguard_parse_duration_seconds_bucket{language="css",le="+Inf"} 1' in text
+        assert 'crossguard_parse_duration_seconds_count{language="css"} 1' in text
+
+    @pytest.mark.whitebox
+    def test_http_endpoint_serves_metrics(self, service):
+        from urllib.request import urlopen
+
+        server = service.enable_metrics(port=0)
+        try:
+            metrics.FILES_PARSED.inc('html')
+            host, port = server.server_address[:2]
+            with urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+                body = response.read().decode()
+                assert response.headers['Content-Type'].startswith('text/plain')
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'crossguard_files_parsed_total{language="html"} 1' in body
@@ -40,6 +40,225 @@ class TestAnalyzeCommand:
         data = json.loads(result.output)
         assert data['success'] is True
 
+    def test_profile_adds_report_key_and_table(self, tmp_path):
+        css_file = tmp_path / "a.css"
+        css_file.write_text(".a { display: grid; gap: 1rem; }")
+        runner = CliRunner()
+        result = runner.invoke(cli, ['analyze', str(css_file), '--format', 'json', '--profile'])
+        assert result.exit_code == 0, f"CLI failed: {result.output}"
+        data = json.loads(result.stdout)
+        stages = [s['stage'] for s in data['profile']['stages']]
+        assert 'parse.css' in stages
+        assert data['profile']['files'][0]['file'].endswith('a.css')
+        assert "Slowest files" in result.stderr
+
+    def test_metrics_file_written(self, tmp_path):
+        from src.utils import metrics
+        css_file = tmp_path / "a.css"
+        css_file.write_text(".a { display: grid; }")
+        metrics_file = tmp_path / "metrics.prom"
+        try:
+            result = CliRunner().invoke(
+                cli, ['analyze', str(css_file), '--format', 'json', '--metrics-file', str(metrics_file)])
+        finally:
+            metrics.disable_metrics()
+            metrics.get_metrics_registry().reset()
+        assert result.exit_code == 0, result.output
+        text = metrics_file.read_text()
+        assert 'crossguard_files_parsed_total{language="css"} 1' in text
+
+
+# --- check-rules command ---
+
+
+@pytest.mark.blackbox
+class TestCheckRulesCommand:
+    def test_reports_quarantined_pattern(self, tmp_path):
+        rules_file = tmp_path / "custom_rules.json"
+        rules_file.write_text(json.dumps({"css": {
+            "broken": {"patterns": ["bad(prop"], "description": "x"},
+        }}))
+        css_file = tmp_path / "a.css"
+        css_file.write_text(".a { display: grid; }")
+
+        from src.parsers.custom_rules_loader import reload_custom_rules
+        with patch('src.parsers.custom_rules_loader.CUSTOM_RULES_PATH', rules_file):
+            reload_custom_rules()
+            result = CliRunner().invoke(cli, ['check-rules', str(css_file)])
+        reload_custom_rules()
+
+        assert result.exit_code == 1, result.output
+        assert "bad(prop" in result.output
+        assert "Slowest rule patterns" in result.output
+
+
+@pytest.mark.blackbox
+class TestMinifiedOption:
+    def test_skip_leaves_out_minified_bundles(self, tmp_path):
+        bundle = tmp_path / "app.min.js"
+        bundle.write_text(';'.join(f'fetch("/a{i}").then(function(r){{return r.json()}})' for i in range(60)))
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ['analyze', str(bundle), '--format', 'json'])
+        assert 'fetch' in json.loads(result.stdout)['features']['js']
+
+        result = runner.invoke(cli, ['analyze', str(bundle), '--format', 'json', '--minified', 'skip'])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.stdout)['features']['js'] == []
+
+
+@pytest.mark.blackbox
+class TestMaxFileSizeOption:
+    def test_oversized_file_is_skipped(self, tmp_path):
+        script = tmp_path / "app.js"
+        script.write_text('fetch("/a");\n' * 200)
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ['analyze', str(script), '--format', 'json', '--max-file-size', '1K'])
+        assert result.exit_code == 0, result.output
+        assert json.loads(result.stdout)['features']['js'] == []
+
+        result = runner.invoke(cli, ['analyze', str(script), '--format', 'json', '--max-file-size', '1MB'])
+        assert 'fetch' in json.loads(result.stdout)['features']['js']
+
+    def test_invalid_size_is_rejected(self, tmp_path):
+        script = tmp_path / "app.js"
+        script.write_text('fetch("/a");')
+        result = CliRunner().invoke(cli, ['analyze', str(script), '--max-file-size', 'lots'])
+        assert result.exit_code != 0
+        assert "Invalid size" in result.output
+
+
+@pytest.mark.blackbox
+class TestWatchCommand:
+    def test_first_run_prints_summary(self, tmp_path):
+        (tmp_path / "app.js").write_text('fetch("/a");')
+        result = CliRunner().invoke(cli, ['watch', str(tmp_path), '--max-runs', '1'])
+        assert result.exit_code == 0, result.output
+        assert "Grade:" in result.output and "Features:" in result.output
+
+    def test_missing_target_is_rejected(self, tmp_path):
+        result = CliRunner().invoke(cli, ['watch', str(tmp_path / 'missing')])
+        assert result.exit_code == 2
+
+
+# --- Sharded analysis (--shard / merge-reports) ---
+
+
+@pytest.mark.blackbox
+class TestShardedAnalysis:
+    @pytest.fixture
+    def project(self, tmp_path):
+        root = tmp_path / "proj"
+        (root / "sub").mkdir(parents=True)
+        (root / "index.html").write_text("<dialog open></dialog><style>.a { display: grid; }</style>")
+        (root / "a.css").write_text(".b { display: flex; gap: 1rem; }")
+        (root / "sub" / "d.css").write_text(".c { container-type: inline-size; }")
+        (root / "sub" / "b.js").write_text('fetch("/x").then(r => r.json());')
+        (root / "sub" / "c.js").write_text('navigator.clipboard.writeText("x");')
+        return root
+
+    def test_merged_shards_match_single_run(self, project, tmp_path):
+        runner = CliRunner()
+        single = runner.invoke(cli, ['analyze', str(project), '--format', 'json'])
+        partials = []
+        for i in (1, 2, 3):
+            partial = tmp_path / f"shard{i}.json"
+            result = runner.invoke(cli, ['analyze', str(project), '--shard', f'{i}/3', '-o', str(partial)])
+            assert result.exit_code == 0, result.output
+            partials.append(str(partial))
+        merged = runner.invoke(cli, ['merge-reports', *reversed(partials), '--format', 'json'])
+
+        assert merged.exit_code == single.exit_code
+        single_data, merged_data = json.loads(single.stdout), json.loads(merged.stdout)
+        single_data.pop('timestamp', None)
+        merged_data.pop('timestamp', None)
+        assert merged_data == single_data
+
+    def test_missing_shard_is_an_error(self, project, tmp_path):
+        partial = tmp_path / "shard1.json"
+        CliRunner().invoke(cli, ['analyze', str(project), '--shard', '1/2', '-o', str(partial)])
+        result = CliRunner().invoke(cli, ['merge-reports', str(partial)])
+        assert result.exit_code == 2
+        assert "Missing shard(s) 2/2" in result.output
+
+    def test_shards_that_saw_different_files_are_not_merged(self, project, tmp_path):
+        runner = CliRunner()
+        partials = []
+        for i in (1, 2):
+            partial = tmp_path / f"shard{i}.json"
+            assert runner.invoke(cli, ['analyze', str(project), '--shard', f'{i}/2', '-o', str(partial)]).exit_code == 0
+            partials.append(str(partial))
+            # A file generated between the shards' runs changes the second shard's partition
+            (project / "sub" / "c.js").write_text('navigator.clipboard.writeText("x");\n' * 50)
+        result = runner.invoke(cli, ['merge-reports', *partials])
+        assert result.exit_code == 2
+        assert "created from different files" in result.output
+
+    def test_shard_rejects_gates(self, project):
+        result = CliRunner().invoke(cli, ['analyze', str(project), '--shard', '1/2', '--fail-on-score', '80'])
+        assert result.exit_code == 2
+        assert "--fail-on-score" in result.output
+
+
+# --- fingerprint command ---
+
+
+@pytest.mark.blackbox
+class TestFingerprintCommand:
+    def test_added_library_is_grouped_in_analysis(self, tmp_path, monkeypatch):
+        import src.analyzer.fingerprints as fingerprints
+        monkeypatch.setattr(fingerprints, '_store', fingerprints.LibraryFingerprints(
+            builtin_path=tmp_path / "known.json", local_path=tmp_path / "local.json"))
+        lib = tmp_path / "gridkit-1.2.0.css"
+        lib.write_text(".row { display: grid; gap: 1rem; }")
+        runner = CliRunner()
+
+        result = runner.invoke(cli, ['fingerprint', 'add', str(lib)])
+        assert result.exit_code == 0, result.output
+        assert "Added gridkit 1.2.0 (css" in result.output
+
+        result = runner.invoke(cli, ['fingerprint', 'list'])
+        assert "gridkit" in result.output
+
+        result = runner.invoke(cli, ['analyze', str(lib), '--format', 'json', '--group-libraries'])
+        assert result.exit_code == 0, result.output
+        data = json.loads(result.stdout)
+        assert data['libraries'][0]['library'] == 'gridkit'
+        assert data['features']['css'] == []
+
+    def test_builtin_fingerprints_are_rebuilt_from_their_sources(self, tmp_path, monkeypatch):
+        import src.analyzer.fingerprints as fingerprints
+        shipped = fingerprints.LibraryFingerprints(local_path=tmp_path / "local.json")
+        store = fingerprints.LibraryFingerprints(
+            builtin_path=tmp_path / "known.json", local_path=tmp_path / "local.json")
+        monkeypatch.setattr(fingerprints, '_store', store)
+        runner = CliRunner()
+
+        for source in shipped.builtin_source_files():
+            result = runner.invoke(cli, ['fingerprint', 'add', '--builtin', str(source)])
+            assert result.exit_code == 0, result.output
+        assert not (tmp_path / "local.json").exists()
+        assert [p.name for p in store.builtin_source_files()] == [
+            p.name for p in shipped.builtin_source_files()]
+
+        known = json.loads((tmp_path / "known.json").read_text())
+        for entry in known['libraries'].values():
+            entry['rules'] = 'stale'
+        (tmp_path / "known.json").write_text(json.dumps(known))
+        result = runner.invoke(cli, ['fingerprint', 'rebuild'])
+        assert result.exit_code == 0, result.output
+        assert "Rebuilt es6-promise 4.2.8 (js" in result.output
+
+        rebuilt = json.loads((tmp_path / "known.json").read_text())
+        assert rebuilt == json.loads(fingerprints.KNOWN_LIBRARIES_PATH.read_text())
+
+    def test_unsupported_file_type(self, tmp_path):
+        page = tmp_path / "a.html"
+        page.write_text("<p></p>")
+        result = CliRunner().invoke(cli, ['fingerprint', 'add', str(page)])
+        assert result.exit_code == 2
+
 
 # --- Stdin support ---
 
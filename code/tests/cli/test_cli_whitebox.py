@@ -1,12 +1,27 @@
-"""Whitebox tests for CLI internals: gate evaluation and CI config generators.
+"""Whitebox tests for CLI internals: gate evaluation, CI config generators, import cost,
+the watch-mode poller and shard partitioning.
 
 Tests internal functions that are not part of the public CLI interface.
 """
 
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import click
 import pytest
 
 from src.cli.gates import ThresholdConfig, evaluate_gates
 from src.cli.generators import generate_ci_config
+from src.cli.shards import (
+    file_set_digest,
+    merge_partial_reports,
+    parse_shard_spec,
+    partition_files,
+)
+from src.cli.watch import Changes, TreeWatcher, snapshot_tree
 
 
 # --- Quality gate evaluation ---
@@ -32,3 +47,179 @@ class TestGenerators:
         output = generate_ci_config('github')
         assert 'crossguard analyze' in output
         assert 'sarif' in output
+
+
+# --- Import cost ---
+
+_CODE_ROOT = Path(__file__).resolve().parents[2]
+
+# Cumulative import time of src.cli.main for `crossguard --help`, in ms.
+# Roughly 2-3x what a warm run takes; raise it on slow CI machines.
+IMPORT_BUDGET_MS = float(os.environ.get('CROSSGUARD_IMPORT_BUDGET_MS', 400))
+
+_HEAVY_MODULES = {
+    'bs4', 'tinycss2', 'tree_sitter_languages', 'sqlite3', 'http.server',
+    'src.parsers.css_parser', 'src.parsers.js_parser', 'src.parsers.html_parser',
+    'src.analyzer.main', 'src.database',
+}
+
+
+def _import_times(code: str) -> dict:
+    """Module -> cumulative import time (us) from `python -X importtime`."""
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=_CODE_ROOT, capture_output=True, text=True, timeout=60,
+    )
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+@pytest.mark.whitebox
+class TestImportCost:
+    def test_help_skips_parsers_and_database(self):
+        times = _import_times("from src.cli.main import cli; cli(['--help'], standalone_mode=False)")
+        assert 'src.cli.main' in times
+        assert not _HEAVY_MODULES & set(times), sorted(_HEAVY_MODULES & set(times))
+
+    def test_help_within_import_budget(self):
+        # Best of three: the first run may also be compiling .pyc files
+        best = min(
+            _import_times("from src.cli.main import cli")['src.cli.main']
+            for _ in range(3)
+        )
+        assert best / 1000 < IMPORT_BUDGET_MS, f"src.cli.main took {best / 1000:.0f} ms to import"
+
+    def test_css_only_analysis_skips_other_parser_backends(self):
+        times = _import_times(
+            "from src.analyzer.main import CrossGuardAnalyzer; "
+            "CrossGuardAnalyzer().css_parser.parse_string('a { display: grid; }')"
+        )
+        assert 'tinycss2' in times
+        assert not {'bs4', 'tree_sitter_languages', 'src.parsers.js_parser',
+                    'src.parsers.html_parser'} & set(times)
+
+
+# --- Watch mode ---
+
+
+@pytest.mark.whitebox
+class TestTreeWatcher:
+    def test_snapshot_skips_noise_directories_and_other_files(self, tmp_path):
+        (tmp_path / 'app.js').write_text('x')
+        (tmp_path / 'notes.txt').write_text('x')
+        (tmp_path / 'node_modules').mkdir()
+        (tmp_path / 'node_modules' / 'lib.js').write_text('x')
+        snapshot = snapshot_tree(tmp_path, ['.js'], ['node_modules'])
+        assert list(snapshot) == [str(tmp_path / 'app.js')]
+
+    def test_changes_within_a_window_are_merged(self):
+        pending = Changes(added={'a'}, modified={'b'})
+        pending.update(Changes(modified={'a'}, removed={'b', 'c'}))
+        pending.update(Changes(removed={'a'}, added={'c'}))
+        assert (pending.added, pending.modified, pending.removed) == (set(), {'c'}, {'b'})
+
+    def test_waits_until_the_tree_is_quiet(self):
+        # Each poll returns the next snapshot; the clock advances 0.1 s per sleep
+        snapshots = iter([{}, {'a': (1, 1)}, {'a': (2, 2)}, {'a': (2, 2)}, {'a': (2, 2)}, {'a': (2, 2)}])
+        now = [0.0]
+        watcher = TreeWatcher(lambda: next(snapshots))
+
+        def sleep(seconds):
+            now[0] += seconds
+
+        changes = watcher.wait_for_changes(0.1, 0.25, sleep=sleep, clock=lambda: now[0])
+        assert changes.added == {'a'} and not changes.modified
+        assert now[0] == pytest.approx(0.4)
+
+
+# --- Sharding ---
+
+
+def _partial(index, count, files, browsers=None, discovered=None):
+    """discovered: every shard's paths (default: this shard's); all files are 1 byte."""
+    discovered = [path for _, path in files] if discovered is None else discovered
+    return {
+        'format': 'crossguard-partial-report', 'version': 2,
+        'shard': {'index': index, 'count': count},
+        'target': 'proj', 'browsers': browsers or {'chrome': '120'}, 'options': {},
+        'discovered': {'files': len(discovered),
+                       'digest': file_set_digest((os.path.relpath(p, 'proj'), 1) for p in discovered)},
+        'files': [{'kind': kind, 'relative_path': os.path.relpath(path, 'proj'), 'size': 1,
+                   'path': path, 'parts': {}} for kind, path in files],
+    }
+
+
+@pytest.mark.whitebox
+class TestSharding:
+    @pytest.fixture
+    def tree(self, tmp_path):
+        paths = []
+        for i in range(12):
+            path = tmp_path / 'src' / f'f{i}.js'
+            path.parent.mkdir(exist_ok=True)
+            path.write_text('x' * (100 * (i % 4) + 1))
+            paths.append(str(path))
+        return tmp_path, paths
+
+    def test_shard_spec(self):
+        assert parse_shard_spec(None, None, '2/4') == (2, 4)
+        for bad in ('0/4', '5/4', '2', 'a/b', '1/0'):
+            with pytest.raises(click.BadParameter):
+                parse_shard_spec(None, None, bad)
+
+    def test_partition_covers_every_file_once_and_keeps_order(self, tree):
+        root, paths = tree
+        shards = partition_files(paths, root, 3)
+        assert sorted(p for shard in shards for p in shard) == sorted(paths)
+        for shard in shards:
+            assert shard == [p for p in paths if p in shard]
+
+    def test_partition_is_balanced_by_size(self, tree):
+        root, paths = tree
+        loads = [sum(os.path.getsize(p) for p in shard) for shard in partition_files(paths, root, 3)]
+        assert max(loads) - min(loads) <= 301
+
+    def test_partition_depends_only_on_relative_paths(self, tree, tmp_path_factory):
+        root, paths = tree
+        other = tmp_path_factory.mktemp('checkout')
+        moved = []
+        for path in reversed(paths):
+            copy = other / os.path.relpath(path, root)
+            copy.parent.mkdir(exist_ok=True)
+            copy.write_text(Path(path).read_text())
+            moved.append(str(copy))
+        relative = [sorted(os.path.relpath(p, root) for p in shard) for shard in partition_files(paths, root, 4)]
+        assert relative == [sorted(os.path.relpath(p, other) for p in shard)
+                            for shard in partition_files(moved, other, 4)]
+
+    def test_merge_restores_single_run_order(self):
+        everything = ['proj/x.html', 'proj/a.css', 'proj/b.css', 'proj/a.js']
+        header, files = merge_partial_reports([
+            _partial(2, 2, [('css', 'proj/b.css'), ('js', 'proj/a.js')], discovered=everything),
+            _partial(1, 2, [('html', 'proj/x.html'), ('css', 'proj/a.css')], discovered=everything),
+        ])
+        assert header['target'] == 'proj'
+        assert [f['path'] for f in files] == everything
+        assert not {'kind', 'relative_path', 'size'} & set(files[0])
+
+    @pytest.mark.parametrize('reports, message', [
+        ([_partial(1, 3, []), _partial(2, 3, [])], 'Missing shard(s) 3/3'),
+        ([_partial(1, 2, []), _partial(1, 2, [])], 'more than once'),
+        ([_partial(1, 2, []), _partial(2, 2, [], {'firefox': '120'})], 'different browsers'),
+        ([{'format': 'sarif'}], 'Not a partial report'),
+        ([_partial(1, 2, [], discovered=['proj/a.js']), _partial(2, 2, [], discovered=['proj/b.js'])],
+         'created from different files'),
+        ([_partial(1, 2, [('js', 'proj/a.js')]), _partial(2, 2, [('js', 'proj/a.js')], discovered=['proj/a.js'])],
+         'analyzed by more than one shard: a.js'),
+        ([_partial(1, 2, [('js', 'proj/a.js')], discovered=['proj/a.js', 'proj/b.js']),
+          _partial(2, 2, [], discovered=['proj/a.js', 'proj/b.js'])],
+         'do not cover the discovered files: 1 analyzed, 2 discovered'),
+    ])
+    def test_merge_rejects_inconsistent_reports(self, reports, message):
+        with pytest.raises(ValueError, match=re.escape(message)):
+            merge_partial_reports(reports)
@@ -51,6 +51,22 @@ class TestAnalysisRepository:
         assert loaded.file_name == "app.js" and loaded.overall_score == 72.5 and len(loaded.features) == 2
 
 
+class TestBookmarksRepository:
+
+    @pytest.mark.blackbox
+    def test_bulk_bookmark_lookup(self, db, analysis_repo, sample_analysis):
+        from src.database.repositories import BookmarksRepository
+
+        ids = save_n_analyses(analysis_repo, sample_analysis, 4)
+        repo = BookmarksRepository(conn=db)
+        repo.add_bookmark(ids[1])
+        repo.add_bookmark(ids[3])
+
+        assert repo.get_bookmarked_ids(ids) == {ids[1], ids[3]}
+        assert repo.get_bookmarked_ids([ids[0], None]) == set()
+        assert repo.get_bookmarked_ids([]) == set()
+
+
 # =============================================================================
 # StatisticsService -- aggregation queries
 # =============================================================================
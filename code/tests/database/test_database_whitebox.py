@@ -24,3 +24,42 @@ class TestCreateTables:
         expected = {"schema_version", "analyses", "analysis_features", "browser_results",
                     "settings", "bookmarks"}
         assert _table_names(db) == expected
+
+
+# =============================================================================
+# ConnectionPool -- per-thread connections
+# =============================================================================
+
+class TestConnectionPool:
+    @pytest.mark.whitebox
+    def test_threads_get_own_connections_and_can_write_concurrently(self, temp_dir, sample_analysis):
+        import threading
+        from src.database.connection import ConnectionPool
+        from src.database.repositories import AnalysisRepository
+
+        pool = ConnectionPool(temp_dir / "pool.db")
+        main_conn = pool.get()
+        assert pool.get() is main_conn
+        assert main_conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+        seen, errors = [], []
+
+        def worker(i):
+            try:
+                conn = pool.get()
+                seen.append(conn)
+                AnalysisRepository(conn=conn).save_analysis(sample_analysis(file_name=f"w{i}.css"))
+            except Exception as e:  # pragma: no cover - surfaced by the assert below
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert not errors
+        assert all(c is not main_conn for c in seen)
+        assert AnalysisRepository(conn=main_conn).get_count() == 8
+        pool.close_all()
+        assert pool.size() == 0
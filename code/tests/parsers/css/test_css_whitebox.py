@@ -1,11 +1,109 @@
 """CSS parser white box tests.
 
-Tests internals: tinycss2 AST pipeline, and custom rules with mocked dependencies.
+Tests internals: tinycss2 AST pipeline (single-pass extraction and
+serialization), the structured rule index, custom rules with mocked
+dependencies, minified-file handling, and chunked parsing of large
+stylesheets.
 """
 
 import pytest
+import tinycss2
 from unittest.mock import patch
-from src.parsers.css_parser import CSSParser
+from src.parsers.css_parser import CSSParser, _serialize, _split_top_level_rules
+from src.parsers.css_rule_index import get_css_rule_index
+from src.parsers.rule_registry import RuleRegistry, get_rule_snapshot
+
+
+# =====================================================================
+# AST Extraction
+# =====================================================================
+
+@pytest.mark.whitebox
+class TestExtraction:
+    @pytest.mark.parametrize("css", [
+        '.a > b[c="d"]::before:not(.e, #f) { color: rgba(0, 0, 0, .5) !important; }',
+        'a { margin: 1e3px 1/**/px -\\31 x; width: calc(100% - 2em); }',
+        'a { x: #1a #a\\:b url(a.png) u+0-7f 2e-1e "s \\"t\\"" }',
+        'a { content: f("unterminated }',
+    ])
+    def test_serialize_matches_tinycss2(self, css):
+        rule = tinycss2.parse_stylesheet(css)[0]
+        assert _serialize(rule.prelude) == tinycss2.serialize(rule.prelude)
+        for decl in tinycss2.parse_blocks_contents(rule.content):
+            if decl.type == 'declaration':
+                assert _serialize(decl.value) == tinycss2.serialize(decl.value)
+
+    def test_nested_rules_walked_in_document_order(self, css_parser):
+        css = """
+        .a { color: red; .b { gap: 1px; } margin: 0; }
+        @media (min-width: 1px) { .c { top: 0; } @supports (x: y) { .d { left: 0; } } }
+        @font-face { font-family: X; }
+        """
+        css_parser._block_counter = 0
+        rules = tinycss2.parse_stylesheet(css, skip_comments=True, skip_whitespace=True)
+        declarations, at_rules, selectors = css_parser._extract_components(rules)
+        assert declarations == [
+            ('color', 'red', '.a', 0), ('gap', '1px', '.b', 1), ('margin', '0', '.a', 0),
+            ('top', '0', '.c', 2), ('left', '0', '.d', 3), ('font-family', 'X', '@font-face', 4),
+        ]
+        assert at_rules == [('media', '(min-width: 1px)'), ('supports', '(x: y)'), ('font-face', '')]
+        assert selectors == ['.a', '.b', '.c', '.d']
+        assert css_parser._has_nesting
+
+
+# =====================================================================
+# Rule Index
+# =====================================================================
+
+def _forms(index, feature_id):
+    """{pattern source: form} for one feature's patterns."""
+    forms = {}
+    for pattern in index.property_rules:
+        forms[pattern] = 'property'
+    for pattern, _ in index.value_rules:
+        forms[pattern] = 'value'
+    for pattern, _ in index.at_rules:
+        forms[pattern] = 'at-rule'
+    for pattern, _ in index.literal_rules:
+        forms[pattern] = 'literal'
+    for pattern in index.text_rules:
+        forms[pattern] = 'text'
+    return {p.source: form for p, form in forms.items() if p.feature_id == feature_id}
+
+
+@pytest.mark.whitebox
+class TestRuleIndex:
+    def test_patterns_sorted_into_forms(self):
+        index = get_css_rule_index(get_rule_snapshot())
+        assert _forms(index, 'will-change') == {r'will-change\s*:': 'property'}
+        assert _forms(index, 'css-sticky') == {r'position\s*:\s*sticky': 'value'}
+        assert _forms(index, 'css-has') == {r':has\(': 'literal'}
+        assert _forms(index, 'css-container-queries')['@container'] == 'at-rule'
+        # Spans declarations, so it stays a regex over the whole block
+        assert set(_forms(index, 'flexbox-gap').values()) == {'text'}
+
+    def test_index_shared_until_rules_change(self):
+        snapshot = get_rule_snapshot()
+        index = get_css_rule_index(snapshot)
+        assert get_css_rule_index(snapshot) is index
+        assert CSSParser()._index is index
+        assert index.property_entry('will-change') is index.property_entry('will-change')
+
+    def test_property_rules_match_declarations_not_selectors(self, parse_features):
+        assert 'css-container-queries' in parse_features('.a { container-type: inline-size; }')
+        assert 'css-container-queries' not in parse_features('.container:hover { color: red; }')
+
+    def test_value_rules_only_see_their_declaration(self, parse_features):
+        assert 'css-sticky' in parse_features('.a { position: sticky; }')
+        assert 'css-sticky' not in parse_features('.a { position: relative; content: "position: sticky"; }')
+
+    def test_at_rule_preludes_checked_for_declarations(self, parse_features):
+        features = parse_features('@supports (display: grid) { .a { color: red; } }')
+        assert {'css-featurequeries', 'css-grid'} <= features
+
+    def test_cross_declaration_rule_still_matches_block(self, parse_features):
+        assert 'flexbox-gap' in parse_features('.a { display: flex; color: red; gap: 1rem; }')
+        assert 'flexbox-gap' not in parse_features('.a { display: flex; } .b { gap: 1rem; }')
 
 
 # =====================================================================
@@ -36,7 +134,8 @@ def custom_css_rules():
 
 @pytest.fixture
 def css_parser_with_custom(custom_css_rules):
-    with patch('src.parsers.css_parser.get_custom_css_rules', return_value=custom_css_rules):
+    with patch('src.parsers.rule_registry._registry', RuleRegistry()), \
+            patch('src.parsers.rule_registry.get_custom_css_rules', return_value=custom_css_rules):
         yield CSSParser()
 
 
@@ -53,3 +152,98 @@ class TestCSSCustomDetection:
         )
         assert "test-custom-prop" in features
         assert "flexbox" in features
+
+
+# =====================================================================
+# Minified files
+# =====================================================================
+
+@pytest.mark.whitebox
+class TestMinifiedFiles:
+    def test_fast_mode_keeps_features_and_drops_noise(self, tmp_path):
+        sheet = tmp_path / 'site.min.css'
+        sheet.write_text(''.join(f'.c{i}{{display:grid;gap:1px;zoom-level:{i}}}' for i in range(100)),
+                         encoding='utf-8')
+        full = CSSParser()
+        full.minified_mode = 'full'
+        expected = full.parse_file(str(sheet))
+        assert 'css-grid' in expected and full.unrecognized_patterns
+
+        parser = CSSParser()
+        assert parser.parse_file(str(sheet)) == expected
+        assert parser.minified_reason is not None
+        assert parser.unrecognized_patterns == set()
+        assert parser.feature_details == []
+
+    def test_inline_strings_are_never_treated_as_minified(self):
+        parser = CSSParser()
+        parser.minified_mode = 'skip'
+        css = ''.join(f'.c{i}{{display:grid}}' for i in range(300))
+        assert 'css-grid' in parser.parse_string(css)
+        assert parser.minified_reason is None
+
+
+# =====================================================================
+# Large stylesheets
+# =====================================================================
+
+@pytest.mark.whitebox
+class TestChunkedParsing:
+    _CSS = ('/* } */ .a { display: grid; background: url(x{y}.png); }\n'
+            '@media (min-width: 1px) { .b { gap: 1px; content: "}"; } }\n'
+            '.c { & .d { color: red; } }\n') * 40
+
+    def test_chunks_are_whole_top_level_rules(self):
+        chunks = _split_top_level_rules(self._CSS, 200)
+        assert len(chunks) > 1
+        assert ''.join(chunks) == self._CSS
+        for chunk in chunks:
+            assert tinycss2.serialize(tinycss2.parse_stylesheet(chunk)) == chunk
+
+    def test_stray_brace_disables_splitting(self):
+        css = '.a { color: red; } } .b { color: blue; }' * 20
+        assert _split_top_level_rules(css, 10) == [css]
+
+    def test_chunked_parse_matches_single_pass(self, monkeypatch):
+        expected = CSSParser().parse_string(self._CSS)
+        monkeypatch.setattr('src.parsers.css_parser.CSS_CHUNK_SIZE', 200)
+        parser = CSSParser()
+        assert parser.parse_string(self._CSS) == expected
+        assert {'css-grid', 'css-nesting'} <= expected
+
+    def test_located_offsets_survive_chunking(self, monkeypatch):
+        monkeypatch.setattr('src.parsers.css_parser.CSS_CHUNK_SIZE', 200)
+        parser = CSSParser()
+        parser.parse_string(self._CSS, locate=True)
+        offsets = parser.feature_offsets['css-grid']
+        assert len(offsets) == 40
+        assert all(self._CSS.startswith('display: grid', o) for o in offsets)
+
+
+# =====================================================================
+# Locating hits (parse_string(locate=True))
+# =====================================================================
+
+@pytest.mark.whitebox
+class TestLocatedHits:
+    def test_offsets_point_at_the_matching_rule(self):
+        css = '.a { display: grid; }\n* { display: flex; gap: 1px }\n@supports (aspect-ratio: 1) { }'
+        parser = CSSParser()
+        parser.parse_string(css, locate=True)
+        at = {feature: [css[o:o + 7] for o in offsets] for feature, offsets in parser.feature_offsets.items()}
+        assert at['css-grid'] == ['display']
+        assert at['flexbox'] == ['display']
+        assert parser.feature_offsets['css-grid'] != parser.feature_offsets['flexbox']
+        assert at['flexbox-gap'] == ['* { dis']
+        assert at['css-featurequeries'] == ['@suppor']
+
+    def test_offsets_are_characters_not_bytes(self):
+        css = '/* café */ .a { display: grid; }'
+        parser = CSSParser()
+        parser.parse_string(css, locate=True)
+        assert [css[o:o + 13] for o in parser.feature_offsets['css-grid']] == ['display: grid']
+
+    def test_not_recorded_by_default(self):
+        parser = CSSParser()
+        parser.parse_string('.a { display: grid; }')
+        assert parser.feature_offsets == {}
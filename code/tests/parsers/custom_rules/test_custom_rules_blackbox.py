@@ -6,8 +6,10 @@ Tests loading rules, querying rules across CSS/JS/HTML, and raw access.
 import pytest
 from src.parsers.custom_rules_loader import (
     CustomRulesLoader,
+    get_rule_diagnostics,
     is_user_rule,
     load_raw_custom_rules,
+    save_custom_rules,
 )
 
 
@@ -42,3 +44,30 @@ class TestLoadRaw:
         raw = load_raw_custom_rules()
         assert "css" in raw and "javascript" in raw and "html" in raw
         assert "test-css-feature" in raw["css"]
+
+
+@pytest.mark.blackbox
+class TestRuleValidation:
+
+    def test_invalid_pattern_quarantined_rest_of_rule_kept(self, mock_custom_rules_path):
+        save_custom_rules({"css": {
+            "half-broken": {"patterns": [r"good-prop\s*:", r"bad(prop"], "description": "x"},
+            "all-broken": {"patterns": [r"[unclosed"], "description": "y"},
+        }})
+        css = CustomRulesLoader().get_custom_css_rules()
+
+        assert css["half-broken"]["patterns"] == [r"good-prop\s*:"]
+        assert "all-broken" not in css
+        quarantined = {(q["feature"], q["pattern"]) for q in get_rule_diagnostics()["quarantined"]}
+        assert quarantined == {("half-broken", "bad(prop"), ("all-broken", "[unclosed")}
+
+    def test_slow_patterns_flagged(self, mock_custom_rules_path):
+        save_custom_rules({"javascript": {
+            "nested": {"patterns": [r"(\w+\s*)+;"], "description": "x"},
+            "span": {"patterns": [r"foo[^}]*bar"], "description": "y"},
+            "safe": {"patterns": [r"\bSafeAPI\b"], "description": "z"},
+        }})
+        flagged = {w["feature"] for w in get_rule_diagnostics()["warnings"]}
+        assert flagged == {"nested", "span"}
+        # Flagged patterns are still loaded
+        assert "nested" in CustomRulesLoader().get_custom_js_rules()
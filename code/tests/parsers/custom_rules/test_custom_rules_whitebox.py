@@ -1,13 +1,19 @@
 """White-box tests for custom rules loader internals.
 
-Tests the save/reload cycle.
+Tests the save/reload cycle and rule-set versioning.
 """
 
+import json
+import os
+
 import pytest
 from src.parsers.custom_rules_loader import (
     get_custom_rules_loader,
+    get_custom_rules_version,
+    reload_custom_rules,
     save_custom_rules,
 )
+from src.parsers.rule_registry import get_rule_snapshot
 
 
 @pytest.mark.whitebox
@@ -29,3 +35,123 @@ class TestSaveAndRoundtrip:
         loader = get_custom_rules_loader()
         css = loader.get_custom_css_rules()
         assert "roundtrip-feature" in css
+
+
+@pytest.mark.whitebox
+class TestRuleVersioning:
+
+    def test_save_and_reload_bump_version(self, mock_custom_rules_path):
+        first = get_custom_rules_version()
+        save_custom_rules({"css": {}, "javascript": {}, "html": {}})
+        second = get_custom_rules_version()
+        reload_custom_rules()
+        assert first < second < get_custom_rules_version()
+
+    def test_file_edit_bumps_version(self, tmp_rules_file, monkeypatch):
+        import src.parsers.custom_rules_loader as mod
+
+        monkeypatch.setattr(mod, "MTIME_CHECK_INTERVAL", 0)
+        before = get_custom_rules_version()
+        tmp_rules_file.write_text(json.dumps({"css": {
+            "edited-feature": {"patterns": [r"edited\s*:"], "description": "Edited"},
+        }}), encoding='utf-8')
+        stat = tmp_rules_file.stat()
+        os.utime(tmp_rules_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert get_custom_rules_version() > before
+        assert "edited-feature" in get_rule_snapshot().css
+
+    def test_snapshot_shared_until_version_changes(self, tmp_rules_file):
+        from src.parsers.css_parser import CSSParser
+
+        snapshot = get_rule_snapshot()
+        assert get_rule_snapshot() is snapshot
+        assert "test-css-feature" in snapshot.css
+        assert snapshot.html.attribute_values[("data-test", "value1")] == "test-value-feature"
+
+        parser = CSSParser()
+        parser.parse_string(".a { test-property: 1; }")
+        assert parser._all_features is snapshot.css
+        assert "test-css-feature" in parser.features_found
+
+        reload_custom_rules()
+        parser.parse_string(".a { color: red; }")
+        assert parser._all_features is not snapshot.css
+
+
+@pytest.mark.whitebox
+class TestPatternBudget:
+
+    def test_over_budget_custom_pattern_disabled(self, tmp_rules_file, monkeypatch):
+        import src.parsers.rule_patterns as rule_patterns
+        from src.parsers.css_parser import CSSParser
+
+        monkeypatch.setattr(rule_patterns, "PATTERN_TIME_BUDGET", -1)
+        rule_patterns.get_pattern_stats().reset()
+        parser = CSSParser()
+
+        assert "test-css-feature" in parser.parse_string(".a { test-property: 1; }")
+        # Every match is over a negative budget, so the custom pattern is now off
+        assert "test-css-feature" not in parser.parse_string(".a { test-property: 1; }")
+        # Built-in patterns are timed but never disabled
+        assert "css-grid" in parser.parse_string(".a { display: grid; }")
+
+        slow = rule_patterns.get_pattern_stats().slowest(limit=1000)
+        custom = [s for s in slow if s["feature"] == "test-css-feature"]
+        assert custom and all(s["over_budget"] for s in custom)
+
+    def test_budget_grows_with_the_searched_text(self, tmp_rules_file, monkeypatch):
+        import src.parsers.rule_patterns as rule_patterns
+        from src.parsers.js_parser import JavaScriptParser
+
+        clock = _FakeClock()
+        monkeypatch.setattr(rule_patterns, "time", clock)
+        stats = rule_patterns.get_pattern_stats()
+        [pattern] = get_rule_snapshot().js_patterns["test-js-feature"]
+
+        # A linear pattern over a 9 MB bundle: slow, but within the budget for that size
+        clock.step = 0.3
+        assert rule_patterns.timed_search(pattern, "x" * (9 * 1024 * 1024)) is None
+        assert not pattern.disabled and stats.disabled_patterns() == []
+        clock.step = 0.0
+        assert "test-js-feature" in JavaScriptParser().parse_string("TestAPI.start();")
+
+        # The same time on a short text is over budget
+        clock.step = 0.3
+        rule_patterns.timed_search(pattern, "TestAPI")
+        assert pattern.disabled
+        [entry] = stats.disabled_patterns()
+        assert (entry["feature"], entry["elapsed_ms"], entry["budget_ms"]) == ("test-js-feature", 300, 250)
+
+    def test_disabled_pattern_is_reported(self, tmp_rules_file, tmp_path, monkeypatch):
+        import src.parsers.rule_patterns as rule_patterns
+        from src.analyzer.main import CrossGuardAnalyzer
+
+        monkeypatch.setattr(rule_patterns, "PATTERN_TIME_BUDGET", -1)
+        monkeypatch.setattr(rule_patterns, "PATTERN_TIME_PER_MB", 0)
+        get_rule_snapshot()  # compile the rules before the run, forgetting earlier disablements
+        first, second = tmp_path / "a.css", tmp_path / "b.css"
+        first.write_text(".a { test-property: 1; }")
+        second.write_text(".b { test-property: 2; }")
+        browsers = {"chrome": "120"}
+        analyzer = CrossGuardAnalyzer()
+
+        report = analyzer.run_analysis(css_files=[str(first), str(second)], target_browsers=browsers)
+        [warning] = [w for w in report["issues"]["warnings"] if "test-css-feature" in w]
+        assert str(first) in warning and "disabled for the rest of the session" in warning
+
+        report = analyzer.run_analysis(css_files=[str(second)], target_browsers=browsers)
+        assert any("test-css-feature" in w and "earlier in this session" in w
+                   for w in report["issues"]["warnings"])
+
+
+class _FakeClock:
+    """Stands in for the time module in rule_patterns: every search takes step seconds."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.step = 0.0
+
+    def perf_counter(self):
+        self.now += self.step  # read before and after each search
+        return self.now
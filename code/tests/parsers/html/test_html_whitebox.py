@@ -6,6 +6,8 @@ Tests internal state management and custom-rules integration.
 import pytest
 from unittest.mock import patch
 
+from src.parsers.rule_registry import RuleRegistry
+
 
 # =====================================================================
 # State Reset
@@ -36,7 +38,8 @@ def custom_html_rules():
 
 @pytest.fixture
 def parser_with_custom(custom_html_rules):
-    with patch("src.parsers.html_parser.get_custom_html_rules", return_value=custom_html_rules):
+    with patch("src.parsers.rule_registry._registry", RuleRegistry()), \
+            patch("src.parsers.rule_registry.get_custom_html_rules", return_value=custom_html_rules):
         parser = __import__("src.parsers.html_parser", fromlist=["HTMLParser"]).HTMLParser()
         yield parser
 
@@ -45,3 +48,147 @@ def parser_with_custom(custom_html_rules):
 class TestCustomRulesExtended:
     def test_custom_element_detected(self, parser_with_custom):
         assert "custom-elementsv1" in parser_with_custom.parse_string("<x-widget>content</x-widget>")
+
+
+# =====================================================================
+# Rule Table Caching
+# =====================================================================
+
+@pytest.mark.whitebox
+class TestRuleTableCache:
+    def test_tables_reused_until_custom_rules_reload(self, html_parser):
+        from src.parsers.custom_rules_loader import reload_custom_rules
+
+        html_parser.parse_string("<dialog></dialog>")
+        elements = html_parser._elements
+        html_parser.parse_string("<details></details>")
+        assert html_parser._elements is elements
+
+        reload_custom_rules()
+        html_parser.parse_string("<dialog></dialog>")
+        assert html_parser._elements is not elements
+
+    def test_single_walk_keeps_detector_order(self, html_parser):
+        html_parser.parse_string(
+            '<dialog data-a="1"></dialog>'
+            '<input type="date" loading="lazy">'
+            '<link rel="preload" href="x.css">'
+        )
+        first_features = [d['feature'] for d in html_parser.feature_details]
+        # Elements are reported before input types, attributes and special patterns
+        assert first_features.index('dialog') < first_features.index('input-datetime')
+        assert first_features.index('input-datetime') < first_features.index('dataset')
+
+
+# =====================================================================
+# Feature Details
+# =====================================================================
+
+@pytest.mark.whitebox
+class TestFeatureDetails:
+    def test_repeated_hits_are_recorded_once(self, html_parser):
+        html_parser.parse_string('<dialog></dialog>' * 2000 + '<img srcset="a.png 2x" sizes="50vw">' * 500)
+        dialog = [d for d in html_parser.feature_details if d['feature'] == 'dialog']
+        assert dialog == [{'feature': 'dialog', 'matched_items': ['<dialog>']}]
+        srcset = next(d for d in html_parser.feature_details if d['feature'] == 'srcset')
+        assert srcset['matched_items'] == ['srcset', 'sizes']
+
+    def test_items_grouped_by_match_type(self, html_parser):
+        html_parser._add_match('x', 'values', 'a="b"')
+        html_parser._add_match('x', 'attributes', 'a')
+        html_parser._add_match('x', 'elements', '<x>')
+        html_parser._add_match('x', 'attributes', 'a')
+        html_parser._build_feature_details()
+        assert html_parser.feature_details == [{'feature': 'x', 'matched_items': ['<x>', 'a', 'a="b"']}]
+
+
+# =====================================================================
+# Scanner Backends
+# =====================================================================
+
+_NESTED_DOC = """
+<!DOCTYPE html>
+<html><body>
+  <picture><source srcset="a.webp" type="image/webp"><img src="a.svg"></picture>
+  <video src="v.mp4#t=10,20"><track src="subs.vtt" kind="subtitles"></video>
+  <audio><source src="a.ogg"></audio>
+  <div class="x y" data-id="1"></span></div>
+  <link rel="preload stylesheet" href="s.css">
+  <my-widget loading="lazy"></my-widget>
+  <fieldset disabled><input type="date"></fieldset>
+</body></html>
+"""
+
+
+@pytest.mark.whitebox
+class TestScannerBackends:
+    @pytest.mark.parametrize("backend", ["stream", "lxml"])
+    def test_backend_matches_soup(self, backend):
+        from src.parsers.html_parser import HTMLParser
+
+        reference = HTMLParser(backend="soup")
+        expected = reference.parse_string(_NESTED_DOC)
+        parser = HTMLParser(backend=backend)
+        assert parser.parse_string(_NESTED_DOC) == expected
+        assert parser.feature_details == reference.feature_details
+        assert parser.attributes_found == reference.attributes_found
+
+    def test_nesting_tracked_without_tree(self, html_parser):
+        features = html_parser.parse_string(_NESTED_DOC)
+        assert {"picture", "videotracks", "media-fragments", "webvtt"} <= features
+        # <audio> has a <source> but no <track>
+        assert "audiotracks" not in features
+
+    def test_falls_back_to_soup_when_backend_fails(self, html_parser):
+        with patch.object(html_parser._backend, "scan", side_effect=RuntimeError("boom")):
+            assert "dialog" in html_parser.parse_string("<dialog></dialog>")
+
+    def test_unknown_backend_rejected(self):
+        from src.parsers.html_parser import HTMLParser
+
+        with pytest.raises(ValueError):
+            HTMLParser(backend="regex")
+
+
+_INLINE_DOC = """
+<html><head>
+  <style>.a { display: grid; }</style>
+  <script type="application/ld+json">{"fetch": true}</script>
+  <script src="app.js">fetch('ignored')</script>
+  <script>const p = fetch('/x');</script>
+  <script type="module">navigator.clipboard.writeText('a')</script>
+</head>
+<body><div style="aspect-ratio: 1 / 1">x</div></body></html>
+"""
+
+
+@pytest.mark.whitebox
+class TestInlineSources:
+    @pytest.mark.parametrize("backend", ["stream", "lxml", "soup"])
+    def test_fragments_collected_in_document_order(self, backend):
+        from src.parsers.html_parser import HTMLParser
+
+        parser = HTMLParser(backend=backend)
+        parser.parse_string(_INLINE_DOC)
+
+        assert [label for _, _, label in parser.inline_css.segments] == [
+            "<style> #1", "style attribute on <div>",
+        ]
+        assert [label for _, _, label in parser.inline_js.segments] == ["<script> #1", "<script> #2"]
+        # JSON and external-script bodies are not JavaScript to analyze
+        assert "ignored" not in parser.inline_js.text
+        assert '"fetch"' not in parser.inline_js.text
+
+    def test_offsets_map_back_to_fragments(self, html_parser):
+        html_parser.parse_string(_INLINE_DOC)
+        js = html_parser.inline_js
+
+        assert js.locate(js.text.index("navigator")) == "<script> #2"
+        # The separator between fragments belongs to neither
+        assert js.locate(js.segments[0][1]) is None
+
+    def test_sources_reset_between_documents(self, html_parser):
+        html_parser.parse_string(_INLINE_DOC)
+        html_parser.parse_string("<p>plain</p>")
+        assert not html_parser.inline_css
+        assert not html_parser.inline_js
@@ -1,12 +1,21 @@
 """Whitebox tests for the JavaScript parser.
 
 Tests internals: tree-sitter AST node handling, false positive prevention via AST
-(comments/strings), and custom rules injection.
+(comments/strings), custom rules injection, the regex fallback's
+comment/string stripping, minified-file handling, large-file reading, non-ASCII
+text, and incremental re-parsing.
 """
 
+import random
+from pathlib import Path
+
 import pytest
 from unittest.mock import patch
-from src.parsers.js_parser import JavaScriptParser, _TREE_SITTER_AVAILABLE
+from src.parsers.js_parser import JavaScriptParser, _TREE_SITTER_AVAILABLE, strip_comments_and_strings
+from src.parsers.minified import detect_minified
+from src.parsers import source_reader
+from src.parsers.js_incremental import TextEdit, TreeCache, compute_edit
+from src.parsers.rule_registry import RuleRegistry
 
 
 # --- AST Syntax Detection ---
@@ -35,6 +44,19 @@ class TestFalsePositives:
         assert 'fetch' not in parse_features(js)
 
 
+# --- Feature Details ---
+
+@pytest.mark.whitebox
+def test_repeated_api_hits_give_one_detail(js_parser):
+    js = '"use strict";\n' + 'fetch(url).then(r => r.json());\n' * 3000
+    js_parser.parse_string(js)
+    features = [d['feature'] for d in js_parser.feature_details]
+    assert len(features) == len(set(features))
+    fetch = next(d for d in js_parser.feature_details if d['feature'] == 'fetch')
+    assert len(fetch['matched_apis']) == len(set(fetch['matched_apis']))
+    assert features[0] == 'use-strict'
+
+
 # --- Custom Rules ---
 
 @pytest.fixture
@@ -59,7 +81,8 @@ def custom_js_rules():
 @pytest.fixture
 def js_parser_with_custom(custom_js_rules):
     """JavaScriptParser with injected custom rules."""
-    with patch('src.parsers.js_parser.get_custom_js_rules', return_value=custom_js_rules):
+    with patch('src.parsers.rule_registry._registry', RuleRegistry()), \
+            patch('src.parsers.rule_registry.get_custom_js_rules', return_value=custom_js_rules):
         parser = JavaScriptParser()
         yield parser
 
@@ -75,3 +98,285 @@ class TestJSCustomRules:
         features = js_parser_with_custom.parse_string(js)
         assert "test-custom-api" in features
         assert "promises" in features
+
+
+# --- Comment/String Stripping (regex fallback) ---
+
+VALIDATION_DIR = Path(__file__).resolve().parents[2] / 'validation'
+
+
+def _reference_strip(js_content: str) -> str:
+    """The original character-by-character stripper, kept as the oracle."""
+    result = []
+    i = 0
+    length = len(js_content)
+    while i < length:
+        if i < length - 1 and js_content[i:i+2] == '//':
+            while i < length and js_content[i] != '\n':
+                i += 1
+            continue
+        if i < length - 1 and js_content[i:i+2] == '/*':
+            i += 2
+            while i < length - 1 and js_content[i:i+2] != '*/':
+                i += 1
+            i += 2
+            continue
+        if js_content[i] in '"\'':
+            quote = js_content[i]
+            result.append(quote)
+            i += 1
+            while i < length:
+                if js_content[i] == '\\' and i + 1 < length:
+                    i += 2
+                elif js_content[i] == quote:
+                    result.append(quote)
+                    i += 1
+                    break
+                else:
+                    i += 1
+            continue
+        if js_content[i] == '`':
+            result.append('`')
+            i += 1
+            while i < length:
+                if js_content[i] == '\\' and i + 1 < length:
+                    i += 2
+                elif js_content[i] == '`':
+                    result.append('`')
+                    i += 1
+                    break
+                elif js_content[i:i+2] == '${':
+                    result.append('${x}')
+                    i += 2
+                    depth = 1
+                    while i < length and depth > 0:
+                        if js_content[i] == '{':
+                            depth += 1
+                        elif js_content[i] == '}':
+                            depth -= 1
+                        i += 1
+                else:
+                    i += 1
+            continue
+        result.append(js_content[i])
+        i += 1
+    return ''.join(result)
+
+
+def _corpus_files():
+    return sorted(VALIDATION_DIR.rglob('*.js')) + sorted(VALIDATION_DIR.rglob('*.html'))
+
+
+@pytest.mark.whitebox
+class TestStripCommentsAndStrings:
+    """strip_comments_and_strings must match the original loop exactly."""
+
+    @pytest.mark.parametrize('path', _corpus_files(), ids=lambda p: str(p.relative_to(VALIDATION_DIR)))
+    def test_matches_reference_on_validation_corpus(self, path):
+        text = path.read_text(encoding='utf-8', errors='replace')
+        assert strip_comments_and_strings(text) == _reference_strip(text)
+
+    @pytest.mark.parametrize('js', [
+        '', '/', '*/', '/*', '/*/ x', '//', 'a // b\nc', 'a /* b */ c', '"abc', "'a\\'b' c",
+        '"a\\', '`a${b}c`', '`a${ {x: 1} }b` d', '`a${', '`${`', '`\\`x`', '`a$b`', '"x\ny" z',
+        '// "not a string"\n"/* not a comment */"', '`${"}"}` tail',
+    ])
+    def test_matches_reference_on_edge_cases(self, js):
+        assert strip_comments_and_strings(js) == _reference_strip(js)
+
+    def test_matches_reference_on_random_token_soup(self):
+        rng = random.Random(41)
+        pieces = ['/', '*', '"', "'", '`', '\\', '$', '{', '}', '\n', ' ', 'a', 'fetch(', ')']
+        for _ in range(2000):
+            js = ''.join(rng.choice(pieces) for _ in range(rng.randint(0, 40)))
+            assert strip_comments_and_strings(js) == _reference_strip(js), js
+
+
+# --- Locating hits (parse_string(locate=True)) ---
+
+
+@pytest.mark.whitebox
+class TestLocatedHits:
+    _JS = ('// fetch() in a comment, café\n'
+           'const url = "fetch(x) é";\n'
+           'fetch(url).then(r => r.json());\n'
+           'let big = 10n;\n')
+
+    def _located(self, parser):
+        parser.parse_string(self._JS, locate=True)
+        return {feature: [self._JS[o:o + 5] for o in offsets]
+                for feature, offsets in parser.feature_offsets.items()}
+
+    def test_hits_are_located_in_code_only(self, js_parser):
+        at = self._located(js_parser)
+        assert at['fetch'] == ['fetch']
+        assert at['bigint'] == ['10n;\n']
+        assert at['const'] == ['const']
+
+    def test_regex_fallback_locates_hits_too(self, js_parser):
+        with patch('src.parsers.js_parser._get_ts_parser', return_value=None):
+            at = self._located(js_parser)
+        assert at['fetch'] == ['fetch']
+
+
+# --- Minified / generated files ---
+
+# One 3 KB line, like a bundler's output
+_BUNDLE = ';'.join(f'fetch("/a{i}").then(function(r){{return r.json()}})' for i in range(60)) + \
+    ';foo.unknownThing();new Promise(function(){})'
+
+
+@pytest.mark.whitebox
+class TestMinifiedFiles:
+    def test_detection(self):
+        assert detect_minified(_BUNDLE).startswith('average line length')
+        assert detect_minified('// @generated by protoc\n' + 'x = 1;\n' * 500).startswith('generated-file marker')
+        assert detect_minified('x = 1;\n' * 500 + '//# sourceMappingURL=app.js.map\n') == 'sourceMappingURL comment'
+        assert detect_minified('const x = 1;\n' * 500) is None
+        assert detect_minified(_BUNDLE[:1000]) is None  # too small to bother
+
+    def test_fast_mode_detects_features_only(self, tmp_path):
+        bundle = tmp_path / 'bundle.min.js'
+        bundle.write_text(_BUNDLE, encoding='utf-8')
+        full = JavaScriptParser()
+        full.minified_mode = 'full'
+        expected = set(full.parse_file(str(bundle)))
+        assert full.minified_reason is None and full.unrecognized_patterns
+
+        parser = JavaScriptParser()
+        assert parser.parse_file(str(bundle)) == expected
+        assert parser.minified_reason.startswith('average line length')
+        assert parser.unrecognized_patterns == set()
+        assert parser.feature_details == []
+
+    def test_skip_mode_skips_the_file(self, tmp_path):
+        bundle = tmp_path / 'bundle.min.js'
+        bundle.write_text(_BUNDLE, encoding='utf-8')
+        parser = JavaScriptParser()
+        parser.parse_string('fetch("/x")')
+        parser.minified_mode = 'skip'
+        assert parser.parse_file(str(bundle)) == set()
+        assert parser.minified_reason is not None
+        assert parser.feature_details == []
+
+
+# --- Large files ---
+
+@pytest.mark.whitebox
+class TestLargeFiles:
+    _JS = ('// fetch() in a comment\nconst s = "Promise.any";\n'
+           'const t = `a ${fetch("/x")} b`;\nnew IntersectionObserver(cb);\n') * 50
+
+    def test_mapped_file_gives_same_result_as_string(self, tmp_path, monkeypatch):
+        script = tmp_path / 'app.js'
+        script.write_text(self._JS, encoding='utf-8')
+        expected = JavaScriptParser().parse_string(self._JS)
+
+        monkeypatch.setattr(source_reader, 'LARGE_FILE_SIZE', 1)
+        with source_reader.open_source(script) as source:
+            assert not isinstance(source, bytes)
+        parser = JavaScriptParser()
+        parser.minified_mode = 'full'
+        assert parser.parse_file(str(script)) == expected
+        assert 'intersectionobserver' in expected
+
+    def test_invalid_utf8_is_rejected(self, tmp_path, monkeypatch):
+        script = tmp_path / 'bad.js'
+        script.write_bytes(b'const a = "\xff";\n' * 10)
+        monkeypatch.setattr(source_reader, 'LARGE_FILE_SIZE', 1)
+        with pytest.raises(ValueError, match='not valid UTF-8'):
+            JavaScriptParser().parse_file(str(script))
+
+
+# --- Non-ASCII text (AST byte offsets vs. str offsets) ---
+
+@pytest.mark.whitebox
+class TestNonAsciiText:
+    _JS = ('let big = 10n;\n'
+           'fetch("/api").then(r => r.json());\n'
+           'const el = document.querySelector("#out");\n'
+           'const data = JSON.parse("{}");\n'
+           'const keys = Object.keys({ a: "b" });\n')
+
+    @staticmethod
+    def _parse(js):
+        parser = JavaScriptParser()
+        return parser.parse_string(js), parser.unrecognized_patterns
+
+    # Extra bytes before the code: with 7+ '10n' was missed, with 10 / 27 the
+    # shifted slices gave 'API: OOct' / 'method: .querySSor()'
+    @pytest.mark.parametrize('count', [7, 10, 27])
+    def test_multibyte_text_before_code_does_not_shift_hits(self, count):
+        features, unrecognized = self._parse(f'// caf{"é" * count}\nconst s = "{"ü" * count}";\n' + self._JS)
+        assert (features, unrecognized) == self._parse('// cafe\nconst s = "u";\n' + self._JS)
+        assert {'bigint', 'fetch', 'queryselector'} <= features
+        assert unrecognized == set()
+
+
+# --- Incremental re-parsing ---
+
+@pytest.mark.whitebox
+@pytest.mark.skipif(not _TREE_SITTER_AVAILABLE, reason="tree-sitter not installed")
+class TestIncrementalParsing:
+    _JS = 'const a = fetch("/x");\n/* note */\nlet b = a ?? 1;\nnew IntersectionObserver(cb);\n'
+
+    def _parse_both(self, parser, path, text):
+        path.write_text(text, encoding='utf-8')
+        fresh = JavaScriptParser()
+        expected = (fresh.parse_file(str(path)), fresh.feature_details, fresh.unrecognized_patterns)
+        got = (parser.parse_file(str(path)), parser.feature_details, parser.unrecognized_patterns)
+        assert got == expected
+
+    def test_edits_give_same_results_as_fresh_parse(self, tmp_path):
+        script = tmp_path / 'app.js'
+        parser = JavaScriptParser()
+        parser.incremental = True
+        text = self._JS
+        self._parse_both(parser, script, text)
+        for change in ('fetch', 'fetcx', 'class fetch {}\n', '`${x}` + "y"', '{ broken'):
+            text = text.replace('let b', change + 'let b', 1)
+            self._parse_both(parser, script, text)
+        self._parse_both(parser, script, text.replace('fetcx', 'fetch'))
+
+    def test_unchanged_statements_are_not_walked_again(self, tmp_path):
+        script = tmp_path / 'app.js'
+        script.write_text(self._JS, encoding='utf-8')
+        parser = JavaScriptParser()
+        parser.incremental = True
+        parser.parse_file(str(script))
+
+        script.write_text(self._JS + 'navigator.geolocation;\n', encoding='utf-8')
+        with patch.object(parser, '_detect_ast_syntax_features',
+                          wraps=parser._detect_ast_syntax_features) as walk:
+            features = parser.parse_file(str(script))
+        assert walk.call_count == 1
+        assert {'fetch', 'intersectionobserver', 'geolocation'} <= features
+
+    def test_trees_are_only_kept_when_enabled(self, tmp_path):
+        script = tmp_path / 'app.js'
+        script.write_text(self._JS, encoding='utf-8')
+        parser = JavaScriptParser()
+        parser.parse_file(str(script))
+        assert len(parser._trees) == 0
+        parser.incremental = True
+        parser.parse_file(str(script))
+        assert len(parser._trees) == 1
+
+
+@pytest.mark.whitebox
+class TestIncrementalHelpers:
+    def test_compute_edit(self):
+        assert compute_edit(b'abc', b'abc') is None
+        assert compute_edit(b'let a = 1;', b'let ab = 1;') == TextEdit(5, 5, 6)
+        assert compute_edit(b'aaaa', b'aa') == TextEdit(2, 4, 2)
+        old = b'x' * 10000 + b'y' + b'z' * 10000
+        assert compute_edit(old, old.replace(b'y', b'QQ')) == TextEdit(10000, 10001, 10002)
+
+    def test_tree_cache_evicts_least_recently_used(self):
+        cache = TreeCache(max_files=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1 and cache.get('c') == 3